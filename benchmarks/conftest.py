@@ -0,0 +1,236 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of shellfoundry commands against local stand-ins.
+
+GitHub and CloudShell packaging API are replaced by the local HTTP server,
+shells are generated with the requested size.
+
+Usage:
+    pytest benchmarks [--shell-files N] [--driver-size BYTES]
+        [--shell-attributes N] [--templates-count N]
+        [--benchmark-min-rounds N] [--benchmark-json results.json]
+
+Results saved with --benchmark-save are compared with
+--benchmark-compare, --benchmark-compare-fail=mean:10% fails on regressions.
+"""
+
+import shutil
+
+import pytest
+import yaml
+from standin import StandIn
+from synthetic import (
+    STANDARD_NAME,
+    STANDARD_VERSION,
+    gen1_shell,
+    gen2_shell,
+    gen2_template,
+    write_tree,
+)
+
+from shellfoundry.utilities.cache.file_cache import CACHE_DIR_ENV
+from shellfoundry.utilities.config import config_providers
+from shellfoundry.utilities.config.config_snapshot import clear_snapshots
+from shellfoundry.utilities.http_sessions import close_sessions
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # benchmarks are not collected without the plugin
+    collect_ignore_glob = ["test_*.py"]
+
+SHELL_NAME = "BenchShell"
+TEMPLATE_NAME = "gen2/" + STANDARD_NAME
+TEMPLATE_REPO = "bench-template"
+SHELL_REPO = "bench-shell"
+SIZE_OPTIONS = {
+    "shell_files": ("--shell-files", 100, "amount of driver modules"),
+    "driver_size": ("--driver-size", 1024 * 1024, "total driver size in bytes"),
+    "shell_attributes": ("--shell-attributes", 100, "amount of shell attributes"),
+    "templates_count": (
+        "--templates-count",
+        20,
+        "amount of additional templates in the templates list",
+    ),
+}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("shellfoundry benchmarks")
+    for dest, (option, default, help_text) in SIZE_OPTIONS.items():
+        group.addoption(
+            option,
+            dest=dest,
+            type=int,
+            default=default,
+            help="{} (default {})".format(help_text, default),
+        )
+
+
+@pytest.fixture(scope="session")
+def shell_size(request):
+    """Size of the synthetic shells and templates list."""
+    return {
+        dest: request.config.getoption(dest, default)
+        for dest, (_, default, _) in SIZE_OPTIONS.items()
+    }
+
+
+@pytest.fixture(scope="session")
+def stand_in(shell_size):
+    files = shell_size["shell_files"]
+    driver_size = shell_size["driver_size"]
+    attributes = shell_size["shell_attributes"]
+    template = gen2_template(files, driver_size, attributes)
+
+    repositories = {
+        TEMPLATE_REPO: template,
+        SHELL_REPO: gen2_shell(SHELL_NAME, files, driver_size, attributes),
+    }
+    standards = {STANDARD_NAME: [STANDARD_VERSION]}
+    templates = [
+        {
+            "name": TEMPLATE_NAME,
+            "description": "Synthetic resource template",
+            "repository": "https://github.com/QualiSystems/" + TEMPLATE_REPO,
+            "params": {"project_name": None},
+            "min_cs_ver": 8.0,
+        }
+    ]
+    for index in range(shell_size["templates_count"]):
+        name = "bench-{}".format(index)
+        repository = "{}-{}".format(TEMPLATE_REPO, index)
+        repositories[repository] = template
+        standards[name] = ["1.0.0", "1.0.1"]
+        templates.append(
+            {
+                "name": "gen2/" + name,
+                "description": "Synthetic template {}".format(index),
+                "repository": "https://github.com/QualiSystems/" + repository,
+                "params": {"project_name": None},
+                "min_cs_ver": 8.0,
+            }
+        )
+
+    server = StandIn(
+        yaml.safe_dump({"templates": templates}), repositories, standards
+    ).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def environment(tmp_path, monkeypatch, stand_in):
+    """Run every benchmark in its own folder with its own cache and configuration.
+
+    :return: working folder
+    """
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+
+    config_path = str(tmp_path / "global_config.yml")
+    with open(config_path, "w") as stream:
+        yaml.safe_dump(
+            {
+                "install": {
+                    "host": stand_in.host,
+                    "port": stand_in.port,
+                    "username": "admin",
+                    "password": "admin",
+                    "domain": "Global",
+                    "author": "Benchmark",
+                    "online_mode": "True",
+                }
+            },
+            stream,
+        )
+    monkeypatch.setattr(
+        config_providers.GlobalConfigProvider,
+        "get_config_path",
+        lambda self: config_path,
+    )
+
+    cookiecutter_config = str(tmp_path / "cookiecutterrc")
+    with open(cookiecutter_config, "w") as stream:
+        yaml.safe_dump(
+            {
+                "cookiecutters_dir": str(tmp_path / "cookiecutters"),
+                "replay_dir": str(tmp_path / "replay"),
+            },
+            stream,
+        )
+    monkeypatch.setenv("COOKIECUTTER_CONFIG", cookiecutter_config)
+
+    stand_in.patch_requests(monkeypatch)
+    stand_in.shells.clear()
+    del stand_in.requests[:]
+
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+
+    clear_snapshots()
+    yield str(work_dir)
+    close_sessions()
+    clear_snapshots()
+
+
+@pytest.fixture
+def clear_cache(tmp_path):
+    """Function removing shellfoundry cache, runs start cold after it."""
+
+    def clear():
+        shutil.rmtree(str(tmp_path / "cache"), ignore_errors=True)
+        close_sessions()
+
+    return clear
+
+
+@pytest.fixture
+def rounds(request):
+    return request.config.getoption("benchmark_min_rounds", 5)
+
+
+@pytest.fixture
+def bench(benchmark, shell_size, rounds):
+    """Run the target with setup before every round.
+
+    :return: function taking target, setup and extra info of the benchmark
+    """
+
+    def run(target, setup=None, **extra_info):
+        benchmark.extra_info.update(shell_size)
+        benchmark.extra_info.update(extra_info)
+        return benchmark.pedantic(
+            target, setup=setup, rounds=rounds, warmup_rounds=1, iterations=1
+        )
+
+    return run
+
+
+@pytest.fixture
+def shell_path(tmp_path, shell_size):
+    """2nd generation shell source folder outside the working folder."""
+    return write_tree(
+        str(tmp_path / "source" / SHELL_NAME),
+        gen2_shell(
+            SHELL_NAME,
+            shell_size["shell_files"],
+            shell_size["driver_size"],
+            shell_size["shell_attributes"],
+        ),
+    )
+
+
+@pytest.fixture
+def gen1_shell_path(tmp_path, shell_size):
+    """1st generation shell source folder outside the working folder."""
+    return write_tree(
+        str(tmp_path / "source" / ("gen1-" + SHELL_NAME)),
+        gen1_shell(
+            SHELL_NAME,
+            shell_size["shell_files"],
+            shell_size["driver_size"],
+            shell_size["shell_attributes"],
+        ),
+    )
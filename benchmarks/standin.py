@@ -0,0 +1,234 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Local HTTP stand-in for GitHub and CloudShell packaging API.
+
+GitHub requests are sent to the stand-in with the original host
+as the first path segment, e.g. http://127.0.0.1:<port>/api.github.com/repos/...
+CloudShell requests come as is, the stand-in is configured as CloudShell server.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from urllib.parse import urlsplit, urlunsplit
+except ImportError:
+    from urlparse import urlsplit, urlunsplit
+
+import requests
+from synthetic import make_zip
+
+GITHUB_HOSTS = (
+    "github.com",
+    "api.github.com",
+    "raw.github.com",
+    "raw.githubusercontent.com",
+)
+TOKEN = "benchmark-token"
+FILENAME_RE = re.compile(rb'filename="([^"]+)"')
+
+
+class StandIn(object):
+    def __init__(self, templates_yml, repositories, standards):
+        """Stand-in for GitHub and CloudShell.
+
+        :param str templates_yml: content of the templates list
+        :param dict repositories: repository name and its files
+            served as zipball and raw content of any owner and ref
+        :param dict standards: standard name and its versions
+        """
+        self.templates_yml = templates_yml
+        self.repositories = repositories
+        self.standards = standards
+        self.shells = set()
+        self.requests = []
+        self._zipballs = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def rewrite(self, url):
+        """Send requests to GitHub hosts to the stand-in."""
+        parts = urlsplit(url)
+        if parts.hostname not in GITHUB_HOSTS:
+            return url
+        return urlunsplit(
+            (
+                "http",
+                "{}:{}".format(self.host, self.port),
+                "/" + parts.hostname + parts.path,
+                parts.query,
+                "",
+            )
+        )
+
+    def patch_requests(self, monkeypatch):
+        """Route GitHub requests of all sessions to the stand-in."""
+        send = requests.adapters.HTTPAdapter.send
+
+        def send_to_stand_in(adapter, request, *args, **kwargs):
+            request.url = self.rewrite(request.url)
+            return send(adapter, request, *args, **kwargs)
+
+        monkeypatch.setattr(requests.adapters.HTTPAdapter, "send", send_to_stand_in)
+
+    @staticmethod
+    def commit(owner, repo, ref):
+        return hashlib.sha1("/".join([owner, repo, ref]).encode("utf8")).hexdigest()
+
+    def zipball(self, owner, repo, ref):
+        commit = self.commit(owner, repo, ref)
+        with self._lock:
+            if commit not in self._zipballs:
+                self._zipballs[commit] = make_zip(
+                    self.repositories[repo],
+                    root="{}-{}-{}/".format(owner, repo, commit[:7]),
+                )
+            return self._zipballs[commit]
+
+    def github(self, host, method, path, headers):
+        """Handle GitHub request, return status, content type and body."""
+        segments = path.strip("/").split("/")
+        if host == "api.github.com" and len(segments) >= 4 and segments[0] == "repos":
+            owner, repo, action = segments[1:4]
+            if repo not in self.repositories:
+                return 404, "application/json", b"{}"
+            ref = "/".join(segments[4:]) or "master"
+            if action == "commits":
+                return 200, "text/plain", self.commit(owner, repo, ref).encode()
+            if action == "zipball":
+                return 200, "application/zip", self.zipball(owner, repo, ref)
+            if action == "branches":
+                branches = [
+                    {"name": name, "commit": {"sha": self.commit(owner, repo, name)}}
+                    for name in ["master"] + sorted(self.standards.get("resource", []))
+                ]
+                return 200, "application/json", json.dumps(branches).encode()
+        elif host.startswith("raw.") and len(segments) >= 4:
+            repo = segments[1]
+            file_path = "/".join(segments[3:])
+            if segments[-1] == "templates_v1.yml":
+                etag = '"{}"'.format(
+                    hashlib.sha1(self.templates_yml.encode("utf8")).hexdigest()
+                )
+                if headers.get("If-None-Match") == etag:
+                    return 304, "text/plain", b""
+                return 200, "text/plain", self.templates_yml.encode("utf8"), etag
+            files = self.repositories.get(repo, {})
+            if file_path in files:
+                return 200, "text/plain", files[file_path]
+        return 404, "text/plain", b"Not Found"
+
+    def cloudshell(self, method, path, body):
+        """Handle CloudShell packaging API request."""
+        segments = path.strip("/").split("/")[1:]
+        if segments == ["Auth", "Login"] and method == "PUT":
+            return 200, "application/json", json.dumps(TOKEN).encode()
+        if segments == ["Standards"] and method == "GET":
+            standards = [
+                {
+                    "StandardName": "cloudshell_{}_standard".format(
+                        name.replace("-", "_")
+                    ),
+                    "Versions": versions,
+                }
+                for name, versions in sorted(self.standards.items())
+            ]
+            return 200, "application/json", json.dumps(standards).encode()
+        if segments == ["Shells"] and method == "POST":
+            match = FILENAME_RE.search(body[:4096])
+            name = match.group(1).decode("utf8").rsplit(".", 1)[0] if match else ""
+            if name in self.shells:
+                return 400, "text/plain", b"Shell already exists"
+            self.shells.add(name)
+            return 201, "text/plain", b""
+        if len(segments) == 2 and segments[0] == "Shells":
+            name = requests.utils.unquote(segments[1])
+            if method == "GET":
+                if name not in self.shells:
+                    return 400, "text/plain", b"Shell not found"
+                return (
+                    200,
+                    "application/json",
+                    json.dumps({"Name": name, "IsOfficial": False}).encode(),
+                )
+            if method == "PUT":
+                if name not in self.shells:
+                    return 404, "text/plain", b"Shell not found"
+                return 200, "text/plain", b""
+        return 404, "text/plain", b"Not Found"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if not size:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _handle(self):
+        stand_in = self.server.stand_in
+        body = self._read_body()
+        path = urlsplit(self.path).path
+        stand_in.requests.append((self.command, path))
+        host = path.strip("/").split("/")[0]
+        if host in GITHUB_HOSTS:
+            response = stand_in.github(
+                host, self.command, path[len(host) + 1 :], self.headers
+            )
+        else:
+            response = stand_in.cloudshell(self.command, path, body)
+
+        status, content_type, content = response[:3]
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        if len(response) > 3:
+            self.send_header("ETag", response[3])
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
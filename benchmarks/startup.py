@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Measure shellfoundry CLI startup time per command.
+
+Every measurement is made in a fresh interpreter, it imports the CLI
+and the modules the command loads before doing any work.
+
+Usage: python benchmarks/startup.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules imported by each command on top of shellfoundry.bootstrap
+COMMAND_MODULES = {
+    "version": [],
+    "list": ["shellfoundry.commands.list_command"],
+    "new": ["shellfoundry.commands.new_command"],
+    "pack": ["shellfoundry.commands.pack_command"],
+    "install": [
+        "shellfoundry.commands.install_command",
+        "shellfoundry.commands.pack_command",
+    ],
+    "dist": [
+        "shellfoundry.commands.dist_command",
+        "shellfoundry.commands.pack_command",
+    ],
+    "watch": [
+        "shellfoundry.commands.watch_command",
+        "shellfoundry.commands.pack_command",
+        "shellfoundry.utilities.installer",
+        "shellfoundry.utilities.shell_package_installer",
+    ],
+    "generate": [
+        "shellfoundry.commands.generate_command",
+        "shellfoundry.commands.pack_command",
+    ],
+    "config": ["shellfoundry.commands.config_command"],
+    "show": ["shellfoundry.commands.show_command"],
+    "extend": ["shellfoundry.commands.extend_command"],
+    "get_templates": ["shellfoundry.commands.get_templates_command"],
+    "delete": ["shellfoundry.commands.delete_command"],
+}
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+import shellfoundry.bootstrap
+cli_time = time.perf_counter() - start
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+total_time = time.perf_counter() - start
+print(json.dumps({"cli": cli_time, "total": total_time, "modules": len(sys.modules)}))
+"""
+
+
+def measure(command, repeat):
+    """Import time of the command in seconds, median of repeated runs."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, "-c", PROBE] + COMMAND_MODULES[command], cwd=ROOT_DIR
+        )
+        samples.append(json.loads(output.decode("utf-8")))
+    return {
+        "cli": statistics.median(sample["cli"] for sample in samples),
+        "total": statistics.median(sample["total"] for sample in samples),
+        "modules": samples[-1]["modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("commands", nargs="*", default=sorted(COMMAND_MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to the file")
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        "{:<15}{:>12}{:>12}{:>10}".format("command", "cli, ms", "total, ms", "modules")
+    )
+    for command in args.commands:
+        result = results[command] = measure(command, max(args.repeat, 1))
+        print(
+            "{:<15}{:>12.1f}{:>12.1f}{:>10}".format(
+                command, result["cli"] * 1000, result["total"] * 1000, result["modules"]
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(
+                {"python": sys.version.split()[0], "commands": results},
+                output_file,
+                indent=2,
+                sort_keys=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Synthetic shells of configurable size used by the benchmarks.
+
+Every generator returns a dict of file paths relative to the shell root
+and their binary content. Content is pseudo random but deterministic,
+so archives of the same size compress the same way between runs.
+"""
+
+import base64
+import io
+import os
+import random
+import zipfile
+
+STANDARD_NAME = "resource"
+STANDARD_VERSION = "2.0.3"
+DRIVER_FILE = "BenchDriver.zip"
+ICON_FILE = "shell-icon.png"
+# 1x1 transparent PNG
+ICON = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="  # noqa: E501
+)
+DRIVER_METADATA = """<Driver Description="Benchmark shell driver" MainClass="driver.BenchDriver" Name="BenchDriver" Version="1.0.*" PythonVersion="3">
+    <Layout>
+        <Category Name="Hidden Commands">
+            <Command Description="" DisplayName="Orchestration Save" Name="orchestration_save" />
+        </Category>
+    </Layout>
+</Driver>
+"""  # noqa: E501
+DRIVER = """from cloudshell.shell.core.resource_driver_interface import (
+    ResourceDriverInterface,
+)
+
+
+class BenchDriver(ResourceDriverInterface):
+    def initialize(self, context):
+        pass
+
+    def get_inventory(self, context):
+        pass
+
+    def cleanup(self):
+        pass
+"""
+TOSCA_META = """TOSCA-Meta-File-Version: 1.0
+CSAR-Version: 0.1.0
+Created-By: Benchmark
+Entry-Definitions: shell-definition.yaml
+"""
+DATAMODEL = """<?xml version="1.0" encoding="utf-8"?>
+<DataModelInfo xmlns="http://schemas.qualisystems.com/ResourceManagement/DataModelSchema.xsd">
+    <Attributes>
+    </Attributes>
+    <ResourceFamilies>
+        <ResourceFamily Name="Bench Family" Description="" IsSearchable="true">
+            <AttachedAttributes />
+            <AttributeValues />
+            <Models>
+            </Models>
+            <Categories />
+        </ResourceFamily>
+    </ResourceFamilies>
+    <DriverDescriptors />
+    <ScriptDescriptors />
+</DataModelInfo>
+"""  # noqa: E501
+
+
+def _module(rnd, size):
+    """Python module of about the size with random constants."""
+    lines = ['"""Synthetic driver module."""', ""]
+    written = 0
+    index = 0
+    while written < size:
+        line = 'VALUE_{} = "{:032x}"'.format(index, rnd.getrandbits(128))
+        lines.append(line)
+        written += len(line) + 1
+        index += 1
+    return ("\n".join(lines) + "\n").encode("utf8")
+
+
+def driver_files(files, driver_size, folder="src"):
+    """Driver folder with the amount of modules sharing the driver size.
+
+    :param int files: amount of synthetic modules
+    :param int driver_size: total size of the modules in bytes
+    """
+    rnd = random.Random(files * 31 + driver_size)
+    result = {
+        folder + "/driver.py": DRIVER.encode("utf8"),
+        folder + "/drivermetadata.xml": DRIVER_METADATA.encode("utf8"),
+        folder + "/requirements.txt": b"cloudshell-shell-core>=7.0.0,<8.0.0\n",
+    }
+    for index in range(files):
+        # nested packages keep folders of a realistic size
+        path = "{}/package_{}/module_{}.py".format(folder, index // 20, index)
+        result[path] = _module(rnd, driver_size // max(files, 1))
+    for index in range((files + 19) // 20):
+        result["{}/package_{}/__init__.py".format(folder, index)] = b""
+    return result
+
+
+def shell_definition(name, attributes):
+    """TOSCA shell definition with the amount of attributes."""
+    properties = "".join(
+        "      bench_attribute_{index}:\n"
+        "        type: string\n"
+        '        default: "value {index}"\n'
+        "        description: Synthetic attribute {index}\n"
+        "        tags: [setting, configuration]\n".format(index=index)
+        for index in range(attributes)
+    )
+    return (
+        "tosca_definitions_version: tosca_simple_yaml_1_0\n"
+        "\n"
+        "metadata:\n"
+        "  template_name: {name}\n"
+        "  template_author: Benchmark\n"
+        "  template_version: 1.0.0\n"
+        "  template_icon: {icon}\n"
+        "\n"
+        "description: >\n"
+        "  Synthetic shell used by the benchmarks\n"
+        "\n"
+        "imports:\n"
+        "  - cloudshell_standard: cloudshell_{standard}_standard_{version}.yaml\n"
+        "\n"
+        "node_types:\n"
+        "\n"
+        "  vendor.resource.BenchShell:\n"
+        "    derived_from: cloudshell.nodes.GenericResource\n"
+        "    properties:\n"
+        "{properties}"
+        "    artifacts:\n"
+        "      icon:\n"
+        "        file: {icon}\n"
+        "        type: tosca.artifacts.File\n"
+        "      driver:\n"
+        "        file: {driver}\n"
+        "        type: tosca.artifacts.File\n"
+    ).format(
+        name=name,
+        icon=ICON_FILE,
+        standard=STANDARD_NAME.replace("-", "_"),
+        version=STANDARD_VERSION.replace(".", "_"),
+        properties=properties or "      {}\n",
+        driver=DRIVER_FILE,
+    )
+
+
+def gen2_shell(name, files, driver_size, attributes):
+    """2nd generation shell source folder."""
+    result = driver_files(files, driver_size)
+    result.update(
+        {
+            "TOSCA-Metadata/TOSCA.meta": TOSCA_META.encode("utf8"),
+            "shell-definition.yaml": shell_definition(name, attributes).encode("utf8"),
+            ICON_FILE: ICON,
+        }
+    )
+    return result
+
+
+def gen1_shell(name, files, driver_size, attributes):
+    """1st generation shell source folder merged from the shell model."""
+    attributes_xml = "".join(
+        '        <AttributeInfo Name="Bench Attribute {0}" Type="String" '
+        'DefaultValue="value {0}" IsReadOnly="false" />\n'.format(index)
+        for index in range(attributes)
+    )
+    shell_model = (
+        "<Shell>\n"
+        "    <ShellAttributes>\n"
+        "{attributes}"
+        "    </ShellAttributes>\n"
+        '    <ShellModel Family="Bench Family">\n'
+        '        <ResourceModel Name="{name}" Description="" '
+        'SupportsConcurrentCommands="true" />\n'
+        "    </ShellModel>\n"
+        "</Shell>\n"
+    ).format(name=name, attributes=attributes_xml)
+    metadata = (
+        '<Metadata Name="{name}" Version="1.0.0" Description="Benchmark shell" '
+        'CreationDate="" LastModifiedDate="" />\n'.format(name=name)
+    )
+    result = driver_files(files, driver_size)
+    result.update(
+        {
+            "datamodel/datamodel.xml": DATAMODEL.encode("utf8"),
+            "datamodel/shell_model.xml": shell_model.encode("utf8"),
+            "datamodel/metadata.xml": metadata.encode("utf8"),
+            "datamodel/shellconfig.xml": b"<ShellConfig />\n",
+            "datamodel/" + ICON_FILE: ICON,
+        }
+    )
+    return result
+
+
+def gen2_template(files, driver_size, attributes):
+    """Cookiecutter template of 2nd generation shell."""
+    result = {
+        "cookiecutter.json": (
+            "{\n"
+            '  "project_name": "",\n'
+            "  \"project_slug\": \"{{ cookiecutter.project_name|lower|replace(' ', '_') }}\",\n"  # noqa: E501
+            '  "full_name": "",\n'
+            '  "release_date": "",\n'
+            '  "python_version": "",\n'
+            '  "server_version": "8.3"\n'
+            "}\n"
+        ).encode("utf8")
+    }
+    shell = gen2_shell(
+        "{{ cookiecutter.project_name }}", files, driver_size, attributes
+    )
+    for path, content in shell.items():
+        result["{{cookiecutter.project_slug}}/" + path] = content
+    return result
+
+
+def write_tree(root, files):
+    """Write files into the folder."""
+    for path, content in files.items():
+        full_path = os.path.join(root, *path.split("/"))
+        if not os.path.isdir(os.path.dirname(full_path)):
+            os.makedirs(os.path.dirname(full_path))
+        with open(full_path, "wb") as stream:
+            stream.write(content)
+    return root
+
+
+def make_zip(files, root=""):
+    """Zip archive with the files, optionally inside the root folder."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        if root:
+            zip_file.writestr(root, b"")
+        for path, content in sorted(files.items()):
+            zip_file.writestr(root + path, content)
+    return buffer.getvalue()
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import pytest
+from conftest import SHELL_NAME, SHELL_REPO
+
+from shellfoundry.commands.extend_command import ExtendCommandExecutor
+from shellfoundry.utilities.shell_package_builder import ShellPackageBuilder
+
+SOURCE_URL = "https://api.github.com/repos/QualiSystems/{}/zipball/master".format(
+    SHELL_REPO
+)
+ATTRIBUTES = ("extended_attribute_1", "extended_attribute_2")
+
+
+@pytest.fixture
+def packed_shell(shell_path, environment, monkeypatch):
+    monkeypatch.chdir(shell_path)
+    ShellPackageBuilder().pack(shell_path)
+    monkeypatch.chdir(environment)
+    return os.path.join(shell_path, "dist", SHELL_NAME + ".zip")
+
+
+def _extend(bench, source, setup=None, **extra_info):
+    def remove_extended():
+        for name in os.listdir(os.curdir):
+            shutil.rmtree(name)
+        if setup:
+            setup()
+
+    bench(
+        lambda: ExtendCommandExecutor().extend(source, ATTRIBUTES),
+        setup=remove_extended,
+        **extra_info
+    )
+    (extended,) = os.listdir(os.curdir)
+    assert os.path.isfile(os.path.join(extended, "shell-definition.yaml"))
+
+
+def test_extend_local_folder(bench, shell_path):
+    _extend(bench, "local:" + shell_path, origin="folder")
+
+
+def test_extend_local_package(bench, packed_shell):
+    _extend(bench, "local:" + packed_shell, origin="package")
+
+
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def test_extend_online_shell(bench, clear_cache, cache):
+    _extend(
+        bench,
+        SOURCE_URL,
+        setup=clear_cache if cache == "cold" else None,
+        origin="online",
+        cache=cache,
+    )
@@ -0,0 +1,32 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+
+from conftest import SHELL_NAME
+
+from shellfoundry.utilities.shell_package_builder import ShellPackageBuilder
+from shellfoundry.utilities.shell_package_installer import ShellPackageInstaller
+
+
+def test_install_package(bench, stand_in, shell_path, monkeypatch):
+    monkeypatch.chdir(shell_path)
+    ShellPackageBuilder().pack(shell_path)
+    stand_in.shells.add(SHELL_NAME)
+
+    bench(lambda: ShellPackageInstaller().install(shell_path, force=True))
+
+    assert ("PUT", "/API/Shells/" + SHELL_NAME) in stand_in.requests
+
+
+def test_install_new_package(bench, stand_in, shell_path, monkeypatch):
+    monkeypatch.chdir(shell_path)
+    ShellPackageBuilder().pack(shell_path)
+
+    bench(
+        lambda: ShellPackageInstaller().install(shell_path, force=True),
+        setup=stand_in.shells.clear,
+    )
+
+    assert ("POST", "/API/Shells") in stand_in.requests
+    assert os.path.isfile(os.path.join(shell_path, "dist", SHELL_NAME + ".zip"))
@@ -0,0 +1,30 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import pytest
+from conftest import TEMPLATE_NAME
+
+from shellfoundry.commands.new_command import NewCommandExecutor
+
+NEW_SHELL_NAME = "new-shell"
+
+
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def test_new_from_online_template(bench, environment, clear_cache, cache):
+    def setup():
+        shutil.rmtree(NEW_SHELL_NAME, ignore_errors=True)
+        if cache == "cold":
+            clear_cache()
+
+    bench(
+        lambda: NewCommandExecutor().new(NEW_SHELL_NAME, TEMPLATE_NAME),
+        setup=setup,
+        cache=cache,
+    )
+
+    assert os.path.isfile(
+        os.path.join(environment, NEW_SHELL_NAME, "shell-definition.yaml")
+    )
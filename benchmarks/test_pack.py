@@ -0,0 +1,37 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import pytest
+from conftest import SHELL_NAME
+
+from shellfoundry.utilities.package_builder import PackageBuilder
+from shellfoundry.utilities.shell_package_builder import ShellPackageBuilder
+
+
+def test_build_gen1_package(bench, gen1_shell_path):
+    builder = PackageBuilder()
+
+    bench(
+        lambda: builder.build_package(
+            gen1_shell_path, SHELL_NAME, SHELL_NAME + "Driver"
+        )
+    )
+
+    assert os.path.isfile(os.path.join(gen1_shell_path, "dist", SHELL_NAME + ".zip"))
+
+
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def test_pack_gen2_shell(bench, shell_path, monkeypatch, cache):
+    monkeypatch.chdir(shell_path)
+    builder = ShellPackageBuilder()
+
+    def setup():
+        if cache == "cold":
+            shutil.rmtree("dist", ignore_errors=True)
+
+    bench(lambda: builder.pack(shell_path), setup=setup, cache=cache)
+
+    assert os.path.isfile(os.path.join(shell_path, "dist", SHELL_NAME + ".zip"))
@@ -0,0 +1,22 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import pytest
+from conftest import TEMPLATE_NAME
+
+from shellfoundry.utilities.standards import Standards
+from shellfoundry.utilities.template_retriever import TemplateRetriever
+
+
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def test_get_templates(bench, clear_cache, shell_size, cache):
+    def list_templates():
+        standards = Standards().fetch()
+        return TemplateRetriever().get_templates(standards=standards)
+
+    templates = bench(
+        list_templates, setup=clear_cache if cache == "cold" else None, cache=cache
+    )
+
+    assert TEMPLATE_NAME in templates
+    assert len(templates) == shell_size["templates_count"] + 1
@@ -1,35 +1,45 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+# Command executors and their dependencies are imported by the commands
+# which use them, so the CLI starts without loading heavy packages
+# that the invoked command doesn't need.
+
 import click
-import pkg_resources
-
-from shellfoundry.commands.config_command import ConfigCommandExecutor
-from shellfoundry.commands.delete_command import DeleteCommandExecutor
-from shellfoundry.commands.dist_command import DistCommandExecutor
-from shellfoundry.commands.extend_command import ExtendCommandExecutor
-from shellfoundry.commands.generate_command import GenerateCommandExecutor
-from shellfoundry.commands.get_templates_command import GetTemplatesCommandExecutor
-from shellfoundry.commands.install_command import InstallCommandExecutor
-from shellfoundry.commands.list_command import ListCommandExecutor
-from shellfoundry.commands.new_command import NewCommandExecutor
-from shellfoundry.commands.pack_command import PackCommandExecutor
-from shellfoundry.commands.show_command import ShowCommandExecutor
+
+from shellfoundry import PACKAGE_NAME
 from shellfoundry.decorators import shellfoundry_version_check
-from shellfoundry.utilities import GEN_ONE, GEN_TWO, LAYER_ONE, NO_FILTER
+from shellfoundry.utilities import (
+    GEN_ONE,
+    GEN_TWO,
+    LAYER_ONE,
+    NO_FILTER,
+    get_installed_version,
+    tracing,
+)
+from shellfoundry.utilities.constants import DEFAULT_MAX_UPLOADS, WATCH_DEBOUNCE_TIME
 
 
 @click.group()
-def cli():
-    pass
+@click.option(
+    "--trace",
+    "trace_path",
+    type=click.Path(dir_okay=False, writable=True),
+    envvar=tracing.TRACE_ENV,
+    help="Write timings of the command phases into the file in Chrome trace format",
+)
+@click.pass_context
+def cli(ctx, trace_path):
+    if trace_path:
+        ctx.call_on_close(
+            tracing.start(trace_path, "command.{}".format(ctx.invoked_subcommand))
+        )
 
 
 @cli.command()
 def version():
     """Displays the shellfoundry version."""
-    click.echo(
-        "shellfoundry version " + pkg_resources.get_distribution("shellfoundry").version
-    )
+    click.echo("shellfoundry version " + get_installed_version(PACKAGE_NAME))
 
 
 @cli.command()  # noqa: A001
@@ -49,10 +59,17 @@ def version():
     "--layer1", "default_view", flag_value=LAYER_ONE, help="Show layer1 shell templates"
 )
 @click.option("--all", "default_view", flag_value=NO_FILTER, help="Show all templates")
+@click.option(
+    "--refresh-standards",
+    is_flag=True,
+    help="Fetch standards from CloudShell instead of using the cached ones",
+)
 @shellfoundry_version_check(abort_if_major=True)
-def list(default_view):  # noqa: A001
+def list(default_view, refresh_standards):  # noqa: A001
     """Lists the available shell templates."""
-    ListCommandExecutor(default_view).list()
+    from shellfoundry.commands.list_command import ListCommandExecutor
+
+    ListCommandExecutor(default_view).list(refresh_standards=refresh_standards)
 
 
 @cli.command()
@@ -71,23 +88,88 @@ def list(default_view):  # noqa: A001
     required=False,
     help="Specify Python version which will be used",
 )
+@click.option(
+    "--refresh-standards",
+    is_flag=True,
+    help="Fetch standards from CloudShell instead of using the cached ones",
+)
 @shellfoundry_version_check(abort_if_major=True)
-def new(name, template, version, python):
+def new(name, template, version, python, refresh_standards):
     """Creates a new shell based on a template."""
-    NewCommandExecutor().new(name, template, version, python)
+    from shellfoundry.commands.new_command import NewCommandExecutor
+
+    NewCommandExecutor().new(name, template, version, python, refresh_standards)
 
 
 @cli.command()
 def pack():
     """Creates a shell package."""
+    from shellfoundry.commands.pack_command import PackCommandExecutor
+
     PackCommandExecutor().pack()
 
 
 @cli.command()
-def install():
-    """Installs the shell package into CloudShell."""
-    PackCommandExecutor().pack()
-    InstallCommandExecutor().install()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--all",
+    "install_all",
+    is_flag=True,
+    help="Installs all 2nd generation shells found under the current folder",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Uploads the shell package even if the same package "
+    "was already installed into CloudShell",
+)
+@click.option(
+    "--max-uploads",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_UPLOADS,
+    show_default=True,
+    help="Maximum number of shell packages uploaded in parallel "
+    "when installing many shells",
+)
+def install(paths, install_all, force, max_uploads):
+    """Installs the shell package into CloudShell.
+
+    Installs the shell from the current folder, or packs and installs
+    all shells from PATHS using one CloudShell session.
+    """
+    from shellfoundry.commands.install_command import InstallCommandExecutor
+    from shellfoundry.commands.pack_command import PackCommandExecutor
+
+    if paths or install_all:
+        InstallCommandExecutor().install_many(paths, install_all, force, max_uploads)
+    else:
+        PackCommandExecutor().pack()
+        InstallCommandExecutor().install(force=force)
+
+
+@cli.command()
+@click.option(
+    "--poll",
+    is_flag=True,
+    help="Polls the shell files for changes instead of using inotify",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=WATCH_DEBOUNCE_TIME,
+    show_default=True,
+    help="Seconds the shell files should stay unchanged before the shell is packed",
+)
+def watch(poll, debounce):
+    """Packs and installs the shell on each change of its files.
+
+    Watches src, deployments, datamodel and the shell definition
+    of the shell in the current folder, CloudShell login is kept
+    between installs.
+    """
+    from shellfoundry.commands.watch_command import WatchCommandExecutor
+
+    WatchCommandExecutor().watch(poll=poll, debounce=debounce)
 
 
 @cli.command()
@@ -98,15 +180,26 @@ def install():
 )
 def dist(enable_cs_repo):
     """Creates a deployable Shell which can be distributed to a production environment."""  # noqa: E501
+    from shellfoundry.commands.dist_command import DistCommandExecutor
+    from shellfoundry.commands.pack_command import PackCommandExecutor
+
     PackCommandExecutor().pack()
     DistCommandExecutor().dist(enable_cs_repo)
 
 
 @cli.command()
-def generate():
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Generate data model on CloudShell instead of using the cached one",
+)
+def generate(refresh):
     """Generates Python driver data model to be used in driver code."""
+    from shellfoundry.commands.generate_command import GenerateCommandExecutor
+    from shellfoundry.commands.pack_command import PackCommandExecutor
+
     PackCommandExecutor().pack()
-    GenerateCommandExecutor().generate()
+    GenerateCommandExecutor().generate(refresh=refresh)
 
 
 @cli.command()
@@ -115,6 +208,8 @@ def generate():
 @click.option("--remove", "key_to_remove", default=None)
 def config(kv, global_cfg, key_to_remove):
     """Configures global/local config values used by shellfoundry."""
+    from shellfoundry.commands.config_command import ConfigCommandExecutor
+
     ConfigCommandExecutor(global_cfg).config(kv, key_to_remove)
 
 
@@ -122,6 +217,8 @@ def config(kv, global_cfg, key_to_remove):
 @click.argument("template_name")
 def show(template_name):
     """Shows all versions of TEMPLATE NAME."""
+    from shellfoundry.commands.show_command import ShowCommandExecutor
+
     ShowCommandExecutor().show(template_name)
 
 
@@ -140,6 +237,8 @@ def extend(source, add_attribute):
     SOURCE - Specify the original Shell location.\n
     \tYou can use 'local://<folder>' to specify a locally saved Shell folder
     """
+    from shellfoundry.commands.extend_command import ExtendCommandExecutor
+
     ExtendCommandExecutor().extend(source, add_attribute)
 
 
@@ -156,6 +255,8 @@ def get_templates(cs_version, output_dir):
 
     CS_VERSION - CloudShell Version
     """
+    from shellfoundry.commands.get_templates_command import GetTemplatesCommandExecutor
+
     GetTemplatesCommandExecutor().get_templates(cs_version, output_dir)
 
 
@@ -166,4 +267,6 @@ def delete(name):
 
     NAME - Shell name installed on CloudShell
     """
+    from shellfoundry.commands.delete_command import DeleteCommandExecutor
+
     DeleteCommandExecutor().delete(name)
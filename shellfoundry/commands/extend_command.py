@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import posixpath
 import re
 import shutil
+import zipfile
+from io import open
 
 import click
+import ruamel.yaml as yaml
 
 from shellfoundry.exceptions import VersionRequestException
 from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
@@ -16,13 +20,23 @@ from shellfoundry.utilities.constants import (
 )
 from shellfoundry.utilities.modifiers.definition.definition_modification import (
     DefinitionModification,
+    get_artifacts_files,
+    get_entry_definition,
 )
-from shellfoundry.utilities.repository_downloader import RepositoryDownloader
-from shellfoundry.utilities.temp_dir_context import TempDirContext
+from shellfoundry.utilities.repository_downloader import (
+    SPOOL_MAX_SIZE,
+    RepositoryDownloader,
+)
+from shellfoundry.utilities.spooled_file import SpooledFile
+from shellfoundry.utilities.tracing import span, traced
 from shellfoundry.utilities.validations import (
     ShellGenerationValidations,
     ShellNameValidations,
 )
+from shellfoundry.utilities.validations.shell_generation_validation import (
+    TOSCA_META_MEMBER,
+    get_shell_root,
+)
 
 
 class ExtendCommandExecutor(object):
@@ -51,74 +65,195 @@ class ExtendCommandExecutor(object):
     def extend(self, source, attribute_names):
         """Create a new shell based on an already existing shell.
 
-        :param str source: The path to the existing shell. Can be a url or local path
+        Shell is written straight into the current folder in one pass,
+        driver and deployment archives are expanded on the way.
+        :param str source: The path to the existing shell. Can be a url, local path
+            or local zip-file
         :param tuple attribute_names: Sequence of attribute names that should be added
         """
-        with TempDirContext("Extended_Shell_Temp_Dir") as temp_dir:
-            try:
-                if self._is_local(source):
-                    temp_shell_path = self._copy_local_shell(
-                        self._remove_prefix(
-                            source, ExtendCommandExecutor.LOCAL_TEMPLATE_URL_PREFIX
-                        ),
-                        temp_dir,
-                    )
+        try:
+            if self._is_local(source):
+                local_source = self._remove_prefix(
+                    source, ExtendCommandExecutor.LOCAL_TEMPLATE_URL_PREFIX
+                )
+                if os.path.isdir(local_source):
+                    shell_path = self._copy_local_shell(local_source, os.path.curdir)
                 else:
-                    temp_shell_path = self._copy_online_shell(source, temp_dir)
-            except VersionRequestException as err:
-                raise click.ClickException(str(err))
-            except Exception:
-                raise click.BadParameter("Check correctness of entered attributes")
-
-            # Remove shell version from folder name
-            shell_path = re.sub(r"-\d+(\.\d+)*/?$", "", temp_shell_path)
-            os.rename(temp_shell_path, shell_path)
-
-            if not self.shell_gen_validations.validate_2nd_gen(shell_path):
-                raise click.ClickException("Invalid second generation Shell.")
+                    shell_path = self._extract_shell_archive(
+                        local_source, os.path.curdir, local_source
+                    )
+            else:
+                shell_path = self._copy_online_shell(source, os.path.curdir)
+        except click.ClickException:
+            raise
+        except VersionRequestException as err:
+            raise click.ClickException(str(err))
+        except Exception:
+            raise click.BadParameter("Check correctness of entered attributes")
 
+        try:
             modificator = DefinitionModification(shell_path)
-            self._unpack_driver_archive(shell_path, modificator)
-            self._remove_quali_signature(shell_path)
-            self._change_author(shell_path, modificator)
-            self._add_based_on(shell_path, modificator)
-            self._add_attributes(shell_path, attribute_names)
-
-            try:
-                shutil.move(shell_path, os.path.curdir)
-            except shutil.Error as err:
-                raise click.BadParameter(str(err))
+            # definition files are parsed once and written once for all edits
+            with span("extend.modify"), modificator.session():
+                self._change_author(shell_path, modificator)
+                self._add_based_on(shell_path, modificator)
+                self._add_attributes(shell_path, attribute_names, modificator)
+        except Exception:
+            shutil.rmtree(shell_path, ignore_errors=True)
+            raise
 
         click.echo("Created shell based on source {}".format(source))
 
+    @traced("extend.copy")
     def _copy_local_shell(self, source, destination):
-        """Copy shell and extract if needed."""
-        if os.path.isdir(source):
-            source = source.rstrip(os.sep)
-            name = os.path.basename(source)
-            ext_shell_path = os.path.join(destination, name)
-            shutil.copytree(source, ext_shell_path)
-        else:
+        """Copy shell folder with its driver and deployment archives expanded."""
+        source = source.rstrip(os.sep)
+        if not os.path.isdir(source):
+            raise click.BadParameter("Check correctness of entered attributes")
+        if not self.shell_gen_validations.validate_2nd_gen(source):
+            raise click.ClickException("Invalid second generation Shell.")
+
+        artifacts = {
+            os.path.normpath(os.path.join(source, artifact_path)): self.ARTIFACTS[name]
+            for name, artifact_path in (
+                DefinitionModification(source).get_artifacts_files(
+                    artifact_name_list=list(self.ARTIFACTS.keys())
+                )
+                or {}
+            ).items()
+        }
+
+        def ignore(folder, names):
+            return [
+                name
+                for name in names
+                if os.path.normpath(os.path.join(folder, name)) in artifacts
+                or (folder == source and name == self.SIGN_FILENAME)
+            ]
+
+        shell_path = self._get_shell_path(destination, os.path.basename(source))
+        try:
+            shutil.copytree(source, shell_path, ignore=ignore)
+            for artifact_path, folder in artifacts.items():
+                if os.path.exists(artifact_path):
+                    self.repository_downloader.repo_extractor.extract_to_folder(
+                        artifact_path, os.path.join(shell_path, folder)
+                    )
+        except Exception:
+            shutil.rmtree(shell_path, ignore_errors=True)
             raise
 
-        return ext_shell_path
+        return shell_path
 
+    @traced("extend.download")
     def _copy_online_shell(self, source, destination):
         """Download shell and extract it."""
-        archive_path = None
-        try:
-            archive_path = self.repository_downloader.download_file(source, destination)
-            ext_shell_path = (
-                self.repository_downloader.repo_extractor.extract_to_folder(
-                    archive_path, destination
-                )
+        with self.repository_downloader.open_archive(source) as archive:
+            return self._extract_shell_archive(archive, destination, source)
+
+    @traced("extend.extract")
+    def _extract_shell_archive(self, archive, destination, source):
+        """Extract shell from zip-file.
+
+        Shell is validated by the zip-file central directory, members are
+        streamed to the destination with driver and deployment archives
+        expanded inline.
+        :param archive: zip-file path or binary file object
+        :param str destination: folder to create shell folder in
+        :param str source: shell source, names shell folder when zip-file
+            has no top level folder
+        :return: path to the shell folder
+        """
+        with zipfile.ZipFile(archive) as zip_file:
+            root = get_shell_root(zip_file.namelist())
+            if root is None:
+                raise click.ClickException("Invalid second generation Shell.")
+
+            name = (
+                root.rstrip("/")
+                or os.path.splitext(os.path.basename(source.rstrip("/")))[0]
             )
-            ext_shell_path = ext_shell_path[0]
-        finally:
-            if archive_path and os.path.exists(archive_path):
-                os.remove(archive_path)
+            shell_path = self._get_shell_path(destination, name)
+            artifacts = self._get_archive_artifacts(zip_file, root)
+            try:
+                self._extract_members(
+                    zip_file,
+                    shell_path,
+                    root,
+                    artifacts,
+                    excluded=(root + self.SIGN_FILENAME,),
+                )
+            except Exception:
+                shutil.rmtree(shell_path, ignore_errors=True)
+                raise
+
+        return shell_path
+
+    def _get_archive_artifacts(self, zip_file, root):
+        """Get artifact members of the zip-file and folders to expand them to."""
+        tosca_meta = zip_file.read(root + TOSCA_META_MEMBER).decode("utf8")
+        entry_definition = get_entry_definition(tosca_meta.splitlines())
+        shell_definition = yaml.YAML(typ="safe").load(
+            zip_file.read(root + entry_definition)
+        )
+        artifacts = get_artifacts_files(shell_definition, list(self.ARTIFACTS.keys()))
+        return {
+            root + posixpath.normpath(artifact_path): self.ARTIFACTS[name]
+            for name, artifact_path in (artifacts or {}).items()
+        }
+
+    def _extract_members(self, zip_file, folder, root="", artifacts=None, excluded=()):
+        """Stream zip-file members under root into the folder.
+
+        :param dict artifacts: nested zip-file members and folders
+            relative to the destination folder to expand them to
+        :param tuple excluded: members which are not extracted
+        """
+        artifacts = artifacts or {}
+        for info in zip_file.infolist():
+            if not info.filename.startswith(root):
+                continue
+            path = info.filename[len(root) :]
+            parts = [part for part in path.split("/") if part]
+            if not parts or info.filename in excluded:
+                continue
+            if ".." in parts or posixpath.isabs(path):
+                raise click.BadParameter("Unsafe path in archive: " + info.filename)
+
+            if info.filename in artifacts:
+                # nested archive is spooled as it has to be seekable
+                with zip_file.open(info) as member, SpooledFile(
+                    max_size=SPOOL_MAX_SIZE
+                ) as nested:
+                    shutil.copyfileobj(member, nested)
+                    with zipfile.ZipFile(nested) as nested_zip:
+                        self._extract_members(
+                            nested_zip,
+                            os.path.join(folder, artifacts[info.filename]),
+                        )
+                continue
+
+            target = os.path.join(folder, *parts)
+            if info.is_dir():
+                if not os.path.isdir(target):
+                    os.makedirs(target)
+                continue
+            if not os.path.isdir(os.path.dirname(target)):
+                os.makedirs(os.path.dirname(target))
+            with zip_file.open(info) as member, open(target, "wb") as stream:
+                shutil.copyfileobj(member, stream)
 
-        return os.path.join(destination, ext_shell_path)
+    @staticmethod
+    def _get_shell_path(destination, name):
+        """Get path of the new shell folder, version is removed from the name."""
+        shell_path = os.path.join(destination, re.sub(r"-\d+(\.\d+)*$", "", name))
+        if os.path.exists(shell_path):
+            raise click.BadParameter(
+                "Destination path '{}' already exists".format(
+                    os.path.abspath(shell_path)
+                )
+            )
+        return shell_path
 
     @staticmethod
     def _is_local(source):
@@ -128,35 +263,6 @@ class ExtendCommandExecutor(object):
     def _remove_prefix(string, prefix):
         return string.rpartition(prefix)[-1]
 
-    def _unpack_driver_archive(self, shell_path, modificator=None):
-        """Unpack driver files from ZIP-archive."""
-        if not modificator:
-            modificator = DefinitionModification(shell_path)
-
-        artifacts = modificator.get_artifacts_files(
-            artifact_name_list=list(self.ARTIFACTS.keys())
-        )
-
-        for artifact_name, artifact_path in artifacts.items():
-
-            artifact_path = os.path.join(shell_path, artifact_path)
-
-            if os.path.exists(artifact_path):
-                self.repository_downloader.repo_extractor.extract_to_folder(
-                    artifact_path,
-                    os.path.join(shell_path, self.ARTIFACTS[artifact_name]),
-                )
-                os.remove(artifact_path)
-
-    @staticmethod
-    def _remove_quali_signature(shell_path):
-        """Remove Quali signature from shell."""
-        signature_file_path = os.path.join(
-            shell_path, ExtendCommandExecutor.SIGN_FILENAME
-        )
-        if os.path.exists(signature_file_path):
-            os.remove(signature_file_path)
-
     def _change_author(self, shell_path, modificator=None):
         """Change shell authoring."""
         author = self.cloudshell_config_reader.read().author
@@ -18,8 +18,12 @@ class GenerateCommandExecutor(object):
         )
         self.driver_generator = driver_generator or DriverGenerator()
 
-    def generate(self):
-        """Generates Python driver by connecting to CloudShell server."""
+    def generate(self, refresh=False):
+        """Generates Python driver by connecting to CloudShell server.
+
+        :param bool refresh: generate data model on CloudShell
+            instead of using the cached one
+        """
         current_path = os.getcwd()
         shell_package = ShellPackage(current_path)
         if not shell_package.is_tosca():
@@ -41,4 +45,6 @@ class GenerateCommandExecutor(object):
             package_full_path=package_full_path,
             shell_filename=shell_filename,
             shell_name=shell_name,
+            definition_path=shell_package.get_definition_path(),
+            refresh=refresh,
         )
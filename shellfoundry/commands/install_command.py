@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import os
+import time
+from collections import OrderedDict
 
 import click
 
@@ -12,8 +14,15 @@ except ImportError:
     # Python 3.x version
     from urllib.error import HTTPError, URLError
 
+from shellfoundry.commands.pack_command import PackCommandExecutor
 from shellfoundry.exceptions import FatalError
+from shellfoundry.utilities.batch_installer import (
+    FAILED,
+    BatchShellInstaller,
+    find_shell_paths,
+)
 from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+from shellfoundry.utilities.constants import DEFAULT_MAX_UPLOADS
 from shellfoundry.utilities.installer import ShellInstaller
 from shellfoundry.utilities.shell_config_reader import ShellConfigReader
 from shellfoundry.utilities.shell_package import ShellPackage
@@ -27,6 +36,7 @@ class InstallCommandExecutor(object):
         installer=None,
         shell_config_reader=None,
         shell_package_installer=None,
+        batch_installer=None,
     ):
         self.cloudshell_config_reader = cloudshell_config_reader or Configuration(
             CloudShellConfigReader()
@@ -36,8 +46,22 @@ class InstallCommandExecutor(object):
         self.shell_package_installer = (
             shell_package_installer or ShellPackageInstaller()
         )
+        self._batch_installer = batch_installer
 
-    def install(self):
+    @property
+    def batch_installer(self):
+        if self._batch_installer is None:
+            self._batch_installer = BatchShellInstaller(
+                PackCommandExecutor(), self.shell_package_installer
+            )
+        return self._batch_installer
+
+    def install(self, force=False):
+        """Install the shell from the current folder.
+
+        :param bool force: upload the package even if the same package
+            was already installed into CloudShell
+        """
         current_path = os.getcwd()
         shell_package = ShellPackage(current_path)
         if shell_package.is_layer_one():
@@ -48,17 +72,74 @@ class InstallCommandExecutor(object):
             )
         else:
             if shell_package.is_tosca():
-                self.shell_package_installer.install(current_path)
+                installed = self.shell_package_installer.install(
+                    current_path, force=force
+                )
+            else:
+                installed = self._install_old_school_shell(force)
+            if installed:
+                click.secho("Successfully installed shell", fg="green")
             else:
-                self._install_old_school_shell()
-            click.secho("Successfully installed shell", fg="green")
+                click.secho("Shell is up to date, nothing to install", fg="green")
+
+    def install_many(
+        self, paths=(), install_all=False, force=False, max_uploads=DEFAULT_MAX_UPLOADS
+    ):
+        """Pack and install many 2nd generation shells using one CloudShell login.
+
+        :param list paths: shells root folders
+        :param bool install_all: install all shells found under the current folder
+        :param bool force: upload packages even if they are already installed
+        :param int max_uploads: amount of packages uploaded in parallel
+        """
+        shell_paths = [os.path.abspath(path) for path in paths]
+        if install_all:
+            shell_paths.extend(find_shell_paths(os.getcwd()))
+        shell_paths = list(OrderedDict.fromkeys(shell_paths))
+        if not shell_paths:
+            raise click.ClickException("No 2nd generation shells were found")
+
+        start_time = time.time()
+        results = self.batch_installer.install(shell_paths, force, max_uploads)
+        self._echo_summary(results, time.time() - start_time)
 
-    def _install_old_school_shell(self):
+        failed = [result for result in results if result.status == FAILED]
+        if failed:
+            raise FatalError(
+                "Failed to install {} of {} shells".format(len(failed), len(results))
+            )
+
+    @staticmethod
+    def _echo_summary(results, elapsed):
+        name_width = max(len(result.shell_name) for result in results)
+        click.echo("Installation summary:")
+        for result in results:
+            line = "  {}  {:<10}  {:>6.1f}s".format(
+                result.shell_name.ljust(name_width), result.status, result.elapsed
+            )
+            if result.error:
+                line += "  " + result.error
+            click.secho(line, fg="red" if result.status == FAILED else "green")
+        statuses = [result.status for result in results]
+        click.echo(
+            "{} shells processed in {:.1f}s: {}".format(
+                len(results),
+                elapsed,
+                ", ".join(
+                    "{} {}".format(statuses.count(status), status)
+                    for status in OrderedDict.fromkeys(statuses)
+                ),
+            )
+        )
+
+    def _install_old_school_shell(self, force=False):
         error = None
         try:
             cloudshell_config = self.cloudshell_config_reader.read()
             shell_config = self.shell_config_reader.read()
-            self.installer.install(shell_config.name, cloudshell_config)
+            return self.installer.install(
+                shell_config.name, cloudshell_config, force=force
+            )
         except HTTPError as e:
             if e.code == 401:
                 raise FatalError(
@@ -34,12 +34,18 @@ class ListCommandExecutor(object):
         self.standards = standards or Standards()
         self.cloudshell_config_reader = Configuration(CloudShellConfigReader())
 
-    def list(self):  # noqa: A003
-        online_mode = self.cloudshell_config_reader.read().online_mode.lower() == "true"
-        template_location = self.cloudshell_config_reader.read().template_location
+    def list(self, refresh_standards=False):  # noqa: A003
+        """List available templates.
+
+        :param bool refresh_standards: fetch standards from CloudShell
+            ignoring the ones cached by earlier runs
+        """
+        cs_config = self.cloudshell_config_reader.read()
+        online_mode = cs_config.online_mode.lower() == "true"
+        template_location = cs_config.template_location
 
         try:
-            standards = self.standards.fetch()
+            standards = self.standards.fetch(refresh=refresh_standards)
             if online_mode:
                 try:
                     templates = self.template_retriever.get_templates(
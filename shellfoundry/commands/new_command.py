@@ -22,7 +22,10 @@ from shellfoundry.exceptions import VersionRequestException
 from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
 from shellfoundry.utilities.constants import TEMPLATE_INFO_FILE
 from shellfoundry.utilities.cookiecutter_integration import CookiecutterTemplateCompiler
-from shellfoundry.utilities.repository_downloader import RepositoryDownloader
+from shellfoundry.utilities.repository_downloader import (
+    RepositoryDownloader,
+    is_template_member,
+)
 from shellfoundry.utilities.standards import Standards, StandardVersionsFactory
 from shellfoundry.utilities.temp_dir_context import TempDirContext
 from shellfoundry.utilities.template_retriever import TemplateRetriever
@@ -61,13 +64,17 @@ class NewCommandExecutor(object):
         self.standard_versions = standard_versions or StandardVersionsFactory()
         self.shell_name_validations = shell_name_validations or ShellNameValidations()
 
-    def new(self, name, template, version=None, python_version="3"):
+    def new(
+        self, name, template, version=None, python_version="3", refresh_standards=False
+    ):
         """Create a new shell based on a template.
 
         :param str version: The desired version of the shell template to use
         :param str name: The name of the Shell
         :param str template: The name of the template to use
         :param str python_version: Python version
+        :param bool refresh_standards: fetch standards from CloudShell
+            ignoring the ones cached by earlier runs
         """
         # Special handling for the case where the user runs 'shellfoundry .'
         # in such a case the '.' character is substituted for the shell name
@@ -84,7 +91,7 @@ class NewCommandExecutor(object):
             )
 
         try:
-            standards = self.standards.fetch()
+            standards = self.standards.fetch(refresh=refresh_standards)
         except FeatureUnavailable:
             standards = self.standards.fetch(alternative=ALTERNATIVE_STANDARDS_PATH)
         except Exception as err:
@@ -134,7 +141,11 @@ class NewCommandExecutor(object):
         with TempDirContext(name) as temp_dir:
             try:
                 repo_path = self.repository_downloader.download_template(
-                    temp_dir, template_url, branch=None, is_need_construct=False
+                    temp_dir,
+                    template_url,
+                    branch=None,
+                    is_need_construct=False,
+                    include=is_template_member,
                 )
             except VersionRequestException:
                 raise click.BadParameter(
@@ -195,7 +206,10 @@ class NewCommandExecutor(object):
 
             try:
                 repo_path = self.repository_downloader.download_template(
-                    temp_dir, template_obj.repository, version
+                    temp_dir,
+                    template_obj.repository,
+                    version,
+                    include=is_template_member,
                 )
             except VersionRequestException:
                 branches = TemplateVersions(
@@ -6,17 +6,33 @@ import os
 import click
 
 from shellfoundry.exceptions import ShellYmlMissingException, WrongShellYmlException
+from shellfoundry.utilities.archive_creator import ZipArchiveBuilder
+from shellfoundry.utilities.config_reader import Configuration, ShellFoundryConfig
 from shellfoundry.utilities.package_builder import PackageBuilder
 from shellfoundry.utilities.shell_config_reader import ShellConfigReader
 from shellfoundry.utilities.shell_package import ShellPackage
 from shellfoundry.utilities.shell_package_builder import ShellPackageBuilder
+from shellfoundry.utilities.version_utilities import DriverVersionContentBased
 
 
 class PackCommandExecutor(object):
     def __init__(self):
         self.config_reader = ShellConfigReader()
-        self.package_builder = PackageBuilder()
-        self.shell_package_builder = ShellPackageBuilder()
+        settings = Configuration(ShellFoundryConfig()).read()
+        archive_builder = ZipArchiveBuilder(
+            compression_level=settings.compression_level,
+            max_workers=settings.max_workers,
+            reproducible=settings.reproducible_pack,
+        )
+        self.package_builder = PackageBuilder(
+            driver_version_strategy=(
+                DriverVersionContentBased() if settings.reproducible_pack else None
+            ),
+            archive_builder=archive_builder,
+        )
+        self.shell_package_builder = ShellPackageBuilder(
+            archive_builder=archive_builder
+        )
 
     def pack(self):
 
@@ -0,0 +1,168 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import click
+
+from shellfoundry.commands.pack_command import PackCommandExecutor
+from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+from shellfoundry.utilities.constants import WATCH_DEBOUNCE_TIME
+from shellfoundry.utilities.file_watcher import FileWatcher
+from shellfoundry.utilities.installer import ShellInstaller
+from shellfoundry.utilities.retry import get_status
+from shellfoundry.utilities.shell_config_reader import ShellConfigReader
+from shellfoundry.utilities.shell_package import ShellPackage
+from shellfoundry.utilities.shell_package_installer import (
+    LoginFailedError,
+    ShellPackageInstaller,
+)
+from shellfoundry.utilities.tracing import span
+
+WATCHED_PATHS = (
+    "src",
+    "deployments",
+    "datamodel",
+    "shell-definition.yaml",
+    "shell.yml",
+)
+# files the pack writes and restores, gen1 driver version is written
+# into the driver metadata while the driver is zipped
+PACK_REWRITTEN_PATHS = ("src/drivermetadata.xml",)
+
+
+class WatchCommandExecutor(object):
+    def __init__(
+        self,
+        pack_command_executor=None,
+        shell_package_installer=None,
+        installer=None,
+        cloudshell_config_reader=None,
+        shell_config_reader=None,
+        watcher=None,
+    ):
+        self.pack_command_executor = pack_command_executor or PackCommandExecutor()
+        self.shell_package_installer = (
+            shell_package_installer or ShellPackageInstaller()
+        )
+        self.installer = installer or ShellInstaller()
+        self.cloudshell_config_reader = cloudshell_config_reader or Configuration(
+            CloudShellConfigReader()
+        )
+        self.shell_config_reader = shell_config_reader or ShellConfigReader()
+        self.watcher = watcher
+        self._client = None
+
+    def watch(self, poll=False, debounce=WATCH_DEBOUNCE_TIME):
+        """Pack and install the shell from the current folder on each change.
+
+        CloudShell login is kept between installs, only changed archives
+        are packed again, so the change is deployed in about a second.
+        :param bool poll: poll the files even if inotify is available
+        :param float debounce: seconds files should stay unchanged
+            before the shell is packed
+        """
+        current_path = os.getcwd()
+        shell_package = ShellPackage(current_path)
+        if shell_package.is_layer_one():
+            raise click.ClickException(
+                "Watching a L1 shell is not supported, "
+                "it can't be installed via shellfoundry."
+            )
+
+        watcher = self.watcher or FileWatcher(
+            current_path, WATCHED_PATHS, debounce=debounce, poll=poll
+        )
+        click.echo(
+            "Watching the shell files for changes using {}, "
+            "press Ctrl+C to stop".format(watcher.kind)
+        )
+        try:
+            self._deploy(shell_package, current_path, watcher)
+            while True:
+                changes = watcher.wait()
+                if changes:
+                    click.echo("Changed: {}".format(", ".join(changes)))
+                    self._deploy(shell_package, current_path, watcher, changes)
+        except KeyboardInterrupt:
+            click.echo("Stopped watching")
+        finally:
+            watcher.close()
+
+    def _deploy(self, shell_package, path, watcher, changes=()):
+        """Pack and install the shell, errors are reported and the watching goes on.
+
+        Gen1 pack writes the driver version into src/drivermetadata.xml
+        and restores it, the restored file doesn't trigger the next pack.
+        Other changes made while packing are deployed next.
+        """
+        start_time = time.time()
+        try:
+            with span("watch.deploy", changes=len(changes)):
+                with watcher.ignore_rewrites(PACK_REWRITTEN_PATHS):
+                    self.pack_command_executor.pack()
+                installed = self._install(shell_package, path)
+        except click.Abort:
+            raise KeyboardInterrupt
+        except Exception as e:
+            message = (
+                e.format_message() if isinstance(e, click.ClickException) else str(e)
+            )
+            click.secho("Failed to install shell: {}".format(message), fg="red")
+            return
+
+        if installed:
+            click.secho(
+                "Successfully installed shell in {:.1f}s".format(
+                    time.time() - start_time
+                ),
+                fg="green",
+            )
+        else:
+            click.secho("Shell is up to date, nothing to install", fg="green")
+
+    def _install(self, shell_package, path):
+        """Install the shell using the kept CloudShell login.
+
+        Kept login may expire while watching, the install rejected
+        as unauthorized is repeated once with a new login. Other errors
+        are raised and the next install logs in again, in case
+        the expired login wasn't recognized in the error.
+        """
+        new_login = self._client is None
+        if new_login:
+            self._client = self._connect(shell_package)
+        try:
+            return self._upload(shell_package, path)
+        except Exception as e:
+            self._client = None
+            if new_login or not _is_unauthorized(e):
+                raise
+        self._client = self._connect(shell_package)
+        return self._upload(shell_package, path)
+
+    def _connect(self, shell_package):
+        if shell_package.is_tosca():
+            return self.shell_package_installer.connect(
+                self.shell_package_installer.cloudshell_config_reader.read()
+            )
+        return self.installer.connect(self.cloudshell_config_reader.read())
+
+    def _upload(self, shell_package, path):
+        if shell_package.is_tosca():
+            return self.shell_package_installer.install(path, client=self._client)
+        return self.installer.install(
+            self.shell_config_reader.read().name,
+            self.cloudshell_config_reader.read(),
+            client=self._client,
+        )
+
+
+def _is_unauthorized(error):
+    """Check that the error or the error it was raised from is a 401 response."""
+    while error is not None:
+        if isinstance(error, LoginFailedError) or get_status(error) == 401:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
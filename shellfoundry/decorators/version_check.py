@@ -1,52 +1,130 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import threading
 from functools import update_wrapper
 
 import click
 
 from shellfoundry.exceptions import ShellFoundryVersionException
-from shellfoundry.utilities import is_index_version_greater_than_current
-from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+from shellfoundry.utilities import (
+    get_cached_index_version,
+    is_index_version_greater_than_current,
+    refresh_index_version,
+)
+
+MAJOR_RELEASE_MESSAGE = (
+    "This version of shellfoundry is not supported anymore, "
+    "please upgrade by running: pip install shellfoundry --upgrade"
+)
+NEW_VERSION_MESSAGE = (
+    "There is a new version of shellfoundry available, "
+    "please upgrade by running: pip install shellfoundry --upgrade"
+)
+# seconds a finished command waits for the background refresh to finish
+BACKGROUND_CHECK_WAIT = 1
+
+
+class _BackgroundCall(object):
+    """Runs function in a daemon thread, so it never delays the exit."""
+
+    def __init__(self, func):
+        self._func = func
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._func()
+        except Exception:
+            pass  # failed call is repeated by the next command
+
+    def wait(self, timeout=None):
+        """Wait for the call, return False if it's still running."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
 
 
 class shellfoundry_version_check(object):
+    """Warns when a newer shellfoundry version is available on PyPI.
+
+    PyPI is asked at most once per version_check_interval seconds,
+    in between the version saved by the last check is used.
+    When the saved version is expired, command output is based on it
+    and the version is refreshed in the background. Only the very first
+    check waits for PyPI, the command can't run before a major release
+    is ruled out.
+    """
+
     def __init__(self, abort_if_major=False):
         self.abort_if_major = abort_if_major
-        self.cloudshell_config_reader = Configuration(CloudShellConfigReader())
+        self._cloudshell_config_reader = None
+        self._shellfoundry_settings = None
+
+    @property
+    def cloudshell_config_reader(self):
+        # imported on first use to keep CLI startup fast
+        if self._cloudshell_config_reader is None:
+            from shellfoundry.utilities.config_reader import (
+                CloudShellConfigReader,
+                Configuration,
+            )
+
+            self._cloudshell_config_reader = Configuration(CloudShellConfigReader())
+        return self._cloudshell_config_reader
+
+    @property
+    def shellfoundry_settings(self):
+        if self._shellfoundry_settings is None:
+            from shellfoundry.utilities.config_reader import (
+                Configuration,
+                ShellFoundryConfig,
+            )
+
+            self._shellfoundry_settings = Configuration(ShellFoundryConfig()).read()
+        return self._shellfoundry_settings
 
     def __call__(self, f):
         def decorator(*args, **kwargs):
             output = ""
+            background_refresh = None
             if self.cloudshell_config_reader.read().online_mode.lower() == "true":
+                check_interval = self.shellfoundry_settings.version_check_interval
+                index_version = get_cached_index_version()
+                if index_version is not None and (
+                    get_cached_index_version(check_interval) is None
+                ):
+                    background_refresh = _BackgroundCall(refresh_index_version)
                 try:
                     (
                         is_greater_version,
                         is_major_release,
-                    ) = is_index_version_greater_than_current()
+                    ) = is_index_version_greater_than_current(index_version)
                 except ShellFoundryVersionException as err:
                     click.secho(str(err), fg="red")
                     raise click.Abort()
-                if is_greater_version:
-                    if is_major_release:
-                        output = (
-                            "This version of shellfoundry is not supported anymore, "
-                            "please upgrade by running: pip install shellfoundry --upgrade"  # noqa: E501
-                        )
-
-                        if self.abort_if_major:
-                            click.secho(output, fg="yellow")
-                            print("")  # noqa: T001
-                            raise click.Abort()
-                    else:
-                        output = (
-                            "There is a new version of shellfoundry available, "
-                            "please upgrade by running: pip install shellfoundry --upgrade"  # noqa: E501
-                        )
+                output = self._get_output(is_greater_version, is_major_release)
+                if is_greater_version and is_major_release and self.abort_if_major:
+                    click.secho(output, fg="yellow")
+                    print("")  # noqa: T001
+                    raise click.Abort()
 
             f(**kwargs)
 
+            # failed or slow refresh is skipped, it's repeated next time
+            if background_refresh is not None:
+                background_refresh.wait(BACKGROUND_CHECK_WAIT)
+
             if output:
                 print("")  # noqa: T001
                 click.secho(output, fg="yellow")
 
         return update_wrapper(decorator, f)
+
+    @staticmethod
+    def _get_output(is_greater_version, is_major_release):
+        if not is_greater_version:
+            return ""
+        if is_major_release:
+            return MAJOR_RELEASE_MESSAGE
+        return NEW_VERSION_MESSAGE
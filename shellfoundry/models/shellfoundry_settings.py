@@ -2,12 +2,53 @@
 # -*- coding: utf-8 -*-
 
 DEFAULT_DEFAULT_VIEW = "gen2"
+DEFAULT_TEMPLATES_CACHE_TTL = 3600
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_COMPRESSION_LEVEL = 6
+DEFAULT_REPRODUCIBLE_PACK = False
+DEFAULT_VERSION_CHECK_INTERVAL = 24 * 60 * 60
+DEFAULT_ARCHIVES_CACHE_SIZE = 256  # megabytes
+DEFAULT_READ_TIMEOUT = 60
+DEFAULT_STANDARDS_CACHE_TTL = 24 * 60 * 60
+DEFAULT_WHEELS_CACHE_SIZE = 1024  # megabytes
 
 
 class ShellFoundrySettings(object):
-    def __init__(self, defaultview):
+    def __init__(
+        self,
+        defaultview,
+        templates_cache_ttl=DEFAULT_TEMPLATES_CACHE_TTL,
+        max_workers=DEFAULT_MAX_WORKERS,
+        compression_level=DEFAULT_COMPRESSION_LEVEL,
+        reproducible_pack=DEFAULT_REPRODUCIBLE_PACK,
+        version_check_interval=DEFAULT_VERSION_CHECK_INTERVAL,
+        archives_cache_size=DEFAULT_ARCHIVES_CACHE_SIZE,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        standards_cache_ttl=DEFAULT_STANDARDS_CACHE_TTL,
+        wheels_cache_size=DEFAULT_WHEELS_CACHE_SIZE,
+    ):
         self.defaultview = defaultview
+        self.templates_cache_ttl = templates_cache_ttl
+        self.max_workers = max_workers
+        self.compression_level = compression_level
+        self.reproducible_pack = reproducible_pack
+        self.version_check_interval = version_check_interval
+        self.archives_cache_size = archives_cache_size
+        self.read_timeout = read_timeout
+        self.standards_cache_ttl = standards_cache_ttl
+        self.wheels_cache_size = wheels_cache_size
 
     @staticmethod
     def get_default():
-        return ShellFoundrySettings(DEFAULT_DEFAULT_VIEW)
+        return ShellFoundrySettings(
+            DEFAULT_DEFAULT_VIEW,
+            DEFAULT_TEMPLATES_CACHE_TTL,
+            DEFAULT_MAX_WORKERS,
+            DEFAULT_COMPRESSION_LEVEL,
+            DEFAULT_REPRODUCIBLE_PACK,
+            DEFAULT_VERSION_CHECK_INTERVAL,
+            DEFAULT_ARCHIVES_CACHE_SIZE,
+            DEFAULT_READ_TIMEOUT,
+            DEFAULT_STANDARDS_CACHE_TTL,
+            DEFAULT_WHEELS_CACHE_SIZE,
+        )
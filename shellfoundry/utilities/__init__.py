@@ -3,23 +3,14 @@
 
 import json
 
-import pkg_resources
-import requests
-
-try:
-    from urllib import urlopen
-except ImportError:
-    from urllib.request import urlopen
-
 try:
-    from urllib.error import HTTPError, URLError
+    from importlib.metadata import version as get_distribution_version
 except ImportError:
-    from urllib2 import HTTPError, URLError
-
-from distutils.version import StrictVersion
+    get_distribution_version = None
 
 from shellfoundry import PACKAGE_NAME
 from shellfoundry.exceptions import ShellFoundryVersionException
+from shellfoundry.utilities.tracing import traced
 
 GEN_ONE = "gen1"
 GEN_TWO = "gen2"
@@ -30,6 +21,11 @@ GEN_TWO_FILTER = "gen2"
 LAYER_ONE_FILTER = "layer-1"
 SEPARATOR = "/"
 
+VERSION_CHECK_CACHE_NAME = "version_check"
+INDEX_VERSION_KEY = "index_version"
+# seconds to wait for PyPI, the check is skipped rather than slowing commands down
+VERSION_CHECK_TIMEOUT = 3
+
 
 class Index(object):
     def __init__(self, url):
@@ -37,15 +33,33 @@ class Index(object):
 
 
 def get_installed_version(package_name):
+    """Get version of the installed package.
+
+    Package metadata is read directly when possible,
+    pkg_resources is slow to import since it scans all installed distributions.
+    """
+    if get_distribution_version is not None:
+        return get_distribution_version(package_name)
+
+    import pkg_resources
+
     return pkg_resources.get_distribution(package_name).version
 
 
-def is_index_version_greater_than_current():
+def is_index_version_greater_than_current(index_version=None):
+    """Compare installed shellfoundry version with the latest one.
+
+    :param str index_version: latest version known from an earlier check,
+        PyPI is asked if not provided
+    :return: tuple of is greater version and is major release flags
+    """
+    from distutils.version import StrictVersion
+
     MAJOR_INDEX = 0
 
     installed, index = (
         StrictVersion(get_installed_version(PACKAGE_NAME)),
-        StrictVersion(max_version_from_index()),
+        StrictVersion(index_version or refresh_index_version()),
     )
     is_major_release = False
 
@@ -62,10 +76,35 @@ def is_index_version_greater_than_current():
     return is_greater_version, is_major_release
 
 
-def max_version_from_index():
+def _get_version_check_cache():
+    from shellfoundry.utilities.cache import FileCache
+
+    return FileCache(VERSION_CHECK_CACHE_NAME)
+
+
+def get_cached_index_version(max_age=None):
+    """Get latest shellfoundry version saved by the last successful check.
+
+    :param int max_age: max allowed age in seconds, None means any age
+    :return: version or None if there is no such version
+    """
+    return _get_version_check_cache().get(INDEX_VERSION_KEY, max_age)
+
+
+def refresh_index_version():
+    """Get latest shellfoundry version from PyPI and save it for next checks."""
+    index_version = max_version_from_index()
+    _get_version_check_cache().set(INDEX_VERSION_KEY, index_version)
+    return index_version
+
+
+@traced("version_check.pypi")
+def max_version_from_index(timeout=VERSION_CHECK_TIMEOUT):
+    import requests
+
     try:
         url = "https://pypi.org/pypi/{}/json".format(PACKAGE_NAME)
-        r = requests.get(url)
+        r = requests.get(url, timeout=timeout)
         if r.status_code != requests.codes.ok:
             raise ShellFoundryVersionException(
                 "Cannot retrieve latest shellfoundry version, " "are you offline?"
@@ -77,11 +116,19 @@ def max_version_from_index():
     except Exception as err:
         raise ShellFoundryVersionException(
             "Cannot retrieve latest shellfoundry version, "
-            "are you offline? Error: {}".format(err.message)
+            "are you offline? Error: {}".format(err)
         )
 
 
 def latest_released_version():
+    try:
+        from urllib.error import HTTPError, URLError
+        from urllib.request import urlopen
+    except ImportError:
+        from urllib import urlopen
+
+        from urllib2 import HTTPError, URLError
+
     url = "https://pypi.org/pypi/{package_name}/json"
     try:
         package_info = json.load(urlopen(url.format(package_name=PACKAGE_NAME)))
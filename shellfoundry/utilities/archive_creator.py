@@ -1,5 +1,52 @@
 import os
+import shutil
+import sys
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import open
+
+from shellfoundry.models.shellfoundry_settings import DEFAULT_COMPRESSION_LEVEL
+from shellfoundry.utilities.source_filter import is_ignored
+from shellfoundry.utilities.tracing import span
+
+# members which are compressed by their format, deflating them again
+# costs CPU time without noticeable size benefit
+STORED_EXTENSIONS = (
+    ".7z",
+    ".bz2",
+    ".egg",
+    ".gif",
+    ".gz",
+    ".ico",
+    ".jar",
+    ".jpeg",
+    ".jpg",
+    ".png",
+    ".tgz",
+    ".whl",
+    ".xz",
+    ".zip",
+)
+# bigger members are compressed by zipfile itself chunk by chunk
+# instead of keeping whole compressed member in memory
+MAX_PARALLEL_MEMBER_SIZE = 32 * 1024 * 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+# parallel compressed members are added to the archive through ZipFile
+# internals checked on these Python versions only, on other versions
+# members are compressed one by one through the public zipfile API
+RAW_WRITE_PYTHON_VERSIONS = ((3, 6), (3, 13))
+RAW_WRITE_SUPPORTED = (
+    sys.version_info[:2] >= RAW_WRITE_PYTHON_VERSIONS[0]
+    and sys.version_info[:2] <= RAW_WRITE_PYTHON_VERSIONS[1]
+    and hasattr(zipfile.ZipFile, "_writecheck")
+)
+# members attributes used by reproducible archives
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+REPRODUCIBLE_CREATE_SYSTEM = 3  # unix, external attributes are unix permissions
+REPRODUCIBLE_DIR_ATTR = (0o40755 << 16) | 0x10  # 0x10 is MS-DOS directory flag
+REPRODUCIBLE_FILE_ATTR = 0o100644 << 16
 
 
 class ArchiveCreator(object):
@@ -15,21 +62,192 @@ class ArchiveCreator(object):
         :param source_dir: Directory to scan for archiving
         :return:
         """
-        if os.path.exists(source_dir):
-            if os.path.splitext(output_filename)[1] == "":
-                output_filename += ".zip"
-            output_dir = os.path.dirname(output_filename)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            relroot = source_dir
+        return ZipArchiveBuilder().make_archive(output_filename, source_dir)
+
+
+class ZipArchiveBuilder(object):
+    """Creates zip archives compressing members in parallel.
+
+    Members are compressed by a pool of workers and written into the archive
+    in the directory walk order as soon as they are ready.
+    zlib releases GIL while compressing, so threads are enough to use all cores.
+    """
+
+    def __init__(
+        self,
+        compression_level=DEFAULT_COMPRESSION_LEVEL,
+        max_workers=None,
+        reproducible=False,
+    ):
+        """Zip archive builder.
+
+        :param int compression_level: deflate level from 1 to 9,
+            0 stores all members without compression
+        :param int max_workers: amount of members compressed in parallel,
+            CPU count is used if not provided
+        :param bool reproducible: create byte identical archives from the same
+            content, members are sorted and get fixed time and permissions,
+            byte code and editor files are skipped
+        """
+        self.compression_level = min(max(compression_level, 0), 9)
+        self.max_workers = max(max_workers or os.cpu_count() or 1, 1)
+        self.reproducible = reproducible
+
+    @property
+    def options_key(self):
+        """Options changing archive content built from the same files."""
+        return "{}:{}".format(self.compression_level, int(self.reproducible))
+
+    def make_archive(self, output_filename, source_dir):
+        """Create zip archive recursively of source_dir.
+
+        :param str output_filename: archive file name, .zip extension is added
+            if missing and the folder is created if doesn't exist
+        :param str source_dir: directory to archive
+        :return: path to the created archive or None if source_dir doesn't exist
+        """
+        if not os.path.exists(source_dir):
+            return None
+
+        if os.path.splitext(output_filename)[1] == "":
+            output_filename += ".zip"
+        output_dir = os.path.dirname(output_filename)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        with span(
+            "archive.make", archive=os.path.basename(output_filename)
+        ) as span_args:
+            members = 0
             with zipfile.ZipFile(output_filename, "w", zipfile.ZIP_DEFLATED) as zip_f:
-                for root, dirs, files in os.walk(source_dir):
-                    # add directory (needed for empty dirs)
-                    zip_f.write(root, os.path.relpath(root, relroot))
-                    for file in files:
-                        filename = os.path.join(root, file)
-                        if os.path.isfile(filename):  # regular files only
-                            arcname = os.path.join(os.path.relpath(root, relroot), file)
-                            zip_f.write(filename, arcname)
-
-            return output_filename
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    pending = deque()
+                    for filename, arcname in self._walk(source_dir):
+                        future = None
+                        if self._is_parallel(filename):
+                            future = executor.submit(self._compress, filename)
+                        pending.append((filename, arcname, future))
+                        members += 1
+                        # limit amount of compressed members waiting to be written
+                        while len(pending) > self.max_workers * 2:
+                            self._write(zip_f, *pending.popleft())
+                    while pending:
+                        self._write(zip_f, *pending.popleft())
+            span_args["members"] = members
+            span_args["size"] = os.path.getsize(output_filename)
+
+        return output_filename
+
+    def _walk(self, source_dir):
+        """Yield paths and archive names of directories and regular files."""
+        for root, dirs, files in os.walk(source_dir):
+            if self.reproducible:
+                dirs[:] = sorted(name for name in dirs if not is_ignored(name))
+                files = sorted(name for name in files if not is_ignored(name))
+            rel_root = os.path.relpath(root, source_dir)
+            # add directory (needed for empty dirs)
+            yield root, rel_root
+            for file_name in files:
+                filename = os.path.join(root, file_name)
+                if os.path.isfile(filename):  # regular files only
+                    yield filename, os.path.join(rel_root, file_name)
+
+    def _get_compress_type(self, filename):
+        if not self.compression_level or filename.lower().endswith(STORED_EXTENSIONS):
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def _is_parallel(self, filename):
+        return (
+            RAW_WRITE_SUPPORTED
+            and os.path.isfile(filename)
+            and self._get_compress_type(filename) == zipfile.ZIP_DEFLATED
+            and os.path.getsize(filename) <= MAX_PARALLEL_MEMBER_SIZE
+        )
+
+    def _compress(self, filename):
+        """Deflate file content.
+
+        :return: tuple of CRC, uncompressed size and raw deflate stream
+        """
+        with open(filename, mode="rb") as stream:
+            data = stream.read()
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        return zlib.crc32(data), len(data), compressed
+
+    def _get_info(self, filename, arcname):
+        zinfo = zipfile.ZipInfo.from_file(filename, arcname)
+        if self.reproducible:
+            zinfo.date_time = REPRODUCIBLE_DATE_TIME
+            zinfo.create_system = REPRODUCIBLE_CREATE_SYSTEM
+            if zinfo.is_dir():
+                zinfo.external_attr = REPRODUCIBLE_DIR_ATTR
+            else:
+                zinfo.external_attr = REPRODUCIBLE_FILE_ATTR
+        return zinfo
+
+    def _write(self, zip_f, filename, arcname, future=None):
+        zinfo = self._get_info(filename, arcname)
+        if future is not None:
+            crc, file_size, compressed = future.result()
+            self._write_compressed(zip_f, zinfo, crc, file_size, compressed)
+        elif zinfo.is_dir():
+            zip_f.writestr(zinfo, b"")
+        else:
+            self._write_file(zip_f, filename, arcname, zinfo)
+
+    def _write_file(self, zip_f, filename, arcname, zinfo):
+        """Add the file to the archive through the public zipfile API.
+
+        Deflate level of a member can be set by ZipFile.write and writestr
+        only, write takes member attributes from the file, so small members
+        and members with reproducible attributes are read into memory.
+        """
+        compress_type = self._get_compress_type(filename)
+        if compress_type == zipfile.ZIP_STORED:
+            zinfo.compress_type = compress_type
+            with open(filename, mode="rb") as src, zip_f.open(zinfo, "w") as dest:
+                shutil.copyfileobj(src, dest, COPY_CHUNK_SIZE)
+        elif self.reproducible or os.path.getsize(filename) <= MAX_PARALLEL_MEMBER_SIZE:
+            with open(filename, mode="rb") as src:
+                zip_f.writestr(
+                    zinfo,
+                    src.read(),
+                    compress_type=compress_type,
+                    compresslevel=self.compression_level,
+                )
+        else:
+            zip_f.write(
+                filename,
+                arcname,
+                compress_type=compress_type,
+                compresslevel=self.compression_level,
+            )
+
+    @staticmethod
+    def _write_compressed(zip_f, zinfo, crc, file_size, compressed):
+        """Add already deflated member to the archive.
+
+        Repeats what ZipFile.open(zinfo, "w") does on write,
+        zipfile has no public API to add compressed data as is,
+        so it is used on RAW_WRITE_PYTHON_VERSIONS only.
+        """
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(compressed)
+        zip_f.fp.seek(zip_f.start_dir)
+        zinfo.header_offset = zip_f.fp.tell()
+        zip_f._writecheck(zinfo)
+        zip_f._didModify = True
+        zip64 = (
+            zinfo.header_offset > zipfile.ZIP64_LIMIT
+            or file_size > zipfile.ZIP64_LIMIT
+            or zinfo.compress_size > zipfile.ZIP64_LIMIT
+        )
+        zip_f.fp.write(zinfo.FileHeader(zip64))
+        zip_f.fp.write(compressed)
+        zip_f.start_dir = zip_f.fp.tell()
+        zip_f.filelist.append(zinfo)
+        zip_f.NameToInfo[zinfo.filename] = zinfo
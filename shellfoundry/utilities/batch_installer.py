@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import click
+
+from shellfoundry.exceptions import FatalError
+from shellfoundry.utilities.constants import DEFAULT_MAX_UPLOADS
+from shellfoundry.utilities.shell_package import ShellPackage
+from shellfoundry.utilities.shell_package_installer import ShellPackageInstaller
+
+INSTALLED = "installed"
+UP_TO_DATE = "up to date"
+FAILED = "failed"
+
+SKIPPED_DIRS = ("dist", "node_modules")
+
+
+def find_shell_paths(root_path):
+    """Find 2nd generation shells in the folder and its subfolders.
+
+    Folders of the found shells and hidden folders are not searched.
+    """
+    shell_paths = []
+    for root, dirs, files in os.walk(root_path):
+        if ShellPackage(root).is_tosca():
+            shell_paths.append(root)
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(
+                dir_name
+                for dir_name in dirs
+                if not dir_name.startswith(".") and dir_name not in SKIPPED_DIRS
+            )
+    return shell_paths
+
+
+@contextmanager
+def _working_dir(path):
+    current_path = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(current_path)
+
+
+class ShellInstallResult(object):
+    def __init__(self, path):
+        self.path = path
+        self.shell_name = os.path.basename(os.path.normpath(path))
+        self.package_path = None
+        self.package_hash = None
+        self.status = None
+        self.error = None
+        self.elapsed = 0.0
+
+    def fail(self, error):
+        self.status = FAILED
+        self.error = str(error)
+
+
+class BatchShellInstaller(object):
+    """Installs many 2nd generation shells over one CloudShell session.
+
+    Shells are packed one by one, then the packages which weren't
+    installed into the server yet are uploaded in parallel
+    using a single login token.
+    """
+
+    def __init__(self, pack_command_executor, shell_package_installer=None):
+        """Batch installer.
+
+        :param pack_command_executor: packs the shell in the current folder
+        :param ShellPackageInstaller shell_package_installer:
+        """
+        self.pack_command_executor = pack_command_executor
+        self.shell_package_installer = (
+            shell_package_installer or ShellPackageInstaller()
+        )
+
+    def install(self, paths, force=False, max_uploads=DEFAULT_MAX_UPLOADS):
+        """Pack and install shells.
+
+        :param list paths: shells root folders
+        :param bool force: upload packages even if they are already installed
+        :param int max_uploads: amount of packages uploaded in parallel
+        :rtype: list[ShellInstallResult]
+        """
+        cloudshell_config = self.shell_package_installer.cloudshell_config_reader.read()
+        if cloudshell_config.domain != self.shell_package_installer.GLOBAL_DOMAIN:
+            raise click.UsageError(
+                "Gen2 shells could not be installed into non Global domain."
+            )
+        ledger = self.shell_package_installer.install_ledger
+
+        results = [ShellInstallResult(path) for path in paths]
+        to_upload = []
+        for result in results:
+            start_time = time.time()
+            self._pack(result, ledger)
+            if result.status is None:
+                if not force and ledger.is_installed(
+                    cloudshell_config.host,
+                    cloudshell_config.port,
+                    result.shell_name,
+                    result.package_hash,
+                ):
+                    result.status = UP_TO_DATE
+                else:
+                    to_upload.append(result)
+            result.elapsed = time.time() - start_time
+
+        if not to_upload:
+            return results
+
+        client = self.shell_package_installer.connect(cloudshell_config)
+        # confirmations are asked one by one before uploads start
+        for result in list(to_upload):
+            try:
+                self.shell_package_installer.confirm_custom_version(
+                    client, result.shell_name
+                )
+            except FatalError as e:
+                result.fail(e.message)
+                to_upload.remove(result)
+
+        with ThreadPoolExecutor(max_workers=max(max_uploads, 1)) as executor:
+            list(
+                executor.map(
+                    lambda result: self._upload(
+                        client, cloudshell_config, ledger, result
+                    ),
+                    to_upload,
+                )
+            )
+
+        return results
+
+    def _pack(self, result, ledger):
+        shell_package = ShellPackage(result.path)
+        if not shell_package.is_tosca():
+            result.fail("Not a 2nd generation shell")
+            return
+        try:
+            with _working_dir(result.path):
+                self.pack_command_executor.pack()
+            result.shell_name = shell_package.get_name_from_definition()
+            result.package_path = os.path.join(
+                result.path, "dist", result.shell_name + ".zip"
+            )
+            result.package_hash = ledger.get_package_hash(result.package_path)
+            if result.package_hash is None:
+                result.fail("Shell package was not created")
+        except Exception as e:
+            result.fail(e)
+
+    def _upload(self, client, cloudshell_config, ledger, result):
+        start_time = time.time()
+        try:
+            self.shell_package_installer.upload(client, result.package_path)
+        except Exception as e:
+            result.fail(e)
+        else:
+            result.status = INSTALLED
+            ledger.record(
+                cloudshell_config.host,
+                cloudshell_config.port,
+                result.shell_name,
+                result.package_hash,
+            )
+        result.elapsed += time.time() - start_time
@@ -0,0 +1,2 @@
+from .blob_store import BlobStore, get_file_digest  # noqa: F401
+from .file_cache import FileCache, get_cache_dir  # noqa: F401
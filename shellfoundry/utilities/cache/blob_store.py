@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import tempfile
+from io import open
+
+from .file_cache import FileCache, get_cache_dir
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_EXTENSION = ".blob"
+
+
+def get_file_digest(path):
+    """Get SHA-256 hex digest of the file content."""
+    digest = hashlib.sha256()
+    with open(path, mode="rb") as stream:
+        for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore(object):
+    """Size capped storage of files addressed by their content.
+
+    Files are kept in the cache folder named by SHA-256 of their content,
+    keys are mapped to these digests, so the same content is stored once.
+    Content is verified on every read and damaged files are dropped.
+    The least recently used files are removed when total size exceeds max_size.
+    """
+
+    def __init__(self, name, max_size, cache_dir=None):
+        """Blob store.
+
+        :param str name: store name, used as the folder name
+        :param int max_size: max total size of stored files in bytes
+        :param str cache_dir: parent folder, shellfoundry cache folder by default
+        """
+        self.name = name
+        self.max_size = max_size
+        self._cache_dir = cache_dir
+        self.index = FileCache(name, cache_dir)
+
+    @property
+    def blobs_dir(self):
+        return os.path.join(self._cache_dir or get_cache_dir(), self.name)
+
+    def get(self, key):
+        """Get path to the stored file.
+
+        :param str key: key the file was stored by
+        :return: path or None if missing or damaged
+        """
+        digest = self.index.get(key)
+        if digest is None:
+            return None
+        blob_path = self._get_blob_path(digest)
+        try:
+            if get_file_digest(blob_path) != digest:
+                raise IOError("Damaged blob {}".format(blob_path))
+            # modification time orders files for eviction
+            os.utime(blob_path, None)
+        except (IOError, OSError):
+            self._remove(blob_path)
+            self.index.delete(key)
+            return None
+        return blob_path
+
+    def put(self, key, path):
+        """Copy file into the store.
+
+        :param str key: key to get the file by
+        :param str path: file to store
+        :return: path to the stored file or None if it could not be stored
+        """
+        try:
+            with open(path, mode="rb") as stream:
+                return self.put_stream(key, stream)
+        except (IOError, OSError):
+            return None
+
+    def put_stream(self, key, stream):
+        """Copy binary stream content from its current position into the store.
+
+        :param str key: key to get the content by
+        :param stream: readable binary file object
+        :return: path to the stored file or None if it could not be stored
+        """
+        temp_path = None
+        try:
+            if not os.path.exists(self.blobs_dir):
+                os.makedirs(self.blobs_dir)
+            fd, temp_path = tempfile.mkstemp(dir=self.blobs_dir, suffix=".tmp")
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as dest:
+                for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    dest.write(chunk)
+            digest = digest.hexdigest()
+            blob_path = self._get_blob_path(digest)
+            if os.path.exists(blob_path):
+                self._remove(temp_path)
+                os.utime(blob_path, None)
+            else:
+                os.replace(temp_path, blob_path)
+        except (IOError, OSError):
+            if temp_path:
+                self._remove(temp_path)
+            return None
+        self.index.set(key, digest)
+        self._evict(keep=blob_path)
+        return blob_path
+
+    def _get_blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest + BLOB_EXTENSION)
+
+    def _evict(self, keep):
+        """Remove the least recently used files exceeding max size."""
+        blobs = []
+        for file_name in os.listdir(self.blobs_dir):
+            if file_name.endswith(BLOB_EXTENSION):
+                blob_path = os.path.join(self.blobs_dir, file_name)
+                try:
+                    stat = os.stat(blob_path)
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, blob_path))
+
+        total_size = sum(size for _, size, _ in blobs)
+        for _, size, blob_path in sorted(blobs):
+            if total_size <= self.max_size:
+                break
+            if blob_path != keep:
+                self._remove(blob_path)
+                total_size -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
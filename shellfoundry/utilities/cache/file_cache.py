@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import os
+import tempfile
+import time
+from io import open
+from threading import RLock
+
+import click
+
+from shellfoundry.utilities.config.config_providers import GlobalConfigProvider
+
+CACHE_DIR_ENV = "SHELLFOUNDRY_CACHE_DIR"
+CACHE_DIR_NAME = "cache"
+
+TIMESTAMP_KEY = "timestamp"
+VALUE_KEY = "value"
+
+
+def get_cache_dir():
+    """Get folder where shellfoundry keeps its cached data.
+
+    Cache is stored next to the global configuration file,
+    the location could be overridden by SHELLFOUNDRY_CACHE_DIR env variable.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        sf_name = os.path.join(GlobalConfigProvider.QUALI, GlobalConfigProvider.PRODUCT)
+        cache_dir = os.path.join(click.get_app_dir(sf_name), CACHE_DIR_NAME)
+    return cache_dir
+
+
+class FileCache(object):
+    """Persistent key/value storage kept as a JSON file in the cache folder.
+
+    Cache is best effort: unreadable or broken files are treated as empty
+    and failures to save are ignored.
+    """
+
+    def __init__(self, name, cache_dir=None):
+        self.name = name
+        self._cache_dir = cache_dir
+        self._data = None
+        self._lock = RLock()
+
+    @property
+    def cache_path(self):
+        return os.path.join(
+            self._cache_dir or get_cache_dir(), "{}.json".format(self.name)
+        )
+
+    def get(self, key, ttl=None):
+        """Get cached value.
+
+        :param str key: cache key
+        :param int ttl: max allowed entry age in seconds, None means any age
+        :return: copy of the cached value or None if missing or expired
+        """
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None or not self._is_fresh(entry, ttl):
+                return None
+            return copy.deepcopy(entry[VALUE_KEY])
+
+    def set(self, key, value):  # noqa: A003
+        """Save value and refresh its timestamp."""
+        with self._lock:
+            data = self._load(reload=True)
+            data[key] = {VALUE_KEY: value, TIMESTAMP_KEY: time.time()}
+            self._dump(data)
+
+    def delete(self, key):
+        with self._lock:
+            data = self._load(reload=True)
+            if data.pop(key, None) is not None:
+                self._dump(data)
+
+    def clear(self):
+        with self._lock:
+            self._data = {}
+            self._dump(self._data)
+
+    @staticmethod
+    def _is_fresh(entry, ttl):
+        if ttl is None:
+            return True
+        return time.time() - entry.get(TIMESTAMP_KEY, 0) < ttl
+
+    def _load(self, reload=False):
+        if self._data is None or reload:
+            try:
+                with open(self.cache_path, mode="r", encoding="utf8") as stream:
+                    data = json.load(stream)
+                self._data = data if isinstance(data, dict) else {}
+            except (IOError, OSError, ValueError):
+                self._data = self._data or {}
+        return self._data
+
+    def _dump(self, data):
+        """Write cache file atomically to not break concurrent readers."""
+        cache_path = self.cache_path
+        temp_path = None
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as stream:
+                json.dump(data, stream)
+            os.replace(temp_path, cache_path)
+        except (IOError, OSError, TypeError, ValueError):
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
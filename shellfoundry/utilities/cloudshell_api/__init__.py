@@ -1 +1,6 @@
 from .client_wrapper import CloudShellClient, create_cloudshell_client  # noqa: F401
+from .packaging_client import (  # noqa: F401
+    PackagingRestApiClient,
+    get_progressbar_callback,
+    open_package,
+)
@@ -1,15 +1,26 @@
 #!/usr/bin/python
 
-from cloudshell.rest.api import PackagingRestApiClient
+from copy import copy
+
+from .packaging_client import PackagingRestApiClient
 
 from shellfoundry.exceptions import FatalError
 from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+from shellfoundry.utilities.retry import RetryPolicy
+from shellfoundry.utilities.tracing import traced
 
 try:
     from urllib.error import HTTPError
 except Exception:
     from urllib2 import HTTPError
 
+try:
+    from cloudshell.rest.exceptions import LoginFailedError
+except ImportError:
+
+    class LoginFailedError(Exception):
+        """Older clients raise HTTPError with 401 code on failed login."""
+
 
 def create_cloudshell_client(retries=1):
     try:
@@ -22,50 +33,55 @@ def create_cloudshell_client(retries=1):
 class CloudShellClient(object):
     ConnectionFailureMessage = "Connection to CloudShell Server failed. Please make sure it is up and running properly."  # noqa: E501
 
-    def __init__(self, cs_config=None):
+    def __init__(self, cs_config=None, retry_policy=None):
         """Creates cloudshell client.
 
         :type cs_config shellfoundry.models.install_config.InstallConfig
+        :type retry_policy shellfoundry.utilities.retry.RetryPolicy
         """
         self._cs_config = cs_config or Configuration(CloudShellConfigReader()).read()
+        self._retry_policy = retry_policy or RetryPolicy()
 
+    @traced("cloudshell.login")
     def create_client(self, **kwargs):
-        retries = kwargs.get("retries", 1)
+        """Login into CloudShell retrying temporary failures.
+
+        :param int retries: max amount of login attempts,
+            the retry policy one by default
+        """
+        retries = kwargs.get("retries", self._retry_policy.attempts)
         if retries == 0:
             raise FatalError(self.ConnectionFailureMessage)
+        policy = copy(self._retry_policy)
+        policy.attempts = retries
         try:
-            return self._create_client()
-        except FatalError as e:
-            retry = retries - 1
-            if retry == 0:
-                raise e
-            return self.create_client(retries=retry)
+            return policy.call(self._create_client)
+        except Exception as e:
+            if isinstance(e, LoginFailedError) or (
+                isinstance(e, HTTPError) and e.code == 401
+            ):
+                msg = getattr(e, "msg", None) or str(e)
+                raise FatalError(
+                    "Login to CloudShell failed. {}".format(
+                        msg or "Please verify the credentials in the config"
+                    )
+                )
+            raise FatalError(self.ConnectionFailureMessage)
 
     def _create_client(self):
         try:
-            try:
-                client = PackagingRestApiClient.login(
-                    host=self._cs_config.host,
-                    port=self._cs_config.port,
-                    username=self._cs_config.username,
-                    password=self._cs_config.password,
-                    domain=self._cs_config.domain,
-                )
-                return client
-            except AttributeError:
-                client = PackagingRestApiClient(
-                    ip=self._cs_config.host,
-                    port=self._cs_config.port,
-                    username=self._cs_config.username,
-                    password=self._cs_config.password,
-                    domain=self._cs_config.domain,
-                )
-                return client
-        except (HTTPError, Exception) as e:
-            if hasattr(e, "code") and e.code == 401:
-                if hasattr(e, "msg") and e.msg:
-                    msg = e.msg
-                else:
-                    msg = "Please verify the credentials in the config"
-                raise FatalError("Login to CloudShell failed. {}".format(msg))
-            raise FatalError(self.ConnectionFailureMessage)
+            return PackagingRestApiClient.login(
+                host=self._cs_config.host,
+                port=self._cs_config.port,
+                username=self._cs_config.username,
+                password=self._cs_config.password,
+                domain=self._cs_config.domain,
+            )
+        except AttributeError:
+            return PackagingRestApiClient(
+                ip=self._cs_config.host,
+                port=self._cs_config.port,
+                username=self._cs_config.username,
+                password=self._cs_config.password,
+                domain=self._cs_config.domain,
+            )
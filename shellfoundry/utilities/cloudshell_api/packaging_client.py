@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+from contextlib import contextmanager
+
+from cloudshell.rest.api import PackagingRestApiClient as BasePackagingRestApiClient
+
+
+class PackageReader(object):
+    """Package file reporting the amount of bytes read from it."""
+
+    def __init__(self, stream, progress_callback):
+        self._stream = stream
+        self._size = os.fstat(stream.fileno()).st_size
+        self._progress_callback = progress_callback
+
+    def fileno(self):
+        return self._stream.fileno()
+
+    def tell(self):
+        return self._stream.tell()
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        if data:
+            self._progress_callback(self._stream.tell(), self._size)
+        return data
+
+
+def get_progressbar_callback(pbar):
+    """Get upload progress callback moving the click progress bar.
+
+    Bar is redrawn once per percent, it's moved back
+    when the package is sent again.
+    """
+    step = max(pbar.length // 100, 1)
+
+    def progress_callback(sent, total):
+        sent = sent * pbar.length // total if total else pbar.length
+        if abs(sent - pbar.pos) >= step or sent == pbar.length:
+            pbar.update(sent - pbar.pos)
+
+    return progress_callback
+
+
+@contextmanager
+def open_package(package_path, progress_callback=None):
+    """Open the package file for upload.
+
+    :param progress_callback: called with the amount of bytes read
+        and the package size
+    """
+    with open(package_path, "rb") as stream:
+        if progress_callback is None:
+            yield stream
+        else:
+            yield PackageReader(stream, progress_callback)
+
+
+class PackagingRestApiClient(BasePackagingRestApiClient):
+    """Packaging API client reporting progress of package uploads.
+
+    The base client streams the package from the file through a multipart
+    encoder, the file reports the bytes the encoder has read from it.
+    """
+
+    def update_shell(self, shell_path, shell_name=None, progress_callback=None):
+        """Update existing shell from the package file.
+
+        :param progress_callback: called with the amount of bytes sent
+            and the package size
+        """
+        shell_name = shell_name or os.path.basename(shell_path).rsplit(".", 1)[0]
+        with open_package(shell_path, progress_callback) as package:
+            self.update_shell_from_buffer(package, shell_name)
+
+    def add_shell(self, shell_path, progress_callback=None):
+        """Add new shell from the package file, see update_shell."""
+        with open_package(shell_path, progress_callback) as package:
+            self.add_shell_from_buffer(package)
+
+    def import_package(self, package_path, progress_callback=None):
+        """Import the package file, see update_shell."""
+        with open_package(package_path, progress_callback) as package:
+            self.import_package_from_buffer(package)
@@ -5,6 +5,7 @@ from io import open
 
 import yaml
 
+from shellfoundry.utilities.config.config_snapshot import forget_config
 from shellfoundry.utilities.config_reader import INSTALL
 from shellfoundry.utilities.modifiers.configuration.aggregated_modifiers import (
     AggregatedModifiers,
@@ -27,6 +28,8 @@ class ConfigContext(object):
             return True
         except Exception:
             return False
+        finally:
+            forget_config(self.config_file_path)
 
     def try_delete(self, key):
         try:
@@ -39,6 +42,8 @@ class ConfigContext(object):
             return True
         except Exception:
             return False
+        finally:
+            forget_config(self.config_file_path)
 
     def _modify(self, key, value):
         return self.modifier.modify(key, value)
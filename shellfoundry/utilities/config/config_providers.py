@@ -8,12 +8,18 @@ import click
 GLOBAL_CONFIG_NAME = "global_config.yml"
 LOCAL_CONFIG_NAME = "cloudshell_config.yml"
 
+# local configurations already reported to the user by this process
+announced_configs = set()
+# working folder -> configuration path found there by the default provider
+resolved_paths = {}
+
 
 class LocalConfigProvider(object):
     def get_config_path(self):
         path = os.path.join(os.getcwd(), LOCAL_CONFIG_NAME)
-        if os.path.exists(path):
+        if path not in announced_configs and os.path.exists(path):
             click.echo("Using local configuration...")
+            announced_configs.add(path)
         return path
 
 
@@ -44,7 +50,15 @@ class DefaultConfigProvider(ConfigProvider):
         self.default_provider = LocalConfigProvider()
 
     def get_config_path(self):
-        config_path = self.default_provider.get_config_path()
-        if not os.path.exists(config_path):
-            config_path = ConfigProvider.get_config_path(self)
-        return config_path  # or self.fallback_provider.get_config_path()
+        """Get path of the local configuration or the global one.
+
+        The files are looked up once per working folder in the process,
+        the lookup is repeated after shellfoundry changes a configuration.
+        """
+        cwd = os.getcwd()
+        if cwd not in resolved_paths:
+            config_path = self.default_provider.get_config_path()
+            if not os.path.exists(config_path):
+                config_path = ConfigProvider.get_config_path(self)
+            resolved_paths[cwd] = config_path
+        return resolved_paths[cwd]
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import stat
+from io import open
+from threading import RLock
+
+import yaml
+
+from shellfoundry.utilities.config import config_providers
+
+# config path -> (file stamp, parsed content)
+_snapshots = {}
+_lock = RLock()
+
+
+def _get_stamp(config_path):
+    config_stat = os.stat(config_path)
+    if not stat.S_ISREG(config_stat.st_mode):
+        raise OSError("Not a file: {}".format(config_path))
+    return config_stat.st_mtime_ns, config_stat.st_size
+
+
+def load_config(config_path):
+    """Get parsed content of the configuration file.
+
+    The file is parsed once per process and parsed again only when
+    its modification time or size changes, so all readers of the same
+    command share one snapshot. The result must not be modified.
+    :return: parsed YAML or None if there is no such file
+    """
+    try:
+        stamp = _get_stamp(config_path)
+    except OSError:
+        return None
+
+    with _lock:
+        snapshot = _snapshots.get(config_path)
+        if snapshot is None or snapshot[0] != stamp:
+            with open(config_path, mode="r", encoding="utf8") as stream:
+                snapshot = stamp, yaml.safe_load(stream)
+            _snapshots[config_path] = snapshot
+        return snapshot[1]
+
+
+def forget_config(config_path):
+    """Drop snapshot of the configuration file changed by shellfoundry itself.
+
+    The file may have been created, so configuration paths are looked up again.
+    """
+    with _lock:
+        _snapshots.pop(config_path, None)
+        config_providers.resolved_paths.clear()
+
+
+def clear_snapshots():
+    """Drop all snapshots, configuration files are read again on next use."""
+    with _lock:
+        _snapshots.clear()
+        config_providers.announced_configs.clear()
+        config_providers.resolved_paths.clear()
@@ -1,11 +1,6 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import os
-from io import open
-
-import yaml
-
 from shellfoundry.models.install_config import (
     DEFAULT_AUTHOR,
     DEFAULT_DOMAIN,
@@ -20,10 +15,21 @@ from shellfoundry.models.install_config import (
     InstallConfig,
 )
 from shellfoundry.models.shellfoundry_settings import (
+    DEFAULT_ARCHIVES_CACHE_SIZE,
+    DEFAULT_COMPRESSION_LEVEL,
     DEFAULT_DEFAULT_VIEW,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_REPRODUCIBLE_PACK,
+    DEFAULT_STANDARDS_CACHE_TTL,
+    DEFAULT_TEMPLATES_CACHE_TTL,
+    DEFAULT_VERSION_CHECK_INTERVAL,
+    DEFAULT_WHEELS_CACHE_SIZE,
     ShellFoundrySettings,
 )
 from shellfoundry.utilities.config.config_providers import DefaultConfigProvider
+from shellfoundry.utilities.config.config_snapshot import load_config
+from shellfoundry.utilities.tracing import traced
 
 INSTALL = "install"
 
@@ -39,6 +45,15 @@ GITHUB_LOGIN = "github_login"
 GITHUB_PASSWORD = "github_password"
 
 DEFAULT_VIEW = "defaultview"
+TEMPLATES_CACHE_TTL = "templates_cache_ttl"
+MAX_WORKERS = "max_workers"
+COMPRESSION_LEVEL = "compression_level"
+REPRODUCIBLE_PACK = "reproducible_pack"
+VERSION_CHECK_INTERVAL = "version_check_interval"
+ARCHIVES_CACHE_SIZE = "archives_cache_size"
+READ_TIMEOUT = "read_timeout"
+STANDARDS_CACHE_TTL = "standards_cache_ttl"
+WHEELS_CACHE_SIZE = "wheels_cache_size"
 
 
 def get_with_default(install_config, parameter_name, default_value):
@@ -56,19 +71,39 @@ def get_with_default(install_config, parameter_name, default_value):
     )
 
 
+def get_int_with_default(install_config, parameter_name, default_value):
+    """Get integer configuration value.
+
+    Values set by config command are stored as strings,
+    default value is used if stored value is not a number.
+    """
+    value = get_with_default(install_config, parameter_name, default_value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default_value
+
+
+def get_bool_with_default(install_config, parameter_name, default_value):
+    """Get boolean configuration value.
+
+    Values set by config command are stored as strings like 'True' or 'false'.
+    """
+    value = get_with_default(install_config, parameter_name, default_value)
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "yes", "1")
+
+
 class Configuration(object):
     def __init__(self, reader, config_provider=None):
         self.reader = reader
         self.config_provider = config_provider or DefaultConfigProvider()
 
+    @traced("config.read")
     def read(self):
         config_path = self.config_provider.get_config_path()
-
-        if config_path is None or not os.path.isfile(config_path):
-            return self.reader.get_defaults()
-
-        with open(config_path) as stream:
-            config = yaml.safe_load(stream.read())
+        config = load_config(config_path) if config_path else None
 
         if not config or INSTALL not in config:
             return self.reader.get_defaults()
@@ -81,10 +116,7 @@ class Configuration(object):
 
         Missing keys will be filled with their defaults.
         """
-        config_data = None
-        if os.path.exists(config_path):
-            with open(config_path, mode="r", encoding="utf8") as conf_file:
-                config_data = yaml.safe_load(conf_file)
+        config_data = load_config(config_path)
 
         if not config_data or INSTALL not in config_data:
             config_data = {INSTALL: {}}
@@ -151,4 +183,38 @@ class ShellFoundryConfig(object):
 
     def read_from_config(self, config):
         defaultview = get_with_default(config, DEFAULT_VIEW, DEFAULT_DEFAULT_VIEW)
-        return ShellFoundrySettings(defaultview)
+        templates_cache_ttl = get_int_with_default(
+            config, TEMPLATES_CACHE_TTL, DEFAULT_TEMPLATES_CACHE_TTL
+        )
+        max_workers = get_int_with_default(config, MAX_WORKERS, DEFAULT_MAX_WORKERS)
+        compression_level = get_int_with_default(
+            config, COMPRESSION_LEVEL, DEFAULT_COMPRESSION_LEVEL
+        )
+        reproducible_pack = get_bool_with_default(
+            config, REPRODUCIBLE_PACK, DEFAULT_REPRODUCIBLE_PACK
+        )
+        version_check_interval = get_int_with_default(
+            config, VERSION_CHECK_INTERVAL, DEFAULT_VERSION_CHECK_INTERVAL
+        )
+        archives_cache_size = get_int_with_default(
+            config, ARCHIVES_CACHE_SIZE, DEFAULT_ARCHIVES_CACHE_SIZE
+        )
+        read_timeout = get_int_with_default(config, READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        standards_cache_ttl = get_int_with_default(
+            config, STANDARDS_CACHE_TTL, DEFAULT_STANDARDS_CACHE_TTL
+        )
+        wheels_cache_size = get_int_with_default(
+            config, WHEELS_CACHE_SIZE, DEFAULT_WHEELS_CACHE_SIZE
+        )
+        return ShellFoundrySettings(
+            defaultview,
+            templates_cache_ttl,
+            max_workers,
+            compression_level,
+            reproducible_pack,
+            version_check_interval,
+            archives_cache_size,
+            read_timeout,
+            standards_cache_ttl,
+            wheels_cache_size,
+        )
@@ -8,17 +8,23 @@ __all__ = [
     "TEMPLATE_AUTHOR_FIELD",
     "TEMPLATE_VERSION",
     "TEMPLATE_BASED_ON",
-    "CLOUDSHELL_MAX_RETRIES",
-    "CLOUDSHELL_RETRY_INTERVAL_SEC",
-    "DEFAULT_TIME_WAIT",
+    "RETRY_MAX_ATTEMPTS",
+    "RETRY_BASE_DELAY",
+    "RETRY_MAX_DELAY",
+    "RETRY_DEADLINE",
     "TEMPLATE_PROPERTY",
     "TEMPLATES_YML",
     "SERVER_VERSION_KEY",
+    "DEFAULT_MAX_UPLOADS",
+    "WATCH_DEBOUNCE_TIME",
 ]
 
-CLOUDSHELL_MAX_RETRIES = 5
-CLOUDSHELL_RETRY_INTERVAL_SEC = 0.5
-DEFAULT_TIME_WAIT = 1.0
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+RETRY_DEADLINE = 60.0
+DEFAULT_MAX_UPLOADS = 4
+WATCH_DEBOUNCE_TIME = 0.3
 METADATA_AUTHOR_FIELD = "Created-By"
 TEMPLATE_AUTHOR_FIELD = "metadata/template_author"
 TEMPLATE_VERSION = "metadata/template_version"
@@ -10,12 +10,14 @@ from cookiecutter.main import cookiecutter
 
 from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
 from shellfoundry.utilities.constants import TEMPLATE_INFO_FILE
+from shellfoundry.utilities.tracing import traced
 
 
 class CookiecutterTemplateCompiler(object):
     def __init__(self):
         self.cloudshell_config_reader = Configuration(CloudShellConfigReader())
 
+    @traced("template.render")
     def compile_template(
         self,
         shell_name,
@@ -4,18 +4,55 @@ try:
 except ImportError:
     from urllib2 import URLError
 
+import hashlib
+import json
 import zipfile
-from io import open
+from functools import partial
 from os import path
 
 import click
-from cloudshell.rest.api import PackagingRestApiClient
 from requests import post
+from requests_toolbelt import MultipartEncoder
 
-from shellfoundry.utilities.temp_dir_context import TempDirContext
+from shellfoundry.utilities.cache import BlobStore, get_file_digest
+from shellfoundry.utilities.cloudshell_api import (
+    PackagingRestApiClient,
+    get_progressbar_callback,
+    open_package,
+)
+from shellfoundry.utilities.retry import RetryPolicy, is_connect_error
+from shellfoundry.utilities.spooled_file import SpooledFile
+from shellfoundry.utilities.standards import Standards
+from shellfoundry.utilities.tracing import traced
+
+DATA_MODELS_CACHE_NAME = "data_models"
+DATA_MODELS_CACHE_SIZE = 64 * 1024 * 1024
+RESPONSE_CHUNK_SIZE = 64 * 1024
+# generated archives bigger than that are spooled to a temporary file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
 
 
 class DriverGenerator(object):
+    def __init__(self, data_models_store=None, standards=None, retry_policy=None):
+        """Generates Python data models.
+
+        :param BlobStore data_models_store: storage for generated data models
+        :param Standards standards: standards installed into CloudShell
+        :param RetryPolicy retry_policy: retries of CloudShell requests
+        """
+        self._data_models_store = data_models_store
+        self.standards = standards or Standards()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    @property
+    def data_models_store(self):
+        if self._data_models_store is None:
+            self._data_models_store = BlobStore(
+                DATA_MODELS_CACHE_NAME, DATA_MODELS_CACHE_SIZE
+            )
+        return self._data_models_store
+
+    @traced("datamodel.generate")
     def generate_driver(
         self,
         cloudshell_config,
@@ -23,17 +60,35 @@ class DriverGenerator(object):
         package_full_path,
         shell_filename,
         shell_name,
+        definition_path=None,
+        refresh=False,
     ):
         """Generates Python data model by connecting to Cloudshell server.
 
+        Generated data model is reused while the shell definition
+        and the standards installed into CloudShell are not changed.
         :param cloudshell_config:
         :type cloudshell_config: InstallConfig
         :param destination_path:
         :param package_full_path:
         :param shell_filename:
         :param shell_name:
+        :param str definition_path: shell definition file, data model
+            is not cached if not provided
+        :param bool refresh: generate data model on CloudShell
+            instead of using the cached one
         :return:
         """
+        cache_key = self._get_cache_key(cloudshell_config, definition_path)
+        data_model = (
+            cache_key and not refresh and self.data_models_store.get(cache_key)
+        )
+        if data_model:
+            click.echo("Extracting cached data model at {}".format(destination_path))
+            with zipfile.ZipFile(data_model) as zf:
+                zf.extractall(destination_path)
+            return
+
         client = self._connect_to_cloudshell(cloudshell_config)
         self._generate_driver_data_model(
             client=client,
@@ -42,19 +97,48 @@ class DriverGenerator(object):
             package_full_path=package_full_path,
             shell_filename=shell_filename,
             shell_name=shell_name,
+            cache_key=cache_key,
+        )
+
+    def _get_cache_key(self, cloudshell_config, definition_path):
+        """Get key of the data model generated for the shell definition.
+
+        CloudShell doesn't report its version, installed standards
+        fingerprint the server instead. They are fetched from CloudShell
+        every time, cached ones may miss an upgraded standard.
+        :return: key or None if data model can't be cached
+        """
+        if not definition_path or not path.exists(definition_path):
+            return None
+        try:
+            standards = self.standards.fetch(refresh=True)
+        except Exception:
+            return None
+
+        standards_digest = hashlib.sha256(
+            json.dumps(standards, sort_keys=True).encode("utf8")
+        ).hexdigest()
+        return "{}:{}/{}@{}".format(
+            cloudshell_config.host,
+            cloudshell_config.port,
+            get_file_digest(definition_path),
+            standards_digest,
         )
 
-    @staticmethod
     def _generate_driver_data_model(
+        self,
         client,
         cloudshell_config,
         destination_path,
         package_full_path,
         shell_filename,
         shell_name,
+        cache_key=None,
     ):
         """Generates driver data model.
 
+        Package is streamed to CloudShell and generated archive is extracted
+        from the spooled response without a temporary file.
         :param client:
         :param cloudshell_config:
         :type cloudshell_config: InstallConfig
@@ -62,60 +146,102 @@ class DriverGenerator(object):
         :param package_full_path:
         :param shell_filename:
         :param shell_name:
+        :param str cache_key: key to store generated data model by
         :return:
         """
         url = "http://{}:{}/API/ShellDrivers/Generate".format(
             cloudshell_config.host, cloudshell_config.port
         )
-        token = client._token
-        response = post(
-            url,
-            files={path.basename(shell_filename): open(package_full_path, "rb")},
-            headers={"Authorization": "Basic " + token},
-        )
-
-        if response.status_code != 200:
-            error_message = "Code generation failed with code {} and error {}".format(
-                response.status_code, response.text
+        with click.progressbar(
+            length=path.getsize(package_full_path),
+            show_eta=False,
+            label="Uploading package to CloudShell",
+        ) as pbar:
+            # repeated only if it wasn't sent, the body is streamed once
+            response = self.retry_policy.call(
+                partial(
+                    self._post_package,
+                    url,
+                    client._token,
+                    shell_filename,
+                    package_full_path,
+                    get_progressbar_callback(pbar),
+                ),
+                retryable=is_connect_error,
             )
-            click.echo(message=error_message, err=True)
-            return
 
-        click.echo("Extracting data model ...")
-        with TempDirContext(remove_dir_on_error=False, prefix=shell_name) as temp_dir:
-            generated_zip = path.join(temp_dir, shell_filename)
-            click.echo("Writing temporary file {}".format(generated_zip))
-            with open(generated_zip, "wb") as driver_file:
-                driver_file.write(response.content)
+        try:
+            if response.status_code != 200:
+                error_message = (
+                    "Code generation failed with code {} and error {}".format(
+                        response.status_code, response.text
+                    )
+                )
+                click.echo(message=error_message, err=True)
+                return
 
-            click.echo("Extracting generated code at {}".format(destination_path))
-            with zipfile.ZipFile(generated_zip) as zf:
-                zf.extractall(destination_path)
+            click.echo("Extracting data model ...")
+            with SpooledFile(max_size=SPOOL_MAX_SIZE) as buffer:
+                for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+                    buffer.write(chunk)
+
+                click.echo("Extracting generated code at {}".format(destination_path))
+                with zipfile.ZipFile(buffer) as zf:
+                    zf.extractall(destination_path)
+
+                if cache_key:
+                    buffer.seek(0)
+                    self.data_models_store.put_stream(cache_key, buffer)
+        finally:
+            response.close()
 
     @staticmethod
-    def _connect_to_cloudshell(cloudshell_config):
+    def _post_package(
+        url, token, shell_filename, package_full_path, progress_callback=None
+    ):
+        """Post the package streamed from the file in a multipart body.
+
+        :param progress_callback: called with the amount of bytes sent
+            and the package size
+        """
+        file_name = path.basename(shell_filename)
+        with open_package(package_full_path, progress_callback) as package:
+            body = MultipartEncoder({file_name: (file_name, package)})
+            return post(
+                url,
+                data=body,
+                headers={
+                    "Authorization": "Basic " + token,
+                    "Content-Type": body.content_type,
+                },
+                stream=True,
+            )
+
+    def _connect_to_cloudshell(self, cloudshell_config):
         try:
-            try:
-                client = PackagingRestApiClient.login(
-                    host=cloudshell_config.host,
-                    port=cloudshell_config.port,
-                    username=cloudshell_config.username,
-                    password=cloudshell_config.password,
-                    domain=cloudshell_config.domain,
-                )
-                return client
-            except AttributeError:
-                client = PackagingRestApiClient(
-                    ip=cloudshell_config.host,
-                    port=cloudshell_config.port,
-                    username=cloudshell_config.username,
-                    password=cloudshell_config.password,
-                    domain=cloudshell_config.domain,
-                )
-                return client
+            return self.retry_policy.call(partial(self._login, cloudshell_config))
         except URLError:
             click.echo(
                 "Login to CloudShell failed. Please verify the credentials in cloudshell_config.yml",  # noqa: E501
                 err=True,
             )
             raise
+
+    @staticmethod
+    def _login(cloudshell_config):
+        try:
+            return PackagingRestApiClient.login(
+                host=cloudshell_config.host,
+                port=cloudshell_config.port,
+                username=cloudshell_config.username,
+                password=cloudshell_config.password,
+                domain=cloudshell_config.domain,
+            )
+        except AttributeError:
+            return PackagingRestApiClient(
+                ip=cloudshell_config.host,
+                port=cloudshell_config.port,
+                username=cloudshell_config.username,
+                password=cloudshell_config.password,
+                domain=cloudshell_config.domain,
+            )
@@ -0,0 +1,296 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Changes of the shell source files.
+
+inotify is used on Linux, other systems or file systems not supporting it
+are polled. Paths are relative to the watched root with "/" separators.
+"""
+
+import errno
+import hashlib
+import os
+import select
+import struct
+import sys
+import time
+from contextlib import contextmanager
+
+from shellfoundry.utilities.constants import WATCH_DEBOUNCE_TIME
+from shellfoundry.utilities.source_filter import is_ignored
+
+POLL_INTERVAL = 0.5
+
+
+def _join(directory, name):
+    return directory + "/" + name if directory else name
+
+
+class PollingObserver(object):
+    kind = "polling"
+
+    def __init__(self, root, paths, interval=POLL_INTERVAL):
+        """Observer comparing size and modification time of the files.
+
+        :param str root: watched folder
+        :param list paths: files and folders inside the root to watch
+        :param float interval: seconds between the files scans
+        """
+        self.root = root
+        self.paths = paths
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in self.paths:
+            full_path = os.path.join(self.root, path)
+            if os.path.isfile(full_path):
+                snapshot[path] = self._signature(full_path)
+            for dir_path, dir_names, file_names in os.walk(full_path):
+                dir_names[:] = [name for name in dir_names if not is_ignored(name)]
+                directory = os.path.relpath(dir_path, self.root).replace(os.sep, "/")
+                for name in file_names:
+                    if not is_ignored(name):
+                        snapshot[_join(directory, name)] = self._signature(
+                            os.path.join(dir_path, name)
+                        )
+        return snapshot
+
+    @staticmethod
+    def _signature(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, timeout=None):
+        """Get paths changed since the previous read.
+
+        :param float timeout: seconds to wait for changes, None to wait forever
+        :return: set of changed paths, empty if nothing was changed in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in set(snapshot) | set(self._snapshot)
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(
+                self.interval if remaining is None else min(self.interval, remaining)
+            )
+
+    def close(self):
+        pass
+
+
+class InotifyObserver(object):
+    kind = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_CLOEXEC = 0o2000000
+    MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+    )
+    EVENT_HEADER = struct.Struct("iIII")
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, root, paths):
+        """Observer receiving changes from Linux inotify.
+
+        Root folder is watched for replaced files and created folders,
+        watched folders are watched recursively.
+        :raise OSError: if inotify isn't available
+        """
+        import ctypes
+        import ctypes.util
+
+        self.root = root
+        self.paths = paths
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self._fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(self._get_errno(), "inotify is not available")
+        self._watches = {}
+        try:
+            self._add_watch("")
+            for path in paths:
+                if os.path.isdir(os.path.join(root, path)):
+                    self._add_tree(path)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(os.path.join(self.root, directory)),
+            self.MASK,
+        )
+        if wd < 0:
+            error = self._get_errno()
+            # folder was removed or replaced by a file meanwhile
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(error, "Failed to watch " + directory)
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory):
+        for dir_path, dir_names, _ in os.walk(os.path.join(self.root, directory)):
+            dir_names[:] = [name for name in dir_names if not is_ignored(name)]
+            self._add_watch(os.path.relpath(dir_path, self.root).replace(os.sep, "/"))
+
+    def _is_watched(self, path):
+        return any(
+            path == watched or path.startswith(watched + "/") for watched in self.paths
+        )
+
+    def read(self, timeout=None):
+        """Get paths changed since the previous read, see PollingObserver.read."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, self.READ_SIZE)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # events were lost, consider everything changed
+                changed.update(self.paths)
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or is_ignored(name):
+                continue
+            path = _join(directory, name)
+            if not self._is_watched(path):
+                continue
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_observer(root, paths, poll=False):
+    """Create inotify observer if possible, polling one otherwise."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyObserver(root, paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingObserver(root, paths)
+
+
+class FileWatcher(object):
+    def __init__(
+        self, root, paths, debounce=WATCH_DEBOUNCE_TIME, poll=False, observer=None
+    ):
+        """Watcher of the files and folders.
+
+        :param str root: watched folder
+        :param list paths: files and folders inside the root to watch
+        :param float debounce: seconds files should stay unchanged
+            before the changes are reported
+        :param bool poll: poll the files even if inotify is available
+        """
+        self.root = root
+        self.debounce = debounce
+        self.observer = observer or create_observer(root, paths, poll)
+        self._pending = set()
+
+    @property
+    def kind(self):
+        return self.observer.kind
+
+    def wait(self, timeout=None):
+        """Wait for changes and collect them until the files stay unchanged.
+
+        Editors and version control tools change many files at once,
+        they are reported together.
+        :param float timeout: seconds to wait for the first change,
+            None to wait forever
+        :return: sorted list of changed paths, empty if nothing was changed
+        """
+        changed = self._pending or self.observer.read(timeout)
+        self._pending = set()
+        if not changed:
+            return []
+        while True:
+            more = self.observer.read(self.debounce)
+            if not more:
+                return sorted(changed)
+            changed |= more
+
+    @contextmanager
+    def ignore_rewrites(self, paths):
+        """Drop changes of the files written back with the same content meanwhile.
+
+        Build of the shell may change its files and restore them,
+        other changes made meanwhile are returned by the next wait.
+        :param list paths: files the build may write
+        """
+        digests = {path: self._digest(path) for path in paths}
+        try:
+            yield
+        finally:
+            changed = set()
+            while True:
+                more = self.observer.read(0)
+                if not more:
+                    break
+                changed |= more
+            self._pending |= {
+                path
+                for path in changed
+                if path not in digests or self._digest(path) != digests[path]
+            }
+
+    def _digest(self, path):
+        """Get hash of the file content, None if there is no such file."""
+        try:
+            with open(os.path.join(self.root, path), "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except (IOError, OSError):
+            return None
+
+    def close(self):
+        self.observer.close()
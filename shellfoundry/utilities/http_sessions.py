@@ -0,0 +1,50 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from threading import RLock
+
+import requests
+
+from shellfoundry.utilities.retry import RetryPolicy
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+POOL_MAXSIZE = 16
+
+_sessions = {}
+_lock = RLock()
+
+
+def get_session(url, retries=True):
+    """Get keep-alive session shared by all requests to the url host.
+
+    Session keeps connections to the host open, so subsequent requests
+    don't need to establish new TCP and TLS connections.
+    :param bool retries: retry failed requests by the default retry policy,
+        requests retried by the caller are sent without retries,
+        so the retries don't multiply
+    """
+    key = urlparse(url).netloc, retries
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                max_retries=RetryPolicy().adapter_retry() if retries else 0,
+                pool_maxsize=POOL_MAXSIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    """Close all shared sessions and their connections."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import time
+from io import open
+
+from shellfoundry.utilities.cache import FileCache
+
+INSTALL_LEDGER_CACHE_NAME = "install_ledger"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class InstallLedger(object):
+    """Hashes of the shell packages last installed into each CloudShell server.
+
+    Allows to skip uploading a package the server already got.
+    The ledger only knows about installations made by shellfoundry
+    from this machine, so upload could be forced if the shell
+    was changed on the server by other means.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or FileCache(INSTALL_LEDGER_CACHE_NAME)
+
+    @staticmethod
+    def get_package_hash(package_path):
+        """Get hash of the package file or None if there is no such file."""
+        if not os.path.isfile(package_path):
+            return None
+        package_hash = hashlib.sha256()
+        with open(package_path, mode="rb") as stream:
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                package_hash.update(chunk)
+        return package_hash.hexdigest()
+
+    def is_installed(self, host, port, shell_name, package_hash):
+        """Check that the same package was the last one installed into the server."""
+        if package_hash is None:
+            return False
+        record = self.cache.get(self._get_key(host, port, shell_name))
+        return bool(record) and record.get("hash") == package_hash
+
+    def record(self, host, port, shell_name, package_hash):
+        if package_hash is not None:
+            self.cache.set(
+                self._get_key(host, port, shell_name),
+                {"hash": package_hash, "installed_at": time.time()},
+            )
+
+    def forget(self, host, port, shell_name):
+        self.cache.delete(self._get_key(host, port, shell_name))
+
+    @staticmethod
+    def _get_key(host, port, shell_name):
+        return "{}:{}/{}".format(host, port, shell_name)
@@ -2,30 +2,72 @@
 # -*- coding: utf-8 -*-
 
 import os
+from functools import partial
 
 import click
-from cloudshell.rest.api import PackagingRestApiClient
+
+from shellfoundry.utilities.cloudshell_api import PackagingRestApiClient
+from shellfoundry.utilities.install_ledger import InstallLedger
+from shellfoundry.utilities.retry import RetryPolicy, is_connect_error
 
 
 class ShellInstaller(object):
-    def install(self, package_name, config):
+    def __init__(self, install_ledger=None, retry_policy=None):
+        self.install_ledger = install_ledger or InstallLedger()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    def install(self, package_name, config, force=False, client=None):
         """Installs package according to cloudshell.
 
         :param package_name: Package name to install
         :type package_name str
         :param config: Configuration to be used for
         :type config shellfoundry.models.install_config.InstallConfig
-        :return:
+        :param bool force: upload the package even if the same package
+            was already installed into the server
+        :param client: authenticated PackagingRestApiClient to use
+            instead of a new login
+        :return: False if upload was skipped, True otherwise
         """
         package_full_path = os.path.join(os.getcwd(), "dist", package_name + ".zip")
+        package_hash = self.install_ledger.get_package_hash(package_full_path)
+        if not force and self.install_ledger.is_installed(
+            config.host, config.port, package_name, package_hash
+        ):
+            click.echo(
+                "Package {} is already installed into CloudShell at {}:{}, "
+                "use --force to upload it anyway".format(
+                    package_full_path, config.host, config.port
+                )
+            )
+            return False
+
         click.echo(
             "Installing package {} into CloudShell at http://{}:{}".format(
                 package_full_path, config.host, config.port
             )
         )
 
+        client = client or self.connect(config)
+        # repeated only if it wasn't sent, package may be imported otherwise
+        self.retry_policy.call(
+            partial(client.import_package, package_full_path),
+            retryable=is_connect_error,
+        )
+        self.install_ledger.record(config.host, config.port, package_name, package_hash)
+        return True
+
+    def connect(self, config):
+        """Login into CloudShell.
+
+        :return: authenticated PackagingRestApiClient
+        """
+        return self.retry_policy.call(partial(self._login, config))
+
+    @staticmethod
+    def _login(config):
         try:
-            client = PackagingRestApiClient.login(
+            return PackagingRestApiClient.login(
                 host=config.host,
                 port=config.port,
                 username=config.username,
@@ -33,12 +75,10 @@ class ShellInstaller(object):
                 domain=config.domain,
             )
         except AttributeError:
-            client = PackagingRestApiClient(
+            return PackagingRestApiClient(
                 ip=config.host,
                 port=config.port,
                 username=config.username,
                 password=config.password,
                 domain=config.domain,
             )
-
-        client.import_package(package_full_path)
@@ -0,0 +1,173 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import re
+from io import open
+
+from shellfoundry.utilities import GEN_TWO
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.constants import TEMPLATE_INFO_FILE
+
+LOCAL_TEMPLATES_CACHE_NAME = "local_templates"
+SHELL_DEFINITION_FILE = "shell-definition.yaml"
+STANDARD_VERSION_RE = re.compile(
+    r"cloudshell_standard:\s*cloudshell_(?P<name>\S+)_standard_(?P<version>\S+)\.\w+$",
+    re.MULTILINE,
+)
+
+
+def _get_mtime(path):
+    """Get modification time of the path or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _is_skipped_dir(name):
+    """Hidden folders (.git, .idea, etc.) never contain templates."""
+    return name.startswith(".")
+
+
+def find_shell_definition(template_dir):
+    """Get path to the first shell-definition file inside the template folder."""
+    for root, directories, filenames in os.walk(template_dir):
+        directories[:] = sorted(d for d in directories if not _is_skipped_dir(d))
+        if SHELL_DEFINITION_FILE in filenames:
+            return os.path.join(root, SHELL_DEFINITION_FILE)
+
+
+def get_standard_version(definition_path):
+    """Get standard version from template shell-definition file."""
+    with open(definition_path, encoding="utf8") as stream:
+        match = STANDARD_VERSION_RE.search(stream.read())
+    if match:
+        return str(match.groupdict()["version"].replace("_", "."))
+
+
+class LocalTemplatesIndex(object):
+    """Persisted metadata of templates kept in the local template location.
+
+    Every scanned folder is stored with its modification time. Folders with
+    unchanged time are not listed again and their templates are not parsed
+    again, so repeated scans of big template shares only touch changed folders.
+    Folders of found templates are not scanned for other templates.
+    """
+
+    def __init__(self, cache=None):
+        """Local templates index.
+
+        :param FileCache cache: storage for the index
+        """
+        self.cache = cache or FileCache(LOCAL_TEMPLATES_CACHE_NAME)
+
+    def scan(self, template_location):
+        """Find templates in the template location.
+
+        :param str template_location: folder with templates
+        :return: list of (template folder, cookiecutter.json content,
+            standard version) tuples
+        """
+        template_location = os.path.abspath(template_location)
+        cached_dirs = self.cache.get(template_location) or {}
+        dirs = {}
+        templates = []
+
+        pending = [template_location]
+        while pending:
+            path = pending.pop()
+            mtime = _get_mtime(path)
+            if mtime is None:
+                continue
+
+            entry = cached_dirs.get(path)
+            if entry is None or entry["mtime"] != mtime:
+                entry = self._read_dir(path, mtime)
+            elif entry["template"] and not self._is_template_fresh(
+                path, entry["template"]
+            ):
+                entry = dict(entry, template=self._read_template(path))
+            dirs[path] = entry
+
+            if entry["template"]:
+                templates.append(
+                    (
+                        path,
+                        entry["template"]["data"],
+                        entry["template"]["standard_version"],
+                    )
+                )
+            else:
+                pending.extend(
+                    os.path.join(path, name) for name in reversed(entry["subdirs"])
+                )
+
+        if dirs != cached_dirs:
+            self.cache.set(template_location, dirs)
+        return templates
+
+    def _read_dir(self, path, mtime):
+        """List the folder and parse the template it contains."""
+        subdirs = []
+        is_template = False
+        try:
+            with os.scandir(path) as entries:
+                for dir_entry in entries:
+                    if dir_entry.name == TEMPLATE_INFO_FILE and dir_entry.is_file():
+                        is_template = True
+                    elif dir_entry.is_dir() and not _is_skipped_dir(dir_entry.name):
+                        subdirs.append(dir_entry.name)
+        except OSError:
+            pass
+
+        return {
+            "mtime": mtime,
+            "subdirs": sorted(subdirs),
+            "template": self._read_template(path) if is_template else None,
+        }
+
+    @staticmethod
+    def _read_template(path):
+        """Get template metadata with modification times of its files."""
+        info_path = os.path.join(path, TEMPLATE_INFO_FILE)
+        info_mtime = _get_mtime(info_path)
+        with open(info_path, mode="r", encoding="utf8") as stream:
+            templ_data = json.load(stream)
+
+        definition_path = definition_mtime = None
+        if GEN_TWO in templ_data.get("template_name", "Undefined"):
+            definition_path = find_shell_definition(path)
+            if definition_path:
+                definition_mtime = _get_mtime(definition_path)
+                standard_version = get_standard_version(definition_path)
+            else:
+                standard_version = None
+        else:
+            standard_version = templ_data.get(
+                "version", templ_data.get("shell_version", "0.0.1")
+            )
+
+        return {
+            "data": templ_data,
+            "standard_version": standard_version,
+            "info_mtime": info_mtime,
+            "definition_path": definition_path,
+            "definition_mtime": definition_mtime,
+        }
+
+    @staticmethod
+    def _is_template_fresh(path, template):
+        """Check that files the template metadata was read from are not changed.
+
+        Files edited in place don't change the folder modification time.
+        """
+        if _get_mtime(os.path.join(path, TEMPLATE_INFO_FILE)) != template["info_mtime"]:
+            return False
+        if GEN_TWO in template["data"].get("template_name", "Undefined"):
+            definition_path = template["definition_path"]
+            return bool(definition_path) and (
+                _get_mtime(definition_path) == template["definition_mtime"]
+            )
+        return True
@@ -1,9 +1,13 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import copy
 import os
 import re
-from io import open
+import shutil
+import tempfile
+from contextlib import contextmanager
+from io import StringIO, open
 
 import ruamel.yaml as yaml
 
@@ -15,12 +19,74 @@ from shellfoundry.utilities.constants import (
 )
 
 
+def _write_file(path, content):
+    """Replace file content atomically, readers never see a partial file."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with open(fd, "w", encoding="utf8") as stream:
+            stream.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def get_entry_definition(tosca_meta_lines):
+    """Get shell definition file name from TOSCA.meta lines."""
+    return dict(
+        list(map(str.strip, str(line).split(":", 1))) for line in tosca_meta_lines
+    )["Entry-Definitions"]
+
+
+def get_artifacts_files(shell_definition, artifact_name_list):
+    """Get files of the artifacts from parsed shell definition.
+
+    :param dict shell_definition: parsed shell-definition.yaml
+    :param list artifact_name_list: names of the artifacts to look for
+    :return: dict of artifact names and file paths relative to the Shell root
+    """
+    for node_type in list(shell_definition["node_types"].values()):
+        if "artifacts" not in node_type:
+            continue
+
+        result = {}
+        for artifact_name, artifact in node_type["artifacts"].items():
+            if artifact_name in artifact_name_list:
+                result.update({artifact_name: artifact["file"]})
+
+        return result
+
+
 class DefinitionModification(object):
     def __init__(self, shell_path):
         self.shell_path = shell_path
         self.entry_definition = os.path.join(
             self.shell_path, self._find_entry_definition()
         )
+        self.tosca_meta = os.path.join(self.shell_path, TOSCA_META_LOCATION)
+        self._session_depth = 0
+        self._reset()
+
+    @contextmanager
+    def session(self):
+        """Editing session.
+
+        shell-definition.yaml and TOSCA.meta are parsed once on the first use,
+        all edits made inside the block are applied to the in-memory documents.
+        Changed files are written once atomically when the outermost block exits,
+        edits are dropped if the block raises.
+        """
+        self._session_depth += 1
+        try:
+            yield self
+            if self._session_depth == 1:
+                self._commit()
+        finally:
+            self._session_depth -= 1
+            if not self._session_depth:
+                self._reset()
 
     def edit_definition(self, field, value):
         """Modify shell-definition.yaml.
@@ -28,27 +94,24 @@ class DefinitionModification(object):
         :params field str: field name to modify
         :params value str: new value to update
         """
-        self._edit_yaml(self.entry_definition, field, value)
+        with self.session():
+            loaded = self._get_definition()
+            field_name = field.split("/")[-1]
+            self._get_inner_dict_recursively(loaded, field)[field_name] = value
+            self._definition_changed = True
 
     def edit_tosca_meta(self, field, value):
-        with open(
-            os.path.join(self.shell_path, TOSCA_META_LOCATION), "r", encoding="utf8"
-        ) as tosca_file:
+        with self.session():
+            tosca_data = self._get_tosca_meta()
             is_changed = False
-            tosca_data = []
-            for line in tosca_file:
+            for index, line in enumerate(tosca_data):
                 if field in line:
-                    line = re.sub(r":\s+.*", ": {}".format(value), line)
+                    tosca_data[index] = re.sub(r":\s+.*", ": {}".format(value), line)
                     is_changed = True
-                tosca_data.append(line)
 
-        if not is_changed:
-            tosca_data.append("\n{field}: {value}".format(field=field, value=value))
-
-        with open(
-            os.path.join(self.shell_path, TOSCA_META_LOCATION), "w", encoding="utf8"
-        ) as tosca_file:
-            tosca_file.writelines(tosca_data)
+            if not is_changed:
+                tosca_data.append("\n{field}: {value}".format(field=field, value=value))
+            self._tosca_meta_changed = True
 
     def add_field_to_definition(self, field, value=None, overwrite=False):
         """Add new field to shell-definition.yaml.
@@ -57,56 +120,37 @@ class DefinitionModification(object):
         :params value str: value to add
         :params overwrite bool: overwrite value if it already exists
         """
-        try:
-            if overwrite:
-                self.edit_definition(field, value)
-        except YmlFieldMissingException:
-            value = value or self._get_value_from_definition(TEMPLATE_VERSION)
-            yaml_parser = yaml.YAML()
-            loaded = self._load_yaml(
-                yaml_parser=yaml_parser, yaml_file=self.entry_definition
-            )
-
-            section, field_name = field.split("/", 1)
-            loaded[section].update({field_name: value})
-            self._edit_file(
-                yaml_file=self.entry_definition, yaml_parser=yaml_parser, data=loaded
-            )
+        with self.session():
+            try:
+                if overwrite:
+                    self.edit_definition(field, value)
+            except YmlFieldMissingException:
+                value = value or self._get_value_from_definition(TEMPLATE_VERSION)
+                loaded = self._get_definition()
+
+                section, field_name = field.split("/", 1)
+                loaded[section].update({field_name: value})
+                self._definition_changed = True
 
     def add_properties(self, attribute_names):
         """Add property to shell-definition.yaml file.
 
+        Properties are added commented out.
         :params fields tuple/list: sequence of properties name that will be added
         """
-        results = list(map(self._add_property, attribute_names))
-
-        for item in zip(attribute_names, results):
-            self._comment_attribute(*item)
+        with self.session():
+            results = list(map(self._add_property, attribute_names))
+            self._commented_attributes.extend(zip(attribute_names, results))
 
     def get_artifacts_files(self, artifact_name_list):
-        yaml_parser = yaml.YAML()
-        shell_definition = self._load_yaml(yaml_parser, self.entry_definition)
-
-        for node_type in list(shell_definition["node_types"].values()):
-            if "artifacts" not in node_type:
-                continue
-
-            result = {}
-            for artifact_name, artifact in node_type["artifacts"].items():
-                if artifact_name in artifact_name_list:
-                    result.update({artifact_name: artifact["file"]})
-
-            return result
+        with self.session():
+            return get_artifacts_files(self._get_definition(), artifact_name_list)
 
     def _find_entry_definition(self):
         with open(
             os.path.join(self.shell_path, TOSCA_META_LOCATION), "r"
         ) as tosca_file:
-            entry_definition = dict(
-                list(map(str.strip, str(line).split(":", 1))) for line in tosca_file
-            )["Entry-Definitions"]
-
-            return entry_definition
+            return get_entry_definition(tosca_file)
 
     def _load_yaml(self, yaml_parser, yaml_file):
         with open(yaml_file, encoding="utf8") as stream:
@@ -116,18 +160,41 @@ class DefinitionModification(object):
             except yaml.YAMLError as exc:
                 print(exc)  # noqa: T001
 
-    def _edit_yaml(self, yaml_file, field, value):
-        yaml_parser = yaml.YAML()
-        loaded = self._load_yaml(yaml_parser=yaml_parser, yaml_file=yaml_file)
-
-        field_name = field.split("/")[-1]
-        self._get_inner_dict_recursively(loaded, field)[field_name] = value
-
-        self._edit_file(yaml_file=yaml_file, yaml_parser=yaml_parser, data=loaded)
-
-    def _edit_file(self, yaml_file, yaml_parser, data):
-        with open(yaml_file, "wb") as f:
-            yaml_parser.dump(data, stream=f)
+    def _reset(self):
+        """Drop the in-memory documents and edits."""
+        self._yaml_parser = None
+        self._definition = None
+        self._definition_changed = False
+        self._commented_attributes = []
+        self._tosca_meta_data = None
+        self._tosca_meta_changed = False
+
+    def _commit(self):
+        """Write changed documents."""
+        if self._definition_changed:
+            stream = StringIO()
+            self._yaml_parser.dump(self._definition, stream=stream)
+            lines = stream.getvalue().splitlines(True)
+            for attribute_name, is_last in self._commented_attributes:
+                lines = self._comment_attribute(lines, attribute_name, is_last)
+            _write_file(self.entry_definition, "".join(lines))
+
+        if self._tosca_meta_changed:
+            _write_file(self.tosca_meta, "".join(self._tosca_meta_data))
+
+    def _get_definition(self):
+        """Get shell-definition.yaml parsed once per session."""
+        if self._definition is None:
+            self._yaml_parser = yaml.YAML()
+            self._definition = self._load_yaml(self._yaml_parser, self.entry_definition)
+        return self._definition
+
+    def _get_tosca_meta(self):
+        """Get TOSCA.meta lines read once per session."""
+        if self._tosca_meta_data is None:
+            with open(self.tosca_meta, "r", encoding="utf8") as tosca_file:
+                self._tosca_meta_data = tosca_file.readlines()
+        return self._tosca_meta_data
 
     def _get_inner_dict_recursively(self, dic, field):
         split = field.split("/", 1)
@@ -140,66 +207,61 @@ class DefinitionModification(object):
         return self._get_inner_dict_recursively(i, split[1])
 
     def _get_value_from_definition(self, field):
-        yaml_parser = yaml.YAML()
-        loaded = self._load_yaml(yaml_parser, self.entry_definition)
+        loaded = self._get_definition()
 
         field_name = field.split("/")[-1]
         value = self._get_inner_dict_recursively(loaded, field)[field_name]
         return value
 
     def _add_property(self, attribute_name):
-        """Add property to shell-definition.yaml file.
+        """Add property to the in-memory shell-definition.yaml.
 
         :params fields list: list of properties name that will be added
         """
-        yaml_parser = yaml.YAML()
-        loaded = self._load_yaml(yaml_parser, self.entry_definition)
+        loaded = self._get_definition()
 
         nodes = loaded.get("node_types")
 
+        # every property gets own copy, shared one is dumped as YAML anchor
+        attribute = copy.deepcopy(TEMPLATE_PROPERTY)
         is_last = False
         if nodes:
             for key, value in nodes.items():
                 if key.startswith("vendor."):
                     properties_data = value.get("properties", {})
                     if properties_data:
-                        properties_data.update({attribute_name: TEMPLATE_PROPERTY})
+                        properties_data.update({attribute_name: attribute})
                         is_last = False
                     else:
-                        value.insert(
-                            1, "properties", {attribute_name: TEMPLATE_PROPERTY}
-                        )
+                        value.insert(1, "properties", {attribute_name: attribute})
                         is_last = True
                     break
 
-            self._edit_file(
-                yaml_file=self.entry_definition, yaml_parser=yaml_parser, data=loaded
-            )
+            self._definition_changed = True
 
         return is_last
 
-    def _comment_attribute(self, attribute_name, is_last=False):
-        """Comment attribute in shell-definishion.yaml file."""
+    @staticmethod
+    def _comment_attribute(definition_lines, attribute_name, is_last=False):
+        """Comment attribute in shell-definishion.yaml lines."""
         spaces = None
         need_comment = False
         lines = []
-        with open(self.entry_definition, "r", encoding="utf8") as f:
-            for line in f:
-                stripped = line.lstrip(" ")
-                if stripped.startswith("{}:".format(attribute_name)):
-                    if is_last:
-                        lines[-1] = "# {}".format(lines[-1])
-                    spaces = len(line) - len(stripped)
-                    need_comment = True
-                    lines.append("# {}".format(line))
-                    continue
-
-                if need_comment and spaces and (len(line) - len(stripped)) > spaces:
-                    lines.append("# {}".format(line))
-                    continue
-
-                need_comment = False
-                lines.append(line)
-
-        with open(self.entry_definition, "w", encoding="utf8") as f:
-            f.writelines(lines)
+        for line in definition_lines:
+            stripped = line.lstrip(" ")
+            if stripped.startswith("{}:".format(attribute_name)):
+                if is_last:
+                    lines[-1] = "# {}".format(lines[-1])
+                spaces = len(line) - len(stripped)
+                need_comment = True
+                lines.append("# {}".format(line))
+                continue
+
+            if need_comment and spaces and (len(line) - len(stripped)) > spaces:
+                lines.append("# {}".format(line))
+                continue
+
+            need_comment = False
+            lines.append(line)
+
+        return lines
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import time
+from io import open
+
+PACK_DIR_NAME = ".pack"
+MANIFEST_FILE_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+# files modified that close to the moment they were hashed
+# could be changed again without mtime change, they are always re-hashed
+MTIME_RESOLUTION = 2
+
+
+class PackManifest(object):
+    """Fingerprints of the inputs used by the previous shell pack.
+
+    Manifest is kept in dist/.pack folder together with the driver archives
+    built by the previous pack. File hashes are reused while file path,
+    size and modification time stay the same.
+    """
+
+    def __init__(self, dist_path):
+        self.pack_path = os.path.join(dist_path, PACK_DIR_NAME)
+        self.manifest_path = os.path.join(self.pack_path, MANIFEST_FILE_NAME)
+        self._data = self._load()
+
+    def fingerprint_file(self, file_path):
+        """Get content hash of the file."""
+        file_path = os.path.normpath(file_path)
+        stat = os.stat(file_path)
+        record = self._data["files"].get(file_path)
+        if (
+            record
+            and record["size"] == stat.st_size
+            and record["mtime"] == stat.st_mtime
+            and record["hashed_at"] - stat.st_mtime > MTIME_RESOLUTION
+        ):
+            return record["hash"]
+
+        file_hash = self._hash_file(file_path)
+        self._data["files"][file_path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": file_hash,
+            "hashed_at": time.time(),
+        }
+        return file_hash
+
+    def fingerprint_dir(self, dir_path):
+        """Get hash of the directory tree: names of all entries and files content."""
+        entries = []
+        for root, dirs, files in os.walk(dir_path):
+            dirs.sort()
+            rel_root = os.path.relpath(root, dir_path).replace(os.sep, "/")
+            entries.append(rel_root + "/")
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                if os.path.isfile(file_path):
+                    entries.append(
+                        "{}/{}:{}".format(
+                            rel_root, file_name, self.fingerprint_file(file_path)
+                        )
+                    )
+        return self._hash_entries(entries)
+
+    def fingerprint_members(self, members):
+        """Get hash of the package members.
+
+        :param dict members: member name to member fingerprint
+        """
+        return self._hash_entries(
+            "{}:{}".format(name, fingerprint)
+            for name, fingerprint in sorted(members.items())
+        )
+
+    def get_archive(self, archive_name, fingerprint):
+        """Get archive built by previous pack from the same inputs.
+
+        :return: path to the archive or None if inputs were changed
+        """
+        archive_path = self.get_archive_path(archive_name)
+        is_same_inputs = self._data["archives"].get(archive_name) == fingerprint
+        if is_same_inputs and os.path.isfile(archive_path):
+            return archive_path
+
+    def set_archive(self, archive_name, fingerprint):
+        self._data["archives"][archive_name] = fingerprint
+
+    def get_archive_path(self, archive_name):
+        return os.path.join(self.pack_path, archive_name)
+
+    def is_package_unchanged(self, package_path, fingerprint):
+        """Check that the package was built from the same members and not touched."""
+        record = self._data["packages"].get(os.path.normpath(package_path))
+        if not record or record["fingerprint"] != fingerprint:
+            return False
+        try:
+            stat = os.stat(package_path)
+        except OSError:
+            return False
+        return record["size"] == stat.st_size and record["mtime"] == stat.st_mtime
+
+    def set_package(self, package_path, fingerprint):
+        stat = os.stat(package_path)
+        self._data["packages"][os.path.normpath(package_path)] = {
+            "fingerprint": fingerprint,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+    def save(self):
+        if not os.path.exists(self.pack_path):
+            os.makedirs(self.pack_path)
+        with open(self.manifest_path, mode="w", encoding="utf8") as stream:
+            stream.write(json.dumps(self._data, indent=2, sort_keys=True))
+
+    def _load(self):
+        data = {}
+        if os.path.isfile(self.manifest_path):
+            try:
+                with open(self.manifest_path, mode="r", encoding="utf8") as stream:
+                    data = json.load(stream)
+            except ValueError:
+                data = {}
+        for section in ("files", "archives", "packages"):
+            data.setdefault(section, {})
+        return data
+
+    @staticmethod
+    def _hash_file(file_path):
+        file_hash = hashlib.sha1()
+        with open(file_path, mode="rb") as stream:
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def _hash_entries(entries):
+        entries_hash = hashlib.sha1()
+        for entry in entries:
+            entries_hash.update(entry.encode("utf8"))
+            entries_hash.update(b"\n")
+        return entries_hash.hexdigest()
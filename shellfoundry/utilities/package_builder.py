@@ -6,17 +6,20 @@ import xml.etree.ElementTree as etree
 
 import click
 
-from shellfoundry.utilities.archive_creator import ArchiveCreator
+from shellfoundry.utilities.archive_creator import ZipArchiveBuilder
 from shellfoundry.utilities.shell_datamodel_merger import ShellDataModelMerger
+from shellfoundry.utilities.tracing import traced
 from shellfoundry.utilities.version_utilities import DriverVersionTimestampBased
 
 
 class PackageBuilder(object):
-    def __init__(self, driver_version_strategy=None):
+    def __init__(self, driver_version_strategy=None, archive_builder=None):
         self.driver_version_strategy = (
             driver_version_strategy or DriverVersionTimestampBased()
         )
+        self.archive_builder = archive_builder or ZipArchiveBuilder()
 
+    @traced("pack.gen1")
     def build_package(self, path, package_name, driver_name):
         package_path = os.path.join(path, "package")
         self._copy_metadata(package_path, path)
@@ -113,13 +116,22 @@ class PackageBuilder(object):
     def _create_driver(self, package_path, path, driver_name):
         dir_to_zip = os.path.join(path, "src")
         drivermetadata_path = os.path.join(dir_to_zip, "drivermetadata.xml")
+        original_metadata = self._read_bytes(drivermetadata_path)
         version = self._update_driver_version(drivermetadata_path)
         zip_file_path = os.path.join(
             package_path, "Resource Drivers - Python", driver_name
         )
-        ArchiveCreator.make_archive(zip_file_path, "zip", dir_to_zip)
-        if version:  # version was replaced
-            self._update_driver_version(drivermetadata_path, version)
+        self.archive_builder.make_archive(zip_file_path, dir_to_zip)
+        if version:  # version was replaced, restore the file byte by byte
+            with open(drivermetadata_path, "wb") as metadata_file:
+                metadata_file.write(original_metadata)
+
+    @staticmethod
+    def _read_bytes(path):
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
 
     @staticmethod
     def _parse_xml(xml_string):
@@ -139,14 +151,15 @@ class PackageBuilder(object):
             self._save_to_file(etree.tostring(metadata_xml), metadata_path)
             return None
         elif self.driver_version_strategy.supports_version_pattern(curver):
-            newver = self.driver_version_strategy.get_version(curver)
+            newver = self.driver_version_strategy.get_version(
+                curver, os.path.dirname(metadata_path)
+            )
             metadata_xml.set("Version", newver)
             self._save_to_file(etree.tostring(metadata_xml), metadata_path)
             return curver
         else:
             return None
 
-    @staticmethod
-    def _zip_package(package_path, path, package_name):
+    def _zip_package(self, package_path, path, package_name):
         zip_file_path = os.path.join(path, "dist", package_name)
-        return ArchiveCreator.make_archive(zip_file_path, "zip", package_path)
+        return self.archive_builder.make_archive(zip_file_path, package_path)
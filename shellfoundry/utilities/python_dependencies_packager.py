@@ -2,30 +2,124 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import shutil
+import subprocess
+import sys
+from io import open
 
-try:
-    from pip import main as pip_main
-except Exception:
-    from pip._internal import main as pip_main
+import click
+
+from shellfoundry.utilities.temp_dir_context import TempDirContext
+from shellfoundry.utilities.tracing import span, traced
+from shellfoundry.utilities.wheelhouse import Wheelhouse
+
+# resolutions of not pinned requirements are refreshed after a day
+UNPINNED_RESOLUTION_TTL = 24 * 3600
+# requirement file lines referring to content which isn't in the file
+NOT_CACHEABLE_RE = re.compile(
+    r"^(-r|-c|-e|--requirement|--constraint|--editable)\b|^[./]|://"
+)
+PINNED_RE = re.compile(r"^[^<>!~=*;]+==[^<>!~=*,;]+(;.*)?$")
+
+
+def parse_requirements(requirements_path):
+    """Split requirements file into options and requirements.
+
+    :return: tuple of option lines and requirement lines or None
+        if the file refers to other files or direct references
+    """
+    options = []
+    requirements = []
+    with open(requirements_path, mode="r", encoding="utf8") as stream:
+        for line in stream:
+            line = re.sub(r"(^|\s)#.*$", "", line).strip()
+            if not line:
+                continue
+            if NOT_CACHEABLE_RE.search(line):
+                return None
+            if line.startswith("-"):
+                options.append(line)
+            else:
+                requirements.append(line)
+    return options, requirements
 
 
 class PythonDependenciesPackager(object):
     CS_PYPI_PORT = 8036
 
-    def __init__(self):
-        pass
+    def __init__(self, wheelhouse=None):
+        """Python dependencies packager.
 
+        :param Wheelhouse wheelhouse: storage shared by all shells
+        """
+        self.wheelhouse = wheelhouse or Wheelhouse()
+
+    @traced("dependencies.save")
     def save_offline_dependencies(
         self, requirements_path, dest_path, cs_server_address=None
     ):
+        """Save requirements with their dependencies into the folder.
 
-        if os.path.isdir(dest_path):
-            shutil.rmtree(path=dest_path, ignore_errors=True)
-
+        Requirements are resolved together by one pip run, the resolution
+        is kept in the shared wheelhouse by the requirements, interpreter,
+        platform and package index, so the same requirements aren't
+        downloaded again. The folder gets hard links to the stored files.
+        """
         if not os.path.exists(requirements_path):
+            if os.path.isdir(dest_path):
+                shutil.rmtree(path=dest_path, ignore_errors=True)
             return
 
+        pip_args = self._get_pip_args(cs_server_address)
+        parsed = parse_requirements(requirements_path)
+        if parsed is None:
+            # nested files, editable and direct references are downloaded as is
+            if os.path.isdir(dest_path):
+                shutil.rmtree(path=dest_path, ignore_errors=True)
+            self._run_pip(
+                pip_args
+                + [
+                    "--requirement={}".format(requirements_path),
+                    "--dest={}".format(dest_path),
+                ],
+                requirements_path,
+            )
+            return
+
+        options, requirements = parsed
+        key = "\n".join(
+            [
+                "python{}.{}".format(*sys.version_info[:2]),
+                sys.platform,
+                cs_server_address or "",
+            ]
+            + options
+            + requirements
+        )
+        pinned = all(PINNED_RE.match(requirement) for requirement in requirements)
+        with span("dependencies.resolve", requirements=len(requirements)) as span_args:
+            files = self.wheelhouse.get(
+                key, ttl=None if pinned else UNPINNED_RESOLUTION_TTL
+            )
+            span_args["hit"] = files is not None
+
+        with TempDirContext(prefix="shellfoundry_dist_") as temp_dir:
+            if files is None:
+                download_dir = os.path.join(temp_dir, "download")
+                os.makedirs(download_dir)
+                self._run_pip(
+                    pip_args
+                    + [
+                        "--requirement={}".format(requirements_path),
+                        "--dest={}".format(download_dir),
+                    ],
+                    requirements_path,
+                )
+                files = self.wheelhouse.add(key, download_dir)
+            self.wheelhouse.materialize(files, dest_path)
+
+    def _get_pip_args(self, cs_server_address=None):
         proxy = os.environ.get("http_proxy")
         pip_args = ["download"]
         if proxy:
@@ -43,11 +137,13 @@ class PythonDependenciesPackager(object):
                     cs_server_address=cs_server_address, cs_pypi_port=self.CS_PYPI_PORT
                 )
             )
+        return pip_args
 
-        pip_args.append(
-            "--requirement={requirements_path}".format(
-                requirements_path=requirements_path
-            )
-        )
-        pip_args.append("--dest={dest_path}".format(dest_path=dest_path))
-        pip_main(pip_args)
+    @staticmethod
+    @traced("dependencies.pip")
+    def _run_pip(pip_args, requirement):
+        """Run pip in a separate process, pip is not thread safe."""
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip"] + pip_args)
+        except subprocess.CalledProcessError:
+            raise click.ClickException("Failed to download {}".format(requirement))
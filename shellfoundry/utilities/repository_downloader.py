@@ -1,16 +1,73 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import hashlib
+import json
 import os
+import re
+import shutil
+import time
 import zipfile
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from functools import partial
 from io import open
 
 import requests
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 
 from .template_url import construct_template_url
 
 from shellfoundry.exceptions import VersionRequestException
+from shellfoundry.utilities.cache import BlobStore, FileCache
+from shellfoundry.utilities.config_reader import Configuration, ShellFoundryConfig
+from shellfoundry.utilities.constants import TEMPLATE_INFO_FILE
+from shellfoundry.utilities.http_sessions import get_session
+from shellfoundry.utilities.retry import RetryPolicy
+from shellfoundry.utilities.spooled_file import SpooledFile
+from shellfoundry.utilities.tracing import span, traced
+
+ARCHIVES_CACHE_NAME = "archives"
+COMMITS_CACHE_NAME = "commits"
+# seconds resolved commit of a ref is used without asking GitHub,
+# afterwards it's revalidated by its ETag, 304 responses don't count
+# against the anonymous rate limit
+COMMITS_CACHE_TTL = 5 * 60
+REQUEST_TIMEOUT = 15
+COMMIT_URL = "https://api.github.com/repos/{}/{}/commits/{}"
+# chunk size grows while chunks arrive faster than the target time
+# and shrinks on slow connections to keep progress reports steady
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNK_TARGET_TIME = 0.25
+MAX_RESUME_ATTEMPTS = 5
+PART_SUFFIX = ".part"
+# validator of the version kept in the .part file, so the next run resumes it
+PART_VALIDATOR_SUFFIX = ".json"
+# downloaded archives bigger than that are spooled to a temporary file,
+# their dropped downloads are kept in the parts folder and resumed next run
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+PARTS_DIR_NAME = "parts"
+# repository root members cookiecutter needs besides the {{cookiecutter.*}} folders
+TEMPLATE_MEMBERS = (TEMPLATE_INFO_FILE, "hooks")
+COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+# archive links of GitHub repositories, groups are owner, repository and ref
+GITHUB_ARCHIVE_URL_RES = (
+    re.compile(r"^https://api\.github\.com/repos/([^/]+)/([^/]+)/zipball(?:/(.+))?$"),
+    re.compile(
+        r"^https://github\.com/([^/]+)/([^/]+)/archive/"
+        r"(?:refs/(?:heads|tags)/)?(.+)\.zip$"
+    ),
+)
+
+
+def is_template_member(path):
+    """Check that the path belongs to the cookiecutter template.
+
+    :param str path: member path relative to the repository root folder
+    """
+    top_name = path.split("/", 1)[0]
+    return top_name in TEMPLATE_MEMBERS or "{{" in top_name
 
 
 class DownloadedRepoExtractor:
@@ -20,57 +77,438 @@ class DownloadedRepoExtractor:
     __metaclass__ = ABCMeta
 
     @abstractmethod
-    def extract_to_folder(self, repo_link, folder):
+    def extract_to_folder(self, repo_link, folder, include=None):
         pass
 
 
 class ZipDownloadedRepoExtractor(DownloadedRepoExtractor):
-    def extract_to_folder(self, repo_link, folder):
-        super(ZipDownloadedRepoExtractor, self).extract_to_folder(repo_link, folder)
+    @traced("archive.extract")
+    def extract_to_folder(self, repo_link, folder, include=None):
+        """Extract zip archive into the folder.
+
+        :param repo_link: archive path or binary file object
+        :param str folder: destination folder
+        :param include: function deciding by member path relative to the root
+            folder of the archive whether member is extracted, all by default
+        :return: names of the extracted members, root folder is the first one
+        """
+        super(ZipDownloadedRepoExtractor, self).extract_to_folder(
+            repo_link, folder, include
+        )
         with zipfile.ZipFile(repo_link, "r") as z:
             infos = z.infolist()
-            z.extractall(folder)
+            if include is not None and infos and infos[0].is_dir():
+                root_dir = infos[0].filename
+                infos = infos[:1] + [
+                    info
+                    for info in infos[1:]
+                    if not info.filename.startswith(root_dir)
+                    or include(info.filename[len(root_dir) :])
+                ]
+            z.extractall(folder, members=infos)
         return [info.filename for info in infos]
 
 
 class RepositoryDownloader(object):
-    def __init__(self, repo_extractor=ZipDownloadedRepoExtractor()):
+    def __init__(
+        self,
+        repo_extractor=ZipDownloadedRepoExtractor(),
+        archive_store=None,
+        read_timeout=None,
+        retry_policy=None,
+        commits_cache=None,
+    ):
+        """Repository downloader.
+
+        :param DownloadedRepoExtractor repo_extractor:
+        :param BlobStore archive_store: storage of downloaded archives,
+            created with the configured size if not provided
+        :param int read_timeout: seconds to wait for the next downloaded bytes,
+            read from configuration if not provided
+        :param RetryPolicy retry_policy: retries of dropped downloads
+        :param FileCache commits_cache: storage for commits refs of GitHub
+            repositories point to
+        """
         self.repo_extractor = repo_extractor
+        self.commits_cache = commits_cache or FileCache(COMMITS_CACHE_NAME)
+        self._archive_store = archive_store
+        self._read_timeout = read_timeout
+        self._settings = None
+        self.retry_policy = retry_policy or RetryPolicy(
+            attempts=MAX_RESUME_ATTEMPTS + 1
+        )
 
+    @property
+    def settings(self):
+        if self._settings is None:
+            self._settings = Configuration(ShellFoundryConfig()).read()
+        return self._settings
+
+    @property
+    def archive_store(self):
+        if self._archive_store is None:
+            self._archive_store = BlobStore(
+                ARCHIVES_CACHE_NAME, self.settings.archives_cache_size * 1024 * 1024
+            )
+        return self._archive_store
+
+    @property
+    def parts_dir(self):
+        """Folder of dropped archive downloads resumed by the next run."""
+        return os.path.join(self.archive_store.blobs_dir, PARTS_DIR_NAME)
+
+    @property
+    def read_timeout(self):
+        if self._read_timeout is None:
+            self._read_timeout = self.settings.read_timeout
+        return self._read_timeout
+
+    @traced("template.download")
     def download_template(
-        self, target_dir, repo_address, branch, is_need_construct=True
+        self, target_dir, repo_address, branch, is_need_construct=True, include=None
     ):
+        """Download repository and extract it into the target folder.
+
+        :param include: member filter, see ZipDownloadedRepoExtractor
+        :return: path to the repository root folder
+        """
         if is_need_construct:
             download_url = construct_template_url(repo_address, branch)
         else:
             download_url = repo_address
-        archive_path = ""
-        try:
-            archive_path = self.download_file(download_url, target_dir)
 
+        with self.open_archive(download_url) as archive:
             repo_content = self.repo_extractor.extract_to_folder(
-                archive_path, target_dir
+                archive, target_dir, include
             )
 
-            # The first entry is always the root folder by git zipball convention
-            root_dir = repo_content[0]
+        # The first entry is always the root folder by git zipball convention
+        root_dir = repo_content[0]
+
+        return os.path.join(target_dir, root_dir)
+
+    @contextmanager
+    def open_archive(self, url, progress_callback=None):
+        """Open zip archive stored earlier or download it.
+
+        Archives of GitHub repositories are stored by the commit their ref
+        points to, so archive of the same commit is downloaded only once.
+        Downloaded archive is kept in memory unless it's bigger than
+        SPOOL_MAX_SIZE, it's never written to the destination folder.
+        Dropped download of a bigger archive is kept as a .part file
+        in parts_dir and resumed by download_file on the next call.
+        :param progress_callback: download progress callback, see download_file
+        :return: context manager giving archive path or binary file object
+        """
+        with span("archive.lookup", url=url) as span_args:
+            key = self._get_archive_key(url)
+            stored_path = self.archive_store.get(key) if key else None
+            span_args["hit"] = bool(stored_path)
+        if stored_path:
+            yield stored_path
+            return
+
+        part_name = hashlib.sha256(url.encode("utf8")).hexdigest() + ".zip"
+        if os.path.exists(os.path.join(self.parts_dir, part_name + PART_SUFFIX)):
+            with self._resume_archive(url, key, part_name, progress_callback) as path:
+                yield path
+            return
+
+        with SpooledFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            validator = {}
+            try:
+                self.download_to_stream(url, buffer, progress_callback, validator)
+            except BaseException:
+                if buffer.tell() > SPOOL_MAX_SIZE:
+                    self._save_part(url, buffer, part_name, validator)
+                raise
+            if key and self._is_valid_archive(buffer):
+                buffer.seek(0)
+                self.archive_store.put_stream(key, buffer)
+            buffer.seek(0)
+            yield buffer
+
+    @contextmanager
+    def _resume_archive(self, url, key, part_name, progress_callback=None):
+        """Finish archive download dropped by an earlier call.
 
-            return os.path.join(target_dir, root_dir)
+        :return: context manager giving archive path
+        """
+        path = self.download_file(
+            url, self.parts_dir, progress_callback, file_name=part_name
+        )
+        try:
+            stored_path = None
+            if key:
+                with open(path, "rb") as archive:
+                    if self._is_valid_archive(archive):
+                        archive.seek(0)
+                        stored_path = self.archive_store.put_stream(key, archive)
+            yield stored_path or path
         finally:
-            if os.path.exists(archive_path):
-                os.remove(archive_path)
-
-    def download_file(self, url, directory):
-        local_filename = os.path.join(directory, url.split("/")[-1])
-        # NOTE the stream=True parameter
-        r = requests.get(url, stream=True)
-        if r.status_code != requests.codes.ok:
-            raise VersionRequestException(
-                "Failed to download zip file from {}".format(url)
+            os.remove(path)
+
+    def _save_part(self, url, buffer, part_name, validator):
+        """Keep downloaded part of the archive for the next call."""
+        if not validator.get("value"):
+            return
+        part_filename = os.path.join(self.parts_dir, part_name + PART_SUFFIX)
+        try:
+            if not os.path.isdir(self.parts_dir):
+                os.makedirs(self.parts_dir)
+            buffer.seek(0)
+            with open(part_filename, "wb") as part:
+                shutil.copyfileobj(buffer, part)
+        except (IOError, OSError):
+            validator = {}
+        self._keep_part(
+            url, part_filename, part_filename + PART_VALIDATOR_SUFFIX, validator
+        )
+
+    def _get_archive_key(self, url):
+        """Get store key of GitHub repository archive, None for other links."""
+        for url_re in GITHUB_ARCHIVE_URL_RES:
+            match = url_re.match(url)
+            if match:
+                owner, repo, ref = match.groups()
+                commit = self._resolve_commit(owner, repo, ref or "HEAD")
+                if commit:
+                    return "{}/{}@{}".format(owner, repo, commit).lower()
+        return None
+
+    def _resolve_commit(self, owner, repo, ref):
+        """Get SHA of the commit ref points to or None if it's unknown.
+
+        Resolved commit is cached for COMMITS_CACHE_TTL and revalidated
+        by its ETag afterwards. The last resolved commit, whose archive
+        is the newest stored one of the ref, is used if GitHub can't be
+        asked, e.g. when the rate limit is exceeded.
+        """
+        if COMMIT_SHA_RE.match(ref.lower()):
+            return ref.lower()
+        key = "{}/{}@{}".format(owner.lower(), repo.lower(), ref)
+        cached = self.commits_cache.get(key, COMMITS_CACHE_TTL)
+        if cached:
+            return cached["commit"]
+
+        cached = self.commits_cache.get(key)
+        headers = {"Accept": "application/vnd.github.sha"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        url = COMMIT_URL.format(owner, repo, ref)
+        try:
+            response = get_session(url).get(
+                url, headers=headers, timeout=REQUEST_TIMEOUT
             )
-        with open(local_filename, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:  # filter out keep-alive new chunks
-                    f.write(chunk)
-                    # f.flush() commented by recommendation from J.F.Sebastian
+        except requests.RequestException:
+            response = None
+
+        status = response.status_code if response is not None else None
+        if status == requests.codes.ok:
+            commit = response.text.strip().lower()
+            if COMMIT_SHA_RE.match(commit):
+                self.commits_cache.set(
+                    key, {"commit": commit, "etag": response.headers.get("ETag")}
+                )
+                return commit
+        elif status == requests.codes.not_modified and cached:
+            self.commits_cache.set(key, cached)
+            return cached["commit"]
+        return cached["commit"] if cached else None
+
+    @staticmethod
+    def _is_valid_archive(archive):
+        """Check that the file is a zip archive with correct members CRC."""
+        try:
+            archive.seek(0)
+            with zipfile.ZipFile(archive, "r") as z:
+                return z.testzip() is None
+        except (zipfile.BadZipfile, IOError, OSError):
+            return False
+
+    def download_file(self, url, directory, progress_callback=None, file_name=None):
+        """Download file into the directory.
+
+        Data is written into a .part file renamed when download is completed.
+        Interrupted download keeps the .part file together with the validator
+        of the downloaded version, so the next call resumes it if the file
+        hasn't changed meanwhile.
+        :param str url: file url
+        :param str directory: folder to save the file to
+        :param progress_callback: download progress callback, see download_to_stream
+        :param str file_name: name of the downloaded file, last url part by default
+        :return: path to the downloaded file
+        """
+        local_filename = os.path.join(directory, file_name or url.split("/")[-1])
+        part_filename = local_filename + PART_SUFFIX
+        validator_filename = part_filename + PART_VALIDATOR_SUFFIX
+        validator = self._load_part_validator(url, part_filename, validator_filename)
+        try:
+            with open(part_filename, "ab" if validator else "wb") as f:
+                self.download_to_stream(url, f, progress_callback, validator)
+        except BaseException:
+            self._keep_part(url, part_filename, validator_filename, validator)
+            raise
+
+        os.replace(part_filename, local_filename)
+        if os.path.exists(validator_filename):
+            os.remove(validator_filename)
         return local_filename
+
+    @staticmethod
+    def _load_part_validator(url, part_filename, validator_filename):
+        """Get validator of the .part file left by interrupted download.
+
+        :return: validator of the same url download, empty if there is no one
+        """
+        try:
+            with open(validator_filename, "r", encoding="utf8") as stream:
+                saved = json.load(stream)
+        except (IOError, OSError, ValueError):
+            return {}
+        if (
+            isinstance(saved, dict)
+            and saved.get("url") == url
+            and saved.get("value")
+            and os.path.isfile(part_filename)
+        ):
+            return {"value": saved["value"]}
+        return {}
+
+    @staticmethod
+    def _keep_part(url, part_filename, validator_filename, validator):
+        """Keep downloaded part which can be resumed, remove it otherwise."""
+        if (
+            validator.get("value")
+            and os.path.isfile(part_filename)
+            and os.path.getsize(part_filename)
+        ):
+            with open(validator_filename, "w", encoding="utf8") as stream:
+                stream.write(json.dumps({"url": url, "value": validator["value"]}))
+            return
+        for filename in (part_filename, validator_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def download_to_stream(self, url, stream, progress_callback=None, validator=None):
+        """Download file into the binary file object.
+
+        Dropped connection is resumed from the received bytes
+        if server supports range requests and the file hasn't changed
+        meanwhile, otherwise download is restarted.
+        Attempts are limited by the retry policy amount and deadline.
+        :param str url: file url
+        :param stream: seekable binary file object, bytes before its position
+            are the downloaded part of the file version given by validator
+        :param progress_callback: called after each chunk with downloaded
+            and total (None if unknown) bytes and throughput in bytes per second
+        :param dict validator: ETag or Last-Modified of the downloaded version,
+            updated from the responses
+        """
+        # validator of the downloaded version, resumed only if it's the same
+        if validator is None:
+            validator = {}
+        with span("download", url=url, attempts=1) as span_args:
+
+            def on_retry(retry, error, delay):
+                span_args["attempts"] = retry + 1
+
+            try:
+                self.retry_policy.call(
+                    partial(
+                        self._download_rest, url, stream, progress_callback, validator
+                    ),
+                    on_retry=on_retry,
+                )
+            except (requests.RequestException, Urllib3HTTPError) as err:
+                raise VersionRequestException(
+                    "Failed to download zip file from {}: {}".format(url, err)
+                )
+
+    def _download_rest(self, url, stream, progress_callback=None, validator=None):
+        """Download the part of the file missing in the stream.
+
+        :param dict validator: ETag or Last-Modified of the downloaded version,
+            updated from the response
+        """
+        if validator is None:
+            validator = {}
+        downloaded = stream.tell()
+        # ranges are applied to encoded content, so ask for the file as is
+        headers = {"Accept-Encoding": "identity"}
+        if downloaded and validator.get("value"):
+            headers["Range"] = "bytes={}-".format(downloaded)
+            # changed file, e.g. archive of moved branch, is sent as a whole
+            headers["If-Range"] = validator["value"]
+
+        # retries are driven by the retry policy, they resume the download
+        with get_session(url, retries=False).get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=(REQUEST_TIMEOUT, self.read_timeout),
+        ) as r:
+            if r.status_code == requests.codes.requested_range_not_satisfiable:
+                # downloaded part doesn't fit the file, the retry starts over
+                stream.seek(0)
+                stream.truncate()
+                validator.clear()
+                raise requests.ConnectionError(
+                    "Requested range is not satisfiable", response=r
+                )
+            if r.status_code == requests.codes.ok:
+                # range is not supported or the file has changed, start over
+                stream.seek(0)
+                stream.truncate()
+                downloaded = 0
+                validator["value"] = self._get_validator(r.headers)
+            elif r.status_code != requests.codes.partial_content:
+                # error keeps the response, so the retry policy repeats
+                # temporary failures like 503
+                raise requests.HTTPError(
+                    "Unexpected response status {}".format(r.status_code), response=r
+                )
+
+            length = r.headers.get("Content-Length")
+            total = downloaded + int(length) if length and length.isdigit() else None
+            start_time = time.time()
+            start_size = downloaded
+            chunk_size = MIN_CHUNK_SIZE
+            while True:
+                chunk_start = time.time()
+                chunk = r.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                stream.write(chunk)
+                downloaded += len(chunk)
+                chunk_size = self._adapt_chunk_size(
+                    chunk_size, time.time() - chunk_start
+                )
+                if progress_callback:
+                    elapsed = time.time() - start_time
+                    progress_callback(
+                        downloaded,
+                        total,
+                        (downloaded - start_size) / elapsed if elapsed else 0.0,
+                    )
+
+        if total is not None and downloaded < total:
+            raise requests.ConnectionError(
+                "Connection closed after {} of {} bytes".format(downloaded, total)
+            )
+
+    @staticmethod
+    def _get_validator(headers):
+        """Get strong validator of the response, None if there is no one."""
+        etag = headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return headers.get("Last-Modified")
+
+    @staticmethod
+    def _adapt_chunk_size(chunk_size, chunk_time):
+        if chunk_time < CHUNK_TARGET_TIME / 2:
+            return min(chunk_size * 2, MAX_CHUNK_SIZE)
+        if chunk_time > CHUNK_TARGET_TIME * 2:
+            return max(chunk_size // 2, MIN_CHUNK_SIZE)
+        return chunk_size
@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Retries of CloudShell and GitHub requests.
+
+Failed request is repeated only when its error may be temporary: connection
+errors, timeouts and 429 or 5xx responses. Delays between attempts grow
+exponentially with full jitter, so clients failed together don't come back
+together, and attempts stop once the deadline is reached.
+"""
+
+import random
+import time
+from urllib.error import HTTPError as UrllibHTTPError
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.exceptions import SSLError as Urllib3SSLError
+from urllib3.util.retry import Retry
+
+from shellfoundry.utilities.constants import (
+    RETRY_BASE_DELAY,
+    RETRY_DEADLINE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+from shellfoundry.utilities.tracing import span
+
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+def get_status(error):
+    """Get HTTP status of the failed request, None if it's unknown."""
+    if isinstance(error, UrllibHTTPError):
+        # its attributes lookup raises KeyError on Python 3.7 without body
+        status = error.code
+    else:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error):
+    """Check that the request failed by the error may succeed when repeated."""
+    if isinstance(error, (requests.exceptions.SSLError, Urllib3SSLError)):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.RequestException):
+        return get_status(error) in RETRYABLE_STATUSES
+    if isinstance(error, Urllib3HTTPError):
+        return True
+    return get_status(error) in RETRYABLE_STATUSES
+
+
+def is_connect_error(error):
+    """Check that the request failed before it was sent.
+
+    Only such requests are repeated if they are not idempotent, e.g. uploads.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.ConnectionError) or not error.args:
+        return False
+    reason = getattr(error.args[0], "reason", error.args[0])
+    # NewConnectionError is derived from ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class RetryPolicy(object):
+    def __init__(
+        self,
+        attempts=RETRY_MAX_ATTEMPTS,
+        base_delay=RETRY_BASE_DELAY,
+        max_delay=RETRY_MAX_DELAY,
+        deadline=RETRY_DEADLINE,
+        retryable=is_retryable,
+        sleep=time.sleep,
+        clock=time.monotonic,
+        jitter=random.random,
+    ):
+        """Exponential backoff retry policy.
+
+        :param int attempts: max amount of attempts including the first one
+        :param float base_delay: max delay in seconds before the first retry
+        :param float max_delay: limit of the delay growth in seconds
+        :param float deadline: seconds since the first attempt after which
+            failed request isn't repeated, None for no limit
+        :param retryable: function checking that the error is temporary
+        :param jitter: function returning random factor from 0 to 1
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retryable = retryable
+        self.sleep = sleep
+        self.clock = clock
+        self.jitter = jitter
+
+    def delay(self, retry):
+        """Random delay in seconds before the retry, counted from 0."""
+        return self.jitter() * min(self.max_delay, self.base_delay * 2**retry)
+
+    def remaining(self, started):
+        """Seconds left till the deadline of attempts started at the time."""
+        if self.deadline is None:
+            return float("inf")
+        return self.deadline - (self.clock() - started)
+
+    def call(self, func, on_retry=None, retryable=None):
+        """Call the function until it succeeds or the error isn't retryable.
+
+        :param func: function without arguments
+        :param on_retry: called before each retry with the retry number
+            counted from 1, the error and the delay in seconds
+        :param retryable: error classification used instead of the policy one
+        :return: result of the function
+        :raise: the last error of the function
+        """
+        retryable = retryable or self.retryable
+        started = self.clock()
+        for retry in range(self.attempts):
+            try:
+                return func()
+            except Exception as error:
+                delay = self.delay(retry)
+                if (
+                    retry + 1 >= self.attempts
+                    or not retryable(error)
+                    or delay > self.remaining(started)
+                ):
+                    raise
+                if on_retry is not None:
+                    on_retry(retry + 1, error, delay)
+                with span("retry.wait", retry=retry + 1, error=type(error).__name__):
+                    self.sleep(delay)
+
+    def adapter_retry(self):
+        """Retries of requests sent through requests adapters.
+
+        Connection errors of any request and read errors and retryable
+        statuses of idempotent requests are retried, the last response
+        is returned when retries are over.
+        """
+        return _AdapterRetry(
+            policy=self,
+            total=self.attempts - 1,
+            status_forcelist=RETRYABLE_STATUSES,
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+
+
+class _AdapterRetry(Retry):
+    def __init__(self, *args, **kwargs):
+        self.policy = kwargs.pop("policy")
+        self.started = kwargs.pop("started", None)
+        super(_AdapterRetry, self).__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        kwargs.setdefault("policy", self.policy)
+        # adapter retry is shared by all requests, its copy made
+        # on the first failure of a request starts the deadline
+        kwargs.setdefault(
+            "started", self.policy.clock() if self.started is None else self.started
+        )
+        return super(_AdapterRetry, self).new(**kwargs)
+
+    def get_backoff_time(self):
+        if not self.history:
+            return 0
+        delay = self.policy.delay(len(self.history) - 1)
+        return max(0, min(delay, self.policy.remaining(self.started)))
+
+    def is_exhausted(self):
+        if self.started is not None and self.policy.remaining(self.started) <= 0:
+            return True
+        return super(_AdapterRetry, self).is_exhausted()
@@ -42,9 +42,8 @@ class ShellPackage(object):
         """Returns file path of the TOSCA meta file."""
         return os.path.join(self.path, "TOSCA-Metadata", "TOSCA.meta")
 
-    def _reload_name(self):
-        """Reloads the name from the entry definition in the tosca.meta file."""
-        # fetch entry definition from tosca.meta file
+    def get_definition_path(self):
+        """Returns file path of the entry definition set in the TOSCA meta file."""
         with open(self.get_metadata_path()) as stream:
             s = str(stream.read())
             entry_definition = dict(
@@ -52,8 +51,10 @@ class ShellPackage(object):
                 for line in s.splitlines()
                 if line.strip()
             )["Entry-Definitions"]
+        return os.path.join(self.path, entry_definition)
 
-        # fetch template name from entry definition file retrieved earlier
-        with open(os.path.join(self.path, entry_definition), encoding="utf8") as stream:
+    def _reload_name(self):
+        """Reloads the name from the entry definition in the tosca.meta file."""
+        with open(self.get_definition_path(), encoding="utf8") as stream:
             definition = yaml.safe_load(stream)
         self.real_shell_name = definition["metadata"]["template_name"]
@@ -7,78 +7,104 @@ from io import open
 import click
 import yaml
 
-from shellfoundry.utilities.archive_creator import ArchiveCreator
+from shellfoundry.utilities.archive_creator import ZipArchiveBuilder
+from shellfoundry.utilities.pack_manifest import PackManifest
 from shellfoundry.utilities.shell_package import ShellPackage
 from shellfoundry.utilities.temp_dir_context import TempDirContext
+from shellfoundry.utilities.tracing import traced
 
 
 class ShellPackageBuilder(object):
     DRIVER_DIR = "src"
     DEPLOY_DIR = "deployments"
+    DIST_DIR = "dist"
+    ARCHIVED_ARTIFACTS = {"driver": DRIVER_DIR, "deployment": DEPLOY_DIR}
 
+    def __init__(self, archive_builder=None):
+        self.archive_builder = archive_builder or ZipArchiveBuilder()
+
+    @traced("pack.shell")
     def pack(self, path):
-        """Creates TOSCA based Shell package."""
+        """Creates TOSCA based Shell package.
+
+        Driver archives and the package itself are rebuilt only when
+        their content was changed since the previous pack.
+        """
         self._remove_all_pyc(path)
         shell_package = ShellPackage(path)
         shell_name = shell_package.get_shell_name()
         shell_real_name = shell_package.get_name_from_definition()
+        manifest = PackManifest(self.DIST_DIR)
         with TempDirContext(shell_name) as package_path:
-            self._copy_tosca_meta(package_path, "")
+            tosca_meta_path = ShellPackage("").get_metadata_path()
             tosca_meta = self._read_tosca_meta(path)
 
             shell_definition_path = tosca_meta["Entry-Definitions"]
-
-            self._copy_shell_definition(package_path, "", shell_definition_path)
+            members = {
+                tosca_meta_path: manifest.fingerprint_file(tosca_meta_path),
+                shell_definition_path: manifest.fingerprint_file(shell_definition_path),
+            }
+            artifact_list = []
+            archives = {}
 
             with open(shell_definition_path, encoding="utf8") as shell_definition_file:
                 shell_definition = yaml.safe_load(shell_definition_file)
 
                 if "template_icon" in shell_definition["metadata"]:
-                    self._copy_artifact(
-                        shell_definition["metadata"]["template_icon"], package_path
-                    )
+                    artifact_list.append(shell_definition["metadata"]["template_icon"])
 
                 for node_type in list(shell_definition["node_types"].values()):
                     if "artifacts" not in node_type:
                         continue
 
-                    artifact_path_list = []
                     for artifact_name, artifact in node_type["artifacts"].items():
-                        if artifact_name == "driver":
-                            artifact_path_list.append(
-                                self._create_driver(
-                                    path="",
-                                    package_path=os.curdir,
-                                    dir_path=self.DRIVER_DIR,
-                                    driver_name=os.path.basename(artifact["file"]),
-                                )
-                            )
-                        elif artifact_name == "deployment":
-                            artifact_path_list.append(
-                                self._create_driver(
-                                    path="",
-                                    package_path=os.curdir,
-                                    dir_path=self.DEPLOY_DIR,
-                                    driver_name=os.path.basename(artifact["file"]),
-                                    mandatory=False,
-                                )
+                        if artifact_name in self.ARCHIVED_ARTIFACTS:
+                            archive_path, fingerprint = self._create_driver(
+                                dir_path=self.ARCHIVED_ARTIFACTS[artifact_name],
+                                driver_name=os.path.basename(artifact["file"]),
+                                manifest=manifest,
+                                mandatory=artifact_name == "driver",
                             )
+                            if archive_path:
+                                archives[artifact["file"]] = archive_path
+                                members[artifact["file"]] = fingerprint
+
+                        artifact_list.append(artifact["file"])
+
+            for artifact_path in artifact_list:
+                if artifact_path not in members and os.path.isfile(artifact_path):
+                    members[artifact_path] = manifest.fingerprint_file(artifact_path)
 
-                        self._copy_artifact(artifact["file"], package_path)
+            package_fingerprint = manifest.fingerprint_members(members)
+            zip_path = os.path.join(self.DIST_DIR, shell_real_name + ".zip")
 
-            zip_path = self._zip_package(package_path, "", shell_real_name)
+            if manifest.is_package_unchanged(zip_path, package_fingerprint):
+                message = "Shell package is up to date: "
+            else:
+                self._copy_tosca_meta(package_path, "")
+                self._copy_shell_definition(package_path, "", shell_definition_path)
+                for artifact_path in artifact_list:
+                    self._copy_artifact(
+                        artifact_path, package_path, archives.get(artifact_path)
+                    )
 
-            try:
-                self._remove_build_artifacts(artifact_path_list)
-            except Exception:
-                pass
+                zip_path = self._zip_package(package_path, "", shell_real_name)
+                manifest.set_package(zip_path, package_fingerprint)
+                message = "Shell package was successfully created: "
 
-            click.echo("Shell package was successfully created: " + zip_path)
+            manifest.save()
+            click.echo(message + zip_path)
 
-    def _copy_artifact(self, artifact_path, package_path):
-        if os.path.exists(artifact_path):
+    def _copy_artifact(self, artifact_path, package_path, source_path=None):
+        """Copy artifact into the package.
+
+        :param str source_path: file to be added instead of the artifact path,
+            used for archives built during pack
+        """
+        source_path = source_path or artifact_path
+        if os.path.exists(source_path):
             click.echo("Adding artifact to shell package: " + artifact_path)
-            self._copy_file(src_file_path=artifact_path, dest_dir_path=package_path)
+            self._copy_file(src_file_path=source_path, dest_dir_path=package_path)
         else:
             click.echo("Missing artifact not added to shell package: " + artifact_path)
 
@@ -117,19 +143,35 @@ class ShellPackageBuilder(object):
                 if file.endswith(".pyc"):
                     os.remove(os.path.join(root, file))
 
-    @staticmethod
-    def _create_driver(path, package_path, dir_path, driver_name, mandatory=True):
-        dir_to_zip = os.path.join(path, dir_path)
-        if os.path.exists(dir_to_zip):
-            zip_file_path = os.path.join(package_path, driver_name)
-            ArchiveCreator.make_archive(zip_file_path, "zip", dir_to_zip)
-            return os.path.abspath(zip_file_path)
+    @traced("pack.driver")
+    def _create_driver(self, dir_path, driver_name, manifest, mandatory=True):
+        """Create driver archive.
+
+        Archive built by the previous pack is reused if the driver folder
+        wasn't changed since then.
+
+        :param PackManifest manifest:
+        :return: tuple of archive path and driver folder fingerprint
+        """
+        if os.path.exists(dir_path):
+            # archives built with other options are not reused
+            fingerprint = "{}:{}".format(
+                manifest.fingerprint_dir(dir_path), self.archive_builder.options_key
+            )
+            archive_path = manifest.get_archive(driver_name, fingerprint)
+            if archive_path is None:
+                archive_path = self.archive_builder.make_archive(
+                    manifest.get_archive_path(driver_name), dir_path
+                )
+                manifest.set_archive(driver_name, fingerprint)
+            return archive_path, fingerprint
         elif mandatory:
             raise click.ClickException(
                 "Invalid driver structure. Can't find '{}' driver folder.".format(
                     dir_path
                 )
             )
+        return None, None
 
     @staticmethod
     def _copy_file(src_file_path, dest_dir_path):
@@ -137,13 +179,6 @@ class ShellPackageBuilder(object):
             os.makedirs(dest_dir_path)
         shutil.copy(src_file_path, dest_dir_path)
 
-    @staticmethod
-    def _zip_package(package_path, path, package_name):
+    def _zip_package(self, package_path, path, package_name):
         zip_file_path = os.path.join(path, "dist", package_name)
-        return ArchiveCreator.make_archive(zip_file_path, "zip", package_path)
-
-    @staticmethod
-    def _remove_build_artifacts(artifacts_path_list):
-        for artifact_path in artifacts_path_list:
-            if artifact_path and os.path.exists(artifact_path):
-                os.remove(artifact_path)
+        return self.archive_builder.make_archive(zip_file_path, package_path)
@@ -2,7 +2,7 @@
 
 import json
 import os
-import time
+from functools import partial
 
 import click
 
@@ -11,24 +11,31 @@ try:
 except ImportError:
     from urllib2 import HTTPError
 
-from cloudshell.rest.api import PackagingRestApiClient
 
 try:
-    from cloudshell.rest.exceptions import FeatureUnavailable, ShellNotFound
-except ImportError:
     from cloudshell.rest.exceptions import (
         FeatureUnavailable,
-        ShellNotFoundException as ShellNotFound,
+        LoginFailedError,
+        ShellNotFound,
     )
+except ImportError:
+    from cloudshell.rest.exceptions import FeatureUnavailable
+    from cloudshell.rest.exceptions import ShellNotFoundException as ShellNotFound
+
+    class LoginFailedError(Exception):
+        """Older clients raise HTTPError with 401 code on failed login."""
+
 
 from shellfoundry.exceptions import FatalError
-from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
-from shellfoundry.utilities.constants import (
-    CLOUDSHELL_MAX_RETRIES,
-    CLOUDSHELL_RETRY_INTERVAL_SEC,
-    DEFAULT_TIME_WAIT,
+from shellfoundry.utilities.cloudshell_api import (
+    PackagingRestApiClient,
+    get_progressbar_callback,
 )
+from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+from shellfoundry.utilities.install_ledger import InstallLedger
+from shellfoundry.utilities.retry import RetryPolicy, is_connect_error
 from shellfoundry.utilities.shell_package import ShellPackage
+from shellfoundry.utilities.tracing import traced
 
 SHELL_IS_OFFICIAL_FLAG = "IsOfficial"
 
@@ -36,11 +43,21 @@ SHELL_IS_OFFICIAL_FLAG = "IsOfficial"
 class ShellPackageInstaller(object):
     GLOBAL_DOMAIN = "Global"
 
-    def __init__(self):
+    def __init__(self, install_ledger=None, retry_policy=None):
         self.cloudshell_config_reader = Configuration(CloudShellConfigReader())
+        self.install_ledger = install_ledger or InstallLedger()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    @traced("install.shell")
+    def install(self, path, force=False, client=None):
+        """Install new or Update existed Shell.
 
-    def install(self, path):
-        """Install new or Update existed Shell."""
+        :param bool force: upload the package even if the same package
+            was already installed into the server
+        :param client: authenticated PackagingRestApiClient to use
+            instead of a new login
+        :return: False if upload was skipped, True otherwise
+        """
         shell_package = ShellPackage(path)
         shell_name = shell_package.get_name_from_definition()
         shell_filename = shell_name + ".zip"
@@ -53,23 +70,67 @@ class ShellPackageInstaller(object):
                 "Gen2 shells could not be installed into non Global domain."
             )
 
-        cs_connection_label = "Connecting to CloudShell at {}:{}".format(
-            cloudshell_config.host, cloudshell_config.port
+        package_hash = self.install_ledger.get_package_hash(package_full_path)
+        if not force and self.install_ledger.is_installed(
+            cloudshell_config.host, cloudshell_config.port, shell_name, package_hash
+        ):
+            click.echo(
+                "Shell package {} is already installed into CloudShell at {}:{}, "
+                "use --force to upload it anyway".format(
+                    shell_filename, cloudshell_config.host, cloudshell_config.port
+                )
+            )
+            return False
+
+        client = client or self.connect(cloudshell_config)
+        self.confirm_custom_version(client, shell_name)
+
+        # progress of the package upload in bytes
+        package_size = (
+            os.path.getsize(package_full_path)
+            if os.path.exists(package_full_path)
+            else 0
+        )
+        installation_label = "Installing shell into CloudShell".ljust(
+            len(self._get_connection_label(cloudshell_config))
         )
         with click.progressbar(
-            length=CLOUDSHELL_MAX_RETRIES, show_eta=False, label=cs_connection_label
+            length=package_size, show_eta=False, label=installation_label
         ) as pbar:
             try:
-                client = self._open_connection_to_quali_server(
-                    cloudshell_config, pbar, retry=CLOUDSHELL_MAX_RETRIES
-                )
+                self.upload(client, package_full_path, pbar)
             finally:
                 self._render_pbar_finish(pbar)
 
+        self.install_ledger.record(
+            cloudshell_config.host, cloudshell_config.port, shell_name, package_hash
+        )
+        return True
+
+    @traced("cloudshell.login")
+    def connect(self, cloudshell_config):
+        """Login into CloudShell showing the connection progress.
+
+        Progress bar makes a step on each retry of the failed login.
+        :return: authenticated PackagingRestApiClient
+        """
+        with click.progressbar(
+            length=self.retry_policy.attempts,
+            show_eta=False,
+            label=self._get_connection_label(cloudshell_config),
+        ) as pbar:
+            try:
+                return self._open_connection_to_quali_server(cloudshell_config, pbar)
+            finally:
+                self._render_pbar_finish(pbar)
+
+    @traced("install.get_shell")
+    def confirm_custom_version(self, client, shell_name):
+        """Ask user to confirm replacing of the official shell by a custom one."""
         try:
-            is_official = client.get_shell(shell_name=shell_name).get(
-                SHELL_IS_OFFICIAL_FLAG, False
-            )
+            is_official = self.retry_policy.call(
+                partial(client.get_shell, shell_name=shell_name)
+            ).get(SHELL_IS_OFFICIAL_FLAG, False)
 
             if is_official:
                 click.confirm(
@@ -95,25 +156,25 @@ class ShellPackageInstaller(object):
                 )
             )
 
-        pbar_install_shell_len = 2  # amount of possible actions (update and add)
-        installation_label = "Installing shell into CloudShell".ljust(
-            len(cs_connection_label)
-        )
-        with click.progressbar(
-            length=pbar_install_shell_len, show_eta=False, label=installation_label
-        ) as pbar:
-            try:
-                client.update_shell(package_full_path)
-            except ShellNotFound:
-                self._increase_pbar(pbar, DEFAULT_TIME_WAIT)
-                self._add_new_shell(client, package_full_path)
-            except Exception as e:
-                self._increase_pbar(pbar, DEFAULT_TIME_WAIT)
-                raise FatalError(
-                    self._parse_installation_error("Failed to update shell", e)
-                )
-            finally:
-                self._render_pbar_finish(pbar)
+    @traced("install.upload")
+    def upload(self, client, package_full_path, pbar=None):
+        """Update the shell or add it if it isn't installed yet.
+
+        :param pbar: progress bar of the package upload in bytes, if shown
+        """
+        upload_kwargs = {}
+        if pbar is not None:
+            upload_kwargs["progress_callback"] = get_progressbar_callback(pbar)
+        try:
+            self.retry_policy.call(
+                partial(client.update_shell, package_full_path, **upload_kwargs)
+            )
+        except ShellNotFound:
+            self._add_new_shell(client, package_full_path, **upload_kwargs)
+        except Exception as e:
+            raise FatalError(
+                self._parse_installation_error("Failed to update shell", e)
+            )
 
     def delete(self, shell_name):
         """Delete Shell."""
@@ -124,75 +185,56 @@ class ShellPackageInstaller(object):
                 "Gen2 shells could not be deleted from non Global domain."
             )
 
-        cs_connection_label = "Connecting to CloudShell at {}:{}".format(
-            cloudshell_config.host, cloudshell_config.port
-        )
-        with click.progressbar(
-            length=CLOUDSHELL_MAX_RETRIES, show_eta=False, label=cs_connection_label
-        ) as pbar:
-            try:
-                client = self._open_connection_to_quali_server(
-                    cloudshell_config, pbar, retry=CLOUDSHELL_MAX_RETRIES
-                )
-            finally:
-                self._render_pbar_finish(pbar)
+        client = self.connect(cloudshell_config)
 
         pbar_install_shell_len = 2  # amount of possible actions (update and add)
         installation_label = "Deleting shell from CloudShell".ljust(
-            len(cs_connection_label)
+            len(self._get_connection_label(cloudshell_config))
         )
         with click.progressbar(
             length=pbar_install_shell_len, show_eta=False, label=installation_label
         ) as pbar:
             try:
-                client.delete_shell(shell_name)
+                self.retry_policy.call(partial(client.delete_shell, shell_name))
+                self.install_ledger.forget(
+                    cloudshell_config.host, cloudshell_config.port, shell_name
+                )
             except FeatureUnavailable:
-                self._increase_pbar(pbar, DEFAULT_TIME_WAIT)
+                self._increase_pbar(pbar)
                 raise click.ClickException(
                     "Delete shell command unavailable (probably due to CloudShell version below 9.2)"  # noqa: E501
                 )
             except ShellNotFound:
-                self._increase_pbar(pbar, DEFAULT_TIME_WAIT)
+                self._increase_pbar(pbar)
                 raise click.ClickException(
                     "Shell '{shell_name}' doesn't exist on CloudShell".format(
                         shell_name=shell_name
                     )
                 )
             except Exception as e:
-                self._increase_pbar(pbar, DEFAULT_TIME_WAIT)
+                self._increase_pbar(pbar)
                 raise click.ClickException(
                     self._parse_installation_error("Failed to delete shell", e)
                 )
             finally:
                 self._render_pbar_finish(pbar)
 
-    def _open_connection_to_quali_server(self, cloudshell_config, pbar, retry):
-        if retry == 0:
-            raise FatalError(
-                "Connection to CloudShell Server failed. "
-                "Please make sure it is up and running properly."
-            )
+    @staticmethod
+    def _get_connection_label(cloudshell_config):
+        return "Connecting to CloudShell at {}:{}".format(
+            cloudshell_config.host, cloudshell_config.port
+        )
+
+    def _open_connection_to_quali_server(self, cloudshell_config, pbar):
         try:
-            try:
-                client = PackagingRestApiClient.login(
-                    host=cloudshell_config.host,
-                    port=cloudshell_config.port,
-                    username=cloudshell_config.username,
-                    password=cloudshell_config.password,
-                    domain=cloudshell_config.domain,
-                )
-                return client
-            except AttributeError:
-                client = PackagingRestApiClient(
-                    ip=cloudshell_config.host,
-                    port=cloudshell_config.port,
-                    username=cloudshell_config.username,
-                    password=cloudshell_config.password,
-                    domain=cloudshell_config.domain,
-                )
-                return client
-        except HTTPError as e:
-            if e.code == 401:
+            return self.retry_policy.call(
+                partial(self._login, cloudshell_config),
+                on_retry=lambda retry, error, delay: self._increase_pbar(pbar),
+            )
+        except Exception as e:
+            if isinstance(e, LoginFailedError) or (
+                isinstance(e, HTTPError) and e.code == 401
+            ):
                 raise FatalError(
                     "Login to CloudShell failed. "
                     "Please verify the credentials in the config"
@@ -201,15 +243,33 @@ class ShellPackageInstaller(object):
                 "Connection to CloudShell Server failed. "
                 "Please make sure it is up and running properly."
             )
-        except Exception:
-            self._increase_pbar(pbar, time_wait=CLOUDSHELL_RETRY_INTERVAL_SEC)
-            return self._open_connection_to_quali_server(
-                cloudshell_config, pbar, retry - 1
+
+    @staticmethod
+    def _login(cloudshell_config):
+        try:
+            return PackagingRestApiClient.login(
+                host=cloudshell_config.host,
+                port=cloudshell_config.port,
+                username=cloudshell_config.username,
+                password=cloudshell_config.password,
+                domain=cloudshell_config.domain,
+            )
+        except AttributeError:
+            return PackagingRestApiClient(
+                ip=cloudshell_config.host,
+                port=cloudshell_config.port,
+                username=cloudshell_config.username,
+                password=cloudshell_config.password,
+                domain=cloudshell_config.domain,
             )
 
-    def _add_new_shell(self, client, package_full_path):
+    def _add_new_shell(self, client, package_full_path, **upload_kwargs):
         try:
-            client.add_shell(package_full_path)
+            # repeated only if it wasn't sent, shell may be added otherwise
+            self.retry_policy.call(
+                partial(client.add_shell, package_full_path, **upload_kwargs),
+                retryable=is_connect_error,
+            )
         except Exception as e:
             raise FatalError(
                 self._parse_installation_error("Failed to add new shell", e)
@@ -235,8 +295,7 @@ class ShellPackageInstaller(object):
         
         return "{}. CloudShell responded with: '{}'".format(base_message, cs_message)
 
-    def _increase_pbar(self, pbar, time_wait):
-        time.sleep(time_wait)
+    def _increase_pbar(self, pbar):
         pbar.make_step(1)
 
     def _render_pbar_finish(self, pbar):
@@ -0,0 +1,15 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Files of the shell sources which are not part of the shell."""
+
+IGNORED_DIRS = ("__pycache__", ".git", ".idea", ".pack")
+# byte code and temporary files of editors
+IGNORED_SUFFIXES = (".pyc", ".pyo", ".swp", ".swx", ".tmp", "~")
+
+
+def is_ignored(name):
+    """Check that the file or folder doesn't affect the shell."""
+    return (
+        name in IGNORED_DIRS or name.startswith(".#") or name.endswith(IGNORED_SUFFIXES)
+    )
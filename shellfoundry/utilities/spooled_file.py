@@ -0,0 +1,24 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import tempfile
+
+
+class SpooledFile(tempfile.SpooledTemporaryFile):
+    """Binary buffer kept in memory until it's bigger than max_size.
+
+    SpooledTemporaryFile implements io.IOBase checks only since Python 3.11,
+    zipfile requires them to read archives.
+    """
+
+    def __init__(self, max_size=0):
+        super(SpooledFile, self).__init__(max_size=max_size, mode="w+b")
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return True
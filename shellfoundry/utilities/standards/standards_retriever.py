@@ -7,11 +7,62 @@ from io import open
 from ..cloudshell_api import create_cloudshell_client
 
 from shellfoundry.decorators.standards import standard_transformation
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.config_reader import (
+    CloudShellConfigReader,
+    Configuration,
+    ShellFoundryConfig,
+)
+from shellfoundry.utilities.retry import RetryPolicy
+from shellfoundry.utilities.tracing import traced
+
+STANDARDS_CACHE_NAME = "standards"
 
 
 class Standards(object):
-    @standard_transformation
+    def __init__(self, cache=None, cache_ttl=None):
+        """Standards installed into CloudShell.
+
+        :param FileCache cache: storage for standards fetched from CloudShell
+        :param int cache_ttl: seconds fetched standards are used without
+            asking CloudShell, read from configuration if not provided
+        """
+        self.cache = cache or FileCache(STANDARDS_CACHE_NAME)
+        self._cache_ttl = cache_ttl
+
+    @property
+    def cache_ttl(self):
+        if self._cache_ttl is None:
+            self._cache_ttl = (
+                Configuration(ShellFoundryConfig()).read().standards_cache_ttl
+            )
+        return self._cache_ttl
+
+    @traced("standards.fetch")
     def fetch(self, **kwargs):
+        """Get installed standards and their versions.
+
+        Standards fetched from CloudShell are kept per server and domain,
+        the round trip is skipped while they are not older than cache_ttl.
+        :keyword str alternative: path to standards file used instead of CloudShell
+        :keyword bool refresh: fetch standards from CloudShell ignoring the cache
+        :rtype: dict
+        """
+        if kwargs.get("alternative"):
+            return self._fetch(**kwargs)
+
+        cs_config = Configuration(CloudShellConfigReader()).read()
+        key = "{}:{}/{}".format(cs_config.host, cs_config.port, cs_config.domain)
+        standards = None
+        if not kwargs.get("refresh") and self.cache_ttl > 0:
+            standards = self.cache.get(key, self.cache_ttl)
+        if standards is None:
+            standards = self._fetch()
+            self.cache.set(key, standards)
+        return standards
+
+    @standard_transformation
+    def _fetch(self, **kwargs):
         alternative = kwargs.get("alternative", None)
         if not alternative:
             return self._fetch_from_cloudshell()
@@ -20,10 +71,7 @@ class Standards(object):
     @staticmethod
     def _fetch_from_cloudshell():
         cs_client = create_cloudshell_client()
-        try:
-            return cs_client.get_installed_standards()
-        except Exception:
-            raise
+        return RetryPolicy().call(cs_client.get_installed_standards)
 
     @staticmethod
     def _fetch_from_alternative_path(alternative_path):
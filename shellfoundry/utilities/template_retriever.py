@@ -1,11 +1,9 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-import json
 import os
-import re
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from io import open
-from threading import RLock, Thread
 
 import click
 import requests
@@ -21,18 +19,73 @@ from .filters import CompositeFilter
 
 from shellfoundry.models.shell_template import ShellTemplate
 from shellfoundry.utilities import GEN_TWO, SEPARATOR
-from shellfoundry.utilities.constants import (
-    SERVER_VERSION_KEY,
-    TEMPLATE_INFO_FILE,
-    TEMPLATES_YML,
-)
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.config_reader import Configuration, ShellFoundryConfig
+from shellfoundry.utilities.constants import SERVER_VERSION_KEY, TEMPLATES_YML
+from shellfoundry.utilities.http_sessions import get_session
+from shellfoundry.utilities.local_templates_index import LocalTemplatesIndex
+from shellfoundry.utilities.tracing import traced
 
 REQUEST_TIMEOUT = 15
+TEMPLATES_CACHE_NAME = "templates"
+MIN_CS_VERSIONS_CACHE_NAME = "min_cs_versions"
+# lookups of branches with unknown commit are refreshed after a week,
+# missing cookiecutter.json (404) is checked again after a day
+MIN_CS_VERSION_CACHE_TTL = 7 * 24 * 3600
+MIN_CS_VERSION_NOT_FOUND_CACHE_TTL = 24 * 3600
 
 
 class TemplateRetriever(object):
     NAME_PLACEHOLDER = "name"
 
+    def __init__(
+        self,
+        templates_cache=None,
+        templates_cache_ttl=None,
+        max_workers=None,
+        min_cs_versions_cache=None,
+        local_templates_index=None,
+    ):
+        """Retrieve shell templates.
+
+        :param FileCache templates_cache: storage for templates list from GitHub
+        :param int templates_cache_ttl: seconds cached templates list is used
+            without asking GitHub, read from configuration if not provided
+        :param int max_workers: amount of templates checked on GitHub in parallel,
+            read from configuration if not provided
+        :param FileCache min_cs_versions_cache: storage for minimal CloudShell
+            versions of template branches
+        :param LocalTemplatesIndex local_templates_index: metadata of templates
+            from the local template location
+        """
+        self.templates_cache = templates_cache or FileCache(TEMPLATES_CACHE_NAME)
+        self.min_cs_versions_cache = min_cs_versions_cache or FileCache(
+            MIN_CS_VERSIONS_CACHE_NAME
+        )
+        self.local_templates_index = local_templates_index or LocalTemplatesIndex()
+        self._templates_cache_ttl = templates_cache_ttl
+        self._max_workers = max_workers
+        self._settings = None
+
+    @property
+    def settings(self):
+        if self._settings is None:
+            self._settings = Configuration(ShellFoundryConfig()).read()
+        return self._settings
+
+    @property
+    def templates_cache_ttl(self):
+        if self._templates_cache_ttl is None:
+            self._templates_cache_ttl = self.settings.templates_cache_ttl
+        return self._templates_cache_ttl
+
+    @property
+    def max_workers(self):
+        if self._max_workers is None:
+            self._max_workers = self.settings.max_workers
+        return max(self._max_workers, 1)
+
+    @traced("templates.get")
     def get_templates(self, **kwargs):
         """Get templates.
 
@@ -49,7 +102,7 @@ class TemplateRetriever(object):
             config = self._get_local_templates(template_location=template_location)
         else:
             response = self._get_templates_from_github()
-            config = yaml.safe_load(response)
+            config = self._load_templates_config(response)
 
         if not config or "templates" not in config:
             return {}
@@ -76,12 +129,58 @@ class TemplateRetriever(object):
 
         return self._filter_by_standards(templatesdic, standards)
 
-    @staticmethod
-    def _get_templates_from_github():
-        """Get templates data from GitHub."""
-        session = requests.Session()
-        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=5))
-        return session.get(TEMPLATES_YML, timeout=REQUEST_TIMEOUT).text
+    @traced("templates.download")
+    def _get_templates_from_github(self):
+        """Get templates data from GitHub.
+
+        Cached data is used while it is younger than the configured TTL,
+        after that GitHub is asked whether the data was changed.
+        Cached data is also used when GitHub can't be reached.
+        """
+        fresh = self.templates_cache.get(TEMPLATES_YML, ttl=self.templates_cache_ttl)
+        if fresh:
+            return fresh["body"]
+
+        cached = self.templates_cache.get(TEMPLATES_YML)
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = get_session(TEMPLATES_YML).get(
+                TEMPLATES_YML, headers=headers, timeout=REQUEST_TIMEOUT
+            )
+        except requests.RequestException:
+            if cached:
+                return cached["body"]
+            raise
+
+        if cached and response.status_code == requests.codes.not_modified:
+            self.templates_cache.set(TEMPLATES_YML, cached)
+            return cached["body"]
+        elif response.status_code == requests.codes.ok:
+            self.templates_cache.set(
+                TEMPLATES_YML,
+                {
+                    "body": response.text,
+                    "config": yaml.safe_load(response.text),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+            )
+        elif cached:
+            return cached["body"]
+
+        return response.text
+
+    def _load_templates_config(self, response):
+        """Parse templates data, reusing already parsed cached data."""
+        cached = self.templates_cache.get(TEMPLATES_YML)
+        if cached and cached.get("body") == response:
+            return cached["config"]
+        return yaml.safe_load(response)
 
     @staticmethod
     def _get_templates_from_path(alternative_path):
@@ -90,84 +189,50 @@ class TemplateRetriever(object):
             response = stream.read()
         return response
 
+    @traced("templates.scan")
     def _get_local_templates(self, template_location):
-        """Get templates from local storage."""
+        """Get templates from local storage.
+
+        Template metadata is taken from the persisted index,
+        only folders changed since the previous scan are read.
+        """
         if not template_location or not os.path.exists(template_location):
             raise click.ClickException("Local template location empty or doesn't exist")
-        else:
-            templ_info = []
-            for root, directories, filenames in os.walk(template_location):
-                for filename in filenames:
-                    if filename == TEMPLATE_INFO_FILE:
-                        full_path = os.path.join(root, filename)
-
-                        with open(full_path, mode="r", encoding="utf8") as f:
-                            templ_data = json.load(f)
-
-                        if GEN_TWO in templ_data.get("template_name", "Undefined"):
-                            standard_version = self._get_standard_version_from_template(
-                                root
-                            )
-                        else:
-                            standard_version = templ_data.get(
-                                "version", templ_data.get("shell_version", "0.0.1")
-                            )
 
-                        templ_info.append(
-                            {
-                                "name": templ_data.get("template_name", "Undefined"),
-                                "description": templ_data.get(
-                                    "template_descr", "Undefined"
-                                ),
-                                "min_cs_ver": templ_data.get(
-                                    SERVER_VERSION_KEY, "Undefined"
-                                ),
-                                "repository": "",
-                                "standard_version": {
-                                    standard_version: {
-                                        "repo": root,
-                                        "min_cs_ver": templ_data.get(
-                                            SERVER_VERSION_KEY, "Undefined"
-                                        ),
-                                    }
-                                },
-                                "params": {
-                                    "project_name": templ_data.get(
-                                        "project_name", None
-                                    ),
-                                    "family_name": templ_data.get("family_name", None),
-                                },
-                            }
-                        )
-
-            if templ_info:
-                templates = {
-                    "templates": sorted(
-                        templ_info,
-                        key=lambda data: list(data["standard_version"].keys())[0],
-                    )
+        templ_info = []
+        for root, templ_data, standard_version in self.local_templates_index.scan(
+            template_location
+        ):
+            templ_info.append(
+                {
+                    "name": templ_data.get("template_name", "Undefined"),
+                    "description": templ_data.get("template_descr", "Undefined"),
+                    "min_cs_ver": templ_data.get(SERVER_VERSION_KEY, "Undefined"),
+                    "repository": "",
+                    "standard_version": {
+                        standard_version: {
+                            "repo": root,
+                            "min_cs_ver": templ_data.get(
+                                SERVER_VERSION_KEY, "Undefined"
+                            ),
+                        }
+                    },
+                    "params": {
+                        "project_name": templ_data.get("project_name", None),
+                        "family_name": templ_data.get("family_name", None),
+                    },
                 }
-            else:
-                templates = None
+            )
 
-        return templates
+        if not templ_info:
+            return None
 
-    @staticmethod
-    def _get_standard_version_from_template(template_location):
-        """Get standard version from template shell-definition file."""
-        for root, directories, filenames in os.walk(template_location):
-            for filename in filenames:
-                if filename == "shell-definition.yaml":
-                    with open(
-                        os.path.join(root, "shell-definition.yaml"), encoding="utf8"
-                    ) as stream:
-                        match = re.search(
-                            r"cloudshell_standard:\s*cloudshell_(?P<name>\S+)_standard_(?P<version>\S+)\.\w+$",  # noqa: E501
-                            stream.read(),
-                            re.MULTILINE,
-                        )
-                        if match:
-                            return str(match.groupdict()["version"].replace("_", "."))
+        return {
+            "templates": sorted(
+                templ_info,
+                key=lambda data: list(data["standard_version"].keys())[0],
+            )
+        }
 
     @staticmethod
     def _get_standard_out_of_name(template_name, default=None):
@@ -178,10 +243,11 @@ class TemplateRetriever(object):
             return default
         return template[standard_index]
 
-    @staticmethod
-    def _filter_by_standards(templates, standards):
+    def _filter_by_standards(self, templates, standards):
         """Filter templates by available on CloudShell Standards.
 
+        Templates are checked in parallel by a bounded pool of workers.
+
         :type templates collections.defaultdict(list)
         :type standards dict
         :return:
@@ -189,36 +255,35 @@ class TemplateRetriever(object):
         if not standards:
             return OrderedDict(sorted(templates.items()))
 
-        global filtered_templates
-        filtered_templates = defaultdict(list)
-
-        threads = []
-        lock = RLock()
-
-        for template_name, templates_list in templates.items():
-            template_thread = Thread(
-                target=TemplateRetriever._filter_in_threads,
-                args=(template_name, templates_list, standards, lock),
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(templates) or 1)
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda item: self._filter_template(item[0], item[1], standards),
+                    templates.items(),
+                )
             )
-            threads.append(template_thread)
-
-        for thread in threads:
-            thread.start()
 
-        for thread in threads:
-            thread.join()
+        return OrderedDict(
+            sorted(
+                (template_name, templates_list)
+                for template_name, templates_list in results
+                if templates_list
+            )
+        )
 
-        return OrderedDict(sorted(filtered_templates.items()))
+    def _filter_template(self, template_name, templates_list, standards):
+        """Get templates compatible with available Standards.
 
-    @staticmethod
-    def _filter_in_threads(template_name, templates_list, standards, lock):
+        :return: tuple of template name and list of compatible templates
+        """
         clear_template_name = TemplateRetriever._get_standard_out_of_name(template_name)
         if clear_template_name is None:
-            for template in templates_list:
-                lock.acquire()
-                filtered_templates[template_name].append(template)
-                lock.release()
-        elif clear_template_name in list(standards.keys()):
+            return template_name, list(templates_list)
+
+        filtered = []
+        if clear_template_name in list(standards.keys()):
             for template in templates_list:
                 if (
                     not template.standard_version
@@ -227,60 +292,100 @@ class TemplateRetriever(object):
                 ):
                     if template.repository:
                         template.min_cs_ver = (
-                            TemplateRetriever._get_min_cs_version(
+                            self._get_min_cs_version(
                                 repository=template.repository,
                                 standard_name=template.standard,
                                 standards=standards,
                             )
                             or template.min_cs_ver
                         )
-                    lock.acquire()
-                    filtered_templates[template_name].append(template)
-                    lock.release()
+                    filtered.append(template)
+        return template_name, filtered
 
-    @staticmethod
-    def _get_min_cs_version(repository, standard_name, standards, branch=None):
-        """Get minimal CloudShell Server Version available for provided template."""
+    @traced("templates.min_cs_version")
+    def _get_min_cs_version(
+        self, repository, standard_name, standards, branch=None, commit_sha=None
+    ):
+        """Get minimal CloudShell Server Version available for provided template.
+
+        Results are cached per repository and branch. When branch commit is known
+        the result is kept until the branch changes, otherwise it is refreshed
+        after MIN_CS_VERSION_CACHE_TTL. Missing cookiecutter.json is cached too.
+        """
         if not branch:
             branch = str(
                 min(list(map(parse_version, standards[standard_name])))
             )  # determine minimal standard version
+
+        cache_key = "{}/{}".format(repository.rstrip("/"), branch)
+        if commit_sha:
+            cache_key = "{}@{}".format(cache_key, commit_sha)
+
+        cached = self.min_cs_versions_cache.get(
+            cache_key, ttl=None if commit_sha else MIN_CS_VERSION_CACHE_TTL
+        )
+        if cached and not cached[SERVER_VERSION_KEY] and not commit_sha:
+            cached = self.min_cs_versions_cache.get(
+                cache_key, ttl=MIN_CS_VERSION_NOT_FOUND_CACHE_TTL
+            )
+        if cached:
+            return cached[SERVER_VERSION_KEY]
+
         repository = repository.replace("https://github.com", "https://raw.github.com")
         url = "/".join([repository, str(branch), "cookiecutter.json"])
 
-        session = requests.Session()
-        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=5))
-        responce = session.get(url, timeout=REQUEST_TIMEOUT)
+        responce = get_session(url).get(url, timeout=REQUEST_TIMEOUT)
 
         if responce.status_code == requests.codes.ok:
-            return responce.json().get(SERVER_VERSION_KEY, None)
+            cs_version = responce.json().get(SERVER_VERSION_KEY, None)
+        elif responce.status_code == requests.codes.not_found:
+            cs_version = None
         else:
             return
 
+        self.min_cs_versions_cache.set(cache_key, {SERVER_VERSION_KEY: cs_version})
+        return cs_version
+
     def get_repo_branches(self, repository, github_login=None, github_password=None):
         """Get all available branches for provided repository."""
+        return [
+            branch
+            for branch, _ in self._get_repo_branches_commits(
+                repository, github_login, github_password
+            )
+        ]
+
+    def _get_repo_branches_commits(
+        self, repository, github_login=None, github_password=None
+    ):
+        """Get all available branches for provided repository with their commits.
+
+        :return: list of (branch, commit sha) tuples
+        """
         if repository.endswith("/"):
             repository = repository[:-1]
         request = "{}/branches".format(
             repository.replace("https://github.com", "https://api.github.com/repos")
         )
 
-        session = requests.Session()
+        auth = None
         if github_login and github_password:
-            session.auth = (github_login, github_password)
-        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=5))
-        response = session.get(request, timeout=REQUEST_TIMEOUT)
+            auth = (github_login, github_password)
+        response = get_session(request).get(request, auth=auth, timeout=REQUEST_TIMEOUT)
 
         response.raise_for_status()
 
-        branches = [item[self.NAME_PLACEHOLDER] for item in response.json()]
+        branches = [
+            (item[self.NAME_PLACEHOLDER], item.get("commit", {}).get("sha"))
+            for item in response.json()
+        ]
 
         repo_branches = []
-        for item in branches:
+        for item, commit_sha in branches:
             if item == "master":
-                repo_branches.append(item)
+                repo_branches.append((item, commit_sha))
             elif isinstance(parse_version(item), Version):  # only numeric version
-                repo_branches.append(parse_version(item))
+                repo_branches.append((parse_version(item), commit_sha))
 
         repo_branches.reverse()
 
@@ -290,9 +395,15 @@ class TemplateRetriever(object):
         self, repo, version, github_login=None, github_password=None
     ):
         """Get latest template version based on CloudShell version."""
-        for branch in self.get_repo_branches(repo, github_login, github_password):
+        for branch, commit_sha in self._get_repo_branches_commits(
+            repo, github_login, github_password
+        ):
             cs_version = self._get_min_cs_version(
-                repository=repo, standard_name=None, standards=None, branch=branch
+                repository=repo,
+                standard_name=None,
+                standards=None,
+                branch=branch,
+                commit_sha=commit_sha,
             )
 
             if cs_version:
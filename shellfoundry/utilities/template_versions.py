@@ -4,6 +4,7 @@
 import requests
 
 import shellfoundry.exceptions as exc
+from shellfoundry.utilities.retry import RetryPolicy
 
 VERSIONS_URL = "https://api.github.com/repos/{}/{}/branches"
 NAME_PLACEHOLDER = "name"
@@ -20,8 +21,9 @@ def is_version(vstr):
 
 
 class TemplateVersions(object):
-    def __init__(self, url_user, url_repo):
+    def __init__(self, url_user, url_repo, retry_policy=None):
         self.template_repo = [url_user, url_repo]
+        self.retry_policy = retry_policy or RetryPolicy()
 
     def get_versions_of_template(self):
         """Get all versions (branches) of a given template.
@@ -30,9 +32,7 @@ class TemplateVersions(object):
         NoVersionsHaveBeenFoundException when no versions have been found
         :return: List filled with version names (e.g. 1.0, 1.1, 2.0...)
         """
-        response = requests.get(VERSIONS_URL.format(*self.template_repo))
-        response.raise_for_status()
-
+        response = self.retry_policy.call(self._get_branches)
         branches = [d[NAME_PLACEHOLDER] for d in response.json()]
         branches.sort(reverse=True, key=lambda x: (is_version(x), x))
         if not self.has_versions(branches):
@@ -41,6 +41,11 @@ class TemplateVersions(object):
             )
         return branches
 
+    def _get_branches(self):
+        response = requests.get(VERSIONS_URL.format(*self.template_repo))
+        response.raise_for_status()
+        return response
+
     @staticmethod
     def has_versions(branches):
         first_branch = next(iter(branches or []), None)
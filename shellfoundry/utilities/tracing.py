@@ -0,0 +1,235 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""Timings of command phases in Chrome trace format.
+
+Tracing is off by default and spans cost nothing but a function call then.
+When it's started, every span is recorded with its wall time, HTTP requests
+count and bytes sent and received by all threads while the span was open.
+Saved file is opened by chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from io import open
+
+TRACE_ENV = "SHELLFOUNDRY_TRACE"
+COUNTERS = ("http_requests", "bytes_sent", "bytes_received")
+
+_tracer = None
+
+
+class Tracer(object):
+    def __init__(self, clock=time.perf_counter):
+        """Recorder of spans and counters.
+
+        :param clock: monotonic clock returning seconds
+        """
+        self._clock = clock
+        self._origin = clock()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(COUNTERS, 0)
+        self._threads = {}
+        self.events = []
+
+    def _now(self):
+        """Microseconds since the tracer was created."""
+        return (self._clock() - self._origin) * 1000000
+
+    def count(self, **counters):
+        """Add values to the counters."""
+        with self._lock:
+            for name, value in counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def begin(self, name, args=None):
+        """Open span, pass the result to end."""
+        return name, args if args is not None else {}, self.snapshot(), self._now()
+
+    def end(self, span):
+        """Close span opened by begin and record it."""
+        end = self._now()
+        name, args, counters, start = span
+        for counter, value in self.snapshot().items():
+            if value != counters.get(counter, 0):
+                args[counter] = value - counters.get(counter, 0)
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": round(start, 1),
+                    "dur": round(end - start, 1),
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                    "args": args,
+                }
+            )
+
+    def span(self, name, **args):
+        """Context manager recording the span, gives its mutable args dict."""
+        return _Span(self, name, args)
+
+    def save(self, path):
+        """Write recorded spans into the file in Chrome trace format."""
+        with self._lock:
+            events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": ident,
+                    "args": {"name": name},
+                }
+                for ident, name in self._threads.items()
+            ]
+            events.extend(sorted(self.events, key=lambda event: event["ts"]))
+        with open(path, mode="w", encoding="utf8") as stream:
+            stream.write(
+                json.dumps(
+                    {"traceEvents": events, "displayTimeUnit": "ms"},
+                    ensure_ascii=False,
+                )
+            )
+
+
+class _Span(object):
+    def __init__(self, tracer, name, args):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._span = None
+
+    def __enter__(self):
+        self._span = self._tracer.begin(self._name, self._args)
+        return self._args
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer.end(self._span)
+
+
+class _NoSpan(object):
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+def span(name, **args):
+    """Record the block as a span when tracing is started.
+
+    :param str name: dotted span name, the first part is its category
+    :return: context manager giving dict of span args
+        which can be extended inside the block
+    """
+    if _tracer is None:
+        return _NoSpan()
+    return _tracer.span(name, **args)
+
+
+def traced(name):
+    """Record every call of the decorated function as a span."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(**counters):
+    """Add values to the counters of the open spans."""
+    if _tracer is not None:
+        _tracer.count(**counters)
+
+
+def start(path, name="shellfoundry", tracer=None):
+    """Start tracing, spans are saved into the file by stop.
+
+    HTTP requests made through requests package are counted from now on.
+    :param str path: trace file path
+    :param str name: name of the root span
+    """
+    global _tracer
+    _tracer = tracer or Tracer()
+    _instrument_requests()
+    root = _tracer.begin(name)
+
+    def stop():
+        global _tracer
+        tracer, _tracer = _tracer, None
+        if tracer is not None:
+            tracer.end(root)
+            tracer.save(path)
+
+    return stop
+
+
+_instrumented = False
+
+
+def _instrument_requests():
+    """Count requests and their bytes sent through any requests session."""
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    from requests.adapters import HTTPAdapter
+
+    send = HTTPAdapter.send
+
+    @wraps(send)
+    def traced_send(adapter, request, *args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return send(adapter, request, *args, **kwargs)
+
+        with tracer.span("http." + request.method, url=request.url) as span_args:
+            length = request.headers.get("Content-Length")
+            if length and length.isdigit():
+                sent = int(length)
+            else:
+                sent = len(request.body) if isinstance(request.body, bytes) else 0
+            tracer.count(http_requests=1, bytes_sent=sent)
+            response = send(adapter, request, *args, **kwargs)
+            span_args["status"] = response.status_code
+            _count_received(response.raw)
+            return response
+
+    HTTPAdapter.send = traced_send
+
+
+def _count_received(raw):
+    """Count bytes read from the response body, streamed or not."""
+    read = getattr(raw, "read", None)
+    if read is None:
+        return
+
+    @wraps(read)
+    def counted_read(*args, **kwargs):
+        data = read(*args, **kwargs)
+        if data:
+            count(bytes_received=len(data))
+        return data
+
+    raw.read = counted_read
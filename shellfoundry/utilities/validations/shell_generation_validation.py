@@ -6,24 +6,35 @@ import zipfile
 
 from shellfoundry.utilities.constants import TOSCA_META_LOCATION
 
+# zip member names always use forward slashes
+TOSCA_META_MEMBER = TOSCA_META_LOCATION.replace(os.sep, "/")
+
+
+def get_shell_root(member_names):
+    """Get folder of the 2nd generation Shell inside the zip-file.
+
+    :param list member_names: names from the zip-file central directory
+    :return: "" for Shell in the zip-file root, "<folder>/" for Shell
+        in the top level folder or None if it isn't 2nd generation Shell
+    """
+    for name in member_names:
+        root, _, path = name.rpartition(TOSCA_META_MEMBER)
+        if not path and (not root or root.count("/") == 1 and root.endswith("/")):
+            return root
+
 
 class ShellGenerationValidations(object):
     def validate_2nd_gen(self, shell_path):
         """Validate generation of Shell.
 
-        :param str shell_path: path to Shell directory or Shell zip-file
+        Zip-file is validated by its central directory without extraction.
+        :param shell_path: path to Shell directory or Shell zip-file,
+            or zip-file object
         """
-        if os.path.isdir(shell_path):
-            file_list = []
-            for root, dirs, files in os.walk(shell_path):
-                root = root.replace(shell_path, "").lstrip("\\").lstrip("/")
-                for name in files:
-                    file_list.append(os.path.join(root, name))
-
-            if TOSCA_META_LOCATION in file_list:
-                return True
-            return False
+        if not hasattr(shell_path, "read") and os.path.isdir(shell_path):
+            return os.path.isfile(os.path.join(shell_path, TOSCA_META_LOCATION))
         elif zipfile.is_zipfile(shell_path):
-            raise NotImplementedError
+            with zipfile.ZipFile(shell_path) as zip_file:
+                return get_shell_root(zip_file.namelist()) is not None
         else:
             raise Exception("Unexpected shell path type")
@@ -1,10 +1,18 @@
+import hashlib
+import os
 import re
 from datetime import datetime
+from io import open
+
+from shellfoundry.utilities.source_filter import is_ignored
+
+# driver version parts are limited by .NET assembly version
+MAX_VERSION_PART = 65534
 
 
 class DriverVersionTimestampBased:
     @staticmethod
-    def get_version(version):
+    def get_version(version, source_dir=None):
         days = (datetime.utcnow() - datetime(2000, 1, 1)).days
         now = datetime.now()
         seconds_since_midnight = (
@@ -17,3 +25,37 @@ class DriverVersionTimestampBased:
     @staticmethod
     def supports_version_pattern(version):
         return re.match(r"\d+\.\d+\.\*$", version)
+
+
+class DriverVersionContentBased(object):
+    """Driver version derived from the driver files content.
+
+    Packing the same driver sources always produces the same version,
+    byte code and editor files are not hashed.
+    """
+
+    @staticmethod
+    def get_version(version, source_dir=None):
+        content_hash = DriverVersionContentBased._hash_dir(source_dir)
+        build = int(content_hash[:8], 16) % (MAX_VERSION_PART + 1)
+        revision = int(content_hash[8:16], 16) % (MAX_VERSION_PART + 1)
+        return version.replace("*", "{}.{}".format(build, revision))
+
+    @staticmethod
+    def supports_version_pattern(version):
+        return DriverVersionTimestampBased.supports_version_pattern(version)
+
+    @staticmethod
+    def _hash_dir(source_dir):
+        content_hash = hashlib.sha1()
+        if not source_dir:
+            return content_hash.hexdigest()
+        for root, dirs, files in os.walk(source_dir):
+            dirs[:] = sorted(name for name in dirs if not is_ignored(name))
+            for file_name in sorted(name for name in files if not is_ignored(name)):
+                file_path = os.path.join(root, file_name)
+                rel_path = os.path.relpath(file_path, source_dir).replace(os.sep, "/")
+                content_hash.update(rel_path.encode("utf8") + b"\n")
+                with open(file_path, mode="rb") as stream:
+                    content_hash.update(stream.read())
+        return content_hash.hexdigest()
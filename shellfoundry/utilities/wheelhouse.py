@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+from shellfoundry.utilities.cache import BlobStore, FileCache
+from shellfoundry.utilities.config_reader import Configuration, ShellFoundryConfig
+from shellfoundry.utilities.tracing import traced
+
+WHEELS_CACHE_NAME = "wheels"
+WHEELHOUSE_INDEX_NAME = "wheelhouse"
+
+
+class Wheelhouse(object):
+    """Shared storage of resolved Python requirements.
+
+    Downloaded files are kept once in the content addressed blob store,
+    the index maps resolution keys to names and digests of the files
+    the requirement was resolved to.
+    """
+
+    def __init__(self, store=None, index=None):
+        """Wheelhouse.
+
+        :param BlobStore store: storage for downloaded files,
+            capped by wheels_cache_size setting by default
+        :param FileCache index: storage for resolved requirements
+        """
+        self._store = store
+        self.index = index or FileCache(WHEELHOUSE_INDEX_NAME)
+
+    @property
+    def store(self):
+        if self._store is None:
+            settings = Configuration(ShellFoundryConfig()).read()
+            self._store = BlobStore(
+                WHEELS_CACHE_NAME, settings.wheels_cache_size * 1024 * 1024
+            )
+        return self._store
+
+    def get(self, key, ttl=None):
+        """Get files the requirement was resolved to.
+
+        :param str key: resolution key
+        :param int ttl: max age of the resolution in seconds, None means any age
+        :return: dict of file names and stored file paths or None
+            if the requirement wasn't resolved or some file is missing
+        """
+        resolved = self.index.get(key, ttl=ttl)
+        if resolved is None:
+            return None
+
+        files = {}
+        for file_name, digest in resolved.items():
+            path = self.store.get(file_name)
+            if not path or not os.path.basename(path).startswith(digest):
+                return None
+            files[file_name] = path
+        return files
+
+    def add(self, key, folder):
+        """Store files the requirement was resolved to.
+
+        :param str key: resolution key
+        :param str folder: folder with downloaded files
+        :return: dict of file names and paths, stored files are used when possible
+        """
+        files = {}
+        resolved = {}
+        for file_name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, file_name)
+            stored_path = self.store.put(file_name, path)
+            if stored_path:
+                resolved[file_name] = os.path.splitext(os.path.basename(stored_path))[0]
+            files[file_name] = stored_path or path
+
+        if len(resolved) == len(files):
+            self.index.set(key, resolved)
+        return files
+
+    @staticmethod
+    @traced("dependencies.materialize")
+    def materialize(files, dest_path):
+        """Make the folder contain exactly the files.
+
+        Files are hard linked when possible and copied otherwise,
+        files already linked to the same content are kept.
+        :param dict files: file names and paths to their content
+        :param str dest_path: destination folder
+        """
+        if not os.path.isdir(dest_path):
+            os.makedirs(dest_path)
+
+        for file_name in os.listdir(dest_path):
+            if file_name not in files:
+                path = os.path.join(dest_path, file_name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+        for file_name, path in files.items():
+            target = os.path.join(dest_path, file_name)
+            if os.path.exists(target):
+                if os.path.samefile(path, target):
+                    continue
+                os.remove(target)
+            try:
+                os.link(path, target)
+            except OSError:
+                shutil.copy2(path, target)
@@ -0,0 +1,26 @@
+import pytest
+
+from shellfoundry.utilities.cache.file_cache import CACHE_DIR_ENV
+from shellfoundry.utilities.config.config_snapshot import clear_snapshots
+from shellfoundry.utilities.http_sessions import close_sessions
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep shellfoundry cache of every test in its own folder."""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_http_sessions():
+    """Don't share keep-alive connections between tests."""
+    yield
+    close_sessions()
+
+
+@pytest.fixture(autouse=True)
+def isolated_config_snapshots():
+    """Don't share parsed configuration files between tests."""
+    clear_snapshots()
+    yield
+    clear_snapshots()
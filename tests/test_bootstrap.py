@@ -1,11 +1,16 @@
 #!/usr/bin/python
+import json
+import os
+import subprocess
+import sys
 import traceback
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from click.testing import CliRunner
 
 from shellfoundry.bootstrap import (
+    cli,
     config,
     delete,
     dist,
@@ -18,6 +23,7 @@ from shellfoundry.bootstrap import (
     pack,
     show,
     version,
+    watch,
 )
 from shellfoundry.utilities import GEN_ONE, GEN_TWO, LAYER_ONE, NO_FILTER
 
@@ -29,17 +35,17 @@ class TestBootstrap(unittest.TestCase):
     def tearDown(self):
         pass
 
-    @patch("shellfoundry.bootstrap.pkg_resources")
-    def test_version(self, test_dist):
-        obj = MagicMock()
-        obj.version = "shellfoundry_version"
-        test_dist.get_distribution = MagicMock(return_value=obj)
+    @patch(
+        "shellfoundry.bootstrap.get_installed_version",
+        return_value="shellfoundry_version",
+    )
+    def test_version(self, test_get_version):
         result = self.runner.invoke(version)
 
         assert result.exit_code == 0
         assert result.output == "shellfoundry version shellfoundry_version\n"
 
-    @patch("shellfoundry.bootstrap.ListCommandExecutor")
+    @patch("shellfoundry.commands.list_command.ListCommandExecutor")
     def test_list_all(self, test_list_executor_class):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -53,7 +59,7 @@ class TestBootstrap(unittest.TestCase):
             test_list_executor_class.assert_called_once_with(NO_FILTER)
             test_list_executor_class.return_value.list.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.ListCommandExecutor")
+    @patch("shellfoundry.commands.list_command.ListCommandExecutor")
     def test_list_gen_one(self, test_list_executor_class):
 
         with patch(
@@ -69,7 +75,7 @@ class TestBootstrap(unittest.TestCase):
             test_list_executor_class.assert_called_once_with(GEN_ONE)
             test_list_executor_class.return_value.list.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.ListCommandExecutor")
+    @patch("shellfoundry.commands.list_command.ListCommandExecutor")
     def test_list_gen_two(self, test_list_executor_class):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -83,7 +89,7 @@ class TestBootstrap(unittest.TestCase):
             test_list_executor_class.assert_called_once_with(GEN_TWO)
             test_list_executor_class.return_value.list.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.ListCommandExecutor")
+    @patch("shellfoundry.commands.list_command.ListCommandExecutor")
     def test_list_layer_one(self, test_list_executor_class):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -97,7 +103,7 @@ class TestBootstrap(unittest.TestCase):
             test_list_executor_class.assert_called_once_with(LAYER_ONE)
             test_list_executor_class.return_value.list.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.NewCommandExecutor")
+    @patch("shellfoundry.commands.new_command.NewCommandExecutor")
     def test_new_only_name(self, new_command_executor):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -109,10 +115,10 @@ class TestBootstrap(unittest.TestCase):
 
             assert result.exit_code == 0
             new_command_executor.return_value.new.assert_called_once_with(
-                "test_shell", "gen2/resource", None, "3"
+                "test_shell", "gen2/resource", None, "3", False
             )
 
-    @patch("shellfoundry.bootstrap.NewCommandExecutor")
+    @patch("shellfoundry.commands.new_command.NewCommandExecutor")
     def test_new(self, new_command_executor):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -127,10 +133,10 @@ class TestBootstrap(unittest.TestCase):
 
             assert result.exit_code == 0
             new_command_executor.return_value.new.assert_called_once_with(
-                "test_shell", "template_name", "version", "3"
+                "test_shell", "template_name", "version", "3", False
             )
 
-    @patch("shellfoundry.bootstrap.NewCommandExecutor")
+    @patch("shellfoundry.commands.new_command.NewCommandExecutor")
     def test_new_with_python_version(self, new_command_executor):
         with patch(
             "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
@@ -153,10 +159,29 @@ class TestBootstrap(unittest.TestCase):
 
             assert result.exit_code == 0
             new_command_executor.return_value.new.assert_called_once_with(
-                "test_shell", "template_name", "version", "3"
+                "test_shell", "template_name", "version", "3", False
             )
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
+    @patch("shellfoundry.commands.list_command.ListCommandExecutor")
+    @patch("shellfoundry.commands.new_command.NewCommandExecutor")
+    def test_refresh_standards(self, new_command_executor, test_list_executor_class):
+        with patch(
+            "shellfoundry.decorators.version_check.is_index_version_greater_than_current",  # noqa: E501
+            return_value=(False, True),
+        ):
+            list_result = self.runner.invoke(list, ["--refresh-standards"])
+            new_result = self.runner.invoke(new, ["test_shell", "--refresh-standards"])
+
+            assert list_result.exit_code == 0
+            assert new_result.exit_code == 0
+            test_list_executor_class.return_value.list.assert_called_once_with(
+                refresh_standards=True
+            )
+            new_command_executor.return_value.new.assert_called_once_with(
+                "test_shell", "gen2/resource", None, "3", True
+            )
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
     def test_pack(self, test_pack_executor):
         result = self.runner.invoke(pack)
         if result.exception:
@@ -165,8 +190,8 @@ class TestBootstrap(unittest.TestCase):
         assert result.exit_code == 0
         test_pack_executor.return_value.pack.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.InstallCommandExecutor")
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.install_command.InstallCommandExecutor")
     def test_install(self, test_install_executor, test_pack_executor):
         result = self.runner.invoke(install)
         if result.exception:
@@ -174,10 +199,37 @@ class TestBootstrap(unittest.TestCase):
 
         assert result.exit_code == 0
         test_pack_executor.return_value.pack.assert_called_once()
-        test_install_executor.return_value.install.assert_called_once()
+        test_install_executor.return_value.install.assert_called_once_with(force=False)
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.install_command.InstallCommandExecutor")
+    def test_install_force(self, test_install_executor, test_pack_executor):
+        result = self.runner.invoke(install, ["--force"])
+        if result.exception:
+            traceback.print_exception(*result.exc_info)
+
+        assert result.exit_code == 0
+        test_install_executor.return_value.install.assert_called_once_with(force=True)
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.install_command.InstallCommandExecutor")
+    def test_install_many(self, test_install_executor, test_pack_executor):
+        with self.runner.isolated_filesystem():
+            os.mkdir("nut-shell")
+            result = self.runner.invoke(
+                install, ["nut-shell", "--all", "--max-uploads", "2"]
+            )
+        if result.exception:
+            traceback.print_exception(*result.exc_info)
+
+        assert result.exit_code == 0
+        test_pack_executor.return_value.pack.assert_not_called()
+        test_install_executor.return_value.install_many.assert_called_once_with(
+            ("nut-shell",), True, False, 2
+        )
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.InstallCommandExecutor")
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.install_command.InstallCommandExecutor")
     def test_install_pack_failed(self, test_install_executor, test_pack_executor):
         test_pack_executor.return_value.pack.side_effect = Exception("some error")
         result = self.runner.invoke(install)
@@ -188,8 +240,19 @@ class TestBootstrap(unittest.TestCase):
         test_pack_executor.return_value.pack.assert_called_once()
         test_install_executor.return_value.install.assert_not_called()
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.DistCommandExecutor")
+    @patch("shellfoundry.commands.watch_command.WatchCommandExecutor")
+    def test_watch(self, test_watch_executor):
+        result = self.runner.invoke(watch, ["--poll", "--debounce", "1"])
+        if result.exception:
+            traceback.print_exception(*result.exc_info)
+
+        assert result.exit_code == 0
+        test_watch_executor.return_value.watch.assert_called_once_with(
+            poll=True, debounce=1.0
+        )
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.dist_command.DistCommandExecutor")
     def test_dist(self, test_dist_executor, test_pack_executor):
         result = self.runner.invoke(dist)
         if result.exception:
@@ -199,8 +262,8 @@ class TestBootstrap(unittest.TestCase):
         test_pack_executor.return_value.pack.assert_called_once()
         test_dist_executor.return_value.dist.assert_called_once()
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.DistCommandExecutor")
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.dist_command.DistCommandExecutor")
     def test_dist_pack_failed(self, test_dist_executor, test_pack_executor):
         test_pack_executor.return_value.pack.side_effect = Exception("some error")
         result = self.runner.invoke(dist)
@@ -211,8 +274,8 @@ class TestBootstrap(unittest.TestCase):
         test_pack_executor.return_value.pack.assert_called_once()
         test_dist_executor.return_value.dist.assert_not_called()
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.GenerateCommandExecutor")
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.generate_command.GenerateCommandExecutor")
     def test_generate(self, test_generate_executor, test_pack_executor):
         result = self.runner.invoke(generate)
         if result.exception:
@@ -220,10 +283,24 @@ class TestBootstrap(unittest.TestCase):
 
         assert result.exit_code == 0
         test_pack_executor.return_value.pack.assert_called_once()
-        test_generate_executor.return_value.generate.assert_called_once()
+        test_generate_executor.return_value.generate.assert_called_once_with(
+            refresh=False
+        )
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.generate_command.GenerateCommandExecutor")
+    def test_generate_refresh(self, test_generate_executor, test_pack_executor):
+        result = self.runner.invoke(generate, ["--refresh"])
+        if result.exception:
+            traceback.print_exception(*result.exc_info)
 
-    @patch("shellfoundry.bootstrap.PackCommandExecutor")
-    @patch("shellfoundry.bootstrap.GenerateCommandExecutor")
+        assert result.exit_code == 0
+        test_generate_executor.return_value.generate.assert_called_once_with(
+            refresh=True
+        )
+
+    @patch("shellfoundry.commands.pack_command.PackCommandExecutor")
+    @patch("shellfoundry.commands.generate_command.GenerateCommandExecutor")
     def test_generate_pack_failed(self, test_generate_executor, test_pack_executor):
         test_pack_executor.return_value.pack.side_effect = Exception("some error")
         result = self.runner.invoke(generate)
@@ -234,7 +311,7 @@ class TestBootstrap(unittest.TestCase):
         test_pack_executor.return_value.pack.assert_called_once()
         test_generate_executor.return_value.generate.assert_not_called()
 
-    @patch("shellfoundry.bootstrap.ConfigCommandExecutor")
+    @patch("shellfoundry.commands.config_command.ConfigCommandExecutor")
     def test_config_get_global(self, test_config_class):
         result = self.runner.invoke(config)
         if result.exception:
@@ -246,7 +323,7 @@ class TestBootstrap(unittest.TestCase):
             (None, None), None
         )
 
-    @patch("shellfoundry.bootstrap.ConfigCommandExecutor")
+    @patch("shellfoundry.commands.config_command.ConfigCommandExecutor")
     def test_config_get_local(self, test_config_class):
         result = self.runner.invoke(config, ["--local"])
         if result.exception:
@@ -258,7 +335,7 @@ class TestBootstrap(unittest.TestCase):
             (None, None), None
         )
 
-    @patch("shellfoundry.bootstrap.ConfigCommandExecutor")
+    @patch("shellfoundry.commands.config_command.ConfigCommandExecutor")
     def test_config_add_key(self, test_config_class):
         result = self.runner.invoke(config, ["new_key", "new_value"])
         if result.exception:
@@ -270,7 +347,7 @@ class TestBootstrap(unittest.TestCase):
             ("new_key", "new_value"), None
         )
 
-    @patch("shellfoundry.bootstrap.ConfigCommandExecutor")
+    @patch("shellfoundry.commands.config_command.ConfigCommandExecutor")
     def test_config_remove_key(self, test_config_class):
         result = self.runner.invoke(config, ["--remove", "key_to_remove"])
         if result.exception:
@@ -282,7 +359,7 @@ class TestBootstrap(unittest.TestCase):
             (None, None), "key_to_remove"
         )
 
-    @patch("shellfoundry.bootstrap.ShowCommandExecutor")
+    @patch("shellfoundry.commands.show_command.ShowCommandExecutor")
     def test_show(self, test_show_class):
         result = self.runner.invoke(show, ["template name"])
         if result.exception:
@@ -291,7 +368,7 @@ class TestBootstrap(unittest.TestCase):
         assert result.exit_code == 0
         test_show_class.return_value.show.assert_called_once_with("template name")
 
-    @patch("shellfoundry.bootstrap.ExtendCommandExecutor")
+    @patch("shellfoundry.commands.extend_command.ExtendCommandExecutor")
     def test_extend(self, test_extend_class):
         result = self.runner.invoke(extend, ["source shell location"])
         if result.exception:
@@ -302,7 +379,7 @@ class TestBootstrap(unittest.TestCase):
             "source shell location", ()
         )
 
-    @patch("shellfoundry.bootstrap.ExtendCommandExecutor")
+    @patch("shellfoundry.commands.extend_command.ExtendCommandExecutor")
     def test_extend_add_attributes(self, test_extend_class):
         result = self.runner.invoke(
             extend,
@@ -316,7 +393,7 @@ class TestBootstrap(unittest.TestCase):
             "source shell location", ("attr_1", "attr2")
         )
 
-    @patch("shellfoundry.bootstrap.GetTemplatesCommandExecutor")
+    @patch("shellfoundry.commands.get_templates_command.GetTemplatesCommandExecutor")
     def test_get_templates(self, test_get_templates_class):
         result = self.runner.invoke(get_templates, ["cs_version"])
         if result.exception:
@@ -327,7 +404,7 @@ class TestBootstrap(unittest.TestCase):
             "cs_version", None
         )
 
-    @patch("shellfoundry.bootstrap.GetTemplatesCommandExecutor")
+    @patch("shellfoundry.commands.get_templates_command.GetTemplatesCommandExecutor")
     def test_get_templates_with_output_folder(self, test_get_templates_class):
         result = self.runner.invoke(
             get_templates, ["cs_version", "--output_dir", "some output folder"]
@@ -340,7 +417,7 @@ class TestBootstrap(unittest.TestCase):
             "cs_version", "some output folder"
         )
 
-    @patch("shellfoundry.bootstrap.DeleteCommandExecutor")
+    @patch("shellfoundry.commands.delete_command.DeleteCommandExecutor")
     def test_delete(self, test_delete_class):
         result = self.runner.invoke(delete, ["shell_name_to_delete"])
         if result.exception:
@@ -350,3 +427,39 @@ class TestBootstrap(unittest.TestCase):
         test_delete_class.return_value.delete.assert_called_once_with(
             "shell_name_to_delete"
         )
+
+    @patch(
+        "shellfoundry.bootstrap.get_installed_version",
+        return_value="shellfoundry_version",
+    )
+    def test_trace_is_saved_into_file(self, test_get_version):
+        with self.runner.isolated_filesystem():
+            result = self.runner.invoke(cli, ["--trace", "trace.json", "version"])
+
+            assert result.exit_code == 0
+            with open("trace.json") as stream:
+                events = json.load(stream)["traceEvents"]
+        assert [event["name"] for event in events if event["ph"] == "X"] == [
+            "command.version"
+        ]
+
+    def test_cli_startup_does_not_import_heavy_modules(self):
+        heavy_modules = [
+            "cloudshell.rest.api",
+            "cookiecutter.main",
+            "pkg_resources",
+            "requests",
+            "shellfoundry.commands.pack_command",
+            "yaml",
+        ]
+        code = (
+            "import sys, shellfoundry.bootstrap; "
+            "print(' '.join(m for m in sys.argv[1:] if m in sys.modules))"
+        )
+
+        output = subprocess.check_output(
+            [sys.executable, "-c", code] + heavy_modules,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+
+        assert output.decode("utf-8").strip() == ""
@@ -49,6 +49,15 @@ not_supported_section:
                     "template_location": "Empty *",
                     "password": "admin *",
                     "defaultview": "gen2 *",
+                    "templates_cache_ttl": "3600 *",
+                    "max_workers": "8 *",
+                    "compression_level": "6 *",
+                    "reproducible_pack": "False *",
+                    "version_check_interval": "86400 *",
+                    "archives_cache_size": "256 *",
+                    "read_timeout": "60 *",
+                    "standards_cache_ttl": "86400 *",
+                    "wheels_cache_size": "1024 *",
                     "key": "value",
                 }
             },
@@ -143,6 +152,15 @@ install:
                     "port": "9000 *",
                     "github_password": "gh_pass *",
                     "defaultview": "gen2 *",
+                    "templates_cache_ttl": "3600 *",
+                    "max_workers": "8 *",
+                    "compression_level": "6 *",
+                    "reproducible_pack": "False *",
+                    "version_check_interval": "86400 *",
+                    "archives_cache_size": "256 *",
+                    "read_timeout": "60 *",
+                    "standards_cache_ttl": "86400 *",
+                    "wheels_cache_size": "1024 *",
                     "key": "value",
                     "yetanotherkey": "yetanothervalue",
                 }
@@ -1,10 +1,14 @@
 #!/usr/bin/python
 
-import shutil
+import io
+import os
 import unittest
+import zipfile
+from contextlib import contextmanager
 from unittest.mock import MagicMock, patch
 
 from click import BadParameter, ClickException
+from pyfakefs import fake_filesystem_unittest
 
 from shellfoundry.commands.extend_command import ExtendCommandExecutor
 from shellfoundry.exceptions import VersionRequestException
@@ -27,135 +31,95 @@ class TestExtendCommandExecutor(unittest.TestCase):
         super().tearDown()
         del self.tested_instance
 
+    @patch(
+        "shellfoundry.commands.extend_command.os.path.isdir",
+        new=MagicMock(return_value=True),
+    )
     @patch(
         "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_local_shell",
         new=MagicMock(side_effect=Exception),
     )
     def test_extend_incorrect_arguments(self):
-
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with self.assertRaisesRegex(
-                BadParameter, "Check correctness of entered attributes"
-            ):
-                self.tested_instance.extend("local:some_path", ("new_attribute",))
+        with self.assertRaisesRegex(
+            BadParameter, "Check correctness of entered attributes"
+        ):
+            self.tested_instance.extend("local:some_path", ("new_attribute",))
 
     @patch(
-        "shellfoundry.commands.extend_command.ShellGenerationValidations.validate_2nd_gen",  # noqa: E501
+        "shellfoundry.commands.extend_command.os.path.isdir",
         new=MagicMock(return_value=True),
     )
     @patch(
         "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_local_shell",
         new=MagicMock(return_value="extended_shell_path"),
     )
-    @patch(
-        "shellfoundry.commands.extend_command.ExtendCommandExecutor._unpack_driver_archive",  # noqa: E501
-        new=MagicMock(),
-    )
-    @patch("shellfoundry.commands.extend_command.os", new=MagicMock())
-    @patch("shellfoundry.commands.extend_command.shutil", new=MagicMock())
     def test_extend_from_local_success(self):
+        with patch(
+            "shellfoundry.commands.extend_command.DefinitionModification"
+        ) as definition_modification_class:
+            self.tested_instance.extend("local:some_path", ("new_attribute",))
 
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with patch("shellfoundry.commands.extend_command.DefinitionModification"):
-                self.tested_instance.extend("local:some_path", ("new_attribute",))
+        definition_modification_class.assert_called_once_with("extended_shell_path")
+        modificator = definition_modification_class.return_value
+        modificator.session.assert_called_once_with()
+        modificator.add_properties.assert_called_once_with(
+            attribute_names=("new_attribute",)
+        )
 
-    @patch(
-        "shellfoundry.commands.extend_command.ShellGenerationValidations.validate_2nd_gen",  # noqa: E501
-        new=MagicMock(return_value=True),
-    )
     @patch(
         "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_online_shell",
         new=MagicMock(return_value="extended_shell_path"),
     )
-    @patch(
-        "shellfoundry.commands.extend_command.ExtendCommandExecutor._unpack_driver_archive",  # noqa: E501
-        new=MagicMock(),
-    )
-    @patch("shellfoundry.commands.extend_command.os", new=MagicMock())
-    @patch("shellfoundry.commands.extend_command.shutil", new=MagicMock())
     def test_extend_from_remote_success(self):
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with patch("shellfoundry.commands.extend_command.DefinitionModification"):
-                self.tested_instance.extend("some_path", ("new_attribute",))
+        with patch("shellfoundry.commands.extend_command.DefinitionModification"):
+            self.tested_instance.extend("some_path", ("new_attribute",))
 
     @patch(
         "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_online_shell",
         new=MagicMock(side_effect=VersionRequestException),
     )
     def test_extend_from_remote_download_failed(self):
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with self.assertRaises(ClickException):
-                self.tested_instance.extend("some_path", ("new_attribute",))
+        with self.assertRaises(ClickException):
+            self.tested_instance.extend("some_path", ("new_attribute",))
 
-    @patch("shellfoundry.commands.extend_command.os.rename", new=MagicMock())
-    @patch(
-        "shellfoundry.commands.extend_command.ShellGenerationValidations.validate_2nd_gen",  # noqa: E501
-        new=MagicMock(return_value=False),
-    )
     @patch(
         "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_online_shell",
         new=MagicMock(return_value="extended_shell_path"),
     )
-    def test_extend_not_2_gen_shell(self):
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with self.assertRaisesRegex(
-                ClickException, "Invalid second generation Shell."
-            ):
+    @patch("shellfoundry.commands.extend_command.shutil")
+    def test_extend_removes_shell_when_edit_failed(self, shutil_mock):
+        with patch(
+            "shellfoundry.commands.extend_command.DefinitionModification",
+            side_effect=ValueError,
+        ):
+            with self.assertRaises(ValueError):
                 self.tested_instance.extend("some_path", ("new_attribute",))
 
+        shutil_mock.rmtree.assert_called_once_with(
+            "extended_shell_path", ignore_errors=True
+        )
+
     @patch(
         "shellfoundry.commands.extend_command.ShellGenerationValidations.validate_2nd_gen",  # noqa: E501
-        new=MagicMock(return_value=True),
-    )
-    @patch(
-        "shellfoundry.commands.extend_command.ExtendCommandExecutor._copy_local_shell",
-        new=MagicMock(return_value="extended_shell_path"),
-    )
-    @patch(
-        "shellfoundry.commands.extend_command.ExtendCommandExecutor._unpack_driver_archive",  # noqa: E501
-        new=MagicMock(),
+        new=MagicMock(return_value=False),
     )
-    @patch("shellfoundry.commands.extend_command.os", new=MagicMock())
-    @patch(
-        "shellfoundry.commands.extend_command.shutil.move",
-        new=MagicMock(side_effect=shutil.Error),
-    )
-    def test_extend_failed_copy_from_temp_folder(self):
-        with patch("shellfoundry.commands.extend_command.TempDirContext"):
-            with patch("shellfoundry.commands.extend_command.DefinitionModification"):
-                with self.assertRaises(BadParameter):
-                    self.tested_instance.extend("local:some_path", ("new_attribute",))
-
     @patch(
         "shellfoundry.commands.extend_command.os.path.isdir",
         new=MagicMock(return_value=True),
     )
     @patch("shellfoundry.commands.extend_command.shutil", new=MagicMock())
-    def test___copy_local_shell_success(self):
-        self.tested_instance._copy_local_shell(
-            "source_shell_path", "destination_shell_path"
-        )
-
-    @patch(
-        "shellfoundry.commands.extend_command.os.path.isdir",
-        new=MagicMock(return_value=False),
-    )
-    @patch("shellfoundry.commands.extend_command.shutil", new=MagicMock())
-    def test___copy_local_shell_failed_source_not_a_folder(self):
-        with self.assertRaises(Exception):
+    def test___copy_local_shell_not_2_gen_shell(self):
+        with self.assertRaisesRegex(ClickException, "Invalid second generation Shell."):
             self.tested_instance._copy_local_shell(
                 "source_shell_path", "destination_shell_path"
             )
 
     @patch(
         "shellfoundry.commands.extend_command.os.path.isdir",
-        new=MagicMock(return_value=True),
-    )
-    @patch(
-        "shellfoundry.commands.extend_command.shutil.copytree",
-        new=MagicMock(side_effect=Exception),
+        new=MagicMock(return_value=False),
     )
-    def test___copy_local_shell_failed_copy_shell(self):
+    @patch("shellfoundry.commands.extend_command.shutil", new=MagicMock())
+    def test___copy_local_shell_failed_source_not_a_folder(self):
         with self.assertRaises(Exception):
             self.tested_instance._copy_local_shell(
                 "source_shell_path", "destination_shell_path"
@@ -204,3 +168,146 @@ class TestExtendCommandExecutor(unittest.TestCase):
         self.tested_instance._add_attributes("shell_path", attr_names)
 
         modificator.add_properties.assert_called_once_with(attribute_names=attr_names)
+
+
+TOSCA_META = """TOSCA-Meta-File-Version: 1.0
+CSAR-Version: 0.1.0
+Created-By: Anonymous
+Entry-Definitions: shell-definition.yaml
+"""
+
+DEFINITION = """tosca_definitions_version: tosca_simple_yaml_1_0
+
+metadata:
+  template_name: NutShell
+  template_author: Anonymous
+  template_version: 0.1.0
+
+node_types:
+  vendor.switch.NutShell:
+    derived_from: cloudshell.nodes.Switch
+    artifacts:
+      driver:
+        file: NutShellDriver.zip
+        type: tosca.artifacts.File
+"""
+
+
+def _create_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in members.items():
+            zip_file.writestr(name, content)
+    return buffer.getvalue()
+
+
+class TestExtendCommandExecutorFakeFS(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/work")
+        os.chdir("/work")
+        self.driver = _create_zip({"driver.py": "# driver", "requirements.txt": ""})
+        self.repository_downloader = MagicMock()
+        with patch("shellfoundry.commands.extend_command.Configuration"):
+            self.tested_instance = ExtendCommandExecutor(
+                repository_downloader=self.repository_downloader
+            )
+        self.tested_instance.cloudshell_config_reader.read.return_value.author = (
+            "Author"
+        )
+
+    def _shell_members(self, root=""):
+        return {
+            root + "TOSCA-Metadata/TOSCA.meta": TOSCA_META,
+            root + "shell-definition.yaml": DEFINITION,
+            root + "NutShellDriver.zip": self.driver,
+            root + "signed": "signature",
+        }
+
+    def _assert_extended_shell(self, shell_path):
+        self.assertEqual(
+            sorted(os.listdir(shell_path)),
+            ["TOSCA-Metadata", "shell-definition.yaml", "src"],
+        )
+        with open(os.path.join(shell_path, "src", "driver.py")) as stream:
+            self.assertEqual(stream.read(), "# driver")
+        with open(os.path.join(shell_path, "shell-definition.yaml")) as stream:
+            definition = stream.read()
+        self.assertIn("template_author: Author", definition)
+        self.assertIn("#       new_attribute:", definition)
+        with open(os.path.join(shell_path, "TOSCA-Metadata", "TOSCA.meta")) as stream:
+            self.assertIn("Created-By: Author", stream.read())
+
+    def test_extend_from_local_zip(self):
+        # Arrange
+        self.fs.create_file(
+            "/shells/NutShell.zip", contents=_create_zip(self._shell_members())
+        )
+
+        # Act
+        self.tested_instance.extend("local:/shells/NutShell.zip", ("new_attribute",))
+
+        # Assert
+        self._assert_extended_shell("/work/NutShell")
+
+    def test_extend_from_online_archive(self):
+        # Arrange
+        archive = _create_zip(self._shell_members("NutShell-1.0.2/"))
+
+        @contextmanager
+        def open_archive(url):
+            yield io.BytesIO(archive)
+
+        self.repository_downloader.open_archive.side_effect = open_archive
+
+        # Act
+        self.tested_instance.extend(
+            "https://github.com/org/NutShell/archive/1.0.2.zip", ("new_attribute",)
+        )
+
+        # Assert
+        self._assert_extended_shell("/work/NutShell")
+
+    def test_extend_from_local_folder(self):
+        # Arrange
+        for name, content in self._shell_members().items():
+            self.fs.create_file(
+                os.path.join("/shells/NutShell-1.0.0", name), contents=content
+            )
+        self.repository_downloader.repo_extractor.extract_to_folder.side_effect = (
+            lambda path, folder: zipfile.ZipFile(path).extractall(folder)
+        )
+
+        # Act
+        self.tested_instance.extend("local:/shells/NutShell-1.0.0", ("new_attribute",))
+
+        # Assert
+        self._assert_extended_shell("/work/NutShell")
+
+    def test_extend_from_zip_of_not_2_gen_shell(self):
+        # Arrange
+        self.fs.create_file(
+            "/shells/NutShell.zip",
+            contents=_create_zip({"NutShell/shell-definition.yaml": DEFINITION}),
+        )
+
+        # Act
+        with self.assertRaisesRegex(ClickException, "Invalid second generation Shell."):
+            self.tested_instance.extend("local:/shells/NutShell.zip", ())
+
+        # Assert
+        self.assertEqual(os.listdir("/work"), [])
+
+    def test_extend_to_existing_folder(self):
+        # Arrange
+        self.fs.create_file(
+            "/shells/NutShell.zip", contents=_create_zip(self._shell_members())
+        )
+        self.fs.create_file("/work/NutShell/driver.py", contents="# own driver")
+
+        # Act
+        with self.assertRaisesRegex(BadParameter, "already exists"):
+            self.tested_instance.extend("local:/shells/NutShell.zip", ())
+
+        # Assert
+        self.assertEqual(os.listdir("/work/NutShell"), ["driver.py"])
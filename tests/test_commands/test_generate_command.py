@@ -86,3 +86,4 @@ Entry-Definitions: shell-definition.yml
             driver_generator.generate_driver.call_args[1]["shell_filename"],
             "NutShell.zip",
         )
+        self.assertFalse(driver_generator.generate_driver.call_args[1]["refresh"])
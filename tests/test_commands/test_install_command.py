@@ -6,6 +6,7 @@ from urllib.error import HTTPError, URLError
 
 from shellfoundry.commands.install_command import InstallCommandExecutor
 from shellfoundry.exceptions import FatalError
+from shellfoundry.utilities.batch_installer import INSTALLED, ShellInstallResult
 
 
 class TestInstallCommandExecutor(unittest.TestCase):
@@ -58,10 +59,36 @@ class TestInstallCommandExecutor(unittest.TestCase):
 
         # Assert
         self.mock_shell_package_installer.install.assert_called_once_with(
-            "current path"
+            "current path", force=False
         )
         secho_mock.assert_any_call("Successfully installed shell", fg="green")
 
+    @patch("shellfoundry.commands.install_command.ShellPackage")
+    @patch("shellfoundry.commands.install_command.os")
+    @patch("shellfoundry.commands.install_command.click.secho")
+    def test_install_gen2_shell_already_installed(
+        self, secho_mock, os_mock, shell_package_mock
+    ):
+        shell_package_mock.return_value.is_layer_one.return_value = False
+        shell_package_mock.return_value.is_tosca.return_value = True
+        os_mock.getcwd.return_value = "current path"
+        self.mock_shell_package_installer.install.return_value = False
+
+        command_executor = InstallCommandExecutor(
+            cloudshell_config_reader=self.mock_cloudshell_config_reader,
+            installer=self.mock_installer,
+            shell_config_reader=self.mock_shell_config_reader,
+            shell_package_installer=self.mock_shell_package_installer,
+        )
+
+        # Act
+        command_executor.install(force=False)
+
+        # Assert
+        secho_mock.assert_called_once_with(
+            "Shell is up to date, nothing to install", fg="green"
+        )
+
     @patch("shellfoundry.commands.install_command.ShellPackage")
     @patch("shellfoundry.commands.install_command.os")
     @patch("shellfoundry.commands.install_command.click.secho")
@@ -188,3 +215,54 @@ class TestInstallCommandExecutor(unittest.TestCase):
             str(context.exception) == "Failed to install shell. "
             "CloudShell responded with: 'Some base exception'"
         )
+
+    @patch("shellfoundry.commands.install_command.click")
+    def test_install_many_reports_summary(self, click_mock):
+        # Arrange
+        installed = ShellInstallResult("/work/nut-shell")
+        installed.shell_name, installed.status, installed.elapsed = (
+            "NutShell",
+            INSTALLED,
+            1.5,
+        )
+        batch_installer = MagicMock()
+        batch_installer.install.return_value = [installed]
+        command_executor = InstallCommandExecutor(
+            cloudshell_config_reader=self.mock_cloudshell_config_reader,
+            shell_package_installer=self.mock_shell_package_installer,
+            batch_installer=batch_installer,
+        )
+
+        # Act
+        command_executor.install_many(["/work/nut-shell"], max_uploads=2)
+
+        # Assert
+        batch_installer.install.assert_called_once_with(["/work/nut-shell"], False, 2)
+        click_mock.secho.assert_called_once_with(
+            "  NutShell  installed      1.5s", fg="green"
+        )
+
+    @patch("shellfoundry.commands.install_command.click")
+    def test_install_many_fails_when_any_shell_failed(self, click_mock):
+        # Arrange
+        installed = ShellInstallResult("/work/nut-shell")
+        installed.status = INSTALLED
+        failed = ShellInstallResult("/work/bolt-shell")
+        failed.fail("Upload failed")
+        batch_installer = MagicMock()
+        batch_installer.install.return_value = [installed, failed]
+        command_executor = InstallCommandExecutor(
+            cloudshell_config_reader=self.mock_cloudshell_config_reader,
+            shell_package_installer=self.mock_shell_package_installer,
+            batch_installer=batch_installer,
+        )
+
+        # Act
+        with self.assertRaises(FatalError) as context:
+            command_executor.install_many(["/work/nut-shell", "/work/bolt-shell"])
+
+        # Assert
+        self.assertEqual(context.exception.message, "Failed to install 1 of 2 shells")
+        click_mock.secho.assert_any_call(
+            "  bolt-shell  failed         0.0s  Upload failed", fg="red"
+        )
@@ -14,7 +14,7 @@ class TestPackCommandExecutor(fake_filesystem_unittest.TestCase):
         self.setUpPyfakefs()
 
     @patch("click.echo")
-    @patch("shellfoundry.utilities.python_dependencies_packager.pip_main")
+    @patch("shellfoundry.utilities.python_dependencies_packager.subprocess.check_call")
     def test_build_package_package_created(self, pip_mock, echo_mock):
         # Arrange
         self.fs.create_file(
@@ -44,7 +44,7 @@ shell:
         echo_mock.assert_any_call("Shell package was successfully created:")
 
     @patch("click.echo")
-    @patch("shellfoundry.utilities.python_dependencies_packager.pip_main")
+    @patch("shellfoundry.utilities.python_dependencies_packager.subprocess.check_call")
     def test_proper_error_message_displayed_when_shell_yml_is_in_wrong_format(
         self, pip_mock, echo_mock
     ):
@@ -61,7 +61,7 @@ shell:
         echo_mock.assert_any_call("shell.yml format is wrong")
 
     @patch("click.echo")
-    @patch("shellfoundry.utilities.python_dependencies_packager.pip_main")
+    @patch("shellfoundry.utilities.python_dependencies_packager.subprocess.check_call")
     def test_proper_error_message_displayed_when_shell_yml_missing(
         self, pip_mock, echo_mock
     ):
@@ -78,7 +78,7 @@ shell:
         echo_mock.assert_any_call("shell.yml file is missing")
 
     @patch("click.secho")
-    @patch("shellfoundry.utilities.python_dependencies_packager.pip_main")
+    @patch("shellfoundry.utilities.python_dependencies_packager.subprocess.check_call")
     def test_pack_layer_one_shell(self, pip_mock, secho_mock):
         # Arrange
         self.fs.create_file("cloudshell-L1-test/datamodel/datamodel.xml")
@@ -0,0 +1,269 @@
+#!/usr/bin/python
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from urllib.error import HTTPError
+
+import click
+
+from shellfoundry.commands.watch_command import WatchCommandExecutor
+from shellfoundry.exceptions import FatalError
+from shellfoundry.utilities.file_watcher import FileWatcher, PollingObserver
+from shellfoundry.utilities.shell_package_installer import LoginFailedError
+
+
+class OneWaitWatcher(FileWatcher):
+    """Watcher stopping the watching after the first wait for changes."""
+
+    def wait(self, timeout=None):
+        self.changes = super(OneWaitWatcher, self).wait(timeout=0.2)
+        raise KeyboardInterrupt
+
+
+@patch("shellfoundry.commands.watch_command.os.getcwd", return_value="shell")
+@patch("shellfoundry.commands.watch_command.ShellPackage")
+@patch("shellfoundry.commands.watch_command.click.secho")
+class TestWatchCommandExecutor(unittest.TestCase):
+    def setUp(self):
+        self.pack_command_executor = MagicMock()
+        self.shell_package_installer = MagicMock()
+        self.installer = MagicMock()
+        self.cloudshell_config_reader = MagicMock()
+        self.shell_config_reader = MagicMock()
+        self.watcher = MagicMock()
+        self.executor = WatchCommandExecutor(
+            pack_command_executor=self.pack_command_executor,
+            shell_package_installer=self.shell_package_installer,
+            installer=self.installer,
+            cloudshell_config_reader=self.cloudshell_config_reader,
+            shell_config_reader=self.shell_config_reader,
+            watcher=self.watcher,
+        )
+
+    def set_changes(self, *changes):
+        self.watcher.wait.side_effect = list(changes) + [KeyboardInterrupt]
+
+    @staticmethod
+    def set_gen2(shell_package_mock):
+        shell_package_mock.return_value.is_layer_one.return_value = False
+        shell_package_mock.return_value.is_tosca.return_value = True
+
+    def test_installs_on_each_change_with_single_login(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"], [], ["shell-definition.yaml"])
+        client = self.shell_package_installer.connect.return_value
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.assertEqual(self.pack_command_executor.pack.call_count, 3)
+        self.assertEqual(self.shell_package_installer.install.call_count, 3)
+        self.shell_package_installer.install.assert_called_with("shell", client=client)
+        self.shell_package_installer.connect.assert_called_once()
+        self.watcher.close.assert_called_once()
+
+    def watch_real_files(self, pack):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.metadata_path = os.path.join(root, "src", "drivermetadata.xml")
+        os.makedirs(os.path.dirname(self.metadata_path))
+        with open(self.metadata_path, "w") as f:
+            f.write('<Driver Version="1.0.0" />')
+        self.pack_command_executor.pack.side_effect = pack
+        self.executor.watcher = OneWaitWatcher(
+            root, ["src"], observer=PollingObserver(root, ["src"], interval=0.01)
+        )
+        self.executor.watch()
+
+    def rewrite_metadata(self):
+        # driver version is written and the file is restored
+        with open(self.metadata_path, "w") as f:
+            f.write('<Driver Version="1.0.0.1234" />')
+        with open(self.metadata_path, "w") as f:
+            f.write('<Driver Version="1.0.0" />')
+
+    def test_files_restored_by_pack_do_not_trigger_next_pack(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+
+        # Act
+        self.watch_real_files(self.rewrite_metadata)
+
+        # Assert
+        self.assertEqual(self.executor.watcher.changes, [])
+        self.pack_command_executor.pack.assert_called_once()
+
+    def test_edit_saved_while_packing_triggers_next_pack(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+
+        def pack():
+            self.rewrite_metadata()
+            driver_path = os.path.join(os.path.dirname(self.metadata_path), "x.py")
+            with open(driver_path, "w") as f:
+                f.write("class Driver(object): pass")
+
+        # Act
+        self.watch_real_files(pack)
+
+        # Assert
+        self.assertEqual(self.executor.watcher.changes, ["src/x.py"])
+
+    def test_failed_install_keeps_watching(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"])
+        self.pack_command_executor.pack.side_effect = [
+            FatalError("Invalid shell definition"),
+            None,
+        ]
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        secho_mock.assert_any_call(
+            "Failed to install shell: Invalid shell definition", fg="red"
+        )
+        self.shell_package_installer.install.assert_called_once()
+
+    def test_expired_login_is_renewed(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"])
+        old_client, new_client = MagicMock(), MagicMock()
+        self.shell_package_installer.connect.side_effect = [old_client, new_client]
+        self.shell_package_installer.install.side_effect = [
+            True,
+            HTTPError("url", 401, "Unauthorized", None, None),
+            True,
+        ]
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.assertEqual(self.shell_package_installer.connect.call_count, 2)
+        self.shell_package_installer.install.assert_called_with(
+            "shell", client=new_client
+        )
+        self.assertNotIn(
+            "red", [call[1].get("fg") for call in secho_mock.call_args_list]
+        )
+
+    def test_rejected_login_is_renewed(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"])
+        self.shell_package_installer.install.side_effect = [
+            True,
+            LoginFailedError("Login failed"),
+            True,
+        ]
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.assertEqual(self.shell_package_installer.connect.call_count, 2)
+        self.assertEqual(self.shell_package_installer.install.call_count, 3)
+
+    def test_unauthorized_error_cause_is_recognized(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"])
+
+        def install(path, client):
+            install.calls += 1
+            if install.calls == 2:
+                try:
+                    raise HTTPError("url", 401, "Unauthorized", None, None)
+                except HTTPError:
+                    raise FatalError("Failed to update shell")
+            return True
+
+        install.calls = 0
+        self.shell_package_installer.install.side_effect = install
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.assertEqual(self.shell_package_installer.connect.call_count, 2)
+        self.assertEqual(self.shell_package_installer.install.call_count, 3)
+        self.assertNotIn(
+            "red", [call[1].get("fg") for call in secho_mock.call_args_list]
+        )
+
+    def test_rejected_package_is_not_uploaded_again(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        self.set_gen2(shell_package_mock)
+        self.set_changes(["src/driver.py"], ["src/driver.py"])
+        self.shell_package_installer.install.side_effect = [
+            True,
+            FatalError("Failed to update shell. CloudShell responded with: 'Invalid'"),
+            True,
+        ]
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.assertEqual(self.shell_package_installer.install.call_count, 3)
+        secho_mock.assert_any_call(
+            "Failed to install shell: Failed to update shell. "
+            "CloudShell responded with: 'Invalid'",
+            fg="red",
+        )
+        # the next install logs in again in case the login has expired
+        self.assertEqual(self.shell_package_installer.connect.call_count, 2)
+
+    def test_gen1_shell(self, secho_mock, shell_package_mock, getcwd_mock):
+        # Arrange
+        shell_package_mock.return_value.is_layer_one.return_value = False
+        shell_package_mock.return_value.is_tosca.return_value = False
+        self.set_changes(["datamodel/datamodel.xml"])
+        self.shell_config_reader.read.return_value.name = "nut_shell"
+        client = self.installer.connect.return_value
+
+        # Act
+        self.executor.watch()
+
+        # Assert
+        self.installer.connect.assert_called_once()
+        self.installer.install.assert_called_with(
+            "nut_shell", self.cloudshell_config_reader.read.return_value, client=client
+        )
+        self.assertEqual(self.installer.install.call_count, 2)
+
+    def test_layer_one_is_not_supported(
+        self, secho_mock, shell_package_mock, getcwd_mock
+    ):
+        # Arrange
+        shell_package_mock.return_value.is_layer_one.return_value = True
+
+        # Act & Assert
+        with self.assertRaises(click.ClickException):
+            self.executor.watch()
+        self.pack_command_executor.pack.assert_not_called()
@@ -7,6 +7,12 @@ from unittest.mock import patch
 from click import Abort
 
 from shellfoundry.decorators import shellfoundry_version_check
+from shellfoundry.utilities import (
+    INDEX_VERSION_KEY,
+    VERSION_CHECK_CACHE_NAME,
+    get_cached_index_version,
+)
+from shellfoundry.utilities.cache import FileCache
 
 
 @shellfoundry_version_check(abort_if_major=False)
@@ -89,3 +95,37 @@ class TestShellFoundryVersionCheck(unittest.TestCase):
             stdout_mock.getvalue(),
             "This version of shellfoundry is not supported anymore, please upgrade by running: pip install shellfoundry --upgrade\n\n",  # noqa: E501
         )
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_version_check_uses_saved_index_version(self, stdout_mock):
+        # Arrange
+        FileCache(VERSION_CHECK_CACHE_NAME).set(INDEX_VERSION_KEY, "0.3.0")
+
+        # Act
+        with patch(
+            "shellfoundry.utilities.get_installed_version", return_value="0.2.7"
+        ), patch("shellfoundry.utilities.max_version_from_index") as max_version_mock:
+            abort_if_major()
+
+        # Assert
+        max_version_mock.assert_not_called()
+        self.assertEqual(
+            stdout_mock.getvalue(),
+            "vido\nThere is a new version of shellfoundry available, please upgrade by running: pip install shellfoundry --upgrade\n",  # noqa: E501
+        )
+
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_version_check_refreshes_expired_index_version(self, stdout_mock):
+        # Arrange
+        with patch("time.time", return_value=0):
+            FileCache(VERSION_CHECK_CACHE_NAME).set(INDEX_VERSION_KEY, "0.2.7")
+
+        # Act
+        with patch(
+            "shellfoundry.utilities.get_installed_version", return_value="0.2.7"
+        ), patch("shellfoundry.utilities.max_version_from_index", return_value="1.0.0"):
+            abort_if_major()
+
+        # Assert
+        self.assertEqual(stdout_mock.getvalue(), "vido")
+        self.assertEqual(get_cached_index_version(3600), "1.0.0")
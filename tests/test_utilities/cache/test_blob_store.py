@@ -0,0 +1,82 @@
+#!/usr/bin/python
+
+import os
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.cache import BlobStore, get_file_digest
+
+
+class TestBlobStore(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def _create_file(self, path, contents):
+        self.fs.create_file(path, contents=contents)
+        return path
+
+    def test_stored_file_is_found_by_key(self):
+        # Arrange
+        store = BlobStore("blobs", 100, cache_dir="/cache")
+        self._create_file("/work/archive.zip", "ARCHIVE")
+
+        # Act
+        store.put("org/repo@sha", "/work/archive.zip")
+        stored_path = BlobStore("blobs", 100, cache_dir="/cache").get("org/repo@sha")
+
+        # Assert
+        self.assertEqual(
+            stored_path,
+            "/cache/blobs/{}.blob".format(get_file_digest("/work/archive.zip")),
+        )
+        with open(stored_path) as stream:
+            self.assertEqual(stream.read(), "ARCHIVE")
+
+    def test_same_content_is_stored_once(self):
+        # Arrange
+        store = BlobStore("blobs", 100, cache_dir="/cache")
+        self._create_file("/work/first.zip", "ARCHIVE")
+        self._create_file("/work/second.zip", "ARCHIVE")
+
+        # Act
+        store.put("first", "/work/first.zip")
+        store.put("second", "/work/second.zip")
+
+        # Assert
+        self.assertEqual(store.get("first"), store.get("second"))
+        self.assertEqual(len(os.listdir("/cache/blobs")), 1)
+
+    def test_damaged_file_is_dropped(self):
+        # Arrange
+        store = BlobStore("blobs", 100, cache_dir="/cache")
+        self._create_file("/work/archive.zip", "ARCHIVE")
+        stored_path = store.put("key", "/work/archive.zip")
+        with open(stored_path, "w") as stream:
+            stream.write("DAMAGED")
+
+        # Act
+        result = store.get("key")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(stored_path))
+        self.assertIsNone(store.index.get("key"))
+
+    def test_least_recently_used_files_are_evicted(self):
+        # Arrange
+        store = BlobStore("blobs", 25, cache_dir="/cache")
+        for name in ("first", "second", "third"):
+            self._create_file("/work/" + name, name.upper() * 2)
+        first_path = store.put("first", "/work/first")
+        second_path = store.put("second", "/work/second")
+        os.utime(first_path, (1600000000, 1600000000))
+        os.utime(second_path, (1600000100, 1600000100))
+        store.get("first")
+
+        # Act
+        store.put("third", "/work/third")
+
+        # Assert
+        self.assertIsNotNone(store.get("first"))
+        self.assertIsNone(store.get("second"))
+        self.assertIsNotNone(store.get("third"))
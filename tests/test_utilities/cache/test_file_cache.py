@@ -0,0 +1,101 @@
+#!/usr/bin/python
+
+import os
+from unittest.mock import patch
+
+from freezegun import freeze_time
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.cache import FileCache, get_cache_dir
+from shellfoundry.utilities.cache.file_cache import CACHE_DIR_ENV
+
+
+class TestFileCache(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def test_value_is_persisted_between_instances(self):
+        # Arrange
+        FileCache("test", cache_dir="/cache").set("key", {"value": [1, 2]})
+
+        # Act
+        value = FileCache("test", cache_dir="/cache").get("key")
+
+        # Assert
+        self.assertEqual(value, {"value": [1, 2]})
+        self.assertTrue(os.path.exists("/cache/test.json"))
+
+    def test_missing_key_returns_none(self):
+        # Act
+        value = FileCache("test", cache_dir="/cache").get("key")
+
+        # Assert
+        self.assertIsNone(value)
+
+    def test_expired_value_returns_none(self):
+        # Arrange
+        cache = FileCache("test", cache_dir="/cache")
+        with freeze_time("2020-01-01 10:00:00"):
+            cache.set("key", "value")
+
+        # Act
+        with freeze_time("2020-01-01 10:30:00"):
+            fresh = cache.get("key", ttl=3600)
+        with freeze_time("2020-01-01 11:30:00"):
+            expired = cache.get("key", ttl=3600)
+
+        # Assert
+        self.assertEqual(fresh, "value")
+        self.assertIsNone(expired)
+        self.assertEqual(cache.get("key"), "value")
+
+    def test_broken_cache_file_treated_as_empty(self):
+        # Arrange
+        self.fs.create_file("/cache/test.json", contents="{not a json")
+        cache = FileCache("test", cache_dir="/cache")
+
+        # Act
+        value = cache.get("key")
+        cache.set("key", "value")
+
+        # Assert
+        self.assertIsNone(value)
+        self.assertEqual(FileCache("test", cache_dir="/cache").get("key"), "value")
+
+    def test_returned_value_is_a_copy(self):
+        # Arrange
+        cache = FileCache("test", cache_dir="/cache")
+        cache.set("key", {"params": {}})
+
+        # Act
+        cache.get("key")["params"]["name"] = "changed"
+
+        # Assert
+        self.assertEqual(cache.get("key"), {"params": {}})
+
+    def test_delete_and_clear(self):
+        # Arrange
+        cache = FileCache("test", cache_dir="/cache")
+        cache.set("first", 1)
+        cache.set("second", 2)
+
+        # Act
+        cache.delete("first")
+
+        # Assert
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual(cache.get("second"), 2)
+        cache.clear()
+        self.assertIsNone(cache.get("second"))
+
+    @patch("shellfoundry.utilities.cache.file_cache.click.get_app_dir")
+    def test_cache_dir_defaults_to_app_dir(self, get_app_dir_mock):
+        # Arrange
+        get_app_dir_mock.return_value = "/quali/shellfoundry"
+
+        # Act
+        with patch.dict(os.environ, {CACHE_DIR_ENV: ""}):
+            cache_dir = get_cache_dir()
+
+        # Assert
+        self.assertEqual(cache_dir, "/quali/shellfoundry/cache")
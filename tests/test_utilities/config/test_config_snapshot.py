@@ -0,0 +1,113 @@
+#!/usr/bin/python
+
+import os
+from unittest.mock import patch
+
+import yaml
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.config.config_context import ConfigContext
+from shellfoundry.utilities.config.config_providers import LocalConfigProvider
+from shellfoundry.utilities.config.config_snapshot import load_config
+from shellfoundry.utilities.config_reader import CloudShellConfigReader, Configuration
+
+
+class TestConfigSnapshot(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.config_path = "/quali/shellfoundry/global_config.yml"
+        self.fs.create_file(
+            self.config_path, contents="install:\n  host: remote\n  port: 8029\n"
+        )
+
+    def test_configuration_is_parsed_once(self):
+        # Act
+        with patch(
+            "shellfoundry.utilities.config.config_snapshot.yaml.safe_load",
+            wraps=yaml.safe_load,
+        ) as safe_load:
+            first = load_config(self.config_path)
+            second = load_config(self.config_path)
+
+        # Assert
+        safe_load.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual(first, {"install": {"host": "remote", "port": 8029}})
+
+    def test_changed_configuration_is_parsed_again(self):
+        # Arrange
+        load_config(self.config_path)
+        with open(self.config_path, "w") as stream:
+            stream.write("install:\n  host: other\n")
+
+        # Act
+        config = load_config(self.config_path)
+
+        # Assert
+        self.assertEqual(config, {"install": {"host": "other"}})
+
+    def test_saved_key_is_read_by_all_readers(self):
+        # Arrange
+        reader = Configuration(CloudShellConfigReader())
+        with patch.object(
+            reader.config_provider, "get_config_path", return_value=self.config_path
+        ):
+            os.utime(self.config_path, ns=(0, 0))
+            reader.read()
+            # same size and time, so only the saving invalidates the snapshot
+            ConfigContext(self.config_path).try_save("host", "remot2")
+            os.utime(self.config_path, ns=(0, 0))
+
+            # Act
+            cs_config = reader.read()
+
+        # Assert
+        self.assertEqual(cs_config.host, "remot2")
+        self.assertEqual(cs_config.port, 8029)
+
+    def test_missing_configuration_is_none(self):
+        # Act
+        config = load_config("/missing/global_config.yml")
+
+        # Assert
+        self.assertIsNone(config)
+
+
+class TestConfigPathLookup(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/shell")
+        os.chdir("/shell")
+
+    def test_configuration_path_is_looked_up_once(self):
+        # Arrange
+        self.fs.create_file(
+            "/shell/cloudshell_config.yml", contents="install:\n  host: local\n"
+        )
+
+        # Act
+        with patch.object(
+            LocalConfigProvider,
+            "get_config_path",
+            autospec=True,
+            side_effect=LocalConfigProvider.get_config_path,
+        ) as get_config_path:
+            first = Configuration(CloudShellConfigReader()).read()
+            second = Configuration(CloudShellConfigReader()).read()
+
+        # Assert
+        get_config_path.assert_called_once()
+        self.assertEqual(first.host, "local")
+        self.assertEqual(second.host, "local")
+
+    def test_configuration_created_by_shellfoundry_is_found(self):
+        # Arrange
+        reader = Configuration(CloudShellConfigReader())
+        self.assertEqual(reader.read().host, "localhost")
+        self.fs.create_file("/shell/cloudshell_config.yml", contents="install: {}\n")
+
+        # Act
+        ConfigContext("/shell/cloudshell_config.yml").try_save("host", "local")
+
+        # Assert
+        self.assertEqual(reader.read().host, "local")
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+
+from unittest.mock import patch
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.constants import (
+    METADATA_AUTHOR_FIELD,
+    TEMPLATE_AUTHOR_FIELD,
+    TEMPLATE_BASED_ON,
+)
+from shellfoundry.utilities.modifiers.definition.definition_modification import (
+    DefinitionModification,
+    _write_file,
+)
+
+TOSCA_META = """TOSCA-Meta-File-Version: 1.0
+CSAR-Version: 0.1.0
+Created-By: Anonymous
+Entry-Definitions: shell-definition.yaml
+"""
+
+DEFINITION = """tosca_definitions_version: tosca_simple_yaml_1_0
+
+metadata:
+  template_name: NutShell
+  template_author: Anonymous
+  template_version: 0.1.0
+
+node_types:
+  vendor.switch.NXOS:
+    derived_from: cloudshell.nodes.Switch
+    artifacts:
+      driver:
+        file: NutShellDriver.zip
+        type: tosca.artifacts.File
+"""
+
+
+class TestDefinitionModification(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file("/shell/TOSCA-Metadata/TOSCA.meta", contents=TOSCA_META)
+        self.fs.create_file("/shell/shell-definition.yaml", contents=DEFINITION)
+        self.modificator = DefinitionModification("/shell")
+
+    @staticmethod
+    def _read(path):
+        with open(path) as stream:
+            return stream.read()
+
+    def test_session_parses_and_writes_definition_once(self):
+        # Act
+        with patch(
+            "shellfoundry.utilities.modifiers.definition.definition_modification."
+            "_write_file",
+            wraps=_write_file,
+        ) as write_file, patch.object(
+            self.modificator, "_load_yaml", wraps=self.modificator._load_yaml
+        ) as load_yaml:
+            with self.modificator.session():
+                self.modificator.edit_definition(TEMPLATE_AUTHOR_FIELD, "Author")
+                self.modificator.edit_tosca_meta(METADATA_AUTHOR_FIELD, "Author")
+                self.modificator.add_field_to_definition(
+                    TEMPLATE_BASED_ON, overwrite=True
+                )
+                self.modificator.add_properties(["attr_1", "attr_2"])
+
+        # Assert
+        load_yaml.assert_called_once()
+        self.assertEqual(write_file.call_count, 2)
+        definition = self._read("/shell/shell-definition.yaml")
+        self.assertIn("template_author: Author", definition)
+        self.assertIn("template_based_on: 0.1.0", definition)
+        self.assertIn(
+            "Created-By: Author\n", self._read("/shell/TOSCA-Metadata/TOSCA.meta")
+        )
+
+    def test_added_properties_are_commented_out(self):
+        # Act
+        self.modificator.add_properties(["attr_1", "attr_2"])
+
+        # Assert
+        definition = self._read("/shell/shell-definition.yaml")
+        self.assertIn("#     properties:\n", definition)
+        self.assertIn("#       attr_1:\n", definition)
+        self.assertIn("#       attr_2:\n", definition)
+        self.assertIn("#         type: string\n", definition)
+        self.assertNotIn("&id", definition)
+        self.assertIn("    derived_from: cloudshell.nodes.Switch\n", definition)
+        self.assertIn("    artifacts:\n", definition)
+
+    def test_failed_session_does_not_change_files(self):
+        # Act
+        with self.assertRaises(RuntimeError):
+            with self.modificator.session():
+                self.modificator.edit_definition(TEMPLATE_AUTHOR_FIELD, "Author")
+                self.modificator.edit_tosca_meta(METADATA_AUTHOR_FIELD, "Author")
+                raise RuntimeError()
+
+        # Assert
+        self.assertEqual(self._read("/shell/shell-definition.yaml"), DEFINITION)
+        self.assertEqual(self._read("/shell/TOSCA-Metadata/TOSCA.meta"), TOSCA_META)
+
+    def test_edits_outside_session_are_written_immediately(self):
+        # Act
+        self.modificator.edit_definition(TEMPLATE_AUTHOR_FIELD, "Author")
+        self.modificator.edit_tosca_meta("Shell-Version", "1.0.0")
+
+        # Assert
+        self.assertIn(
+            "template_author: Author", self._read("/shell/shell-definition.yaml")
+        )
+        self.assertTrue(
+            self._read("/shell/TOSCA-Metadata/TOSCA.meta").endswith(
+                "\nShell-Version: 1.0.0"
+            )
+        )
+
+    def test_get_artifacts_files(self):
+        # Act
+        artifacts = self.modificator.get_artifacts_files(["driver", "deployment"])
+
+        # Assert
+        self.assertEqual(artifacts, {"driver": "NutShellDriver.zip"})
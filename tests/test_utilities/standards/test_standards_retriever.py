@@ -4,6 +4,8 @@ from unittest.mock import MagicMock, patch
 from cloudshell.rest.api import FeatureUnavailable
 from pyfakefs import fake_filesystem_unittest
 
+from shellfoundry.models.install_config import InstallConfig
+from shellfoundry.utilities.cache import FileCache
 from shellfoundry.utilities.standards import Standards
 
 
@@ -62,3 +64,64 @@ class TestStandards(fake_filesystem_unittest.TestCase):
 
         # Assert
         self.assertEqual(results, standards)
+
+    def _fetch_with_server(self, standards, host="localhost", **kwargs):
+        cs_client = MagicMock()
+        cs_client.get_installed_standards.return_value = [
+            {"StandardName": "cloudshell_networking_standard", "Versions": ["5.0.0"]}
+        ]
+        cs_config = InstallConfig(
+            host, 9000, "admin", "admin", "Global", "", "true", "", "", ""
+        )
+        with patch(
+            "shellfoundry.utilities.standards.standards_retriever.create_cloudshell_client",  # noqa: E501
+            return_value=cs_client,
+        ), patch(
+            "shellfoundry.utilities.standards.standards_retriever.Configuration"
+        ) as configuration:
+            configuration.return_value.read.return_value = cs_config
+            results = standards.fetch(**kwargs)
+        return results, cs_client
+
+    def test_fetched_standards_are_reused(self):
+        # Arrange
+        cache = FileCache("standards", cache_dir="/cache")
+        self._fetch_with_server(Standards(cache=cache, cache_ttl=3600))
+
+        # Act
+        results, cs_client = self._fetch_with_server(
+            Standards(cache=FileCache("standards", cache_dir="/cache"), cache_ttl=3600)
+        )
+
+        # Assert
+        self.assertEqual(results, {"networking": ["5.0.0"]})
+        cs_client.get_installed_standards.assert_not_called()
+
+    def test_standards_are_cached_per_server(self):
+        # Arrange
+        standards = Standards(
+            cache=FileCache("standards", cache_dir="/cache"), cache_ttl=3600
+        )
+        self._fetch_with_server(standards)
+
+        # Act
+        _, cs_client = self._fetch_with_server(standards, host="remote")
+
+        # Assert
+        cs_client.get_installed_standards.assert_called_once()
+        cache = FileCache("standards", cache_dir="/cache")
+        self.assertIsNotNone(cache.get("localhost:9000/Global"))
+        self.assertIsNotNone(cache.get("remote:9000/Global"))
+
+    def test_refresh_fetches_cached_standards(self):
+        # Arrange
+        standards = Standards(
+            cache=FileCache("standards", cache_dir="/cache"), cache_ttl=3600
+        )
+        self._fetch_with_server(standards)
+
+        # Act
+        _, cs_client = self._fetch_with_server(standards, refresh=True)
+
+        # Assert
+        cs_client.get_installed_standards.assert_called_once()
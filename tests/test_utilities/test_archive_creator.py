@@ -0,0 +1,258 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import zipfile
+from unittest.mock import patch
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities import archive_creator
+from shellfoundry.utilities.archive_creator import ArchiveCreator, ZipArchiveBuilder
+
+
+class TestZipArchiveBuilder(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        for i in range(10):
+            self.fs.create_file(
+                "driver/module_{}.py".format(i), contents="print({})\n".format(i) * 100
+            )
+        self.fs.create_file("driver/images/icon.png", contents="PNG DATA")
+        self.fs.create_file("driver/dependencies/lib.whl", contents="WHEEL DATA")
+        self.fs.create_dir("driver/empty")
+
+    def test_archive_contains_all_members_in_walk_order(self):
+        # Arrange
+        expected_names = []
+        for root, dirs, files in os.walk("driver"):
+            rel_root = os.path.relpath(root, "driver")
+            expected_names.append(rel_root)
+            expected_names.extend(os.path.join(rel_root, name) for name in files)
+
+        # Act
+        archive_path = ZipArchiveBuilder(max_workers=4).make_archive(
+            "dist/driver", "driver"
+        )
+
+        # Assert
+        self.assertEqual(archive_path, "dist/driver.zip")
+        with zipfile.ZipFile(archive_path) as zip_f:
+            self.assertIsNone(zip_f.testzip())
+            self.assertEqual(
+                [info.filename.rstrip("/") for info in zip_f.infolist()],
+                [
+                    os.path.normpath(name).replace(os.sep, "/")
+                    for name in expected_names
+                ],
+            )
+            self.assertEqual(zip_f.read("module_3.py"), b"print(3)\n" * 100)
+            self.assertEqual(
+                zip_f.getinfo("module_3.py").compress_type, zipfile.ZIP_DEFLATED
+            )
+
+    @patch.object(archive_creator, "RAW_WRITE_SUPPORTED", False)
+    def test_members_are_compressed_one_by_one_on_unchecked_python(self):
+        # Act
+        archive_path = ZipArchiveBuilder(compression_level=9).make_archive(
+            "driver.zip", "driver"
+        )
+
+        # Assert
+        with zipfile.ZipFile(archive_path) as zip_f:
+            self.assertIsNone(zip_f.testzip())
+            self.assertEqual(zip_f.read("module_3.py"), b"print(3)\n" * 100)
+            self.assertEqual(
+                zip_f.getinfo("module_3.py").compress_type, zipfile.ZIP_DEFLATED
+            )
+            self.assertEqual(zip_f.read("images/icon.png"), b"PNG DATA")
+
+    def test_parallel_and_one_by_one_compression_make_same_archive(self):
+        # Arrange
+        builder = ZipArchiveBuilder(compression_level=9, reproducible=True)
+        builder.make_archive("parallel.zip", "driver")
+
+        # Act
+        with patch.object(archive_creator, "RAW_WRITE_SUPPORTED", False):
+            builder.make_archive("one_by_one.zip", "driver")
+
+        # Assert
+        with open("parallel.zip", "rb") as parallel:
+            with open("one_by_one.zip", "rb") as one_by_one:
+                self.assertEqual(parallel.read(), one_by_one.read())
+
+    def test_raw_and_public_api_writes_make_same_members(self):
+        # Arrange
+        builder = ZipArchiveBuilder(compression_level=6)
+        builder.make_archive("raw.zip", "driver")
+
+        # Act
+        with patch.object(archive_creator, "RAW_WRITE_SUPPORTED", False):
+            builder.make_archive("public.zip", "driver")
+
+        # Assert
+        self.assertZipMembersEqual("raw.zip", "public.zip")
+
+    @patch.object(zipfile, "ZIP64_LIMIT", 1024)
+    def test_members_past_zip64_limit_get_zip64_headers(self):
+        # Arrange
+        for i in range(3):
+            self.fs.create_file(
+                "driver/random_{}.py".format(i), contents=os.urandom(1024)
+            )
+
+        # Act
+        ZipArchiveBuilder().make_archive("raw.zip", "driver")
+        with patch.object(archive_creator, "RAW_WRITE_SUPPORTED", False):
+            ZipArchiveBuilder().make_archive("public.zip", "driver")
+
+        # Assert
+        self.assertZipMembersEqual("raw.zip", "public.zip")
+        with zipfile.ZipFile("raw.zip") as zip_f:
+            # the last member compressed in parallel
+            info = max(
+                (
+                    info
+                    for info in zip_f.infolist()
+                    if info.compress_type == zipfile.ZIP_DEFLATED
+                ),
+                key=lambda info: info.header_offset,
+            )
+            self.assertGreater(info.header_offset, 1024)
+            zip_f.fp.seek(info.header_offset)
+            header = zip_f.fp.read(zipfile.sizeFileHeader)
+            name_length, extra_length = struct.unpack("<HH", header[-4:])
+            zip_f.fp.seek(name_length, os.SEEK_CUR)
+            extra = zip_f.fp.read(extra_length)
+        # zip64 extra field header id
+        self.assertEqual(extra[:2], b"\x01\x00")
+
+    def assertZipMembersEqual(self, first_path, second_path):  # noqa: N802
+        with zipfile.ZipFile(first_path) as first, zipfile.ZipFile(
+            second_path
+        ) as second:
+            self.assertIsNone(first.testzip())
+            self.assertIsNone(second.testzip())
+            self.assertEqual(first.namelist(), second.namelist())
+            for first_info, second_info in zip(first.infolist(), second.infolist()):
+                self.assertEqual(
+                    (first_info.CRC, first_info.file_size, first_info.compress_type),
+                    (second_info.CRC, second_info.file_size, second_info.compress_type),
+                )
+                if not first_info.is_dir():
+                    self.assertEqual(
+                        first.read(first_info), second.read(second_info)
+                    )
+
+    @patch.object(archive_creator, "MAX_PARALLEL_MEMBER_SIZE", 100)
+    def test_big_members_are_compressed_chunk_by_chunk(self):
+        # Act
+        archive_path = ZipArchiveBuilder(compression_level=1).make_archive(
+            "driver.zip", "driver"
+        )
+
+        # Assert
+        with zipfile.ZipFile(archive_path) as zip_f:
+            self.assertIsNone(zip_f.testzip())
+            self.assertEqual(zip_f.read("module_3.py"), b"print(3)\n" * 100)
+            self.assertEqual(
+                zip_f.getinfo("module_3.py").compress_type, zipfile.ZIP_DEFLATED
+            )
+
+    def test_compressed_files_are_stored(self):
+        # Act
+        archive_path = ZipArchiveBuilder().make_archive("driver.zip", "driver")
+
+        # Assert
+        with zipfile.ZipFile(archive_path) as zip_f:
+            self.assertEqual(
+                zip_f.getinfo("images/icon.png").compress_type, zipfile.ZIP_STORED
+            )
+            self.assertEqual(
+                zip_f.getinfo("dependencies/lib.whl").compress_type, zipfile.ZIP_STORED
+            )
+            self.assertEqual(zip_f.read("dependencies/lib.whl"), b"WHEEL DATA")
+
+    def test_zero_compression_level_stores_all_files(self):
+        # Act
+        archive_path = ZipArchiveBuilder(compression_level=0).make_archive(
+            "driver.zip", "driver"
+        )
+
+        # Assert
+        with zipfile.ZipFile(archive_path) as zip_f:
+            self.assertIsNone(zip_f.testzip())
+            self.assertEqual(
+                {info.compress_type for info in zip_f.infolist()}, {zipfile.ZIP_STORED}
+            )
+
+    def test_higher_compression_level_makes_smaller_archive(self):
+        self.check_compression_levels()
+
+    @patch.object(archive_creator, "RAW_WRITE_SUPPORTED", False)
+    def test_compression_level_is_used_on_unchecked_python(self):
+        self.check_compression_levels()
+
+    def check_compression_levels(self):
+        # Arrange
+        self.fs.create_file(
+            "big/data.txt",
+            contents="".join("line {} of data\n".format(i % 997) for i in range(20000)),
+        )
+
+        # Act
+        fast_path = ZipArchiveBuilder(compression_level=1).make_archive(
+            "fast.zip", "big"
+        )
+        best_path = ZipArchiveBuilder(compression_level=9).make_archive(
+            "best.zip", "big"
+        )
+
+        # Assert
+        self.assertLess(os.path.getsize(best_path), os.path.getsize(fast_path))
+        with zipfile.ZipFile(best_path) as zip_f:
+            self.assertIsNone(zip_f.testzip())
+
+    def test_missing_source_dir_is_not_archived(self):
+        # Act
+        archive_path = ArchiveCreator.make_archive("missing", "zip", "missing_dir")
+
+        # Assert
+        self.assertIsNone(archive_path)
+        self.assertFalse(os.path.exists("missing.zip"))
+
+    def test_reproducible_archives_are_identical(self):
+        # Arrange
+        builder = ZipArchiveBuilder(reproducible=True)
+        builder.make_archive("first.zip", "driver")
+        os.utime("driver/module_1.py", (1600000000, 1600000000))
+        os.chmod("driver/module_2.py", 0o600)
+
+        # Act
+        builder.make_archive("second.zip", "driver")
+
+        # Assert
+        with open("first.zip", "rb") as first, open("second.zip", "rb") as second:
+            self.assertEqual(first.read(), second.read())
+        with zipfile.ZipFile("second.zip") as zip_f:
+            names = [info.filename for info in zip_f.infolist()]
+            info = zip_f.getinfo("module_2.py")
+        self.assertEqual(names[:3], ["./", "module_0.py", "module_1.py"])
+        self.assertEqual(info.date_time, (1980, 1, 1, 0, 0, 0))
+        self.assertEqual(info.external_attr >> 16, 0o100644)
+
+    def test_reproducible_archives_skip_byte_code_and_editor_files(self):
+        # Arrange
+        builder = ZipArchiveBuilder(reproducible=True)
+        builder.make_archive("first.zip", "driver")
+        self.fs.create_file("driver/__pycache__/module_1.cpython-39.pyc")
+        self.fs.create_file("driver/module_2.pyc")
+        self.fs.create_file("driver/.module_3.py.swp")
+
+        # Act
+        builder.make_archive("second.zip", "driver")
+
+        # Assert
+        with open("first.zip", "rb") as first, open("second.zip", "rb") as second:
+            self.assertEqual(first.read(), second.read())
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+from unittest.mock import MagicMock
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.batch_installer import (
+    FAILED,
+    INSTALLED,
+    UP_TO_DATE,
+    BatchShellInstaller,
+    find_shell_paths,
+)
+from shellfoundry.utilities.shell_package_installer import (
+    SHELL_IS_OFFICIAL_FLAG,
+    ShellPackageInstaller,
+)
+
+
+def pack_shell_in_current_dir():
+    shell_name = os.path.basename(os.getcwd()).title().replace("-", "")
+    with open(os.path.join("dist", shell_name + ".zip"), "w") as package_file:
+        package_file.write("PACKAGE " + shell_name)
+
+
+class TestBatchShellInstaller(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        for shell_name in ("nut-shell", "bolt-shell"):
+            self._create_shell(
+                "/work/" + shell_name, shell_name.title().replace("-", "")
+            )
+        self.pack_command_executor = MagicMock()
+        self.pack_command_executor.pack.side_effect = pack_shell_in_current_dir
+        self.mock_client = MagicMock()
+        self.mock_client.get_shell.return_value = {SHELL_IS_OFFICIAL_FLAG: False}
+        self.shell_package_installer = ShellPackageInstaller()
+        self.shell_package_installer.connect = MagicMock(return_value=self.mock_client)
+
+    def _create_shell(self, path, shell_name):
+        self.fs.create_file(
+            path + "/TOSCA-Metadata/TOSCA.meta",
+            contents="Entry-Definitions: shell-definition.yaml",
+        )
+        self.fs.create_file(
+            path + "/shell-definition.yaml",
+            contents="metadata:\n  template_name: {}\n".format(shell_name),
+        )
+        self.fs.create_dir(path + "/dist")
+
+    def test_shells_are_installed_using_one_connection(self):
+        # Arrange
+        installer = BatchShellInstaller(
+            self.pack_command_executor, self.shell_package_installer
+        )
+
+        # Act
+        results = installer.install(["/work/nut-shell", "/work/bolt-shell"])
+
+        # Assert
+        self.shell_package_installer.connect.assert_called_once()
+        self.assertEqual(
+            [(result.shell_name, result.status) for result in results],
+            [("NutShell", INSTALLED), ("BoltShell", INSTALLED)],
+        )
+        self.assertEqual(
+            sorted(c[0][0] for c in self.mock_client.update_shell.call_args_list),
+            [
+                "/work/bolt-shell/dist/BoltShell.zip",
+                "/work/nut-shell/dist/NutShell.zip",
+            ],
+        )
+        self.assertEqual(os.getcwd(), "/")
+
+    def test_already_installed_shells_are_not_uploaded(self):
+        # Arrange
+        installer = BatchShellInstaller(
+            self.pack_command_executor, self.shell_package_installer
+        )
+        installer.install(["/work/nut-shell"])
+        self.shell_package_installer.connect.reset_mock()
+        self.mock_client.update_shell.reset_mock()
+
+        # Act
+        results = installer.install(["/work/nut-shell", "/work/bolt-shell"])
+
+        # Assert
+        self.assertEqual([result.status for result in results], [UP_TO_DATE, INSTALLED])
+        self.mock_client.update_shell.assert_called_once_with(
+            "/work/bolt-shell/dist/BoltShell.zip"
+        )
+
+    def test_failed_shells_do_not_stop_other_installations(self):
+        # Arrange
+        self.mock_client.update_shell.side_effect = [Exception("Upload failed"), None]
+        self._create_shell("/work/bad-shell", "BadShell")
+        self.fs.create_dir("/work/not-a-shell")
+        installer = BatchShellInstaller(
+            self.pack_command_executor, self.shell_package_installer
+        )
+
+        # Act
+        results = installer.install(
+            ["/work/bad-shell", "/work/not-a-shell", "/work/nut-shell"],
+            max_uploads=1,
+        )
+
+        # Assert
+        self.assertEqual(
+            [result.status for result in results], [FAILED, FAILED, INSTALLED]
+        )
+        self.assertEqual(
+            results[0].error,
+            "Failed to update shell. CloudShell responded with: 'Upload failed'",
+        )
+        self.assertEqual(results[1].error, "Not a 2nd generation shell")
+        self.assertFalse(
+            self.shell_package_installer.install_ledger.is_installed(
+                "localhost", 9000, "BadShell", results[0].package_hash
+            )
+        )
+
+    def test_find_shell_paths(self):
+        # Arrange
+        self._create_shell("/work/group/inner-shell", "InnerShell")
+        self._create_shell("/work/.hidden/hidden-shell", "HiddenShell")
+        self._create_shell("/work/nut-shell/dist/packed-shell", "PackedShell")
+
+        # Act
+        shell_paths = find_shell_paths("/work")
+
+        # Assert
+        self.assertEqual(
+            shell_paths,
+            ["/work/bolt-shell", "/work/group/inner-shell", "/work/nut-shell"],
+        )
@@ -4,11 +4,15 @@ import unittest
 from unittest.mock import MagicMock, patch
 from urllib.error import HTTPError
 
+import requests
+
 from shellfoundry.exceptions import FatalError
 from shellfoundry.utilities.cloudshell_api import (
     CloudShellClient,
     create_cloudshell_client,
 )
+from shellfoundry.utilities.cloudshell_api.client_wrapper import LoginFailedError
+from shellfoundry.utilities.retry import RetryPolicy
 
 patch.object = patch.object
 
@@ -111,3 +115,42 @@ class TestClientWrapper(unittest.TestCase):
 
         # Assert
         self.assertEqual(cs_client, api_mock.login())
+
+    @patch(
+        "shellfoundry.utilities.cloudshell_api.client_wrapper.PackagingRestApiClient.login"  # noqa: E501
+    )
+    def test_client_wrapper_retries_connection_errors_by_policy(self, api_mock):
+        # Arrange
+        api_mock.side_effect = [requests.ConnectionError("refused"), api_mock]
+        retry_policy = RetryPolicy(sleep=MagicMock())
+
+        # Act
+        cs_client = CloudShellClient(
+            cs_config=MagicMock(), retry_policy=retry_policy
+        ).create_client(retries=2)
+
+        # Assert
+        self.assertEqual(cs_client, api_mock)
+        retry_policy.sleep.assert_called_once()
+
+    @patch(
+        "shellfoundry.utilities.cloudshell_api.client_wrapper.PackagingRestApiClient.login"  # noqa: E501
+    )
+    def test_client_wrapper_does_not_retry_failed_login(self, api_mock):
+        # Arrange
+        api_mock.side_effect = LoginFailedError("Username or password is incorrect")
+        retry_policy = RetryPolicy(sleep=MagicMock())
+
+        # Act
+        with self.assertRaises(FatalError) as context:
+            CloudShellClient(
+                cs_config=MagicMock(), retry_policy=retry_policy
+            ).create_client()
+
+        # Assert
+        self.assertEqual(
+            context.exception.message,
+            "Login to CloudShell failed. Username or password is incorrect",
+        )
+        api_mock.assert_called_once()
+        retry_policy.sleep.assert_not_called()
@@ -0,0 +1,134 @@
+#!/usr/bin/python
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from cloudshell.rest.exceptions import (
+    FeatureUnavailable,
+    PackagingRestApiError,
+    ShellNotFound,
+)
+
+from shellfoundry.utilities.cloudshell_api import (
+    PackagingRestApiClient,
+    get_progressbar_callback,
+)
+
+API_URL = "http://localhost:9000/API/"
+
+
+class FakeRequest(object):
+    """Request reading the body in chunks like a socket does."""
+
+    def __init__(self, status_code, text=""):
+        self.response = MagicMock(status_code=status_code, text=text)
+        self.requests = []
+
+    def __call__(self, url, data, headers, timeout):
+        chunks = list(iter(lambda: data.read(8192), b""))
+        self.requests.append((url, b"".join(chunks), headers))
+        return self.response
+
+
+class TestPackagingRestApiClient(unittest.TestCase):
+    def setUp(self):
+        # progress bar of the base client reads its data files from disk
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        self.content = b"PK" + b"0123456789" * 10000
+        self.package_path = os.path.join(temp_dir, "NutShell.zip")
+        with open(self.package_path, "wb") as f:
+            f.write(self.content)
+        self.client = PackagingRestApiClient("localhost", "TOKEN", 9000)
+
+    def upload(self, method, http_method, *args, **kwargs):
+        request = FakeRequest(*args)
+        with patch.object(requests, http_method, request):
+            getattr(self.client, method)(self.package_path, **kwargs)
+        return request
+
+    def test_update_shell_streams_package(self):
+        # Arrange
+        progress = []
+
+        # Act
+        request = self.upload(
+            "update_shell",
+            "put",
+            200,
+            progress_callback=lambda sent, total: progress.append((sent, total)),
+        )
+
+        # Assert
+        url, body, headers = request.requests[0]
+        self.assertEqual(url, API_URL + "Shells/NutShell")
+        self.assertEqual(headers["Authorization"], "Basic TOKEN")
+        self.assertTrue(headers["Content-Type"].startswith("multipart/form-data"))
+        self.assertIn(self.content, body)
+        self.assertGreater(len(progress), 1)
+        self.assertEqual(progress[-1], (len(self.content), len(self.content)))
+
+    def test_update_without_progress(self):
+        # Act
+        request = self.upload("update_shell", "put", 200)
+
+        # Assert
+        _, body, _ = request.requests[0]
+        self.assertIn(self.content, body)
+
+    def test_update_missing_shell(self):
+        # Act & Assert
+        with self.assertRaises(ShellNotFound):
+            self.upload("update_shell", "put", 404)
+
+    def test_add_shell(self):
+        # Act
+        request = self.upload("add_shell", "post", 201)
+
+        # Assert
+        url, body, _ = request.requests[0]
+        self.assertEqual(url, API_URL + "Shells")
+        self.assertIn(self.content, body)
+
+    def test_add_shell_failure_contains_server_response(self):
+        # Act
+        with self.assertRaises(PackagingRestApiError) as context:
+            self.upload("add_shell", "post", 400, '{"Message": "Exists"}')
+
+        # Assert
+        self.assertEqual(
+            str(context.exception), 'Can\'t add shell, response: {"Message": "Exists"}'
+        )
+
+    def test_import_package_unavailable(self):
+        # Act & Assert
+        with self.assertRaises(FeatureUnavailable):
+            self.upload("import_package", "post", 404)
+
+
+class TestProgressbarCallback(unittest.TestCase):
+    def test_upload_progress_moves_bar_by_sent_bytes(self):
+        # Arrange
+        pbar = MagicMock(length=1000, pos=0)
+
+        def update(steps):
+            pbar.pos += steps
+
+        pbar.update.side_effect = update
+        progress_callback = get_progressbar_callback(pbar)
+
+        # Act
+        progress_callback(500, 2000)
+        progress_callback(501, 2000)
+        progress_callback(2000, 2000)
+        after_upload = pbar.pos
+        progress_callback(100, 2000)
+
+        # Assert
+        self.assertEqual(pbar.update.call_count, 3)
+        self.assertEqual(after_upload, 1000)
+        self.assertEqual(pbar.pos, 50)
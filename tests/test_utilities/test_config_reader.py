@@ -130,6 +130,24 @@ install:
         # Assert
         self.assertEqual(settings.defaultview, "gen2")
 
+    def test_read_shellfoundry_settings_templates_cache_ttl(self):
+        # Arrange
+        self.fs.create_file(
+            "shell_name/cloudshell_config.yml",
+            contents="""
+install:
+    templates_cache_ttl: '60'
+    """,
+        )
+        os.chdir("shell_name")
+        reader = Configuration(ShellFoundryConfig())
+
+        # Act
+        settings = reader.read()
+
+        # Assert
+        self.assertEqual(settings.templates_cache_ttl, 60)
+
     def test_read_shellfoundry_settings_not_config_file_reads_default(self):
         # Arrange
         reader = Configuration(ShellFoundryConfig())
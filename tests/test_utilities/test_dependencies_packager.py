@@ -1,37 +1,91 @@
 #!/usr/bin/python
 
 import os
+import sys
 from unittest.mock import patch
 
 from pyfakefs import fake_filesystem_unittest
 
+from shellfoundry.utilities.cache import BlobStore, FileCache
 from shellfoundry.utilities.python_dependencies_packager import (
     PythonDependenciesPackager,
 )
+from shellfoundry.utilities.wheelhouse import Wheelhouse
 
 
 class TestPythonDependenciesPackager(fake_filesystem_unittest.TestCase):
     def setUp(self):
         self.setUpPyfakefs()
+        self.requirements_file = "req/requirements.txt"
+        self.pip_calls = []
+
+    def _create_packager(self):
+        return PythonDependenciesPackager(
+            wheelhouse=Wheelhouse(
+                store=BlobStore("wheels", 1024 * 1024, cache_dir="/cache"),
+                index=FileCache("wheelhouse", cache_dir="/cache"),
+            )
+        )
+
+    def _fake_pip(self, args):
+        """Download wheel named after every requirement from the requirements file."""
+        pip_args = args[3:]
+        requirements_path = next(
+            arg.split("=", 1)[1] for arg in pip_args if arg.startswith("--requirement=")
+        )
+        dest = next(
+            arg.split("=", 1)[1] for arg in pip_args if arg.startswith("--dest=")
+        )
+        with open(requirements_path) as stream:
+            requirements = [line.strip() for line in stream if line.strip()]
+        self.pip_calls.append((pip_args, requirements))
+        if not os.path.exists(dest):
+            os.makedirs(dest)
+        for requirement in requirements:
+            if not requirement.startswith("-"):
+                name, _, version = requirement.partition("==")
+                self.fs.create_file(
+                    os.path.join(dest, "{}-{}-py3-none-any.whl".format(name, version)),
+                    contents=requirement,
+                )
+        return 0
+
+    def _save(self, requirements, dest="dst", cs_server_address=None):
+        if requirements is not None:
+            if os.path.exists(self.requirements_file):
+                os.remove(self.requirements_file)
+            self.fs.create_file(self.requirements_file, contents=requirements)
+        with patch(
+            "shellfoundry.utilities.python_dependencies_packager.subprocess.check_call",
+            side_effect=self._fake_pip,
+        ):
+            self._create_packager().save_offline_dependencies(
+                self.requirements_file, dest, cs_server_address
+            )
 
     def test_calls_pip_to_download_dependencies(self):
-        requirements_file = "req/requirements.requirements_file"
-        self.fs.create_file(requirements_file, contents="")
+        # Act
+        self._save("cloudshell-core==1.0.0\n")
 
+        # Assert
+        pip_args, requirements = self.pip_calls[0]
+        self.assertEqual(pip_args[0], "download")
+        self.assertEqual(requirements, ["cloudshell-core==1.0.0"])
+        self.assertEqual(os.listdir("dst"), ["cloudshell-core-1.0.0-py3-none-any.whl"])
+
+    def test_runs_pip_in_separate_process(self):
+        # Act
         with patch(
-            "shellfoundry.utilities.python_dependencies_packager.pip_main"
-        ) as mock_pip:
-            # Act
-            packager = PythonDependenciesPackager()
-            packager.save_offline_dependencies(requirements_file, "dst")
-            self.assertTrue(mock_pip.called, "pip.main should be called")
-            _, call_params, _ = mock_pip.mock_calls[0]
-            main_params = call_params[0]
-            self.assertIn("download", main_params)
-            self.assertIn(
-                "--requirement=req/requirements.requirements_file", main_params
+            "shellfoundry.utilities.python_dependencies_packager.subprocess.check_call",
+            side_effect=self._fake_pip,
+        ) as check_call:
+            self.fs.create_file(self.requirements_file, contents="cloudshell-core\n")
+            self._create_packager().save_offline_dependencies(
+                self.requirements_file, "dst"
             )
-            self.assertIn("--dest=dst", main_params)
+
+        # Assert
+        self.assertEqual(check_call.call_args[0][0][:3], [sys.executable, "-m", "pip"])
 
     def test_calls_pip_to_download_dependencies_with_proxy(self):
         with patch(
@@ -39,51 +93,128 @@ class TestPythonDependenciesPackager(fake_filesystem_unittest.TestCase):
         ) as environ_mock:
             environ_mock.return_value = "HTTP PROXY"
 
-            requirements_file = "req/requirements.requirements_file"
-            self.fs.create_file(requirements_file, contents="")
-
-            with patch(
-                "shellfoundry.utilities.python_dependencies_packager.pip_main"
-            ) as mock_pip:
-                # Act
-                packager = PythonDependenciesPackager()
-                packager.save_offline_dependencies(requirements_file, "dst")
-                self.assertTrue(mock_pip.called, "pip.main should be called")
-                _, call_params, _ = mock_pip.mock_calls[0]
-                main_params = call_params[0]
-                self.assertIn("download", main_params)
-                self.assertIn(
-                    "--requirement=req/requirements.requirements_file", main_params
-                )
-                self.assertIn("--dest=dst", main_params)
-                self.assertIn("--proxy", main_params)
-                self.assertIn("HTTP PROXY", main_params)
+            # Act
+            self._save("cloudshell-core==1.0.0\n")
+
+        # Assert
+        pip_args, _ = self.pip_calls[0]
+        self.assertIn("--proxy", pip_args)
+        self.assertIn("HTTP PROXY", pip_args)
+
+    def test_calls_pip_with_cloudshell_index(self):
+        # Act
+        self._save("cloudshell-core==1.0.0\n", cs_server_address="cs")
+
+        # Assert
+        pip_args, _ = self.pip_calls[0]
+        self.assertIn("--trusted-host=cs", pip_args)
+        self.assertIn("--extra-index-url=http://cs:8036", pip_args)
 
     def test_removed_old_files_before_running(self):
-        requirements_file = "req/requirements.requirements_file"
-        self.fs.create_file(requirements_file, contents="")
         file = "dst/test.txt"
         self.fs.create_file(file, contents="")
         nested_file = "dst/nested/test.txt"
         self.fs.create_file(nested_file, contents="")
 
-        with patch(
-            "shellfoundry.utilities.python_dependencies_packager.pip_main"
-        ) as mock_pip:  # noqa: F841
-            # Act
-            packager = PythonDependenciesPackager()
-            packager.save_offline_dependencies(requirements_file, "dst")
+        # Act
+        self._save("cloudshell-core==1.0.0\n")
 
         self.assertFalse(os.path.exists(file))
         self.assertFalse(os.path.exists(nested_file))
 
     def test_does_nothing_if_requirements_file_does_not_exist(self):
-        requirements_file = "req/requirements.requirements_file"
+        # Act
+        self._save(None)
 
-        with patch(
-            "shellfoundry.utilities.python_dependencies_packager.pip_main"
-        ) as mock_pip:
-            # Act
-            packager = PythonDependenciesPackager()
-            packager.save_offline_dependencies(requirements_file, "dst")
-        mock_pip.main.assert_not_called()
+        # Assert
+        self.assertEqual(self.pip_calls, [])
+
+    def test_requirements_are_resolved_together(self):
+        # Act
+        self._save("requests==2.31.0\nurllib3<2\n")
+
+        # Assert
+        self.assertEqual(
+            [requirements for _, requirements in self.pip_calls],
+            [["requests==2.31.0", "urllib3<2"]],
+        )
+
+    def test_cached_requirements_are_not_downloaded_again(self):
+        # Arrange
+        self._save("cloudshell-core==1.0.0\ncloudshell-shell-core==5.0.0\n")
+        self.pip_calls = []
+
+        # Act
+        self._save(
+            "# same requirements\n"
+            "cloudshell-core==1.0.0\n"
+            "cloudshell-shell-core==5.0.0\n",
+            dest="other",
+        )
+
+        # Assert
+        self.assertEqual(self.pip_calls, [])
+        self.assertEqual(
+            sorted(os.listdir("other")),
+            [
+                "cloudshell-core-1.0.0-py3-none-any.whl",
+                "cloudshell-shell-core-5.0.0-py3-none-any.whl",
+            ],
+        )
+
+    def test_changed_requirements_are_resolved_again_as_whole(self):
+        # Arrange
+        self._save("cloudshell-core==1.0.0\ncloudshell-shell-core==5.0.0\n")
+        self.pip_calls = []
+
+        # Act
+        self._save("cloudshell-core==1.0.0\ncloudshell-shell-core==5.0.1\n")
+
+        # Assert
+        self.assertEqual(
+            [requirements for _, requirements in self.pip_calls],
+            [["cloudshell-core==1.0.0", "cloudshell-shell-core==5.0.1"]],
+        )
+        self.assertEqual(
+            sorted(os.listdir("dst")),
+            [
+                "cloudshell-core-1.0.0-py3-none-any.whl",
+                "cloudshell-shell-core-5.0.1-py3-none-any.whl",
+            ],
+        )
+
+    def test_resolutions_of_other_index_are_not_reused(self):
+        # Arrange
+        self._save("cloudshell-core==1.0.0\n")
+
+        # Act
+        self._save(None, cs_server_address="cs")
+
+        # Assert
+        self.assertEqual(len(self.pip_calls), 2)
+
+    def test_stored_files_are_linked(self):
+        # Act
+        self._save("cloudshell-core==1.0.0\n", dest="first")
+        self._save(None, dest="second")
+
+        # Assert
+        self.assertEqual(len(self.pip_calls), 1)
+        self.assertTrue(
+            os.path.samefile(
+                "first/cloudshell-core-1.0.0-py3-none-any.whl",
+                "second/cloudshell-core-1.0.0-py3-none-any.whl",
+            )
+        )
+
+    def test_nested_requirements_file_is_downloaded_as_is(self):
+        # Arrange
+        self.fs.create_file("req/base.txt", contents="cloudshell-core==1.0.0\n")
+
+        # Act
+        self._save("-r base.txt\n")
+
+        # Assert
+        pip_args, _ = self.pip_calls[0]
+        self.assertIn("--requirement=req/requirements.txt", pip_args)
+        self.assertIn("--dest=dst", pip_args)
@@ -4,9 +4,11 @@ from unittest.mock import MagicMock, patch
 from urllib.error import URLError
 
 from pyfakefs import fake_filesystem_unittest
+from requests_toolbelt import MultipartEncoder
 
 from shellfoundry.models.install_config import InstallConfig
 from shellfoundry.utilities.archive_creator import ArchiveCreator
+from shellfoundry.utilities.cache import BlobStore
 from shellfoundry.utilities.driver_generator import DriverGenerator
 
 from tests.asserts import assertFileDoesNotExist, assertFileExists
@@ -55,7 +57,7 @@ class TestDriverGenerator(fake_filesystem_unittest.TestCase):
 
                 response = MagicMock()
                 response.status_code = 200
-                response.content = file_content
+                response.iter_content.return_value = [file_content]
                 post_mock.return_value = response
 
                 # Act
@@ -72,6 +74,56 @@ class TestDriverGenerator(fake_filesystem_unittest.TestCase):
         self.assertEqual(
             post_mock.call_args[1]["headers"]["Authorization"], "Basic TEST-TOKEN"
         )
+        self.assertTrue(post_mock.call_args[1]["stream"])
+        self.assertIsInstance(post_mock.call_args[1]["data"], MultipartEncoder)
+
+    def test_package_is_posted_as_multipart_file(self):
+        # Arrange
+        self.fs.create_file("nut-shell/dist/NutShell.zip", contents="ZIP")
+        bodies = []
+
+        def post(url, data, headers, stream):
+            bodies.append((headers["Content-Type"], data.read()))
+            return MagicMock(status_code=500)
+
+        # Act
+        with patch("shellfoundry.utilities.driver_generator.post", post):
+            DriverGenerator._post_package(
+                "url", "TOKEN", "NutShell.zip", "nut-shell/dist/NutShell.zip"
+            )
+
+        # Assert
+        content_type, body = bodies[0]
+        self.assertTrue(content_type.startswith("multipart/form-data; boundary="))
+        self.assertIn(
+            b'Content-Disposition: form-data; name="NutShell.zip"; '
+            b'filename="NutShell.zip"\r\n\r\nZIP\r\n',
+            body,
+        )
+
+    def test_package_upload_progress_is_reported(self):
+        # Arrange
+        self.fs.create_file("nut-shell/dist/NutShell.zip", contents="ZIP" * 10000)
+        progress = []
+
+        def post(url, data, headers, stream):
+            while data.read(8192):
+                pass
+            return MagicMock(status_code=500)
+
+        # Act
+        with patch("shellfoundry.utilities.driver_generator.post", post):
+            DriverGenerator._post_package(
+                "url",
+                "TOKEN",
+                "NutShell.zip",
+                "nut-shell/dist/NutShell.zip",
+                lambda sent, total: progress.append((sent, total)),
+            )
+
+        # Assert
+        self.assertGreater(len(progress), 1)
+        self.assertEqual(progress[-1], (30000, 30000))
 
     def test_error_displayed_when_driver_generation_returns_error_code(self):
         self.fs.create_file("nut-shell/dist/NutShell.zip", contents="ZIP")
@@ -115,6 +167,9 @@ class TestDriverGenerator(fake_filesystem_unittest.TestCase):
                     "shellfoundry.utilities.driver_generator.click"
                 ) as click_mock:
                     click_mock.echo = MagicMock()
+                    click_mock.progressbar.return_value.__enter__.return_value = (
+                        MagicMock(length=3, pos=0)
+                    )
 
                     # Act
                     driver_generator.generate_driver(
@@ -184,3 +239,122 @@ class TestDriverGenerator(fake_filesystem_unittest.TestCase):
 
         # Assert
         assertFileDoesNotExist(self, "nut-shell/src/data_model.py")
+
+    def test_data_model_generated_once_for_same_definition(self):
+        # Arrange
+        self.fs.create_file("nut-shell/dist/NutShell.zip", contents="ZIP")
+        self.fs.create_file("nut-shell/shell-definition.yaml", contents="DEFINITION")
+        self.fs.create_file(
+            "nut-shell/temp/data_model.py", contents="python data model content"
+        )
+        ArchiveCreator.make_archive(
+            "nut-shell/temp/data-model", "zip", "nut-shell/temp"
+        )
+        with open("nut-shell/temp/data-model.zip", "rb") as data_model_file:
+            file_content = data_model_file.read()
+
+        standards = MagicMock()
+        standards.fetch.return_value = {"resource": ["1.0.0"]}
+        driver_generator = DriverGenerator(
+            data_models_store=BlobStore("data_models", 1024 * 1024, "/cache"),
+            standards=standards,
+        )
+        config = InstallConfig(
+            "TEST-HOST",
+            9000,
+            "user",
+            "pwd",
+            "Global",
+            "author",
+            "online_mode",
+            "template_location",
+            "github_login",
+            "github_password",
+        )
+        kwargs = {
+            "cloudshell_config": config,
+            "destination_path": "nut-shell/src",
+            "package_full_path": "nut-shell/dist/NutShell.zip",
+            "shell_filename": "NutShell.zip",
+            "shell_name": "NutShell",
+            "definition_path": "nut-shell/shell-definition.yaml",
+        }
+
+        with patch(
+            "shellfoundry.utilities.driver_generator.PackagingRestApiClient.login"
+        ) as mock_rest, patch(
+            "shellfoundry.utilities.driver_generator.post"
+        ) as post_mock:
+            mock_rest.return_value._token = "TEST-TOKEN"
+            post_mock.return_value.status_code = 200
+            post_mock.return_value.iter_content.return_value = [file_content]
+            driver_generator.generate_driver(**kwargs)
+            self.fs.remove_object("nut-shell/src/data_model.py")
+
+            # Act
+            driver_generator.generate_driver(**kwargs)
+
+        # Assert
+        assertFileExists(self, "nut-shell/src/data_model.py")
+        self.assertEqual(post_mock.call_count, 1)
+        self.assertEqual(mock_rest.call_count, 1)
+        standards.fetch.assert_called_with(refresh=True)
+
+    def test_data_model_generated_again_on_refresh(self):
+        # Arrange
+        self.fs.create_file("nut-shell/dist/NutShell.zip", contents="ZIP")
+        self.fs.create_file("nut-shell/shell-definition.yaml", contents="DEFINITION")
+        self.fs.create_file(
+            "nut-shell/temp/data_model.py", contents="python data model content"
+        )
+        ArchiveCreator.make_archive(
+            "nut-shell/temp/data-model", "zip", "nut-shell/temp"
+        )
+        with open("nut-shell/temp/data-model.zip", "rb") as data_model_file:
+            file_content = data_model_file.read()
+
+        standards = MagicMock()
+        standards.fetch.return_value = {"resource": ["1.0.0"]}
+        driver_generator = DriverGenerator(
+            data_models_store=BlobStore("data_models", 1024 * 1024, "/cache"),
+            standards=standards,
+        )
+        config = InstallConfig(
+            "TEST-HOST",
+            9000,
+            "user",
+            "pwd",
+            "Global",
+            "author",
+            "online_mode",
+            "template_location",
+            "github_login",
+            "github_password",
+        )
+        kwargs = {
+            "cloudshell_config": config,
+            "destination_path": "nut-shell/src",
+            "package_full_path": "nut-shell/dist/NutShell.zip",
+            "shell_filename": "NutShell.zip",
+            "shell_name": "NutShell",
+            "definition_path": "nut-shell/shell-definition.yaml",
+        }
+
+        with patch(
+            "shellfoundry.utilities.driver_generator.PackagingRestApiClient.login"
+        ) as mock_rest, patch(
+            "shellfoundry.utilities.driver_generator.post"
+        ) as post_mock:
+            mock_rest.return_value._token = "TEST-TOKEN"
+            post_mock.return_value.status_code = 200
+            post_mock.return_value.iter_content.return_value = [file_content]
+            driver_generator.generate_driver(**kwargs)
+            self.fs.remove_object("nut-shell/src/data_model.py")
+
+            # Act
+            driver_generator.generate_driver(refresh=True, **kwargs)
+
+        # Assert
+        assertFileExists(self, "nut-shell/src/data_model.py")
+        self.assertEqual(post_mock.call_count, 2)
+        self.assertEqual(mock_rest.call_count, 2)
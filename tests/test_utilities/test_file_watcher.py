@@ -0,0 +1,171 @@
+#!/usr/bin/python
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from shellfoundry.utilities.file_watcher import (
+    FileWatcher,
+    InotifyObserver,
+    PollingObserver,
+    create_observer,
+)
+
+WATCHED_PATHS = ("src", "deployments", "shell-definition.yaml")
+
+
+class ObserverTestMixin(object):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.write("src/driver.py", "class Driver(object): pass")
+        self.write("shell-definition.yaml", "tosca_definitions_version: 1")
+        self.observer = self.create_observer()
+        self.addCleanup(self.observer.close)
+
+    def write(self, path, content):
+        full_path = os.path.join(self.root, path)
+        if not os.path.isdir(os.path.dirname(full_path)):
+            os.makedirs(os.path.dirname(full_path))
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def test_no_changes(self):
+        # Act
+        changed = self.observer.read(0.05)
+
+        # Assert
+        self.assertEqual(changed, set())
+
+    def test_modified_file(self):
+        # Arrange
+        self.write("src/driver.py", "class Driver(object): changed = True")
+
+        # Act
+        changed = self.observer.read(1)
+
+        # Assert
+        self.assertEqual(changed, {"src/driver.py"})
+
+    def test_replaced_definition(self):
+        # Arrange
+        self.write("shell-definition.yaml.new", "tosca_definitions_version: 2")
+        os.replace(
+            os.path.join(self.root, "shell-definition.yaml.new"),
+            os.path.join(self.root, "shell-definition.yaml"),
+        )
+
+        # Act
+        changed = self.observer.read(1)
+
+        # Assert
+        self.assertIn("shell-definition.yaml", changed)
+
+    def test_files_of_new_folder(self):
+        # Arrange
+        self.write("deployments/deployment.yaml", "1")
+        self.observer.read(1)
+
+        # Act
+        self.write("deployments/deployment.yaml", "22")
+        changed = self.observer.read(1)
+
+        # Assert
+        self.assertEqual(changed, {"deployments/deployment.yaml"})
+
+    def test_ignored_files(self):
+        # Arrange
+        self.write("src/__pycache__/driver.cpython-311.pyc", "")
+        self.write("src/driver.py~", "")
+        self.write("README.md", "")
+
+        # Act
+        changed = self.observer.read(0.1)
+
+        # Assert
+        self.assertEqual(changed, set())
+
+
+class TestPollingObserver(ObserverTestMixin, unittest.TestCase):
+    def create_observer(self):
+        return PollingObserver(self.root, WATCHED_PATHS, interval=0.01)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+class TestInotifyObserver(ObserverTestMixin, unittest.TestCase):
+    def create_observer(self):
+        return InotifyObserver(self.root, WATCHED_PATHS)
+
+
+class TestFileWatcher(unittest.TestCase):
+    def test_changes_are_collected_until_files_stay_unchanged(self):
+        # Arrange
+        observer = MagicMock()
+        observer.read.side_effect = [{"src/a.py"}, {"src/b.py", "src/a.py"}, set()]
+        watcher = FileWatcher("shell", WATCHED_PATHS, debounce=0.3, observer=observer)
+
+        # Act
+        changed = watcher.wait()
+
+        # Assert
+        self.assertEqual(changed, ["src/a.py", "src/b.py"])
+        observer.read.assert_called_with(0.3)
+
+    def test_nothing_changed_in_time(self):
+        # Arrange
+        observer = MagicMock()
+        observer.read.return_value = set()
+        watcher = FileWatcher("shell", WATCHED_PATHS, observer=observer)
+
+        # Act
+        changed = watcher.wait(timeout=1)
+
+        # Assert
+        self.assertEqual(changed, [])
+        observer.read.assert_called_once_with(1)
+
+    def test_poll_forces_polling_observer(self):
+        # Act
+        observer = create_observer(tempfile.gettempdir(), WATCHED_PATHS, poll=True)
+
+        # Assert
+        self.assertIsInstance(observer, PollingObserver)
+
+
+class TestFileWatcherIgnoreRewrites(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.write("src/driver.py", "class Driver(object): pass")
+        self.write("src/drivermetadata.xml", '<Driver Version="1.0.0" />')
+        self.watcher = FileWatcher(self.root, WATCHED_PATHS, debounce=0.05)
+        self.addCleanup(self.watcher.close)
+
+    def write(self, path, content):
+        full_path = os.path.join(self.root, path)
+        if not os.path.isdir(os.path.dirname(full_path)):
+            os.makedirs(os.path.dirname(full_path))
+        with open(full_path, "w") as f:
+            f.write(content)
+
+    def test_restored_file_is_ignored(self):
+        # Act
+        with self.watcher.ignore_rewrites(["src/drivermetadata.xml"]):
+            self.write("src/drivermetadata.xml", '<Driver Version="1.0.0.1" />')
+            self.write("src/drivermetadata.xml", '<Driver Version="1.0.0" />')
+
+        # Assert
+        self.assertEqual(self.watcher.wait(0.1), [])
+
+    def test_changes_made_meanwhile_are_kept(self):
+        # Act
+        with self.watcher.ignore_rewrites(["src/drivermetadata.xml"]):
+            self.write("src/driver.py", "class Driver(object): changed = True")
+            self.write("src/drivermetadata.xml", '<Driver Version="2.0.0" />')
+
+        # Assert
+        self.assertEqual(
+            self.watcher.wait(0.1), ["src/driver.py", "src/drivermetadata.xml"]
+        )
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+import unittest
+
+from shellfoundry.utilities.http_sessions import close_sessions, get_session
+
+
+class TestHttpSessions(unittest.TestCase):
+    def tearDown(self):
+        close_sessions()
+
+    def test_same_session_for_same_host(self):
+        # Act
+        first = get_session("https://raw.github.com/QualiSystems/first/master/a")
+        second = get_session("https://raw.github.com/QualiSystems/second/1.0/b")
+
+        # Assert
+        self.assertIs(first, second)
+
+    def test_different_sessions_for_different_hosts(self):
+        # Act
+        raw = get_session("https://raw.github.com/QualiSystems/repo")
+        api = get_session("https://api.github.com/repos/QualiSystems/repo")
+
+        # Assert
+        self.assertIsNot(raw, api)
+
+    def test_session_without_retries(self):
+        # Act
+        session = get_session("https://api.github.com", retries=False)
+
+        # Assert
+        self.assertIsNot(session, get_session("https://api.github.com"))
+        self.assertEqual(
+            session.get_adapter("https://api.github.com").max_retries.total, 0
+        )
+
+    def test_closed_sessions_are_recreated(self):
+        # Arrange
+        session = get_session("https://api.github.com")
+
+        # Act
+        close_sessions()
+
+        # Assert
+        self.assertIsNot(get_session("https://api.github.com"), session)
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.install_ledger import InstallLedger
+
+
+class TestInstallLedger(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file("dist/NutShell.zip", contents="PACKAGE")
+        self.ledger = InstallLedger(FileCache("install_ledger", cache_dir="/cache"))
+
+    def test_package_is_installed_only_into_recorded_server(self):
+        # Arrange
+        package_hash = InstallLedger.get_package_hash("dist/NutShell.zip")
+
+        # Act
+        self.ledger.record("localhost", 9000, "NutShell", package_hash)
+
+        # Assert
+        self.assertTrue(
+            self.ledger.is_installed("localhost", 9000, "NutShell", package_hash)
+        )
+        self.assertFalse(
+            self.ledger.is_installed("localhost", 9001, "NutShell", package_hash)
+        )
+        self.assertFalse(
+            self.ledger.is_installed("remote", 9000, "NutShell", package_hash)
+        )
+        self.assertFalse(
+            self.ledger.is_installed("localhost", 9000, "OtherShell", package_hash)
+        )
+
+    def test_ledger_is_persisted(self):
+        # Arrange
+        package_hash = InstallLedger.get_package_hash("dist/NutShell.zip")
+        self.ledger.record("localhost", 9000, "NutShell", package_hash)
+
+        # Act
+        ledger = InstallLedger(FileCache("install_ledger", cache_dir="/cache"))
+
+        # Assert
+        self.assertTrue(
+            ledger.is_installed("localhost", 9000, "NutShell", package_hash)
+        )
+
+    def test_forgotten_shell_is_not_installed(self):
+        # Arrange
+        package_hash = InstallLedger.get_package_hash("dist/NutShell.zip")
+        self.ledger.record("localhost", 9000, "NutShell", package_hash)
+
+        # Act
+        self.ledger.forget("localhost", 9000, "NutShell")
+
+        # Assert
+        self.assertFalse(
+            self.ledger.is_installed("localhost", 9000, "NutShell", package_hash)
+        )
+
+    def test_missing_package_is_never_installed(self):
+        # Act
+        package_hash = InstallLedger.get_package_hash("dist/Missing.zip")
+        self.ledger.record("localhost", 9000, "Missing", package_hash)
+
+        # Assert
+        self.assertIsNone(package_hash)
+        self.assertFalse(
+            self.ledger.is_installed("localhost", 9000, "Missing", package_hash)
+        )
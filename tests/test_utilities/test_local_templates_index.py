@@ -0,0 +1,126 @@
+#!/usr/bin/python
+
+import json
+import os
+from unittest.mock import patch
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.local_templates_index import LocalTemplatesIndex
+
+DEFINITION = """tosca_definitions_version: tosca_simple_yaml_1_0
+imports:
+  - cloudshell_standard: cloudshell_resource_standard_2_0_3.yaml
+"""
+
+
+class TestLocalTemplatesIndex(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.cache = FileCache("local_templates", cache_dir="/cache")
+        self._create_template("/templates/gen1", {"template_name": "gen1/resource"})
+        self._create_template(
+            "/templates/resource/2.0.3", {"template_name": "gen2/resource"}
+        )
+        self.fs.create_file(
+            "/templates/resource/2.0.3/{{cookiecutter.project_slug}}/"
+            "shell-definition.yaml",
+            contents=DEFINITION,
+        )
+
+    def _create_template(self, path, data):
+        self.fs.create_file(
+            os.path.join(path, "cookiecutter.json"), contents=json.dumps(data)
+        )
+
+    def _scan(self):
+        return sorted(
+            (root, data["template_name"], version)
+            for root, data, version in LocalTemplatesIndex(self.cache).scan(
+                "/templates"
+            )
+        )
+
+    def test_templates_are_found(self):
+        # Arrange
+        self._create_template("/templates/.git/hooks", {"template_name": "hidden"})
+        self._create_template(
+            "/templates/gen1/nested", {"template_name": "gen1/nested"}
+        )
+
+        # Act
+        templates = self._scan()
+
+        # Assert
+        self.assertEqual(
+            templates,
+            [
+                ("/templates/gen1", "gen1/resource", "0.0.1"),
+                ("/templates/resource/2.0.3", "gen2/resource", "2.0.3"),
+            ],
+        )
+
+    def test_unchanged_templates_are_not_read_again(self):
+        # Arrange
+        self._scan()
+
+        # Act
+        with patch.object(
+            LocalTemplatesIndex, "_read_template", side_effect=AssertionError
+        ), patch("os.scandir", side_effect=AssertionError):
+            templates = self._scan()
+
+        # Assert
+        self.assertEqual(len(templates), 2)
+
+    def test_added_template_is_found(self):
+        # Arrange
+        self._scan()
+        os.utime("/templates", ns=(1, 1))
+        self._create_template("/templates/gen1-new", {"template_name": "gen1/new"})
+
+        # Act
+        with patch.object(
+            LocalTemplatesIndex,
+            "_read_template",
+            wraps=LocalTemplatesIndex._read_template,
+        ) as read_template:
+            templates = self._scan()
+
+        # Assert
+        read_template.assert_called_once_with("/templates/gen1-new")
+        self.assertIn(("/templates/gen1-new", "gen1/new", "0.0.1"), templates)
+
+    def test_template_edited_in_place_is_read_again(self):
+        # Arrange
+        self._scan()
+        definition_path = (
+            "/templates/resource/2.0.3/{{cookiecutter.project_slug}}/"
+            "shell-definition.yaml"
+        )
+        with open(definition_path, "w") as stream:
+            stream.write(DEFINITION.replace("2_0_3", "2_1_0"))
+        os.utime(definition_path, ns=(1, 1))
+
+        # Act
+        templates = self._scan()
+
+        # Assert
+        self.assertIn(
+            ("/templates/resource/2.0.3", "gen2/resource", "2.1.0"), templates
+        )
+
+    def test_removed_template_is_dropped(self):
+        # Arrange
+        self._scan()
+        self.fs.remove_object("/templates/gen1/cookiecutter.json")
+        os.utime("/templates/gen1", ns=(1, 1))
+
+        # Act
+        templates = self._scan()
+
+        # Assert
+        self.assertEqual(
+            templates, [("/templates/resource/2.0.3", "gen2/resource", "2.0.3")]
+        )
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+
+import os
+from unittest.mock import patch
+
+from pyfakefs import fake_filesystem_unittest
+
+from shellfoundry.utilities.pack_manifest import PackManifest
+
+
+class TestPackManifest(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def test_file_hash_reused_while_file_not_changed(self):
+        # Arrange
+        self.fs.create_file("src/driver.py", contents="DRIVER")
+        os.utime("src/driver.py", (1000, 1000))
+        manifest = PackManifest("dist")
+        fingerprint = manifest.fingerprint_file("src/driver.py")
+        manifest.save()
+
+        # Act
+        with patch.object(PackManifest, "_hash_file") as hash_file_mock:
+            reused = PackManifest("dist").fingerprint_file("src/driver.py")
+
+        # Assert
+        hash_file_mock.assert_not_called()
+        self.assertEqual(reused, fingerprint)
+
+    def test_recently_modified_file_is_always_hashed(self):
+        # Arrange
+        self.fs.create_file("src/driver.py", contents="DRIVER")
+        manifest = PackManifest("dist")
+        manifest.fingerprint_file("src/driver.py")
+
+        # Act
+        with patch.object(
+            PackManifest, "_hash_file", return_value="hash"
+        ) as hash_file_mock:
+            manifest.fingerprint_file("src/driver.py")
+
+        # Assert
+        hash_file_mock.assert_called_once()
+
+    def test_dir_fingerprint_depends_on_names_and_content(self):
+        # Arrange
+        self.fs.create_file("src/driver.py", contents="DRIVER")
+        manifest = PackManifest("dist")
+        original = manifest.fingerprint_dir("src")
+
+        # Act
+        os.rename("src/driver.py", "src/main.py")
+        renamed = manifest.fingerprint_dir("src")
+        os.makedirs("src/empty")
+        with_empty_dir = manifest.fingerprint_dir("src")
+
+        # Assert
+        self.assertEqual(len({original, renamed, with_empty_dir}), 3)
+
+    def test_archive_returned_only_for_same_fingerprint(self):
+        # Arrange
+        manifest = PackManifest("dist")
+        self.fs.create_file(manifest.get_archive_path("Driver.zip"))
+        manifest.set_archive("Driver.zip", "first")
+
+        # Act & Assert
+        self.assertEqual(
+            manifest.get_archive("Driver.zip", "first"),
+            os.path.join("dist", ".pack", "Driver.zip"),
+        )
+        self.assertIsNone(manifest.get_archive("Driver.zip", "second"))
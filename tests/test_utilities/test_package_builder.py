@@ -6,7 +6,9 @@ from unittest.mock import MagicMock, patch
 
 from pyfakefs import fake_filesystem_unittest
 
+from shellfoundry.utilities.archive_creator import ZipArchiveBuilder
 from shellfoundry.utilities.package_builder import PackageBuilder
+from shellfoundry.utilities.version_utilities import DriverVersionContentBased
 
 from tests.asserts import assertFileDoesNotExist, assertFileExists
 
@@ -450,6 +452,74 @@ class TestPackageBuilder(fake_filesystem_unittest.TestCase):
             "aws/amazon_web_services/src/drivermetadata.xml", "1.2.3"
         )
 
+    def _create_reproducible_shell(self):
+        self.fs.create_file(
+            "work/aws/amazon_web_services/datamodel/metadata.xml", contents=""
+        )
+        self.fs.create_file(
+            "work/aws/amazon_web_services/datamodel/datamodel.xml", contents=""
+        )
+        self.fs.create_file(
+            "work/aws/amazon_web_services/src/driver.py", contents="DRIVER"
+        )
+        self.fs.create_file(
+            "work/aws/amazon_web_services/src/drivermetadata.xml",
+            contents='<Driver Description="CloudShell shell" '
+            'MainClass="driver.ImplementingDiscoveryDriver" '
+            'Name="ImplementingDiscoveryDriver" Version="1.2.*">'
+            "</Driver>",
+        )
+        os.chdir("work")
+        return PackageBuilder(
+            DriverVersionContentBased(), ZipArchiveBuilder(reproducible=True)
+        )
+
+    def test_reproducible_package_is_identical_for_the_same_sources(self):
+        builder = self._create_reproducible_shell()
+        package_path = "aws/amazon_web_services/dist/aws.zip"
+        with patch("click.echo"):
+            builder.build_package("aws/amazon_web_services", "aws", "AwsDriver")
+        with open(package_path, "rb") as package_file:
+            first_package = package_file.read()
+        os.utime("aws/amazon_web_services/src/driver.py", (1600000000, 1600000000))
+
+        # Act
+        with patch("click.echo"):
+            builder.build_package("aws/amazon_web_services", "aws", "AwsDriver")
+
+        # Assert
+        with open(package_path, "rb") as package_file:
+            self.assertEqual(package_file.read(), first_package)
+        TestPackageBuilder.unzip(package_path, "aws/package")
+        TestPackageBuilder.unzip(
+            "aws/package/Resource Drivers - Python/AwsDriver.zip", "aws/driver"
+        )
+        version = self._get_driver_version_from_file("aws/driver/drivermetadata.xml")
+        self.assertRegex(version, r"^1\.2\.\d+\.\d+$")
+        self._assert_driver_version_equals(
+            "aws/amazon_web_services/src/drivermetadata.xml", "1.2.*"
+        )
+
+    def test_reproducible_package_ignores_byte_code(self):
+        builder = self._create_reproducible_shell()
+        package_path = "aws/amazon_web_services/dist/aws.zip"
+        with patch("click.echo"):
+            builder.build_package("aws/amazon_web_services", "aws", "AwsDriver")
+        with open(package_path, "rb") as package_file:
+            first_package = package_file.read()
+        self.fs.create_file(
+            "aws/amazon_web_services/src/__pycache__/driver.cpython-39.pyc",
+            contents="BYTE CODE",
+        )
+
+        # Act
+        with patch("click.echo"):
+            builder.build_package("aws/amazon_web_services", "aws", "AwsDriver")
+
+        # Assert
+        with open(package_path, "rb") as package_file:
+            self.assertEqual(package_file.read(), first_package)
+
     @staticmethod
     def unzip(source_filename, dest_dir):
         if not os.path.exists(dest_dir):
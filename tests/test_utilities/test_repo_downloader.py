@@ -1,12 +1,29 @@
 #!/usr/bin/python
+import io
+import json
 import os
+import shutil
+import socket
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import MagicMock, patch
 
 import httpretty
+import requests
 from pyfakefs import fake_filesystem_unittest
+from urllib3.exceptions import ProtocolError
 
+from shellfoundry.exceptions import VersionRequestException
+from shellfoundry.utilities import repository_downloader
+from shellfoundry.utilities.cache import BlobStore, FileCache
+from shellfoundry.utilities.constants import RETRY_DEADLINE
+from shellfoundry.utilities.http_sessions import close_sessions
 from shellfoundry.utilities.repository_downloader import (
+    MAX_RESUME_ATTEMPTS,
     DownloadedRepoExtractor,
     RepositoryDownloader,
+    is_template_member,
 )
 
 
@@ -103,10 +120,9 @@ class TestRepositoryDownloader(fake_filesystem_unittest.TestCase):
             super().__init__()
             self.fs = fs
 
-        def extract_to_folder(self, repo_link, folder):
+        def extract_to_folder(self, repo_link, folder, include=None):
             files = []
-            with open(repo_link) as f:
-                content = f.read().replace("\n", "")
+            content = repo_link.read().decode().replace("\n", "")
 
             for file in content.split(","):
                 if file.endswith("/"):
@@ -116,3 +132,528 @@ class TestRepositoryDownloader(fake_filesystem_unittest.TestCase):
                 files.append(file)
 
             return files
+
+
+class TestRepositoryDownloaderArchiveStore(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/work")
+        self.commit = "a" * 40
+        self.commit_response = MagicMock(status_code=200)
+        self.commit_response.text = self.commit
+        self.commit_response.headers = {"ETag": '"c1"'}
+        session_patcher = patch(
+            "shellfoundry.utilities.repository_downloader.get_session"
+        )
+        self.get_session = session_patcher.start()
+        self.get_session.return_value.get.return_value = self.commit_response
+        self.addCleanup(session_patcher.stop)
+        self.downloader = RepositoryDownloader(
+            archive_store=BlobStore("archives", 1024 * 1024, cache_dir="/cache"),
+            commits_cache=FileCache("commits", cache_dir="/cache"),
+        )
+        self.downloader.download_to_stream = MagicMock(
+            side_effect=self._download_to_stream
+        )
+
+    def _download_to_stream(self, url, stream, progress_callback=None, validator=None):
+        root_dir = "org-repo-{}/".format(self.commit[:7])
+        with zipfile.ZipFile(stream, "w") as zip_f:
+            zip_f.writestr(root_dir, b"")
+            for name in (
+                "README.md",
+                "cookiecutter.json",
+                "docs/index.md",
+                "hooks/post_gen_project.py",
+                "tests/test_driver.py",
+                "{{cookiecutter.project_slug}}/shell.txt",
+            ):
+                zip_f.writestr(root_dir + name, name.encode())
+
+    def _download_template(self, target_dir, include=None):
+        self.fs.create_dir(target_dir)
+        return self.downloader.download_template(
+            target_dir, "https://github.com/org/repo", "master", include=include
+        )
+
+    def test_archive_of_the_same_commit_is_downloaded_once(self):
+        # Act
+        first_path = self._download_template("/work/first")
+        second_path = self._download_template("/work/second")
+
+        # Assert
+        self.downloader.download_to_stream.assert_called_once()
+        self.assertEqual(
+            self.downloader.download_to_stream.call_args[0][0],
+            "https://api.github.com/repos/org/repo/zipball/master",
+        )
+        self.get_session.return_value.get.assert_called_once_with(
+            "https://api.github.com/repos/org/repo/commits/master",
+            headers={"Accept": "application/vnd.github.sha"},
+            timeout=15,
+        )
+        self.assertEqual(first_path, "/work/first/org-repo-aaaaaaa/")
+        self.assertEqual(second_path, "/work/second/org-repo-aaaaaaa/")
+        with open(os.path.join(second_path, "cookiecutter.json")) as stream:
+            self.assertEqual(stream.read(), "cookiecutter.json")
+        self.assertEqual(os.listdir("/work/first"), ["org-repo-aaaaaaa"])
+        self.assertEqual(os.listdir("/work/second"), ["org-repo-aaaaaaa"])
+
+    @patch.object(repository_downloader, "COMMITS_CACHE_TTL", 0)
+    def test_archive_is_downloaded_when_ref_points_to_new_commit(self):
+        # Arrange
+        self._download_template("/work/first")
+        self.commit_response.text = "b" * 40
+
+        # Act
+        self._download_template("/work/second")
+
+        # Assert
+        self.assertEqual(self.downloader.download_to_stream.call_count, 2)
+
+    @patch.object(repository_downloader, "COMMITS_CACHE_TTL", 0)
+    def test_expired_commit_is_revalidated_by_etag(self):
+        # Arrange
+        self._download_template("/work/first")
+        self.commit_response.status_code = 304
+        self.commit_response.text = ""
+
+        # Act
+        second_path = self._download_template("/work/second")
+
+        # Assert
+        self.downloader.download_to_stream.assert_called_once()
+        self.assertEqual(
+            self.get_session.return_value.get.call_args[1]["headers"],
+            {"Accept": "application/vnd.github.sha", "If-None-Match": '"c1"'},
+        )
+        self.assertEqual(second_path, "/work/second/org-repo-aaaaaaa/")
+
+    @patch.object(repository_downloader, "COMMITS_CACHE_TTL", 0)
+    def test_last_known_commit_is_used_when_rate_limit_is_exceeded(self):
+        # Arrange
+        self._download_template("/work/first")
+        self.commit_response.status_code = 403
+        self.commit_response.text = '{"message": "API rate limit exceeded"}'
+
+        # Act
+        second_path = self._download_template("/work/second")
+
+        # Assert
+        self.downloader.download_to_stream.assert_called_once()
+        self.assertEqual(second_path, "/work/second/org-repo-aaaaaaa/")
+
+    def test_archive_is_downloaded_when_commit_is_unknown(self):
+        # Arrange
+        self.get_session.return_value.get.side_effect = requests.ConnectionError()
+
+        # Act
+        self._download_template("/work/first")
+        self._download_template("/work/second")
+
+        # Assert
+        self.assertEqual(self.downloader.download_to_stream.call_count, 2)
+        self.assertFalse(os.path.exists("/cache/archives"))
+
+    def test_archive_links_of_extended_shells_are_stored(self):
+        # Arrange
+        url = "https://github.com/org/repo/archive/1.0.0.zip"
+        with self.downloader.open_archive(url):
+            pass
+
+        # Act
+        with self.downloader.open_archive(url) as archive:
+            is_zip = zipfile.is_zipfile(archive)
+
+        # Assert
+        self.downloader.download_to_stream.assert_called_once()
+        self.assertTrue(is_zip)
+        self.assertEqual(os.listdir("/work"), [])
+
+    def test_only_template_members_are_extracted(self):
+        # Act
+        repo_path = self._download_template("/work/first", include=is_template_member)
+
+        # Assert
+        extracted = sorted(
+            os.path.relpath(os.path.join(root, name), repo_path)
+            for root, _, files in os.walk(repo_path)
+            for name in files
+        )
+        self.assertEqual(
+            extracted,
+            [
+                "cookiecutter.json",
+                "hooks/post_gen_project.py",
+                "{{cookiecutter.project_slug}}/shell.txt",
+            ],
+        )
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, content, total=None, drop_after=None, etag=None):
+        self.status_code = status_code
+        self.headers = {"Content-Length": str(total or len(content))}
+        if etag:
+            self.headers["ETag"] = etag
+        self._content = content
+        self._drop_after = drop_after
+        self._position = 0
+        self.raw = self
+
+    def read(self, amount, decode_content=False):
+        if self._drop_after is not None and self._position >= self._drop_after:
+            raise ProtocolError("Connection broken")
+        end = self._position + amount
+        if self._drop_after is not None:
+            end = min(end, self._drop_after)
+        chunk = self._content[self._position : end]
+        self._position += len(chunk)
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class TestRepositoryDownloaderDownloadFile(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir("/work")
+        self.content = b"0123456789" * 10000
+        session_patcher = patch(
+            "shellfoundry.utilities.repository_downloader.get_session"
+        )
+        self.session_get = session_patcher.start().return_value.get
+        self.addCleanup(session_patcher.stop)
+        self.downloader = RepositoryDownloader(read_timeout=30)
+        self.downloader.retry_policy.sleep = MagicMock()
+        self.url = "https://github.com/org/repo/archive/1.0.0.zip"
+
+    def test_dropped_download_is_resumed(self):
+        # Arrange
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=40000, etag='"v1"'),
+            FakeResponse(206, self.content[40000:], etag='"v1"'),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        self.assertEqual(path, "/work/1.0.0.zip")
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(os.listdir("/work"), ["1.0.0.zip"])
+        self.assertEqual(
+            self.session_get.call_args_list[1][1]["headers"],
+            {
+                "Accept-Encoding": "identity",
+                "Range": "bytes=40000-",
+                "If-Range": '"v1"',
+            },
+        )
+        self.assertEqual(self.session_get.call_args[1]["timeout"], (15, 30))
+
+    def test_download_is_restarted_if_file_has_changed(self):
+        # Arrange
+        new_content = b"9876543210" * 12000
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=40000, etag='"v1"'),
+            # If-Range doesn't match, the new version is sent as a whole
+            FakeResponse(200, new_content, drop_after=50000, etag='"v2"'),
+            FakeResponse(206, new_content[50000:], etag='"v2"'),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), new_content)
+        self.assertEqual(
+            self.session_get.call_args_list[1][1]["headers"]["If-Range"], '"v1"'
+        )
+        self.assertEqual(
+            self.session_get.call_args_list[2][1]["headers"]["If-Range"], '"v2"'
+        )
+
+    def test_download_without_validator_is_not_resumed(self):
+        # Arrange
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=40000),
+            FakeResponse(200, self.content),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(
+            self.session_get.call_args_list[1][1]["headers"],
+            {"Accept-Encoding": "identity"},
+        )
+
+    def test_download_is_restarted_if_range_is_not_supported(self):
+        # Arrange
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=40000, etag='"v1"'),
+            FakeResponse(200, self.content, etag='"v1"'),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+
+    def test_interrupted_download_is_resumed_by_the_next_run(self):
+        # Arrange
+        self.downloader.retry_policy.attempts = 1
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=40000, etag='"v1"'),
+            FakeResponse(206, self.content[40000:], etag='"v1"'),
+        ]
+        with self.assertRaises(VersionRequestException):
+            self.downloader.download_file(self.url, "/work")
+        self.assertEqual(
+            sorted(os.listdir("/work")), ["1.0.0.zip.part", "1.0.0.zip.part.json"]
+        )
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(os.listdir("/work"), ["1.0.0.zip"])
+        self.assertEqual(
+            self.session_get.call_args_list[1][1]["headers"],
+            {
+                "Accept-Encoding": "identity",
+                "Range": "bytes=40000-",
+                "If-Range": '"v1"',
+            },
+        )
+
+    def test_part_without_validator_is_downloaded_again(self):
+        # Arrange
+        self.fs.create_file("/work/1.0.0.zip.part", contents=b"stale")
+        self.session_get.return_value = FakeResponse(200, self.content, etag='"v1"')
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(
+            self.session_get.call_args[1]["headers"],
+            {"Accept-Encoding": "identity"},
+        )
+
+    def test_unsatisfiable_range_restarts_download(self):
+        # Arrange
+        self.fs.create_file("/work/1.0.0.zip.part", contents=self.content + b"tail")
+        self.fs.create_file(
+            "/work/1.0.0.zip.part.json",
+            contents=json.dumps({"url": self.url, "value": '"v1"'}),
+        )
+        self.session_get.side_effect = [
+            FakeResponse(416, b""),
+            FakeResponse(200, self.content, etag='"v1"'),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(
+            self.session_get.call_args_list[0][1]["headers"]["Range"],
+            "bytes={}-".format(len(self.content) + 4),
+        )
+        self.assertNotIn("Range", self.session_get.call_args_list[1][1]["headers"])
+
+    def test_progress_is_reported(self):
+        # Arrange
+        self.session_get.return_value = FakeResponse(200, self.content)
+        progress = []
+
+        # Act
+        self.downloader.download_file(
+            self.url,
+            "/work",
+            lambda downloaded, total, speed: progress.append((downloaded, total)),
+        )
+
+        # Assert
+        self.assertEqual(progress[-1], (len(self.content), len(self.content)))
+        self.assertEqual(
+            [downloaded for downloaded, _ in progress],
+            sorted(downloaded for downloaded, _ in progress),
+        )
+
+    def test_download_fails_after_all_resume_attempts(self):
+        # Arrange
+        self.session_get.side_effect = requests.ConnectionError("Proxy error")
+
+        # Act
+        with self.assertRaises(VersionRequestException) as context:
+            self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        self.assertEqual(self.session_get.call_count, 6)
+        self.assertIn("Proxy error", str(context.exception))
+        self.assertEqual(os.listdir("/work"), [])
+
+    def test_unavailable_server_is_retried(self):
+        # Arrange
+        self.session_get.side_effect = [
+            FakeResponse(503, b"Service Unavailable"),
+            FakeResponse(429, b"Too Many Requests"),
+            FakeResponse(200, self.content),
+        ]
+
+        # Act
+        path = self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        with open(path, "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+        self.assertEqual(self.session_get.call_count, 3)
+
+    def test_missing_file_is_not_retried(self):
+        # Arrange
+        self.session_get.return_value = FakeResponse(404, b"Not Found")
+
+        # Act
+        with self.assertRaises(VersionRequestException) as context:
+            self.downloader.download_file(self.url, "/work")
+
+        # Assert
+        self.session_get.assert_called_once()
+        self.assertIn("Unexpected response status 404", str(context.exception))
+
+
+class TestRepositoryDownloaderOpenArchive(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_f:
+            zip_f.writestr("shell/shell-definition.yaml", b"x" * 1024)
+            zip_f.writestr("shell/src/driver.py", os.urandom(20000))
+        self.content = buffer.getvalue()
+        session_patcher = patch(
+            "shellfoundry.utilities.repository_downloader.get_session"
+        )
+        self.session_get = session_patcher.start().return_value.get
+        self.session_get.return_value = FakeResponse(200, self.content)
+        self.addCleanup(session_patcher.stop)
+        self.downloader = RepositoryDownloader(
+            archive_store=BlobStore("archives", 1024 * 1024, cache_dir=cache_dir),
+            read_timeout=30,
+        )
+        self.downloader.retry_policy.attempts = 1
+
+    def _read_downloaded_member(self):
+        with self.downloader.open_archive("https://example.com/shell.zip") as archive:
+            with zipfile.ZipFile(archive) as zip_f:
+                return zip_f.read("shell/shell-definition.yaml")
+
+    def test_download_kept_in_memory_is_readable(self):
+        self.assertEqual(self._read_downloaded_member(), b"x" * 1024)
+
+    @patch.object(repository_downloader, "SPOOL_MAX_SIZE", 1)
+    def test_download_spooled_to_disk_is_readable(self):
+        self.assertEqual(self._read_downloaded_member(), b"x" * 1024)
+
+    @patch.object(repository_downloader, "SPOOL_MAX_SIZE", 1000)
+    def test_dropped_big_download_is_resumed_by_the_next_call(self):
+        # Arrange
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=8000, etag='"v1"'),
+            FakeResponse(206, self.content[8000:], etag='"v1"'),
+        ]
+        with self.assertRaises(VersionRequestException):
+            self._read_downloaded_member()
+        self.assertEqual(len(os.listdir(self.downloader.parts_dir)), 2)
+
+        # Act
+        member = self._read_downloaded_member()
+
+        # Assert
+        self.assertEqual(member, b"x" * 1024)
+        self.assertEqual(
+            self.session_get.call_args_list[1][1]["headers"]["Range"], "bytes=8000-"
+        )
+        self.assertEqual(os.listdir(self.downloader.parts_dir), [])
+
+    @patch.object(repository_downloader, "SPOOL_MAX_SIZE", 1000)
+    def test_resumed_download_is_stored(self):
+        # Arrange
+        key = "org/repo@" + "a" * 40
+        self.downloader._get_archive_key = MagicMock(return_value=key)
+        self.session_get.side_effect = [
+            FakeResponse(200, self.content, drop_after=8000, etag='"v1"'),
+            FakeResponse(206, self.content[8000:], etag='"v1"'),
+        ]
+        with self.assertRaises(VersionRequestException):
+            self._read_downloaded_member()
+
+        # Act
+        self._read_downloaded_member()
+
+        # Assert
+        with open(self.downloader.archive_store.get(key), "rb") as stream:
+            self.assertEqual(stream.read(), self.content)
+
+    def test_dropped_small_download_is_not_kept(self):
+        # Arrange
+        self.session_get.return_value = FakeResponse(
+            200, self.content, drop_after=8000, etag='"v1"'
+        )
+
+        # Act
+        with self.assertRaises(VersionRequestException):
+            self._read_downloaded_member()
+
+        # Assert
+        self.assertFalse(os.path.exists(self.downloader.parts_dir))
+
+
+class TestRepositoryDownloaderRetries(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(close_sessions)
+        # port nobody listens to
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.url = "http://127.0.0.1:{}/repo.zip".format(sock.getsockname()[1])
+        self.downloader = RepositoryDownloader(read_timeout=30)
+        self.downloader.retry_policy.sleep = MagicMock()
+
+    def test_refused_download_is_attempted_once_per_retry(self):
+        # Arrange
+        import urllib3.util.connection
+
+        # Act
+        with patch(
+            "urllib3.util.connection.create_connection",
+            wraps=urllib3.util.connection.create_connection,
+        ) as create_connection:
+            with self.assertRaises(VersionRequestException):
+                self.downloader.download_to_stream(self.url, io.BytesIO())
+
+        # Assert
+        self.assertEqual(create_connection.call_count, MAX_RESUME_ATTEMPTS + 1)
+
+    def test_retries_are_limited_by_deadline(self):
+        # Assert
+        self.assertEqual(self.downloader.retry_policy.deadline, RETRY_DEADLINE)
@@ -0,0 +1,175 @@
+#!/usr/bin/python
+import unittest
+from unittest.mock import MagicMock
+from urllib.error import HTTPError
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from shellfoundry.utilities.retry import RetryPolicy, is_connect_error, is_retryable
+
+
+def http_error(status):
+    response = requests.models.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRetryClassification(unittest.TestCase):
+    def test_temporary_errors_are_retryable(self):
+        for error in (
+            requests.ConnectionError("refused"),
+            requests.Timeout("timed out"),
+            ProtocolError("connection broken"),
+            http_error(429),
+            http_error(503),
+            HTTPError("url", 502, "Bad Gateway", None, None),
+        ):
+            self.assertTrue(is_retryable(error), error)
+
+    def test_permanent_errors_are_not_retryable(self):
+        for error in (
+            requests.exceptions.SSLError("certificate verify failed"),
+            http_error(401),
+            http_error(404),
+            HTTPError("url", 401, "Unauthorized", None, None),
+            ValueError("bad data"),
+        ):
+            self.assertFalse(is_retryable(error), error)
+
+    def test_only_unsent_requests_are_connect_errors(self):
+        # Arrange
+        refused = requests.ConnectionError(
+            MagicMock(reason=NewConnectionError(None, "refused"))
+        )
+        dropped = requests.ConnectionError(ProtocolError("connection reset"))
+
+        # Act & Assert
+        self.assertTrue(is_connect_error(refused))
+        self.assertTrue(is_connect_error(requests.ConnectTimeout("timed out")))
+        self.assertFalse(is_connect_error(dropped))
+        self.assertFalse(is_connect_error(requests.ReadTimeout("timed out")))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleep = MagicMock(side_effect=self.clock.sleep)
+
+    def policy(self, **kwargs):
+        kwargs.setdefault("jitter", lambda: 1.0)
+        return RetryPolicy(sleep=self.sleep, clock=self.clock, **kwargs)
+
+    def test_delays_grow_exponentially_up_to_the_limit(self):
+        # Arrange
+        policy = self.policy(base_delay=0.5, max_delay=3.0)
+
+        # Act
+        delays = [policy.delay(retry) for retry in range(5)]
+
+        # Assert
+        self.assertEqual(delays, [0.5, 1.0, 2.0, 3.0, 3.0])
+
+    def test_delays_are_jittered(self):
+        # Arrange
+        policy = self.policy(base_delay=2.0, jitter=lambda: 0.25)
+
+        # Act & Assert
+        self.assertEqual(policy.delay(2), 2.0)
+
+    def test_temporary_error_is_retried(self):
+        # Arrange
+        error = requests.ConnectionError("refused")
+        func = MagicMock(side_effect=[error, "result"])
+        on_retry = MagicMock()
+
+        # Act
+        result = self.policy().call(func, on_retry=on_retry)
+
+        # Assert
+        self.assertEqual(result, "result")
+        self.assertEqual(func.call_count, 2)
+        self.sleep.assert_called_once_with(0.5)
+        on_retry.assert_called_once_with(1, error, 0.5)
+
+    def test_permanent_error_is_raised_without_waiting(self):
+        # Arrange
+        func = MagicMock(side_effect=http_error(401))
+
+        # Act
+        with self.assertRaises(requests.HTTPError):
+            self.policy().call(func)
+
+        # Assert
+        func.assert_called_once()
+        self.sleep.assert_not_called()
+
+    def test_last_error_is_raised_after_all_attempts(self):
+        # Arrange
+        func = MagicMock(side_effect=requests.ConnectionError("refused"))
+
+        # Act
+        with self.assertRaises(requests.ConnectionError):
+            self.policy(attempts=3).call(func)
+
+        # Assert
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_attempts_stop_at_deadline(self):
+        # Arrange
+        func = MagicMock(side_effect=requests.Timeout("timed out"))
+
+        # Act
+        with self.assertRaises(requests.Timeout):
+            self.policy(attempts=10, deadline=3.0).call(func)
+
+        # Assert
+        # waits 0.5 and 1 second, the next 2 seconds wait exceeds the deadline
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(self.clock.now, 1.5)
+
+    def test_custom_classification_is_used(self):
+        # Arrange
+        func = MagicMock(side_effect=requests.ReadTimeout("timed out"))
+
+        # Act
+        with self.assertRaises(requests.ReadTimeout):
+            self.policy().call(func, retryable=is_connect_error)
+
+        # Assert
+        func.assert_called_once()
+
+    def test_adapter_retry_backs_off_by_the_policy(self):
+        # Arrange
+        retry = self.policy(attempts=3, base_delay=1.0).adapter_retry()
+
+        # Act
+        first = retry.increment("GET", "/", error=ProtocolError("reset"))
+        second = first.increment("GET", "/", error=ProtocolError("reset"))
+
+        # Assert
+        self.assertEqual(first.get_backoff_time(), 1.0)
+        self.assertEqual(second.get_backoff_time(), 2.0)
+        self.assertEqual(second.total, 0)
+
+    def test_adapter_retry_is_exhausted_at_deadline(self):
+        # Arrange
+        retry = self.policy(attempts=10, deadline=5.0).adapter_retry()
+        first = retry.increment("GET", "/", error=ProtocolError("reset"))
+        self.clock.now += 5.0
+
+        # Act & Assert
+        with self.assertRaises(MaxRetryError):
+            first.increment("GET", "/", error=ProtocolError("reset"))
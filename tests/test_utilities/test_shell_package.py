@@ -114,3 +114,18 @@ class TestShellPackageWithFileSystem(fake_filesystem_unittest.TestCase):
 
         # Assert
         self.assertEqual(shell_name, "NutShell")
+
+    def test_get_definition_path(self):
+        # Arrange
+        self.fs.create_file(
+            "work/nut-shell/TOSCA-Metadata/TOSCA.meta",
+            contents="TOSCA-Meta-File-Version: 1.0\n"
+            "Entry-Definitions: nut-shell-definition.yaml",
+        )
+        shell_package = ShellPackage("work/nut-shell")
+
+        # Act
+        definition_path = shell_package.get_definition_path()
+
+        # Assert
+        self.assertEqual(definition_path, "work/nut-shell/nut-shell-definition.yaml")
@@ -1,13 +1,14 @@
 #!/usr/bin/python
 
 import os
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from pyfakefs import fake_filesystem_unittest
 
+from shellfoundry.utilities.archive_creator import ZipArchiveBuilder
 from shellfoundry.utilities.shell_package_builder import ShellPackageBuilder
 
-from tests.asserts import assertFileExists
+from tests.asserts import assertFileDoesNotExist, assertFileExists
 from tests.test_utilities.test_package_builder import TestPackageBuilder
 
 
@@ -283,3 +284,101 @@ class TestShellPackageBuilder(fake_filesystem_unittest.TestCase):
         with self.assertRaisesRegex(Exception, "Invalid driver structure."):
             with patch("click.echo"):
                 shell_package_builder.pack("/nut-shell")
+
+    def _create_nut_shell(self):
+        self.fs.create_file(
+            "nut-shell/TOSCA-Metadata/TOSCA.meta",
+            contents="TOSCA-Meta-File-Version: 1.0 \n"
+            "CSAR-Version: 1.1 \n"
+            "Created-By: Anonymous\n"
+            "Entry-Definitions: shell-definition.yml",
+        )
+        self.fs.create_file(
+            "nut-shell/shell-definition.yml",
+            contents="tosca_definitions_version: tosca_simple_yaml_1_0\n"
+            "metadata:\n"
+            "  template_name: NutShell\n"
+            "  template_author: Anonymous\n"
+            "  template_version: 1.0.0\n"
+            "node_types:\n"
+            "  vendor.switch.NXOS:\n"
+            "    derived_from: cloudshell.nodes.Switch\n"
+            "    artifacts:\n"
+            "      icon:\n"
+            "        file: nxos.png\n"
+            "        type: tosca.artifacts.File\n"
+            "      driver:\n"
+            "        file: NutShellDriver.zip\n"
+            "        type: tosca.artifacts.File\n"
+            "      deployment:\n"
+            "        file: Deployments.zip\n"
+            "        type: tosca.artifacts.File",
+        )
+        self.fs.create_file("nut-shell/nxos.png", contents="IMAGE")
+        self.fs.create_file("nut-shell/src/driver.py", contents="DRIVER CONTENT")
+        self.fs.create_file("nut-shell/deployments/deployment.yml", contents="DEPLOY")
+        os.chdir("nut-shell")
+
+    def test_unchanged_shell_is_not_repacked(self):
+        # Arrange
+        self._create_nut_shell()
+        with patch("click.echo"):
+            ShellPackageBuilder().pack("/nut-shell")
+        package_mtime = os.path.getmtime("dist/NutShell.zip")
+
+        # Act
+        with patch("click.echo") as echo_mock, patch.object(
+            ZipArchiveBuilder, "make_archive"
+        ) as make_archive_mock:
+            ShellPackageBuilder().pack("/nut-shell")
+
+        # Assert
+        make_archive_mock.assert_not_called()
+        echo_mock.assert_called_once_with(
+            "Shell package is up to date: " + os.path.join("dist", "NutShell.zip")
+        )
+        self.assertEqual(os.path.getmtime("dist/NutShell.zip"), package_mtime)
+        assertFileDoesNotExist(self, "NutShellDriver.zip")
+
+    def test_only_changed_driver_archive_is_rebuilt(self):
+        # Arrange
+        self._create_nut_shell()
+        with patch("click.echo"):
+            ShellPackageBuilder().pack("/nut-shell")
+        with open("src/driver.py", "w") as driver_file:
+            driver_file.write("CHANGED DRIVER CONTENT")
+
+        # Act
+        archive_builder = ZipArchiveBuilder()
+        with patch("click.echo"), patch.object(
+            archive_builder, "make_archive", wraps=archive_builder.make_archive
+        ) as make_archive_mock:
+            ShellPackageBuilder(archive_builder).pack("/nut-shell")
+
+        # Assert
+        self.assertEqual(
+            [c[0][1] for c in make_archive_mock.call_args_list], ["src", ANY]
+        )
+        TestPackageBuilder.unzip("dist/NutShell.zip", "dist/package_content")
+        TestPackageBuilder.unzip(
+            "dist/package_content/NutShellDriver.zip", "dist/driver_content"
+        )
+        with open("dist/driver_content/driver.py") as driver_file:
+            self.assertEqual(driver_file.read(), "CHANGED DRIVER CONTENT")
+
+    def test_removed_package_is_recreated(self):
+        # Arrange
+        self._create_nut_shell()
+        with patch("click.echo"):
+            ShellPackageBuilder().pack("/nut-shell")
+        os.remove("dist/NutShell.zip")
+
+        # Act
+        with patch("click.echo"):
+            ShellPackageBuilder().pack("/nut-shell")
+
+        # Assert
+        assertFileExists(self, "dist/NutShell.zip")
+        TestPackageBuilder.unzip("dist/NutShell.zip", "dist/package_content")
+        assertFileExists(self, "dist/package_content/NutShellDriver.zip")
+        assertFileExists(self, "dist/package_content/Deployments.zip")
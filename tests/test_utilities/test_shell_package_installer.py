@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 import click
+import requests
 
 try:
     from cloudshell.rest.exceptions import FeatureUnavailable, ShellNotFound
@@ -13,10 +14,11 @@ from urllib.error import HTTPError
 
 from pyfakefs import fake_filesystem_unittest
 
-import shellfoundry.utilities.shell_package_installer as spi
 from shellfoundry.exceptions import FatalError
+from shellfoundry.utilities.retry import RetryPolicy
 from shellfoundry.utilities.shell_package_installer import (
     SHELL_IS_OFFICIAL_FLAG,
+    LoginFailedError,
     ShellPackageInstaller,
 )
 
@@ -58,6 +60,27 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
         # Assert
         self.assertTrue(mock_client.update_shell.called)
 
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login"
+    )
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.ShellPackage.get_name_from_definition",  # noqa: E501
+        new=MagicMock(return_value="NutShell"),
+    )
+    def test_install_shell_with_given_client_does_not_login(self, rest_client_mock):
+        # Arrange
+        mock_client = MagicMock()
+        mock_client.get_shell.return_value = {SHELL_IS_OFFICIAL_FLAG: False}
+        installer = ShellPackageInstaller()
+
+        # Act
+        with patch("click.echo"):
+            installer.install("work/nut-shell", client=mock_client)
+
+        # Assert
+        rest_client_mock.assert_not_called()
+        self.assertTrue(mock_client.update_shell.called)
+
     @patch(
         "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login"
     )
@@ -120,8 +143,6 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
     )
     def test_fail_to_open_connection_to_cs(self):
         # Arrange
-        # doing that for test to run faster with no sleeps between connection failures
-        spi.CloudShell_Retry_Interval_Sec = 0
         installer = ShellPackageInstaller()
 
         with self.assertRaises(FatalError) as context:
@@ -143,8 +164,6 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
     )
     def test_fail_to_login_into_cs(self):
         # Arrange
-        # doing that for test to run faster with no sleeps between connection failures
-        spi.CloudShell_Retry_Interval_Sec = 0
         installer = ShellPackageInstaller()
 
         with self.assertRaises(FatalError) as context:
@@ -166,8 +185,6 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
     )
     def test_fail_with_http_error_other_than_authentication_error(self):
         # Arrange
-        # doing that for test to run faster with no sleeps between connection failures
-        spi.CloudShell_Retry_Interval_Sec = 0
         installer = ShellPackageInstaller()
 
         with self.assertRaises(FatalError) as context:
@@ -179,6 +196,59 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
             "Connection to CloudShell Server failed. Please make sure it is up and running properly.",  # noqa: E501
         )
 
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login",
+        new=MagicMock(side_effect=LoginFailedError("")),
+    )
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.ShellPackage.get_name_from_definition",  # noqa: E501
+        new=MagicMock(return_value="NutShell"),
+    )
+    def test_fail_to_login_is_not_retried(self):
+        # Arrange
+        retry_policy = RetryPolicy(sleep=MagicMock())
+        installer = ShellPackageInstaller(retry_policy=retry_policy)
+
+        with self.assertRaises(FatalError) as context:
+            installer.install("work/nut-shell")
+
+        # Assert
+        self.assertEqual(
+            context.exception.message,
+            "Login to CloudShell failed. Please verify the credentials in the config",
+        )
+        retry_policy.sleep.assert_not_called()
+
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login"
+    )
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.ShellPackage.get_name_from_definition",  # noqa: E501
+        new=MagicMock(return_value="NutShell"),
+    )
+    def test_connection_is_retried_with_backoff(self, login_mock):
+        # Arrange
+        mock_client = MagicMock()
+        mock_client.get_shell.return_value = {SHELL_IS_OFFICIAL_FLAG: False}
+        login_mock.side_effect = [
+            requests.ConnectionError("refused"),
+            requests.ConnectionError("refused"),
+            mock_client,
+        ]
+        retry_policy = RetryPolicy(sleep=MagicMock(), jitter=lambda: 1.0)
+        installer = ShellPackageInstaller(retry_policy=retry_policy)
+
+        # Act
+        with patch("click.echo"):
+            installer.install("work/nut-shell")
+
+        # Assert
+        self.assertEqual(login_mock.call_count, 3)
+        self.assertEqual(
+            [c[0][0] for c in retry_policy.sleep.call_args_list], [0.5, 1.0]
+        )
+        self.assertTrue(mock_client.update_shell.called)
+
     @patch(
         "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login",
         new=MagicMock(
@@ -218,8 +288,6 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
             "        file: NutShellDriver.zip\n"
             "        type: tosca.artifacts.File",
         )
-        # doing that for test to run faster with no sleeps between connection failures
-        spi.Default_Time_Wait = 0
         installer = ShellPackageInstaller()
 
         # Act
@@ -327,3 +395,63 @@ class TestShellPackageInstaller(fake_filesystem_unittest.TestCase):
 
         # Assert
         self.assertTrue(mock_client.update_shell.called)
+
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login"
+    )
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.ShellPackage.get_name_from_definition",  # noqa: E501
+        new=MagicMock(return_value="NutShell"),
+    )
+    def test_install_skips_upload_of_already_installed_package(self, rest_client_mock):
+        # Arrange
+        self.fs.create_file("work/nut-shell/dist/NutShell.zip", contents="PACKAGE")
+        mock_client = MagicMock()
+        mock_client.get_shell.return_value = {SHELL_IS_OFFICIAL_FLAG: False}
+        rest_client_mock.return_value = mock_client
+        installer = ShellPackageInstaller()
+        with patch("click.echo"):
+            self.assertTrue(installer.install("work/nut-shell"))
+        rest_client_mock.reset_mock()
+
+        # Act
+        with patch("click.echo") as echo_mock:
+            result = installer.install("work/nut-shell")
+
+        # Assert
+        self.assertFalse(result)
+        rest_client_mock.assert_not_called()
+        mock_client.update_shell.assert_not_called()
+        echo_mock.assert_called_once_with(
+            "Shell package NutShell.zip is already installed into CloudShell "
+            "at localhost:9000, use --force to upload it anyway"
+        )
+
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.PackagingRestApiClient.login"
+    )
+    @patch(
+        "shellfoundry.utilities.shell_package_installer.ShellPackage.get_name_from_definition",  # noqa: E501
+        new=MagicMock(return_value="NutShell"),
+    )
+    def test_install_uploads_changed_or_forced_package(self, rest_client_mock):
+        # Arrange
+        self.fs.create_file("work/nut-shell/dist/NutShell.zip", contents="PACKAGE")
+        mock_client = MagicMock()
+        mock_client.get_shell.return_value = {SHELL_IS_OFFICIAL_FLAG: False}
+        rest_client_mock.return_value = mock_client
+        installer = ShellPackageInstaller()
+        with patch("click.echo"):
+            installer.install("work/nut-shell")
+
+        # Act
+        with patch("click.echo"):
+            forced = installer.install("work/nut-shell", force=True)
+            with open("work/nut-shell/dist/NutShell.zip", "w") as package_file:
+                package_file.write("CHANGED PACKAGE")
+            changed = installer.install("work/nut-shell")
+
+        # Assert
+        self.assertTrue(forced)
+        self.assertTrue(changed)
+        self.assertEqual(mock_client.update_shell.call_count, 3)
@@ -0,0 +1,12 @@
+#!/usr/bin/python
+import unittest
+
+from shellfoundry.utilities.source_filter import is_ignored
+
+
+class TestSourceFilter(unittest.TestCase):
+    def test_is_ignored(self):
+        for name in ("__pycache__", "driver.pyc", ".#driver.py", "driver.py~", ".git"):
+            self.assertTrue(is_ignored(name), name)
+        for name in ("driver.py", "shell-definition.yaml", "deployments"):
+            self.assertFalse(is_ignored(name), name)
@@ -0,0 +1,25 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+import zipfile
+
+from shellfoundry.utilities.spooled_file import SpooledFile
+
+
+class TestSpooledFile(unittest.TestCase):
+    def _assert_zip_is_readable(self, max_size):
+        with SpooledFile(max_size=max_size) as buffer:
+            with zipfile.ZipFile(buffer, "w") as zip_file:
+                zip_file.writestr("root/shell.txt", b"x" * 1024)
+            buffer.seek(0)
+
+            with zipfile.ZipFile(buffer) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                self.assertEqual(zip_file.read("root/shell.txt"), b"x" * 1024)
+
+    def test_zip_in_memory_is_readable(self):
+        self._assert_zip_is_readable(max_size=1024 * 1024)
+
+    def test_zip_rolled_over_to_disk_is_readable(self):
+        self._assert_zip_is_readable(max_size=1)
@@ -1,11 +1,16 @@
 #!/usr/bin/python
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import httpretty
+import requests
 from pyfakefs import fake_filesystem_unittest
 
+from shellfoundry.models.shell_template import ShellTemplate
 from shellfoundry.utilities import GEN_ONE, GEN_TWO, NO_FILTER
+from shellfoundry.utilities.cache import FileCache
+from shellfoundry.utilities.local_templates_index import LocalTemplatesIndex
 from shellfoundry.utilities.template_retriever import (
     TEMPLATES_YML,
     FilteredTemplateRetriever,
@@ -239,6 +244,175 @@ class TestTemplateRetriever(unittest.TestCase):
             "https://github.com/QualiSystems/shellfoundry-software-asset-template",
         )
 
+    @httpretty.activate
+    def test_templates_served_from_cache_while_fresh(self):
+        # Arrange
+        httpretty.register_uri(
+            "GET", TEMPLATES_YML, body=self.mock_get_templates_from_github()
+        )
+        TemplateRetriever(templates_cache_ttl=3600).get_templates()
+        httpretty.reset()
+
+        # Act
+        templates = TemplateRetriever(templates_cache_ttl=3600).get_templates()
+
+        # Assert
+        self.assertEqual(len(templates), 4)
+        self.assertIsNone(httpretty.last_request().method)
+
+    @httpretty.activate
+    def test_expired_templates_revalidated_with_conditional_request(self):
+        # Arrange
+        httpretty.register_uri(
+            "GET",
+            TEMPLATES_YML,
+            body=self.mock_get_templates_from_github(),
+            adding_headers={"ETag": '"templates-etag"'},
+        )
+        TemplateRetriever(templates_cache_ttl=0).get_templates()
+        httpretty.register_uri("GET", TEMPLATES_YML, status=304, body="")
+
+        # Act
+        templates = TemplateRetriever(templates_cache_ttl=0).get_templates()
+
+        # Assert
+        self.assertEqual(len(templates), 4)
+        self.assertEqual(
+            httpretty.last_request().headers["If-None-Match"], '"templates-etag"'
+        )
+
+    @httpretty.activate
+    def test_stale_templates_used_when_github_unreachable(self):
+        # Arrange
+        httpretty.register_uri(
+            "GET", TEMPLATES_YML, body=self.mock_get_templates_from_github()
+        )
+        TemplateRetriever(templates_cache_ttl=0).get_templates()
+
+        # Act
+        with patch.object(
+            requests.Session, "get", side_effect=requests.ConnectionError("offline")
+        ):
+            templates = TemplateRetriever(templates_cache_ttl=0).get_templates()
+
+        # Assert
+        self.assertEqual(len(templates), 4)
+
+    @patch.object(TemplateRetriever, "_get_min_cs_version")
+    def test_filter_by_standards_returns_same_result_on_repeated_calls(
+        self, get_min_cs_version_mock
+    ):
+        # Arrange
+        get_min_cs_version_mock.return_value = "9.0"
+        template_retriever = TemplateRetriever(max_workers=2)
+        standards = {"resource": ["1.0.0"], "networking": ["5.0.0"]}
+
+        def create_templates():
+            return {
+                "gen1/resource": [ShellTemplate("gen1/resource", "", "", "7.0")],
+                "gen2/resource": [
+                    ShellTemplate("gen2/resource", "", "https://repo", "8.0")
+                ],
+                "gen2/firewall": [ShellTemplate("gen2/firewall", "", "", "8.0")],
+            }
+
+        # Act
+        first = template_retriever._filter_by_standards(create_templates(), standards)
+        second = template_retriever._filter_by_standards(create_templates(), standards)
+
+        # Assert
+        for result in (first, second):
+            self.assertEqual(list(result.keys()), ["gen1/resource", "gen2/resource"])
+            self.assertEqual(result["gen2/resource"][0].min_cs_ver, "9.0")
+
+    @patch.object(TemplateRetriever, "_get_min_cs_version")
+    @patch(
+        "shellfoundry.utilities.template_retriever.ThreadPoolExecutor",
+        wraps=ThreadPoolExecutor,
+    )
+    def test_filter_by_standards_uses_bounded_pool(
+        self, executor_mock, get_min_cs_version_mock
+    ):
+        # Arrange
+        get_min_cs_version_mock.return_value = None
+        templates = {
+            "gen2/resource-{}".format(i): [
+                ShellTemplate("gen2/resource", "", "https://repo", "8.0")
+            ]
+            for i in range(10)
+        }
+
+        # Act
+        result = TemplateRetriever(max_workers=3)._filter_by_standards(
+            templates, {"resource-{}".format(i): ["1.0.0"] for i in range(10)}
+        )
+
+        # Assert
+        executor_mock.assert_called_once_with(max_workers=3)
+        self.assertEqual(len(result), 10)
+
+    @httpretty.activate
+    def test_latest_template_lookups_cached_by_branch_commit(self):
+        # Arrange
+        repo = "https://github.com/QualiSystems/shellfoundry-tosca-resource-template"
+        httpretty.register_uri(
+            "GET",
+            "https://api.github.com/repos/QualiSystems/"
+            "shellfoundry-tosca-resource-template/branches",
+            body='[{"name": "1.0.0", "commit": {"sha": "aaa"}},'
+            ' {"name": "2.0.0", "commit": {"sha": "bbb"}}]',
+        )
+        httpretty.register_uri(
+            "GET",
+            "https://raw.github.com/QualiSystems/"
+            "shellfoundry-tosca-resource-template/2.0.0/cookiecutter.json",
+            body='{"server_version": "9.0"}',
+        )
+        httpretty.register_uri(
+            "GET",
+            "https://raw.github.com/QualiSystems/"
+            "shellfoundry-tosca-resource-template/1.0.0/cookiecutter.json",
+            body='{"server_version": "8.0"}',
+        )
+        first = TemplateRetriever().get_latest_template(repo, "8.1")
+        requests_count = len(httpretty.latest_requests())
+
+        # Act
+        second = TemplateRetriever().get_latest_template(repo, "8.1")
+
+        # Assert
+        self.assertEqual(first, "1.0.0")
+        self.assertEqual(second, "1.0.0")
+        # only branches list is requested again
+        self.assertEqual(len(httpretty.latest_requests()), requests_count + 1)
+        self.assertEqual(
+            httpretty.last_request().path,
+            "/repos/QualiSystems/shellfoundry-tosca-resource-template/branches",
+        )
+
+    @httpretty.activate
+    def test_missing_min_cs_version_is_cached(self):
+        # Arrange
+        url = "https://raw.github.com/QualiSystems/repo/1.0.0/cookiecutter.json"
+        httpretty.register_uri("GET", url, status=404, body="Not Found")
+        TemplateRetriever()._get_min_cs_version(
+            "https://github.com/QualiSystems/repo",
+            standard_name="resource",
+            standards={"resource": ["1.0.0"]},
+        )
+        httpretty.reset()
+
+        # Act
+        cs_version = TemplateRetriever()._get_min_cs_version(
+            "https://github.com/QualiSystems/repo",
+            standard_name="resource",
+            standards={"resource": ["1.0.0"]},
+        )
+
+        # Assert
+        self.assertIsNone(cs_version)
+        self.assertIsNone(httpretty.last_request().method)
+
 
 class TestTemplateRetrieverFakeFS(fake_filesystem_unittest.TestCase):
     def setUp(self):
@@ -277,3 +451,28 @@ templates:
         self.assertTrue("gen2/software-asset" in templates)
         self.assertEqual(templates["gen1/resource"][0].standard, None)
         self.assertEqual(templates["gen2/software-asset"][0].standard, "software-asset")
+
+    def test_get_templates_from_template_location(self):
+        # Arrange
+        self.fs.create_file(
+            "/templates/resource/cookiecutter.json",
+            contents='{"template_name": "gen1/resource", "template_descr": "Resource",'
+            ' "version": "1.0.0", "server_version": "7.0"}',
+        )
+        template_retriever = TemplateRetriever(
+            local_templates_index=LocalTemplatesIndex(
+                FileCache("local_templates", cache_dir="/cache")
+            )
+        )
+
+        # Act
+        templates = template_retriever.get_templates(template_location="/templates")
+
+        # Assert
+        template = templates["gen1/resource"][0]
+        self.assertEqual(template.description, "Resource")
+        self.assertEqual(template.min_cs_ver, "7.0")
+        self.assertEqual(
+            template.standard_version,
+            {"1.0.0": {"repo": "/templates/resource", "min_cs_ver": "7.0"}},
+        )
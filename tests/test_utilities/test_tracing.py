@@ -0,0 +1,125 @@
+#!/usr/bin/python
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import httpretty
+import requests
+
+from shellfoundry.utilities import tracing
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.trace_path = os.path.join(self.temp_dir, "trace.json")
+        self.clock = FakeClock()
+        self.stop = tracing.start(
+            self.trace_path, "command.test", tracer=tracing.Tracer(self.clock)
+        )
+
+    def tearDown(self):
+        self.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _get_spans(self):
+        self.stop()
+        with open(self.trace_path) as stream:
+            trace = json.load(stream)
+        return {
+            event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"
+        }
+
+    def test_nested_spans_are_saved_with_wall_time(self):
+        # Act
+        with tracing.span("pack.shell", shell="Bench"):
+            self.clock.time += 0.5
+            with tracing.span("archive.make") as span_args:
+                self.clock.time += 0.25
+                span_args["size"] = 100
+
+        # Assert
+        spans = self._get_spans()
+        self.assertEqual(spans["command.test"]["dur"], 750000)
+        self.assertEqual(spans["pack.shell"]["dur"], 750000)
+        self.assertEqual(spans["pack.shell"]["cat"], "pack")
+        self.assertEqual(spans["pack.shell"]["args"], {"shell": "Bench"})
+        self.assertEqual(spans["archive.make"]["ts"], 500000)
+        self.assertEqual(spans["archive.make"]["dur"], 250000)
+        self.assertEqual(spans["archive.make"]["args"], {"size": 100})
+
+    def test_counters_are_added_to_open_spans(self):
+        # Act
+        tracing.count(bytes_received=10)
+        with tracing.span("outer"):
+            tracing.count(bytes_received=5)
+            with tracing.span("inner"):
+                tracing.count(http_requests=1, bytes_received=20)
+
+        # Assert
+        spans = self._get_spans()
+        self.assertEqual(
+            spans["inner"]["args"], {"http_requests": 1, "bytes_received": 20}
+        )
+        self.assertEqual(
+            spans["outer"]["args"], {"http_requests": 1, "bytes_received": 25}
+        )
+        self.assertEqual(
+            spans["command.test"]["args"], {"http_requests": 1, "bytes_received": 35}
+        )
+
+    def test_traced_function_failure_is_recorded(self):
+        # Arrange
+        @tracing.traced("standards.fetch")
+        def fetch():
+            raise ValueError()
+
+        # Act
+        with self.assertRaises(ValueError):
+            fetch()
+
+        # Assert
+        self.assertEqual(
+            self._get_spans()["standards.fetch"]["args"], {"error": "ValueError"}
+        )
+
+    def test_nothing_is_recorded_after_stop(self):
+        # Arrange
+        tracer = tracing._tracer
+        self.stop()
+
+        # Act
+        with tracing.span("pack.shell") as span_args:
+            span_args["size"] = 1
+
+        # Assert
+        self.assertEqual([event["name"] for event in tracer.events], ["command.test"])
+
+    @httpretty.activate
+    def test_http_requests_are_counted(self):
+        # Arrange
+        httpretty.register_uri(
+            httpretty.POST, "https://api.github.com/upload", body="x" * 1000
+        )
+
+        # Act
+        with tracing.span("install.upload"):
+            requests.post("https://api.github.com/upload", data=b"y" * 300)
+
+        # Assert
+        spans = self._get_spans()
+        self.assertEqual(spans["http.POST"]["args"]["status"], 200)
+        self.assertEqual(
+            spans["install.upload"]["args"],
+            {"http_requests": 1, "bytes_sent": 300, "bytes_received": 1000},
+        )
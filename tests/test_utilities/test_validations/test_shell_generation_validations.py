@@ -0,0 +1,40 @@
+#!/usr/bin/python
+
+import io
+import unittest
+import zipfile
+
+from shellfoundry.utilities.validations import ShellGenerationValidations
+from shellfoundry.utilities.validations.shell_generation_validation import (
+    get_shell_root,
+)
+
+
+class TestShellGenerationValidations(unittest.TestCase):
+    def test_shell_root_in_zip_root(self):
+        self.assertEqual(
+            get_shell_root(["shell-definition.yaml", "TOSCA-Metadata/TOSCA.meta"]), ""
+        )
+
+    def test_shell_root_in_top_folder(self):
+        self.assertEqual(
+            get_shell_root(["NutShell-1.0/", "NutShell-1.0/TOSCA-Metadata/TOSCA.meta"]),
+            "NutShell-1.0/",
+        )
+
+    def test_shell_root_missing(self):
+        self.assertIsNone(
+            get_shell_root(["a/b/TOSCA-Metadata/TOSCA.meta", "TOSCA-Metadata/x"])
+        )
+
+    def test_validate_zip_file_object(self):
+        # Arrange
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("NutShell/TOSCA-Metadata/TOSCA.meta", "")
+
+        # Act
+        result = ShellGenerationValidations().validate_2nd_gen(archive)
+
+        # Assert
+        self.assertTrue(result)
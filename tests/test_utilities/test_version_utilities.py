@@ -2,8 +2,12 @@
 import unittest
 
 from freezegun import freeze_time
+from pyfakefs import fake_filesystem_unittest
 
-from shellfoundry.utilities.version_utilities import DriverVersionTimestampBased
+from shellfoundry.utilities.version_utilities import (
+    DriverVersionContentBased,
+    DriverVersionTimestampBased,
+)
 
 
 class TestDriverVersionTimestampBased(unittest.TestCase):
@@ -50,3 +54,55 @@ class TestDriverVersionTimestampBased(unittest.TestCase):
     def test_it_supports_only_major_minor_numbers(self):
         self.assertFalse(DriverVersionTimestampBased.supports_version_pattern("a.1.*"))
         self.assertFalse(DriverVersionTimestampBased.supports_version_pattern("1.b.*"))
+
+
+class TestDriverVersionContentBased(fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file("src/driver.py", contents="DRIVER")
+        self.fs.create_file("src/drivermetadata.xml", contents="METADATA")
+
+    def test_it_gets_the_same_version_for_the_same_content(self):
+        # Arrange
+        version1 = DriverVersionContentBased.get_version("1.2.*", "src")
+        self.fs.create_file("copy/driver.py", contents="DRIVER")
+        self.fs.create_file("copy/drivermetadata.xml", contents="METADATA")
+
+        # Act
+        version2 = DriverVersionContentBased.get_version("1.2.*", "copy")
+
+        # Assert
+        self.assertEqual(version1, version2)
+        self.assertRegex(version1, r"^1\.2\.\d+\.\d+$")
+        build, revision = [int(part) for part in version1.split(".")[2:]]
+        self.assertLessEqual(build, 65534)
+        self.assertLessEqual(revision, 65534)
+
+    def test_it_gets_another_version_when_content_changed(self):
+        # Arrange
+        version1 = DriverVersionContentBased.get_version("1.2.*", "src")
+        with open("src/driver.py", "w") as driver_file:
+            driver_file.write("CHANGED DRIVER")
+
+        # Act
+        version2 = DriverVersionContentBased.get_version("1.2.*", "src")
+
+        # Assert
+        self.assertNotEqual(version1, version2)
+
+    def test_byte_code_and_editor_files_are_not_hashed(self):
+        # Arrange
+        version1 = DriverVersionContentBased.get_version("1.2.*", "src")
+        self.fs.create_file("src/__pycache__/driver.cpython-311.pyc", contents="PYC")
+        self.fs.create_file("src/driver.pyc", contents="PYC")
+        self.fs.create_file("src/driver.py~", contents="BACKUP")
+
+        # Act
+        version2 = DriverVersionContentBased.get_version("1.2.*", "src")
+
+        # Assert
+        self.assertEqual(version1, version2)
+
+    def test_it_supports_one_build_wildcard(self):
+        self.assertTrue(DriverVersionContentBased.supports_version_pattern("1.2.*"))
+        self.assertFalse(DriverVersionContentBased.supports_version_pattern("1.2.3"))
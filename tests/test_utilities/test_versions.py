@@ -2,7 +2,11 @@
 import unittest
 from unittest.mock import Mock, patch
 
-from shellfoundry.utilities import is_index_version_greater_than_current
+from shellfoundry.utilities import (
+    VERSION_CHECK_TIMEOUT,
+    get_cached_index_version,
+    is_index_version_greater_than_current,
+)
 
 patch.object = patch.object
 
@@ -21,7 +25,7 @@ class TestVersionsHelpers(unittest.TestCase):
         # Act
         with patch(
             "shellfoundry.utilities.get_installed_version", return_value="1.0.0"
-        ), patch("shellfoundry.utilities.requests.get", return_value=get_response):
+        ), patch("requests.get", return_value=get_response):
             (
                 is_greater_version,
                 is_major_release,
@@ -44,7 +48,7 @@ class TestVersionsHelpers(unittest.TestCase):
         # Act
         with patch(
             "shellfoundry.utilities.get_installed_version", return_value="0.2.7"
-        ), patch("shellfoundry.utilities.requests.get", return_value=get_response):
+        ), patch("requests.get", return_value=get_response):
             (
                 is_greater_version,
                 is_major_release,
@@ -67,7 +71,7 @@ class TestVersionsHelpers(unittest.TestCase):
         # Act
         with patch(
             "shellfoundry.utilities.get_installed_version", return_value="0.2.7"
-        ), patch("shellfoundry.utilities.requests.get", return_value=get_response):
+        ), patch("requests.get", return_value=get_response):
             (
                 is_greater_version,
                 is_major_release,
@@ -90,7 +94,7 @@ class TestVersionsHelpers(unittest.TestCase):
         # Act
         with patch(
             "shellfoundry.utilities.get_installed_version", return_value="0.2.7"
-        ), patch("shellfoundry.utilities.requests.get", return_value=get_response):
+        ), patch("requests.get", return_value=get_response):
             (
                 is_greater_version,
                 is_major_release,
@@ -99,3 +103,36 @@ class TestVersionsHelpers(unittest.TestCase):
         # Assert
         self.assertFalse(is_greater_version)
         self.assertFalse(is_major_release)
+
+    def test_index_version_is_saved_for_next_checks(self):
+        # Arrange
+        get_response = Mock()
+        get_response.status_code = 200
+        get_response.content = '{"info": {"version": "1.0.1"}}'
+
+        # Act
+        with patch(
+            "shellfoundry.utilities.get_installed_version", return_value="1.0.0"
+        ), patch("requests.get", return_value=get_response) as get_mock:
+            is_index_version_greater_than_current()
+
+        # Assert
+        self.assertEqual(get_cached_index_version(3600), "1.0.1")
+        get_mock.assert_called_once_with(
+            "https://pypi.org/pypi/shellfoundry/json", timeout=VERSION_CHECK_TIMEOUT
+        )
+
+    def test_known_index_version_is_not_requested(self):
+        # Act
+        with patch(
+            "shellfoundry.utilities.get_installed_version", return_value="1.0.0"
+        ), patch("requests.get") as get_mock:
+            (
+                is_greater_version,
+                is_major_release,
+            ) = is_index_version_greater_than_current("2.0.0")
+
+        # Assert
+        self.assertTrue(is_greater_version)
+        self.assertTrue(is_major_release)
+        get_mock.assert_not_called()